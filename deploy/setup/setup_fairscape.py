@@ -115,6 +115,46 @@ def connectMongo() -> Optional[pymongo.database.Database]:
         print(f"ERROR: Failed to connect to MongoDB. Error: {e}")
         return None
 
+def setupMongoIndexes(db: pymongo.database.Database):
+    """Indexes backing identifier lookups and the keyset paginated listings."""
+    identifier_collection_name = get_config('FAIRSCAPE_MONGO_IDENTIFIER_COLLECTION', 'mds')
+    identifier_collection = db[identifier_collection_name]
+
+    indexes = [
+        ([("@id", pymongo.ASCENDING)], {}),
+        ([("@type", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], {}),
+        ([("publicationStatus", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], {}),
+        ([("permissions.owner", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], {}),
+        ([("permissions.group", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], {}),
+        ([("metadata.isPartOf.@id", pymongo.ASCENDING)], {}),
+        # keyword filter of faceted search
+        ([("metadata.keywords", pymongo.ASCENDING)], {}),
+        # the basic search text index is created by the API at startup from
+        # SEARCH_TEXT_WEIGHTS in crud/search.py
+    ]
+
+    for keys, options in indexes:
+        try:
+            identifier_collection.create_index(keys, background=True, **options)
+        except Exception as e:
+            print(f"WARNING: Could not ensure index {keys} on '{identifier_collection_name}'. Error: {e}")
+
+    print(f"INFO: MongoDB indexes ensured on '{identifier_collection_name}'.")
+
+    # prefix ranges of the search box completions, see core/autocomplete.py
+    autocomplete_collection_name = get_config('FAIRSCAPE_MONGO_AUTOCOMPLETE_COLLECTION', 'autocomplete')
+    try:
+        db[autocomplete_collection_name].create_index([("term", pymongo.ASCENDING)], background=True)
+    except Exception as e:
+        print(f"WARNING: Could not ensure index on term for '{autocomplete_collection_name}'. Error: {e}")
+
+    # connectToField of the $graphLookup provenance traversal, see core/graph.py
+    edge_collection_name = get_config('FAIRSCAPE_MONGO_PROVENANCE_EDGE_COLLECTION', 'provenance_edges')
+    try:
+        db[edge_collection_name].create_index([("source", pymongo.ASCENDING), ("field", pymongo.ASCENDING)], background=True)
+    except Exception as e:
+        print(f"WARNING: Could not ensure index on source for '{edge_collection_name}'. Error: {e}")
+
 # --- CSV Data Loading ---
 def load_csv_data(filepath: str, expected_headers: List[str]) -> List[Dict[str, str]]:
     data_list: List[Dict[str, str]] = []
@@ -230,6 +270,7 @@ if __name__ == "__main__":
     
     if mongo_db_connection is not None:
         setupMongoUsersAndGroups(mongo_db_connection)
+        setupMongoIndexes(mongo_db_connection)
     else:
         print("ERROR: Failed to connect to MongoDB after maximum retries. Skipping user/group setup.")
     
@@ -0,0 +1,105 @@
+""" Async Mongo and S3 clients for the read heavy endpoints
+
+Routes declared with ``async def`` must not block the event loop, so they use
+these clients instead of the pymongo / boto3 clients on ``FairscapeConfig``.
+Mongo access goes through pymongo's native ``AsyncMongoClient``; S3 access
+goes through aiobotocore, whose client owns an aiohttp session and is therefore
+created lazily on the event loop that first uses it.
+"""
+from typing import AsyncIterator, Optional
+import asyncio
+import contextlib
+
+from aiobotocore.session import get_session
+
+from fairscape_mds.core.streaming import (
+	DEFAULT_CHUNK_SIZE,
+	DEFAULT_READ_AHEAD,
+	TransferMetrics,
+	pipelineBody
+)
+
+
+class AsyncS3Client():
+	def __init__(
+		self,
+		eventHandlers: Optional[dict] = None,
+		chunkSize: int = DEFAULT_CHUNK_SIZE,
+		readAhead: int = DEFAULT_READ_AHEAD,
+		**clientKwargs
+	):
+		"""
+		Args:
+			eventHandlers: botocore event name -> handler registered with
+				register_first when the client is created
+			chunkSize: bytes per chunk when streaming object bodies
+			readAhead: chunks read from S3 ahead of the client
+			clientKwargs: passed to aiobotocore create_client("s3", ...)
+		"""
+		self.clientKwargs = clientKwargs
+		self.eventHandlers = eventHandlers or {}
+		self.chunkSize = chunkSize
+		self.readAhead = readAhead
+
+		self._client = None
+		self._exitStack = None
+		self._loop = None
+		self._lock = None
+
+
+	async def client(self):
+		loop = asyncio.get_running_loop()
+		if self._client is not None and self._loop is loop:
+			return self._client
+
+		if self._lock is None or self._loop is not loop:
+			self._lock = asyncio.Lock()
+			self._loop = loop
+			self._client = None
+
+		async with self._lock:
+			if self._client is None:
+				exitStack = contextlib.AsyncExitStack()
+				client = await exitStack.enter_async_context(
+					get_session().create_client("s3", **self.clientKwargs)
+				)
+				for eventName, handler in self.eventHandlers.items():
+					client.meta.events.register_first(eventName, handler)
+
+				self._exitStack = exitStack
+				self._client = client
+
+		return self._client
+
+
+	async def get_object(self, **kwargs):
+		return await (await self.client()).get_object(**kwargs)
+
+
+	async def head_object(self, **kwargs):
+		return await (await self.client()).head_object(**kwargs)
+
+
+	def iterBody(self, body, label: str = "") -> AsyncIterator[bytes]:
+		""" Stream an object body with this client's chunk size and read ahead
+		"""
+		return iterS3Body(body, self.chunkSize, self.readAhead, label)
+
+
+	async def close(self):
+		if self._exitStack is not None:
+			await self._exitStack.aclose()
+		self._client = None
+		self._exitStack = None
+
+
+def iterS3Body(
+	body,
+	chunkSize: int = DEFAULT_CHUNK_SIZE,
+	readAhead: int = DEFAULT_READ_AHEAD,
+	label: str = ""
+) -> AsyncIterator[bytes]:
+	""" Stream an aiobotocore StreamingBody, releasing the connection when done
+	"""
+	return pipelineBody(body, chunkSize, readAhead, TransferMetrics(label=label))
+
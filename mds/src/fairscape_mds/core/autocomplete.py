@@ -0,0 +1,190 @@
+""" Prefix index for search box completions
+
+Completions are kept in their own collection, one document per distinct
+completion with a lower case ``term`` under an ascending index. A prefix is
+then a range on that index, ``term >= prefix and term < prefix + U+FFFF``,
+read in term order and stopped after k documents, so the cost does not grow
+with the number of identifiers.
+
+Each published identifier contributes, completions are shared by every user:
+
+  - its name, once from every word start so "atlas" completes "Cell atlas"
+  - each keyword, counted over the identifiers sharing it
+  - the postfix of its ARK
+
+The terms an identifier contributed are stored with it, so a write only
+changes the completions that differ and a keyword shared by many
+identifiers is a counter rather than a growing array.
+
+Writes queue identifiers with ``markStale``, see core/stale.py, and
+``index`` applies them on the periodic sync each API process runs in the
+background, so a request only ever reads the collection.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+import datetime
+import re
+import threading
+
+from pymongo import UpdateOne
+
+from fairscape_mds.core.stale import markStale, takeStale
+
+AUTOCOMPLETE_KINDS = ("name", "keyword", "ark")
+MAX_TERM_LENGTH = 128
+# word starts of a name indexed, long titles only complete from the first few
+MAX_NAME_WORDS = 8
+STATE_ID = "__state__"
+IDENTIFIER_PREFIX = "identifier:"
+# a sync holding the lease longer than this is assumed to have died
+SYNC_LEASE_SECONDS = 300
+
+_ARK = re.compile(r"^ark:/?\d+/(.+)$", re.IGNORECASE)
+
+
+def normalizeTerm(text) -> str:
+	return " ".join(str(text).lower().split())[:MAX_TERM_LENGTH]
+
+
+def arkPostfix(guid: str) -> Optional[str]:
+	match = _ARK.match(guid or "")
+	return match.group(1) if match else None
+
+
+def _entryId(kind: str, term: str, label: str) -> str:
+	return f"{kind}\x1f{term}\x1f{normalizeTerm(label)}"
+
+
+def autocompleteEntries(doc: dict) -> Dict[str, dict]:
+	""" The completions of an identifier document keyed by entry _id
+	"""
+	guid = doc.get("@id")
+	metadata = doc.get("metadata") or {}
+	entries = {}
+
+	def add(kind, term, label):
+		if term:
+			entries[_entryId(kind, term, label)] = {"kind": kind, "term": term, "label": label}
+
+	name = metadata.get("name")
+	if isinstance(name, str) and name.strip():
+		label = " ".join(name.split())
+		words = normalizeTerm(name).split(" ")
+		for start in range(min(len(words), MAX_NAME_WORDS)):
+			add("name", " ".join(words[start:]), label)
+
+	keywords = metadata.get("keywords") or []
+	if not isinstance(keywords, list):
+		keywords = [keywords]
+	for keyword in keywords:
+		if isinstance(keyword, str) and keyword.strip():
+			add("keyword", normalizeTerm(keyword), " ".join(keyword.split()))
+
+	postfix = arkPostfix(guid)
+	if postfix:
+		add("ark", normalizeTerm(postfix), guid)
+	return entries
+
+
+class AutocompleteIndex():
+	def __init__(self, collection):
+		self.collection = collection
+		self.syncLock = threading.Lock()
+
+	def markStale(self, guids: Iterable[str]):
+		""" Queue identifiers whose completions may have changed
+		"""
+		markStale(self.collection, guids)
+
+	def acquire(self) -> Optional[dict]:
+		""" Take the sync lease, returns the index state or None while another
+		process holds it
+		"""
+		now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+		self.collection.update_one({"_id": STATE_ID}, {"$setOnInsert": {"lease": None}}, upsert=True)
+		return self.collection.find_one_and_update(
+			{"_id": STATE_ID, "$or": [{"lease": None}, {"lease": {"$lt": now}}]},
+			{"$set": {"lease": now + datetime.timedelta(seconds=SYNC_LEASE_SECONDS)}}
+		)
+
+	def release(self, watermark=None):
+		update = {"$set": {"lease": None}}
+		if watermark is not None:
+			update["$set"]["watermark"] = watermark
+		self.collection.update_one({"_id": STATE_ID}, update)
+
+	def takeStale(self) -> List[str]:
+		return takeStale(self.collection)
+
+	def index(self, docs: Sequence[dict], removed: Sequence[str] = ()) -> int:
+		""" Replace the completions of the documents and drop those of removed
+		identifiers, returns the number of completion documents changed
+		"""
+		wanted = {doc["@id"]: autocompleteEntries(doc) for doc in docs if doc.get("@id")}
+		wanted.update({guid: {} for guid in removed if guid not in wanted})
+		if not wanted:
+			return 0
+
+		current = {
+			stored["_id"][len(IDENTIFIER_PREFIX):]: set(stored.get("entries") or [])
+			for stored in self.collection.find(
+				{"_id": {"$in": [IDENTIFIER_PREFIX + guid for guid in wanted]}}
+			)
+		}
+
+		operations = []
+		dropped = set()
+		for guid, entries in wanted.items():
+			previous = current.get(guid, set())
+			for entryId in previous - set(entries):
+				operations.append(UpdateOne({"_id": entryId}, {"$inc": {"count": -1}}))
+				dropped.add(entryId)
+			for entryId in set(entries) - previous:
+				operations.append(UpdateOne(
+					{"_id": entryId},
+					{"$inc": {"count": 1}, "$set": {**entries[entryId], "guid": guid}},
+					upsert=True
+				))
+
+			if entries:
+				operations.append(UpdateOne(
+					{"_id": IDENTIFIER_PREFIX + guid}, {"$set": {"entries": sorted(entries)}}, upsert=True
+				))
+			elif guid in current:
+				self.collection.delete_one({"_id": IDENTIFIER_PREFIX + guid})
+
+		if operations:
+			self.collection.bulk_write(operations, ordered=False)
+		if dropped:
+			self.collection.delete_many({"_id": {"$in": list(dropped)}, "count": {"$lte": 0}})
+		return len(operations)
+
+	def complete(self, prefix: str, limit: int = 10, kinds: Optional[Sequence[str]] = None) -> List[dict]:
+		""" Completions whose term starts with the prefix, in term order
+		"""
+		prefix = normalizeTerm(prefix)
+		postfix = arkPostfix(prefix)
+		if postfix is not None:
+			prefix, kinds = postfix, ["ark"]
+		if not prefix:
+			return []
+
+		query = {"term": {"$gte": prefix, "$lt": prefix + "\uffff"}}
+		if kinds:
+			query["kind"] = {"$in": list(kinds)}
+
+		completions = []
+		seen = set()
+		# several word starts of one name can match, read a little past the limit
+		cursor = self.collection.find(
+			query,
+			projection={"_id": False, "kind": True, "label": True, "guid": True, "count": True}
+		).sort("term", 1).limit(limit * 3)
+		for entry in cursor:
+			key = (entry["kind"], entry["label"])
+			if key in seen:
+				continue
+			seen.add(key)
+			completions.append(entry)
+			if len(completions) >= limit:
+				break
+		return completions
@@ -0,0 +1,375 @@
+""" Shared metadata cache for identifier documents
+
+Two tiers are kept per process:
+
+  - a small in-process LRU holding serialized entries, and
+  - an optional Redis tier shared by every gunicorn worker and API replica.
+
+Entries are stored under versioned keys
+``fairscape:cache:{namespace}:{guid}:{version}`` where the version is the
+document's ``dateModified``. A per identifier pointer
+``fairscape:cache:version:{guid}`` records the current version, so a write
+that bumps ``dateModified`` orphans old entries instead of overwriting them.
+
+Writers call ``invalidate`` which drops the version pointer, increments a per
+identifier generation ``fairscape:cache:generation:{guid}`` and publishes the
+identifier on a pub/sub channel; every process listening on that channel
+evicts its local entries for the identifier.
+
+A reader that missed takes the generation with ``generation`` before reading
+Mongo and hands it to ``set``. The pointer is only written while the
+generation is unchanged, so a read that raced a write cannot put the old
+version back after ``invalidate``. Local entries also expire after
+``localTtl`` seconds, which bounds how long a dropped pub/sub message can
+leave a process serving an old entry.
+
+When no Redis client is configured the pointer based entries are disabled,
+since the local tier cannot be invalidated across workers without the channel.
+Entries looked up by an explicit version (``getVersion`` / ``setVersion``) are
+only as fresh as that version. Callers pick one that changes with the content,
+an S3 ETag or a dateModified combined with the ``generation``, so those still
+use the local tier on their own.
+
+Async routes use the ``*Async`` variants. Local hits and a disabled cache are
+answered on the event loop, Redis is only called from a worker thread so a
+slow Redis cannot stall other requests.
+"""
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+import asyncio
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from redis.exceptions import WatchError
+
+cacheLogger = logging.getLogger("cache")
+
+CACHE_PREFIX = "fairscape:cache"
+INVALIDATION_CHANNEL = f"{CACHE_PREFIX}:invalidate"
+
+
+def _jsonDefault(value):
+	if isinstance(value, (datetime.datetime, datetime.date)):
+		return value.isoformat()
+	return str(value)
+
+
+def cacheVersion(value) -> Optional[str]:
+	""" Normalize a dateModified value into the version component of a cache key
+	"""
+	if value is None:
+		return None
+	if isinstance(value, (datetime.datetime, datetime.date)):
+		return value.isoformat()
+	return str(value)
+
+
+class MetadataCache():
+	def __init__(
+		self,
+		redisClient=None,
+		ttl: int = 3600,
+		localSize: int = 1024,
+		localMaxBytes: int = 1048576,
+		localTtl: int = 60,
+		channel: str = INVALIDATION_CHANNEL
+	):
+		self.redisClient = redisClient
+		self.ttl = ttl
+		self.localSize = localSize
+		self.localMaxBytes = localMaxBytes
+		self.localTtl = localTtl
+		self.channel = channel
+
+		self._local: OrderedDict = OrderedDict()
+		self._lock = threading.Lock()
+		self._listenerPid = None
+		self._listenerThread = None
+
+
+	@property
+	def enabled(self) -> bool:
+		return self.redisClient is not None
+
+
+	def versionKey(self, guid: str) -> str:
+		return f"{CACHE_PREFIX}:version:{guid}"
+
+
+	def entryKey(self, namespace: str, guid: str, version: str) -> str:
+		return f"{CACHE_PREFIX}:{namespace}:{guid}:{version}"
+
+
+	def generationKey(self, guid: str) -> str:
+		return f"{CACHE_PREFIX}:generation:{guid}"
+
+
+	def get(self, namespace: str, guid: str) -> Optional[Any]:
+		""" Return a cached value for the identifier or None on a miss
+		"""
+		if not self.enabled:
+			return None
+
+		self._ensureListener()
+
+		localEntry = self._getLocal(namespace, guid)
+		if localEntry is not None:
+			return json.loads(localEntry[1])
+
+		try:
+			version = self.redisClient.get(self.versionKey(guid))
+			if version is None:
+				return None
+			if isinstance(version, bytes):
+				version = version.decode()
+
+			serialized = self.redisClient.get(self.entryKey(namespace, guid, version))
+		except Exception as e:
+			cacheLogger.warning(f"cache read failed for {guid}: {e}")
+			return None
+
+		if serialized is None:
+			return None
+		if isinstance(serialized, bytes):
+			serialized = serialized.decode()
+
+		self._setLocal(namespace, guid, version, serialized)
+		return json.loads(serialized)
+
+
+	def generation(self, guid: str) -> Optional[bytes]:
+		""" Token to take before reading the identifier from Mongo on a miss
+
+		set is skipped when the identifier was invalidated since.
+		"""
+		if not self.enabled:
+			return None
+
+		try:
+			return self.redisClient.get(self.generationKey(guid)) or b"0"
+		except Exception as e:
+			cacheLogger.warning(f"cache read failed for {guid}: {e}")
+			return None
+
+
+	def set(self, namespace: str, guid: str, value: Any, version, generation: Optional[bytes] = None) -> None:
+		""" Store a value for the identifier at the given version
+
+		With the generation taken before the value was read, the value is only
+		stored when the identifier was not invalidated in between.
+		"""
+		version = cacheVersion(version)
+		if not self.enabled or version is None:
+			return
+
+		self._ensureListener()
+
+		serialized = json.dumps(value, default=_jsonDefault)
+
+		try:
+			with self.redisClient.pipeline() as pipeline:
+				if generation is not None:
+					pipeline.watch(self.generationKey(guid))
+					if (pipeline.get(self.generationKey(guid)) or b"0") != generation:
+						return
+					pipeline.multi()
+				pipeline.set(self.versionKey(guid), version, ex=self.ttl)
+				pipeline.set(self.entryKey(namespace, guid, version), serialized, ex=self.ttl)
+				pipeline.execute()
+		except WatchError:
+			return
+		except Exception as e:
+			cacheLogger.warning(f"cache write failed for {guid}: {e}")
+			return
+
+		self._setLocal(namespace, guid, version, serialized)
+
+
+	def getVersion(self, namespace: str, guid: str, version) -> Optional[Any]:
+		""" Return a value cached for an explicit version of the identifier
+		"""
+		version = cacheVersion(version)
+		if version is None:
+			return None
+
+		if self.enabled:
+			self._ensureListener()
+
+		localEntry = self._getLocal(namespace, guid)
+		if localEntry is not None and localEntry[0] == version:
+			return json.loads(localEntry[1])
+
+		if not self.enabled:
+			return None
+
+		try:
+			serialized = self.redisClient.get(self.entryKey(namespace, guid, version))
+		except Exception as e:
+			cacheLogger.warning(f"cache read failed for {guid}: {e}")
+			return None
+
+		if serialized is None:
+			return None
+		if isinstance(serialized, bytes):
+			serialized = serialized.decode()
+
+		self._setLocal(namespace, guid, version, serialized)
+		return json.loads(serialized)
+
+
+	def setVersion(self, namespace: str, guid: str, version, value: Any) -> None:
+		""" Store a value under an explicit version without moving the version pointer
+		"""
+		version = cacheVersion(version)
+		if version is None:
+			return
+
+		serialized = json.dumps(value, default=_jsonDefault)
+
+		if self.enabled:
+			self._ensureListener()
+			try:
+				self.redisClient.set(
+					self.entryKey(namespace, guid, version),
+					serialized,
+					ex=self.ttl
+				)
+			except Exception as e:
+				cacheLogger.warning(f"cache write failed for {guid}: {e}")
+
+		self._setLocal(namespace, guid, version, serialized)
+
+
+	def invalidate(self, *guids: str) -> None:
+		""" Drop every cached entry for the identifiers in all processes
+		"""
+		guids = [guid for guid in guids if guid]
+		if not self.enabled or not guids:
+			return
+
+		self._evictLocal(guids)
+
+		try:
+			pipeline = self.redisClient.pipeline()
+			for guid in guids:
+				pipeline.incr(self.generationKey(guid))
+				pipeline.expire(self.generationKey(guid), self.ttl)
+				pipeline.delete(self.versionKey(guid))
+				pipeline.publish(self.channel, guid)
+			pipeline.execute()
+		except Exception as e:
+			cacheLogger.warning(f"cache invalidation failed for {guids}: {e}")
+
+
+	async def getAsync(self, namespace: str, guid: str) -> Optional[Any]:
+		if not self.enabled:
+			return None
+		if self._listenerPid == os.getpid():
+			localEntry = self._getLocal(namespace, guid)
+			if localEntry is not None:
+				return json.loads(localEntry[1])
+		return await asyncio.to_thread(self.get, namespace, guid)
+
+
+	async def generationAsync(self, guid: str) -> Optional[bytes]:
+		if not self.enabled:
+			return None
+		return await asyncio.to_thread(self.generation, guid)
+
+
+	async def setAsync(self, namespace: str, guid: str, value: Any, version, generation: Optional[bytes] = None) -> None:
+		if not self.enabled or cacheVersion(version) is None:
+			return
+		await asyncio.to_thread(self.set, namespace, guid, value, version, generation)
+
+
+	async def getVersionAsync(self, namespace: str, guid: str, version) -> Optional[Any]:
+		version = cacheVersion(version)
+		if version is None:
+			return None
+		if not self.enabled or self._listenerPid == os.getpid():
+			localEntry = self._getLocal(namespace, guid)
+			if localEntry is not None and localEntry[0] == version:
+				return json.loads(localEntry[1])
+			if not self.enabled:
+				return None
+		return await asyncio.to_thread(self.getVersion, namespace, guid, version)
+
+
+	async def setVersionAsync(self, namespace: str, guid: str, version, value: Any) -> None:
+		if not self.enabled:
+			self.setVersion(namespace, guid, version, value)
+			return
+		await asyncio.to_thread(self.setVersion, namespace, guid, version, value)
+
+
+	def _getLocal(self, namespace: str, guid: str):
+		with self._lock:
+			localEntry = self._local.get((namespace, guid))
+			if localEntry is None:
+				return None
+			if localEntry[2] <= time.monotonic():
+				del self._local[(namespace, guid)]
+				return None
+			self._local.move_to_end((namespace, guid))
+			return localEntry
+
+
+	def _setLocal(self, namespace: str, guid: str, version: str, serialized: str):
+		if self.localSize <= 0 or len(serialized) > self.localMaxBytes:
+			return
+
+		with self._lock:
+			self._local[(namespace, guid)] = (version, serialized, time.monotonic() + self.localTtl)
+			self._local.move_to_end((namespace, guid))
+			while len(self._local) > self.localSize:
+				self._local.popitem(last=False)
+
+
+	def _evictLocal(self, guids: Iterable[str]):
+		guids = set(guids)
+		with self._lock:
+			staleKeys = [key for key in self._local if key[1] in guids]
+			for key in staleKeys:
+				del self._local[key]
+
+
+	def _handleInvalidation(self, message):
+		guid = message.get("data")
+		if isinstance(guid, bytes):
+			guid = guid.decode()
+		if guid:
+			self._evictLocal([guid])
+
+
+	def _ensureListener(self):
+		""" Subscribe to the invalidation channel once per process
+
+		Gunicorn forks workers after import, so the subscription is started
+		lazily and restarted when the pid changes.
+		"""
+		pid = os.getpid()
+		if self._listenerPid == pid:
+			return
+
+		with self._lock:
+			if self._listenerPid == pid:
+				return
+
+			# entries inherited from a parent process were never subscribed
+			self._local.clear()
+
+			try:
+				pubsub = self.redisClient.pubsub(ignore_subscribe_messages=True)
+				pubsub.subscribe(**{self.channel: self._handleInvalidation})
+				self._listenerThread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+			except Exception as e:
+				cacheLogger.warning(f"cache invalidation listener failed to start: {e}")
+				# without a listener the local tier could serve stale entries
+				self.localSize = 0
+
+			self._listenerPid = pid
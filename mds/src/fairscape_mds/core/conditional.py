@@ -0,0 +1,131 @@
+""" Conditional GET helpers
+
+Validators are derived from the stored document version rather than the
+rendered body, so a request can be answered with 304 after a projection-only
+lookup of ``@id``, ``dateModified`` and ``publicationStatus``. Bodies that
+embed other documents, like an RO-Crate with its hasPart members, fold in
+the member version stored on the root with ``withMemberVersion``.
+"""
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+import datetime
+import hashlib
+
+VERSION_PROJECTION = {
+	"_id": False,
+	"@id": 1,
+	"dateModified": 1,
+	"publicationStatus": 1
+}
+
+
+def parseDateModified(value) -> Optional[datetime.datetime]:
+	""" Parse a stored dateModified (datetime or ISO string) into an aware UTC datetime
+	"""
+	if value is None:
+		return None
+
+	if isinstance(value, str):
+		try:
+			value = datetime.datetime.fromisoformat(value)
+		except ValueError:
+			return None
+
+	if not isinstance(value, datetime.datetime):
+		return None
+
+	# naive timestamps are written by the server and treated as UTC
+	if value.tzinfo is None:
+		value = value.replace(tzinfo=datetime.timezone.utc)
+
+	return value.astimezone(datetime.timezone.utc)
+
+
+def withMemberVersion(versionDoc: dict) -> dict:
+	""" Version document of a crate, folded with the memberVersion stored on it
+
+	Writers stamp memberVersion on the crates containing what they changed,
+	so it becomes part of the ETag and replaces the root's dateModified when
+	it is later, and a member update or delete changes the validators.
+	"""
+	folded = dict(versionDoc)
+	memberModified = parseDateModified(folded.pop("memberVersion", None))
+	if memberModified is None:
+		return folded
+
+	folded["memberVersion"] = memberModified.isoformat()
+	rootModified = parseDateModified(versionDoc.get("dateModified"))
+	if rootModified is None or memberModified > rootModified:
+		folded["dateModified"] = memberModified
+	return folded
+
+
+def computeETag(versionDoc: dict, variant: str = "") -> str:
+	""" Strong ETag for one representation of a stored document version
+
+	The variant distinguishes representations of the same version, e.g. the
+	negotiated media type or pagination parameters.
+	"""
+	modified = parseDateModified(versionDoc.get("dateModified"))
+	versionParts = [
+		str(versionDoc.get("@id")),
+		modified.isoformat() if modified else str(versionDoc.get("dateModified")),
+		str(versionDoc.get("publicationStatus")),
+		variant
+	]
+	if "memberVersion" in versionDoc:
+		versionParts.append(versionDoc["memberVersion"])
+	digest = hashlib.sha1("|".join(versionParts).encode("utf-8")).hexdigest()
+	return f'"{digest}"'
+
+
+def formatLastModified(versionDoc: dict) -> Optional[str]:
+	modified = parseDateModified(versionDoc.get("dateModified"))
+	if modified is None:
+		return None
+	return format_datetime(modified, usegmt=True)
+
+
+def validatorHeaders(versionDoc: dict, variant: str = "") -> dict:
+	""" ETag and Last-Modified headers for a stored document version
+	"""
+	headers = {"ETag": computeETag(versionDoc, variant)}
+	lastModified = formatLastModified(versionDoc)
+	if lastModified:
+		headers["Last-Modified"] = lastModified
+	return headers
+
+
+def _etagMatches(ifNoneMatch: str, etag: str) -> bool:
+	if ifNoneMatch.strip() == "*":
+		return True
+
+	# If-None-Match uses the weak comparison function
+	candidates = [tag.strip() for tag in ifNoneMatch.split(",")]
+	return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def isNotModified(
+	headers: dict,
+	ifNoneMatch: Optional[str],
+	ifModifiedSince: Optional[str]
+) -> bool:
+	""" Evaluate If-None-Match / If-Modified-Since against validator headers
+
+	If-None-Match takes precedence, If-Modified-Since is only considered when
+	the client sent no entity tags.
+	"""
+	if ifNoneMatch:
+		return _etagMatches(ifNoneMatch, headers.get("ETag", ""))
+
+	lastModified = headers.get("Last-Modified")
+	if ifModifiedSince and lastModified:
+		try:
+			since = parsedate_to_datetime(ifModifiedSince)
+		except (TypeError, ValueError):
+			return False
+		if since.tzinfo is None:
+			since = since.replace(tzinfo=datetime.timezone.utc)
+		return parsedate_to_datetime(lastModified) <= since
+
+	return False
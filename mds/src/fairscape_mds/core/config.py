@@ -9,8 +9,15 @@ from botocore.client import Config
 from urllib.parse import quote_plus
 from typing import Optional
 from celery import Celery
+from fairscape_mds.core.cache import MetadataCache
+from fairscape_mds.core.aio import AsyncS3Client
+from fairscape_mds.core.downloads import DownloadRedirect, parseRoutePolicies
+from fairscape_mds.core.vector_index import SemanticIndex
+from fairscape_mds.core.autocomplete import AutocompleteIndex
+from fairscape_mds.core.graph import EdgeIndex
 import pymongo
 import pathlib
+import redis
 
 
 class Settings(BaseSettings):
@@ -30,17 +37,33 @@ class Settings(BaseSettings):
     FAIRSCAPE_MONGO_ROCRATE_COLLECTION: str
     FAIRSCAPE_MONGO_ASYNC_COLLECTION: str
     FAIRSCAPE_MONGO_TOKENS_COLLECTION: str
+    FAIRSCAPE_MONGO_AUTOCOMPLETE_COLLECTION: str = "autocomplete"
+    FAIRSCAPE_MONGO_PROVENANCE_EDGE_COLLECTION: str = "provenance_edges"
+    FAIRSCAPE_MONGO_SEMANTIC_STALE_COLLECTION: str = "semantic_stale"
 
     FAIRSCAPE_MINIO_ACCESS_KEY: str
     FAIRSCAPE_MINIO_SECRET_KEY: str
     FAIRSCAPE_MINIO_URI: str
     FAIRSCAPE_MINIO_DEFAULT_BUCKET: str
     FAIRSCAPE_MINIO_DEFAULT_BUCKET_PATH: str
+    # endpoint presigned download URLs are signed for, defaults to FAIRSCAPE_MINIO_URI
+    FAIRSCAPE_MINIO_PUBLIC_URI: Optional[str] = Field(default=None)
+
+    FAIRSCAPE_DOWNLOAD_REDIRECT: str = "never"
+    FAIRSCAPE_DOWNLOAD_REDIRECT_ROUTES: Optional[str] = Field(default=None)
+    FAIRSCAPE_DOWNLOAD_REDIRECT_THRESHOLD: int = 104857600
+    FAIRSCAPE_DOWNLOAD_PRESIGN_EXPIRY: int = 300
+    FAIRSCAPE_DOWNLOAD_CHUNK_SIZE: int = 1048576
+    FAIRSCAPE_DOWNLOAD_READ_AHEAD: int = 2
 
     FAIRSCAPE_REDIS_HOST: str
     FAIRSCAPE_REDIS_PORT: str
     FAIRSCAPE_REDIS_JOB_DATABASE: str
     FAIRSCAPE_REDIS_RESULT_DATABASE: str
+    FAIRSCAPE_REDIS_CACHE_DATABASE: Optional[str] = Field(default=None)
+    FAIRSCAPE_CACHE_TTL: int = 3600
+    FAIRSCAPE_CACHE_LOCAL_SIZE: int = 1024
+    FAIRSCAPE_CACHE_LOCAL_TTL: int = 60
 
     FAIRSCAPE_JWT_SECRET: str
     FAIRSCAPE_ADMIN_GROUP: str
@@ -48,6 +71,16 @@ class Settings(BaseSettings):
     FAIRSCAPE_BASE_URL: str
     FAIRSCAPE_INTERNAL_URL: Optional[str] = Field(default=None)
     FAIRSCAPE_DESCRIPTIVE_STATISTICS_MAX_COLUMNS: int = 100
+    FAIRSCAPE_ROCRATE_STREAM_THRESHOLD: int = 1000
+
+    # local vector index behind /search/semantic, the path must be on a volume
+    # shared by every process that serves search
+    FAIRSCAPE_SEMANTIC_INDEX_PATH: str = "/tmp/fairscape-semantic-index"
+    FAIRSCAPE_SEMANTIC_EMBEDDER: str = "hashing"
+    FAIRSCAPE_SEMANTIC_DIMENSIONS: int = 1024
+    FAIRSCAPE_SEMANTIC_ANN_THRESHOLD: int = 200000
+    FAIRSCAPE_SEMANTIC_NPROBE: int = 8
+    FAIRSCAPE_SEMANTIC_SYNC_INTERVAL: int = 30
 
     FAIRSCAPE_LOGFIRE_ENV: Optional[str] = Field(default=None)
     FAIRSCAPE_LOGFIRE_TOKEN: Optional[str] = Field(default=None)
@@ -69,7 +102,14 @@ class FairscapeConfig():
 			jwtSecret: str,
 			adminGroup: str,
 			baseUrl: str,
-			internalUrl: Optional[str] = None
+			internalUrl: Optional[str] = None,
+			metadataCache: Optional[MetadataCache] = None,
+			aioIdentifierCollection=None,
+			aioMinioClient: Optional[AsyncS3Client] = None,
+			downloadRedirect: Optional[DownloadRedirect] = None,
+			semanticIndex: Optional[SemanticIndex] = None,
+			autocompleteIndex: Optional[AutocompleteIndex] = None,
+			provenanceEdges: Optional[EdgeIndex] = None
 	):
 		self.minioClient=minioClient
 		self.minioBucket=minioBucket
@@ -83,6 +123,17 @@ class FairscapeConfig():
 		self.adminGroup = adminGroup
 		self.baseUrl = baseUrl
 		self.internalUrl = internalUrl
+		self.metadataCache = metadataCache if metadataCache is not None else MetadataCache()
+
+		# async clients used by routes declared with async def
+		self.aioIdentifierCollection = aioIdentifierCollection
+		self.aioMinioClient = aioMinioClient
+
+		self.downloadRedirect = downloadRedirect if downloadRedirect is not None else DownloadRedirect()
+		self.semanticIndex = semanticIndex
+		self.autocompleteIndex = autocompleteIndex
+		# normalized references traversed with $graphLookup, see core/graph.py
+		self.provenanceEdges = provenanceEdges
   
 
 		
@@ -109,6 +160,7 @@ except:
         raise Exception("Missing Settings for Fairscape Server Startup")
 
 descriptiveStatisticsMaxCols = settings.FAIRSCAPE_DESCRIPTIVE_STATISTICS_MAX_COLUMNS
+rocrateStreamThreshold = settings.FAIRSCAPE_ROCRATE_STREAM_THRESHOLD
 
 # TODO clean up client string generation
 mongoUser = settings.FAIRSCAPE_MONGO_ACCESS_KEY
@@ -144,6 +196,9 @@ identifierCollection = mongoDB[settings.FAIRSCAPE_MONGO_IDENTIFIER_COLLECTION]
 rocrateCollection = mongoDB[settings.FAIRSCAPE_MONGO_ROCRATE_COLLECTION]
 asyncCollection = mongoDB[settings.FAIRSCAPE_MONGO_ASYNC_COLLECTION]
 tokensCollection = mongoDB[settings.FAIRSCAPE_MONGO_TOKENS_COLLECTION]
+autocompleteCollection = mongoDB[settings.FAIRSCAPE_MONGO_AUTOCOMPLETE_COLLECTION]
+provenanceEdgeCollection = mongoDB[settings.FAIRSCAPE_MONGO_PROVENANCE_EDGE_COLLECTION]
+semanticStaleCollection = mongoDB[settings.FAIRSCAPE_MONGO_SEMANTIC_STALE_COLLECTION]
 
 
 # create a boto s3 client
@@ -164,6 +219,40 @@ s3_event_system = s3.meta.events
 s3_event_system.register_first('before-sign.s3.*', _add_header)
 
 
+# async clients for the async read routes, sharing connection settings with the above
+aioMongoClient = pymongo.AsyncMongoClient(connection_string)
+aioMongoDB = aioMongoClient[settings.FAIRSCAPE_MONGO_DATABASE]
+aioIdentifierCollection = aioMongoDB[settings.FAIRSCAPE_MONGO_IDENTIFIER_COLLECTION]
+
+aioS3 = AsyncS3Client(
+    eventHandlers={'before-sign.s3.*': _add_header},
+    chunkSize=settings.FAIRSCAPE_DOWNLOAD_CHUNK_SIZE,
+    readAhead=settings.FAIRSCAPE_DOWNLOAD_READ_AHEAD,
+    endpoint_url=settings.FAIRSCAPE_MINIO_URI,
+    aws_access_key_id=settings.FAIRSCAPE_MINIO_ACCESS_KEY,
+    aws_secret_access_key=settings.FAIRSCAPE_MINIO_SECRET_KEY,
+    config=Config(signature_version='s3v4'),
+    region_name='us-east-1'
+)
+
+# presigned download URLs are signed without the extract header, clients cannot send it
+presignS3 = boto3.client('s3',
+        endpoint_url=settings.FAIRSCAPE_MINIO_PUBLIC_URI or settings.FAIRSCAPE_MINIO_URI,
+        aws_access_key_id= settings.FAIRSCAPE_MINIO_ACCESS_KEY,
+        aws_secret_access_key= settings.FAIRSCAPE_MINIO_SECRET_KEY,
+        config=Config(signature_version='s3v4'),
+        region_name='us-east-1'
+    )
+
+downloadRedirect = DownloadRedirect(
+    presignClient=presignS3,
+    defaultPolicy=settings.FAIRSCAPE_DOWNLOAD_REDIRECT,
+    routePolicies=parseRoutePolicies(settings.FAIRSCAPE_DOWNLOAD_REDIRECT_ROUTES),
+    threshold=settings.FAIRSCAPE_DOWNLOAD_REDIRECT_THRESHOLD,
+    expiresIn=settings.FAIRSCAPE_DOWNLOAD_PRESIGN_EXPIRY
+)
+
+
 celeryApp = Celery()
 celeryApp.conf.broker_url = "redis://" + settings.FAIRSCAPE_REDIS_HOST + ":" +  settings.FAIRSCAPE_REDIS_PORT  + "/" + settings.FAIRSCAPE_REDIS_JOB_DATABASE
 celeryApp.conf.result_backend = "redis://" + settings.FAIRSCAPE_REDIS_HOST + ":" + settings.FAIRSCAPE_REDIS_PORT  + "/" + settings.FAIRSCAPE_REDIS_RESULT_DATABASE
@@ -174,6 +263,35 @@ celeryApp.conf.update(
 )
 
 
+# optional shared metadata cache, disabled unless a redis database is configured
+if settings.FAIRSCAPE_REDIS_CACHE_DATABASE:
+    cacheRedisClient = redis.Redis(
+        host=settings.FAIRSCAPE_REDIS_HOST,
+        port=int(settings.FAIRSCAPE_REDIS_PORT),
+        db=int(settings.FAIRSCAPE_REDIS_CACHE_DATABASE)
+    )
+else:
+    cacheRedisClient = None
+
+metadataCache = MetadataCache(
+    redisClient=cacheRedisClient,
+    ttl=settings.FAIRSCAPE_CACHE_TTL,
+    localSize=settings.FAIRSCAPE_CACHE_LOCAL_SIZE,
+    localTtl=settings.FAIRSCAPE_CACHE_LOCAL_TTL
+)
+
+
+semanticIndex = SemanticIndex(
+    settings.FAIRSCAPE_SEMANTIC_INDEX_PATH,
+    semanticStaleCollection,
+    embedder=settings.FAIRSCAPE_SEMANTIC_EMBEDDER,
+    dimensions=settings.FAIRSCAPE_SEMANTIC_DIMENSIONS,
+    annThreshold=settings.FAIRSCAPE_SEMANTIC_ANN_THRESHOLD,
+    nprobe=settings.FAIRSCAPE_SEMANTIC_NPROBE,
+    syncInterval=settings.FAIRSCAPE_SEMANTIC_SYNC_INTERVAL
+)
+
+
 appConfig = FairscapeConfig(
     minioClient=s3,
     minioBucket=settings.FAIRSCAPE_MINIO_DEFAULT_BUCKET,
@@ -186,5 +304,12 @@ appConfig = FairscapeConfig(
     jwtSecret=settings.FAIRSCAPE_JWT_SECRET,
 	adminGroup=settings.FAIRSCAPE_ADMIN_GROUP,
     baseUrl=settings.FAIRSCAPE_BASE_URL,
-    internalUrl=settings.FAIRSCAPE_INTERNAL_URL
+    internalUrl=settings.FAIRSCAPE_INTERNAL_URL,
+    metadataCache=metadataCache,
+    aioIdentifierCollection=aioIdentifierCollection,
+    aioMinioClient=aioS3,
+    downloadRedirect=downloadRedirect,
+    semanticIndex=semanticIndex,
+    autocompleteIndex=AutocompleteIndex(autocompleteCollection),
+    provenanceEdges=EdgeIndex(provenanceEdgeCollection)
 )
\ No newline at end of file
@@ -0,0 +1,119 @@
+""" Download redirect policy
+
+After the permission check a download route may answer with a 307 to a
+short lived presigned S3 URL instead of proxying the object through the API
+worker. The policy is set per route:
+
+  - ``never``      always stream through the API (the default)
+  - ``always``     always redirect
+  - ``threshold``  redirect objects of at least ``threshold`` bytes
+
+Routes are configured as ``route=policy`` pairs, e.g.
+``FAIRSCAPE_DOWNLOAD_REDIRECT_ROUTES="dataset=threshold,rocrate=always"``.
+
+Keys inside an uploaded archive (``<upload>.zip/<member>``) are read through
+MinIO's ``x-minio-extract`` header, which a presigned URL cannot carry, so
+they are always streamed through the API.
+"""
+from typing import Dict, Optional
+import mimetypes
+
+REDIRECT_NEVER = "never"
+REDIRECT_ALWAYS = "always"
+REDIRECT_THRESHOLD = "threshold"
+
+REDIRECT_POLICIES = (REDIRECT_NEVER, REDIRECT_ALWAYS, REDIRECT_THRESHOLD)
+
+# download routes a policy can be set for
+DOWNLOAD_ROUTES = ("dataset", "software", "rocrate", "content")
+
+
+def insideArchive(objectKey: Optional[str]) -> bool:
+	""" Whether an object key addresses a member of a stored .zip archive
+	"""
+	if not objectKey:
+		return False
+	return any(segment.lower().endswith(".zip") for segment in objectKey.split("/")[:-1])
+
+
+def parseRoutePolicies(value: Optional[str]) -> Dict[str, str]:
+	""" Parse ``route=policy`` pairs separated by commas
+	"""
+	policies = {}
+	if not value:
+		return policies
+
+	for pair in value.split(","):
+		if not pair.strip():
+			continue
+		route, _, policy = pair.partition("=")
+		route, policy = route.strip(), policy.strip().lower()
+		if route not in DOWNLOAD_ROUTES:
+			raise ValueError(f"unknown download route: {route}")
+		if policy not in REDIRECT_POLICIES:
+			raise ValueError(f"unknown download redirect policy for {route}: {policy}")
+		policies[route] = policy
+	return policies
+
+
+class DownloadRedirect():
+	def __init__(
+		self,
+		presignClient=None,
+		defaultPolicy: str = REDIRECT_NEVER,
+		routePolicies: Optional[Dict[str, str]] = None,
+		threshold: int = 104857600,
+		expiresIn: int = 300
+	):
+		"""
+		Args:
+			presignClient: boto3 S3 client whose endpoint is reachable by API
+				clients, presigning is local so a sync client is fine
+			defaultPolicy: policy for routes without an entry in routePolicies
+			routePolicies: route -> policy overrides
+			threshold: minimum object size in bytes redirected by the threshold policy
+			expiresIn: lifetime of presigned URLs in seconds
+		"""
+		if defaultPolicy not in REDIRECT_POLICIES:
+			raise ValueError(f"unknown download redirect policy: {defaultPolicy}")
+
+		self.presignClient = presignClient
+		self.defaultPolicy = defaultPolicy
+		self.routePolicies = routePolicies or {}
+		self.threshold = threshold
+		self.expiresIn = expiresIn
+
+
+	def policy(self, route: str) -> str:
+		if self.presignClient is None:
+			return REDIRECT_NEVER
+		return self.routePolicies.get(route, self.defaultPolicy)
+
+
+	def shouldRedirect(self, route: str, size: Optional[int] = None, objectKey: Optional[str] = None) -> bool:
+		if insideArchive(objectKey):
+			return False
+		policy = self.policy(route)
+		if policy == REDIRECT_ALWAYS:
+			return True
+		if policy == REDIRECT_THRESHOLD:
+			return size is not None and size >= self.threshold
+		return False
+
+
+	def presignedURL(self, bucket: str, objectKey: str, filename: str, inline: bool = False) -> str:
+		""" Presigned GET URL that serves the object with the API's download headers
+		"""
+		contentType, _ = mimetypes.guess_type(filename)
+		disposition = "inline" if inline else f'attachment; filename="{filename}"'
+
+		return self.presignClient.generate_presigned_url(
+			"get_object",
+			Params={
+				"Bucket": bucket,
+				"Key": objectKey,
+				"ResponseContentDisposition": disposition,
+				"ResponseContentType": contentType or "application/octet-stream"
+			},
+			ExpiresIn=self.expiresIn
+		)
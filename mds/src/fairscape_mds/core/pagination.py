@@ -0,0 +1,31 @@
+""" Opaque continuation tokens for paged endpoints
+
+Tokens are url safe base64 encoded JSON of whatever position state the
+endpoint needs to resume, clients only pass them back unchanged.
+"""
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+	pass
+
+
+def encodeCursor(state: dict) -> str:
+	payload = json.dumps(state, separators=(",", ":"), default=str)
+	return base64.urlsafe_b64encode(payload.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decodeCursor(token: str) -> dict:
+	try:
+		padded = token + "=" * (-len(token) % 4)
+		state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+	except (ValueError, UnicodeError) as e:
+		raise InvalidCursor(f"invalid cursor: {token}") from e
+
+	if not isinstance(state, dict):
+		raise InvalidCursor(f"invalid cursor: {token}")
+	return state
@@ -0,0 +1,255 @@
+""" Ranged reads of Parquet objects in S3
+
+A Parquet file can be read without downloading it: the footer at the end of
+the object describes every row group and the byte range of each column chunk.
+The footer is fetched with one suffix range request, then only the column
+chunks of the row groups that are needed are fetched, coalescing neighbouring
+chunks into one request. pyarrow reads the table from a ``SparseObject`` that
+holds just the fetched ranges.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import bisect
+import io
+import struct
+
+try:
+	import pyarrow
+	import pyarrow.parquet
+except ImportError:
+	pyarrow = None
+
+PARQUET_MAGIC = b"PAR1"
+# the footer of most files fits in the first suffix read
+FOOTER_READ_SIZE = 65536
+# ranges closer than this are fetched in one request
+COALESCE_GAP = 1048576
+
+
+class MissingRange(IOError):
+	def __init__(self, start: int, end: int):
+		super().__init__(f"bytes {start}-{end} were not fetched")
+		self.start = start
+		self.end = end
+
+
+def requirePyarrow():
+	if pyarrow is None:
+		raise ImportError("pyarrow is required for Parquet reads. Install it with: pip install pyarrow")
+
+
+class SparseObject(io.RawIOBase):
+	""" Seekable, read only view of an object of which some byte ranges are held
+
+	Reading outside the held ranges raises MissingRange, so a read that would
+	silently need the whole object fails loudly instead.
+	"""
+	def __init__(self, size: int):
+		super().__init__()
+		self.size = size
+		self._starts: List[int] = []
+		self._pieces: Dict[int, bytes] = {}
+		self._position = 0
+
+	def add(self, start: int, data: bytes):
+		if start in self._pieces and len(self._pieces[start]) >= len(data):
+			return
+		if start not in self._pieces:
+			bisect.insort(self._starts, start)
+		self._pieces[start] = data
+
+	def discard(self, start: int):
+		if self._pieces.pop(start, None) is not None:
+			self._starts.remove(start)
+
+	def has(self, start: int, end: int) -> bool:
+		""" Whether the inclusive range is held
+		"""
+		try:
+			self._gather(start, end - start + 1)
+		except MissingRange:
+			return False
+		return True
+
+	def _covering(self, position: int) -> Optional[Tuple[int, bytes]]:
+		# the held piece reaching furthest past the position, pieces are few
+		best = None
+		for pieceStart in self._starts[:bisect.bisect_right(self._starts, position)]:
+			piece = self._pieces[pieceStart]
+			if pieceStart + len(piece) > position:
+				if best is None or pieceStart + len(piece) > best[0] + len(best[1]):
+					best = (pieceStart, piece)
+		return best
+
+	def _gather(self, start: int, length: int) -> bytes:
+		end = start + length
+		parts = []
+		position = start
+		while position < end:
+			covering = self._covering(position)
+			if covering is None:
+				raise MissingRange(position, end - 1)
+			pieceStart, piece = covering
+			taken = piece[position - pieceStart:end - pieceStart]
+			parts.append(taken)
+			position += len(taken)
+		return b"".join(parts)
+
+	def readable(self) -> bool:
+		return True
+
+	def seekable(self) -> bool:
+		return True
+
+	def tell(self) -> int:
+		return self._position
+
+	def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+		if whence == io.SEEK_SET:
+			self._position = offset
+		elif whence == io.SEEK_CUR:
+			self._position += offset
+		elif whence == io.SEEK_END:
+			self._position = self.size + offset
+		return self._position
+
+	def read(self, amount: int = -1) -> bytes:
+		if amount is None or amount < 0:
+			amount = self.size - self._position
+		amount = max(min(amount, self.size - self._position), 0)
+		data = self._gather(self._position, amount)
+		self._position += len(data)
+		return data
+
+	def readinto(self, buffer) -> int:
+		data = self.read(len(buffer))
+		buffer[:len(data)] = data
+		return len(data)
+
+
+def coalesceRanges(ranges: Iterable[Tuple[int, int]], gap: int = COALESCE_GAP) -> List[Tuple[int, int]]:
+	""" Merge inclusive ranges that overlap or are at most ``gap`` bytes apart
+	"""
+	merged = []
+	for start, end in sorted(ranges):
+		if merged and start - merged[-1][1] - 1 <= gap:
+			merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+		else:
+			merged.append((start, end))
+	return merged
+
+
+def topLevelColumns(metadata) -> List[str]:
+	""" Column names of the file's arrow schema, nested fields under their root
+	"""
+	return list(metadata.schema.to_arrow_schema().names)
+
+
+def columnChunkRanges(metadata, rowGroup: int, columns: Optional[Sequence[str]] = None) -> List[Tuple[int, int]]:
+	""" Inclusive byte ranges of the column chunks of a row group
+	"""
+	wanted = set(columns) if columns else None
+	group = metadata.row_group(rowGroup)
+	ranges = []
+	for index in range(group.num_columns):
+		column = group.column(index)
+		if wanted is not None and column.path_in_schema.split(".")[0] not in wanted:
+			continue
+
+		start = column.data_page_offset
+		if column.has_dictionary_page and column.dictionary_page_offset:
+			start = min(start, column.dictionary_page_offset)
+		ranges.append((start, start + column.total_compressed_size - 1))
+	return ranges
+
+
+class ParquetObject():
+	""" A Parquet object in S3 whose footer has been fetched
+	"""
+	def __init__(self, s3, bucket: str, key: str, size: int, etag: Optional[str], sparse: SparseObject, metadata):
+		self.s3 = s3
+		self.bucket = bucket
+		self.key = key
+		self.size = size
+		self.etag = etag
+		self.sparse = sparse
+		self.metadata = metadata
+
+	@classmethod
+	async def open(cls, s3, bucket: str, key: str, objectMetadata: Optional[dict] = None) -> "ParquetObject":
+		""" Fetch and parse the footer, objectMetadata is a head_object response if one was made
+		"""
+		requirePyarrow()
+		if objectMetadata is None:
+			objectMetadata = await s3.head_object(Bucket=bucket, Key=key)
+		size = objectMetadata["ContentLength"]
+		etag = objectMetadata.get("ETag")
+
+		if size < 12:
+			raise ValueError("object is too small to be a parquet file")
+
+		sparse = SparseObject(size)
+		tailStart = max(size - FOOTER_READ_SIZE, 0)
+		tail = await fetchRange(s3, bucket, key, tailStart, size - 1, etag)
+		if tail[-4:] != PARQUET_MAGIC:
+			raise ValueError("object is not a parquet file")
+		sparse.add(tailStart, tail)
+
+		footerLength = struct.unpack("<I", tail[-8:-4])[0]
+		footerStart = size - 8 - footerLength
+		if footerStart < tailStart:
+			sparse.add(footerStart, await fetchRange(s3, bucket, key, footerStart, tailStart - 1, etag))
+
+		sparse.seek(0)
+		metadata = pyarrow.parquet.read_metadata(pyarrow.PythonFile(sparse, mode="r"))
+		return cls(s3, bucket, key, size, etag, sparse, metadata)
+
+	@property
+	def columns(self) -> List[str]:
+		return topLevelColumns(self.metadata)
+
+	async def fetchRowGroups(self, rowGroups: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Tuple[int, int]]:
+		""" Fetch the column chunks of the row groups concurrently, returns the
+		inclusive ranges fetched
+		"""
+		ranges = []
+		for rowGroup in rowGroups:
+			ranges.extend(columnChunkRanges(self.metadata, rowGroup, columns))
+		ranges = [r for r in coalesceRanges(ranges) if not self.sparse.has(*r)]
+
+		fetched = await asyncio.gather(*[
+			fetchRange(self.s3, self.bucket, self.key, start, end, self.etag)
+			for start, end in ranges
+		])
+		for (start, _), data in zip(ranges, fetched):
+			self.sparse.add(start, data)
+		return ranges
+
+	def release(self, ranges: Iterable[Tuple[int, int]]):
+		""" Drop fetched ranges once their row groups are decoded
+		"""
+		for start, _ in ranges:
+			self.sparse.discard(start)
+
+	def readRowGroups(self, rowGroups: Sequence[int], columns: Optional[Sequence[str]] = None):
+		""" Read fetched row groups into a pyarrow Table, blocking
+		"""
+		parquetFile = pyarrow.parquet.ParquetFile(
+			pyarrow.PythonFile(self.sparse, mode="r"),
+			metadata=self.metadata
+		)
+		return parquetFile.read_row_groups(list(rowGroups), columns=list(columns) if columns else None)
+
+
+async def fetchRange(s3, bucket: str, key: str, start: int, end: int, etag: Optional[str] = None) -> bytes:
+	""" Read the inclusive byte range of an object, failing if it changed since etag
+	"""
+	request = {"Bucket": bucket, "Key": key, "Range": f"bytes={start}-{end}"}
+	if etag:
+		request["IfMatch"] = etag
+	response = await s3.get_object(**request)
+	body = response["Body"]
+	try:
+		return await body.read()
+	finally:
+		body.close()
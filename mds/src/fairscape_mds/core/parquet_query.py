@@ -0,0 +1,315 @@
+""" Column and row subsetting of stored Parquet datasets
+
+A query selects columns and filters rows with simple predicates. Row groups
+whose footer statistics prove that no row can match are skipped without being
+read, and only the column chunks needed for the output and the predicates are
+fetched from S3. Matching rows are streamed back one row group at a time as
+an Arrow IPC stream or CSV, fetching the next row group while the current
+one is decoded, so memory is bounded by one row group of the chosen columns.
+"""
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import contextlib
+import io
+import logging
+
+from fairscape_mds.core.parquet import ParquetObject, pyarrow, requirePyarrow
+
+if pyarrow is not None:
+	import pyarrow.compute
+	import pyarrow.csv
+	import pyarrow.ipc
+
+queryLogger = logging.getLogger("download")
+
+QUERY_OPERATORS = ("==", "!=", "<", "<=", ">", ">=", "in", "not in")
+QUERY_FORMATS = {
+	"arrow": "application/vnd.apache.arrow.stream",
+	"csv": "text/csv",
+}
+
+
+class InvalidQuery(ValueError):
+	""" The query does not fit the dataset, e.g. an unknown column or a value
+	that cannot be cast to the column type
+	"""
+
+
+@dataclass
+class Predicate:
+	column: str
+	op: str
+	# cast to the column type, a list for in / not in
+	value: Any
+	scalar: Any
+
+
+def _castValue(value, field):
+	if value is None or isinstance(value, (list, dict)):
+		raise InvalidQuery(f"unsupported filter value for {field.name}: {value!r}")
+	try:
+		return pyarrow.scalar(value).cast(field.type)
+	except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError, pyarrow.ArrowTypeError) as e:
+		raise InvalidQuery(f"cannot compare {field.name} ({field.type}) with {value!r}: {e}")
+
+
+def compilePredicates(schema, filters: Iterable[Tuple[str, str, Any]]) -> List[Predicate]:
+	""" Validate (column, op, value) filters against the arrow schema of the file
+	"""
+	predicates = []
+	for column, op, value in filters:
+		if column not in schema.names:
+			raise InvalidQuery(f"unknown filter column: {column}")
+		if op not in QUERY_OPERATORS:
+			raise InvalidQuery(f"unsupported filter operator: {op}")
+
+		field = schema.field(column)
+		if op in ("in", "not in"):
+			if not isinstance(value, list) or not value:
+				raise InvalidQuery(f"{op} needs a non empty list of values for {column}")
+			scalars = [_castValue(item, field) for item in value]
+			predicates.append(Predicate(column, op, [item.as_py() for item in scalars], scalars))
+		else:
+			scalar = _castValue(value, field)
+			predicates.append(Predicate(column, op, scalar.as_py(), scalar))
+	return predicates
+
+
+def _excludes(predicate: Predicate, low, high) -> bool:
+	""" Whether a column chunk with values in [low, high] has no row matching the predicate
+	"""
+	value = predicate.value
+	op = predicate.op
+	if op == "==":
+		return value < low or value > high
+	if op == "!=":
+		return low == high == value
+	if op == "<":
+		return low >= value
+	if op == "<=":
+		return low > value
+	if op == ">":
+		return high <= value
+	if op == ">=":
+		return high < value
+	if op == "in":
+		return all(item < low or item > high for item in value)
+	if op == "not in":
+		return low == high and low in value
+	return False
+
+
+def rowGroupMayMatch(metadata, rowGroup: int, predicates: Sequence[Predicate]) -> bool:
+	""" False when the footer statistics of a row group rule out every row
+	"""
+	group = metadata.row_group(rowGroup)
+	if group.num_rows == 0:
+		return False
+
+	chunks = {}
+	for index in range(group.num_columns):
+		column = group.column(index)
+		# statistics of nested leaves do not describe the top level column
+		if "." not in column.path_in_schema:
+			chunks[column.path_in_schema] = column
+
+	for predicate in predicates:
+		column = chunks.get(predicate.column)
+		statistics = column.statistics if column is not None else None
+		if statistics is None:
+			continue
+
+		if statistics.null_count is not None and statistics.null_count == group.num_rows:
+			# comparisons with null never match
+			return False
+		if not statistics.has_min_max:
+			continue
+
+		try:
+			if _excludes(predicate, statistics.min, statistics.max):
+				return False
+		except TypeError:
+			# statistics in a type the value does not compare with, read the group
+			continue
+	return True
+
+
+def selectRowGroups(metadata, predicates: Sequence[Predicate]) -> List[int]:
+	return [
+		rowGroup for rowGroup in range(metadata.num_row_groups)
+		if rowGroupMayMatch(metadata, rowGroup, predicates)
+	]
+
+
+def predicateExpression(predicates: Sequence[Predicate]):
+	expression = None
+	for predicate in predicates:
+		field = pyarrow.compute.field(predicate.column)
+		if predicate.op == "in":
+			term = field.isin(pyarrow.array(predicate.value, type=predicate.scalar[0].type))
+		elif predicate.op == "not in":
+			term = ~field.isin(pyarrow.array(predicate.value, type=predicate.scalar[0].type))
+		elif predicate.op == "==":
+			term = field == predicate.scalar
+		elif predicate.op == "!=":
+			term = field != predicate.scalar
+		elif predicate.op == "<":
+			term = field < predicate.scalar
+		elif predicate.op == "<=":
+			term = field <= predicate.scalar
+		elif predicate.op == ">":
+			term = field > predicate.scalar
+		else:
+			term = field >= predicate.scalar
+		expression = term if expression is None else expression & term
+	return expression
+
+
+class _ArrowEncoder():
+	def __init__(self, schema):
+		self.sink = io.BytesIO()
+		self.writer = pyarrow.ipc.new_stream(self.sink, schema)
+
+	def _take(self) -> bytes:
+		data = self.sink.getvalue()
+		self.sink.seek(0)
+		self.sink.truncate()
+		return data
+
+	def encode(self, table) -> bytes:
+		self.writer.write_table(table)
+		return self._take()
+
+	def finish(self) -> bytes:
+		self.writer.close()
+		return self._take()
+
+
+class _CSVEncoder():
+	def __init__(self, schema):
+		self.schema = schema
+		self.header = True
+
+	def encode(self, table) -> bytes:
+		sink = io.BytesIO()
+		pyarrow.csv.write_csv(table, sink, pyarrow.csv.WriteOptions(include_header=self.header))
+		self.header = False
+		return sink.getvalue()
+
+	def finish(self) -> bytes:
+		if self.header:
+			# nothing matched, still send the header
+			return self.encode(self.schema.empty_table())
+		return b""
+
+
+class ParquetQuery():
+	""" A validated query against one Parquet object
+	"""
+	def __init__(
+		self,
+		parquetObject: ParquetObject,
+		columns: Optional[Sequence[str]] = None,
+		filters: Iterable[Tuple[str, str, Any]] = (),
+		outputFormat: str = "arrow",
+		limit: Optional[int] = None
+	):
+		requirePyarrow()
+		if outputFormat not in QUERY_FORMATS:
+			raise InvalidQuery(f"unsupported output format: {outputFormat}")
+
+		self.parquetObject = parquetObject
+		self.schema = parquetObject.metadata.schema.to_arrow_schema()
+
+		if columns:
+			missing = [column for column in columns if column not in self.schema.names]
+			if missing:
+				raise InvalidQuery(f"unknown columns: {', '.join(missing)}")
+		self.columns = list(columns) if columns else list(self.schema.names)
+
+		self.predicates = compilePredicates(self.schema, filters)
+		self.expression = predicateExpression(self.predicates)
+		self.readColumns = self.columns + [
+			column for column in dict.fromkeys(predicate.column for predicate in self.predicates)
+			if column not in self.columns
+		]
+		self.outputSchema = pyarrow.schema([self.schema.field(column) for column in self.columns])
+		self.outputFormat = outputFormat
+		self.limit = limit
+		self.rowGroups = selectRowGroups(parquetObject.metadata, self.predicates)
+
+	@property
+	def mediaType(self) -> str:
+		return QUERY_FORMATS[self.outputFormat]
+
+	def _decode(self, rowGroup: int, remaining: Optional[int]):
+		table = self.parquetObject.readRowGroups([rowGroup], self.readColumns)
+		if self.expression is not None:
+			table = table.filter(self.expression)
+		table = table.select(self.columns)
+		if remaining is not None:
+			table = table.slice(0, remaining)
+		# files written with other metadata still share the field types
+		return table.cast(self.outputSchema)
+
+	async def stream(self, threadpool: Optional[Callable] = None) -> AsyncIterator[bytes]:
+		""" Yield the encoded result, threadpool runs the blocking decode and encode
+		"""
+		async def run(function, *args):
+			if threadpool is None:
+				return function(*args)
+			return await threadpool(function, *args)
+
+		encoder = _ArrowEncoder(self.outputSchema) if self.outputFormat == "arrow" else _CSVEncoder(self.outputSchema)
+		remaining = self.limit
+		rowsOut = 0
+		bytesFetched = 0
+
+		fetches = {}
+		def prefetch(position: int):
+			if position < len(self.rowGroups):
+				fetches[position] = asyncio.ensure_future(
+					self.parquetObject.fetchRowGroups([self.rowGroups[position]], self.readColumns)
+				)
+
+		prefetch(0)
+		try:
+			for position, rowGroup in enumerate(self.rowGroups):
+				if remaining is not None and remaining <= 0:
+					break
+
+				ranges = await fetches.pop(position)
+				prefetch(position + 1)
+				bytesFetched += sum(end - start + 1 for start, end in ranges)
+
+				def decodeAndEncode():
+					table = self._decode(rowGroup, remaining)
+					return table.num_rows, encoder.encode(table) if table.num_rows else b""
+
+				rows, data = await run(decodeAndEncode)
+				self.parquetObject.release(ranges)
+
+				rowsOut += rows
+				if remaining is not None:
+					remaining -= rows
+				if data:
+					yield data
+
+			tail = await run(encoder.finish)
+			if tail:
+				yield tail
+		finally:
+			for fetch in fetches.values():
+				fetch.cancel()
+				with contextlib.suppress(asyncio.CancelledError, Exception):
+					await fetch
+
+			summary = {
+				"key": self.parquetObject.key,
+				"rowGroups": f"{len(self.rowGroups)}/{self.parquetObject.metadata.num_row_groups}",
+				"bytesFetched": bytesFetched,
+				"objectSize": self.parquetObject.size,
+				"rows": rowsOut,
+			}
+			queryLogger.info(f"parquet query {summary}")
@@ -0,0 +1,68 @@
+""" Mongo predicates for the identifiers a user may access
+
+checkPermissions decides access for one validated document in Python. The
+filters here state the same rule as a query on the indexed
+permissions.owner, permissions.group and publicationStatus fields, so list,
+search, batch and download lookups only ever read documents the user may
+see, instead of loading and validating a document to then refuse it.
+
+A user may access what they own and what belongs to one of their groups.
+Where a caller passes the admin group, as the metadata listings, resolve
+and search do, its members may read everything; object downloads never
+pass it. Reads of public listings and search also allow any published
+identifier, which is all the anonymous user sees.
+"""
+from typing import Optional
+
+from fairscape_mds.models.identifier import PublicationStatusEnum
+from fairscape_mds.models.user import UserWriteModel
+
+PUBLISHED_FILTER = {"publicationStatus": PublicationStatusEnum.PUBLISHED.value}
+# _id is never missing, so no document matches
+NO_ACCESS_FILTER = {"_id": {"$exists": False}}
+
+
+def permissionFilter(
+	user: Optional[UserWriteModel],
+	adminGroup: Optional[str] = None,
+	published: bool = True
+) -> Optional[dict]:
+	""" Query condition for the documents the user may access, None when unrestricted
+
+	With published the condition also matches every published identifier,
+	without it only owned and group documents, as checkPermissions does.
+	"""
+	if user is not None and adminGroup and adminGroup in (user.groups or []):
+		return None
+
+	allowed = [PUBLISHED_FILTER] if published else []
+	if user is not None:
+		allowed.append({"permissions.owner": user.email})
+		groups = [group for group in user.groups or [] if group]
+		if groups:
+			allowed.append({"permissions.group": {"$in": groups}})
+
+	if not allowed:
+		return dict(NO_ACCESS_FILTER)
+	if len(allowed) == 1:
+		return dict(allowed[0])
+	return {"$or": allowed}
+
+
+def restrictQuery(query: dict, condition: Optional[dict]) -> dict:
+	""" The query narrowed to the documents matching condition
+
+	The two are merged when they share no keys, which keeps $text at the top
+	level of a $match, otherwise they are combined with $and.
+	"""
+	if not condition:
+		return query
+	if not query:
+		return dict(condition)
+	if query.keys().isdisjoint(condition):
+		return {**query, **condition}
+	return {"$and": [query, condition]}
+
+
+def isPublished(document: dict) -> bool:
+	return document.get("publicationStatus") == PUBLISHED_FILTER["publicationStatus"]
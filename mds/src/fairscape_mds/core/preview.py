@@ -0,0 +1,162 @@
+""" First rows of a stored dataset without downloading it
+
+Delimited text is read from a leading byte range that doubles until it holds
+the requested rows; Parquet previews read the footer and then only the
+selected column chunks of the leading row groups (see ``core/parquet.py``).
+"""
+from typing import List, Optional, Sequence
+import csv
+import io
+import pathlib
+
+from fairscape_mds.core.parquet import ParquetObject, fetchRange
+
+PREVIEW_DEFAULT_ROWS = 20
+PREVIEW_MAX_ROWS = 1000
+# first leading range of a delimited file, doubled until the rows are found
+PREVIEW_INITIAL_RANGE = 65536
+PREVIEW_MAX_RANGE = 8388608
+
+DELIMITERS = {
+	".csv": ",",
+	".tsv": "\t",
+	".tab": "\t",
+}
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+class InvalidPreview(ValueError):
+	""" The preview request cannot be served, e.g. unknown columns or format
+	"""
+
+
+def previewFormat(objectKey: str) -> str:
+	suffix = pathlib.PurePosixPath(objectKey).suffix.lower()
+	if suffix in DELIMITERS:
+		return "delimited"
+	if suffix in PARQUET_SUFFIXES:
+		return "parquet"
+	raise InvalidPreview(f"preview is not supported for {suffix or 'files without an extension'}")
+
+
+def _selectColumns(header: List[str], columns: Optional[Sequence[str]]) -> List[int]:
+	if not columns:
+		return list(range(len(header)))
+
+	missing = [column for column in columns if column not in header]
+	if missing:
+		raise InvalidPreview(f"unknown columns: {', '.join(missing)}")
+	return [header.index(column) for column in columns]
+
+
+def parseDelimitedPreview(
+	data: bytes,
+	delimiter: str,
+	rows: int,
+	columns: Optional[Sequence[str]] = None,
+	complete: bool = False
+) -> Optional[dict]:
+	""" Parse the header and first rows from the leading bytes of a delimited file
+
+	Returns None when ``data`` is a prefix of the file (``complete`` false)
+	that does not yet hold ``rows`` whole records, since the last record of a
+	prefix may be cut off, also inside a quoted field.
+	"""
+	text = data.decode("utf-8-sig", errors="replace")
+	records = list(csv.reader(io.StringIO(text, newline=""), delimiter=delimiter))
+	if not records:
+		if complete:
+			return {"columns": [], "rows": [], "truncated": False}
+		return None
+
+	header = records[0]
+	body = records[1:]
+	if not complete:
+		# the final record may be partial
+		if len(body) <= rows:
+			return None
+		body = body[:-1]
+
+	indices = _selectColumns(header, columns)
+	selected = [
+		[record[index] if index < len(record) else None for index in indices]
+		for record in body[:rows]
+	]
+	return {
+		"columns": [header[index] for index in indices],
+		"rows": selected,
+		"truncated": len(body) > rows or not complete
+	}
+
+
+async def previewDelimited(s3, bucket: str, key: str, size: int, etag: Optional[str], rows: int, columns=None) -> dict:
+	delimiter = DELIMITERS[pathlib.PurePosixPath(key).suffix.lower()]
+	length = PREVIEW_INITIAL_RANGE
+	data = b""
+
+	while True:
+		end = min(length, size) - 1
+		if end >= len(data):
+			data += await fetchRange(s3, bucket, key, len(data), end, etag)
+
+		complete = len(data) >= size
+		preview = parseDelimitedPreview(data, delimiter, rows, columns, complete=complete)
+		if preview is not None:
+			preview["bytesRead"] = len(data)
+			return preview
+
+		if length >= PREVIEW_MAX_RANGE:
+			# rows longer than the range limit allows, return the whole records found
+			records = parseDelimitedPreview(data, delimiter, rows + 1, columns, complete=True)
+			records["rows"] = records["rows"][:-1]
+			records["truncated"] = True
+			records["bytesRead"] = len(data)
+			return records
+		length *= 2
+
+
+def _jsonValue(value):
+	if isinstance(value, (bytes, bytearray)):
+		return value.hex()
+	return value
+
+
+async def previewParquet(s3, bucket: str, key: str, objectMetadata: dict, rows: int, columns=None, threadpool=None) -> dict:
+	""" Preview of the leading row groups of a Parquet object
+
+	threadpool runs the blocking pyarrow decode, e.g. starlette's run_in_threadpool
+	"""
+	parquetObject = await ParquetObject.open(s3, bucket, key, objectMetadata)
+
+	available = parquetObject.columns
+	if columns:
+		missing = [column for column in columns if column not in available]
+		if missing:
+			raise InvalidPreview(f"unknown columns: {', '.join(missing)}")
+	selected = list(columns) if columns else available
+
+	rowGroups = []
+	found = 0
+	for index in range(parquetObject.metadata.num_row_groups):
+		if found >= rows:
+			break
+		rowGroups.append(index)
+		found += parquetObject.metadata.row_group(index).num_rows
+
+	fetched = await parquetObject.fetchRowGroups(rowGroups, selected)
+
+	def decode():
+		table = parquetObject.readRowGroups(rowGroups, selected).slice(0, rows)
+		return [
+			[_jsonValue(value) for value in record.values()]
+			for record in table.to_pylist()
+		]
+
+	records = await threadpool(decode) if threadpool is not None else decode()
+	return {
+		"columns": selected,
+		"rows": records,
+		"truncated": parquetObject.metadata.num_rows > len(records),
+		"totalRows": parquetObject.metadata.num_rows,
+		"bytesRead": sum(end - start + 1 for start, end in fetched)
+	}
@@ -0,0 +1,67 @@
+""" Client requested field projections
+
+Endpoints accept a list of dotted field paths (``fields=@id,metadata.name``)
+which are turned into a Mongo inclusion projection, so fields the client did
+not ask for are never read from disk or serialized.
+"""
+from typing import Iterable, Optional, Union
+import re
+
+# dotted paths of JSON-LD style keys, operators and positional paths are rejected
+_FIELD_PATTERN = re.compile(r"^[@A-Za-z0-9_:\-]+(\.[@A-Za-z0-9_:\-]+)*$")
+
+MAX_FIELDS = 50
+
+
+class InvalidProjection(ValueError):
+	pass
+
+
+def parseFields(fields: Union[str, Iterable[str], None]) -> Optional[list]:
+	""" Split and validate a fields parameter, None when no projection was asked for
+
+	Accepts a comma separated string or a list of strings (repeated query
+	parameters), either of which may contain comma separated entries.
+	"""
+	if fields is None:
+		return None
+
+	if isinstance(fields, str):
+		fields = [fields]
+
+	parsed = []
+	for entry in fields:
+		for field in entry.split(","):
+			field = field.strip()
+			if not field:
+				continue
+			if not _FIELD_PATTERN.match(field) or field.split(".")[0] == "_id":
+				raise InvalidProjection(f"invalid field: {field}")
+			if field not in parsed:
+				parsed.append(field)
+
+	if not parsed:
+		return None
+	if len(parsed) > MAX_FIELDS:
+		raise InvalidProjection(f"at most {MAX_FIELDS} fields may be requested")
+	return parsed
+
+
+def fieldsProjection(fields: Optional[list], required: Iterable[str] = ("@id",)) -> Optional[dict]:
+	""" Build an inclusion projection from parsed fields, None for the full document
+
+	Paths nested under another requested path are dropped since Mongo rejects
+	projections with overlapping paths.
+	"""
+	if not fields:
+		return None
+
+	paths = sorted(set(fields) | set(required), key=len)
+	kept = []
+	for path in paths:
+		if not any(path.startswith(f"{parent}.") for parent in kept):
+			kept.append(path)
+
+	projection = {"_id": False}
+	projection.update({path: True for path in kept})
+	return projection
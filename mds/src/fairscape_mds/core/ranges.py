@@ -0,0 +1,93 @@
+""" HTTP Range / If-Range handling for object downloads
+
+Only single byte ranges are served as partial content. A multi range request
+or an unparsable header is answered with the full object, which RFC 9110
+permits since servers may ignore the Range header.
+"""
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+import datetime
+import re
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+	def __init__(self, size: int):
+		super().__init__(f"range not satisfiable for object of {size} bytes")
+		self.size = size
+
+
+def parseRange(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+	""" Resolve a Range header to an inclusive (start, end), None to serve the whole object
+	"""
+	if not header:
+		return None
+
+	match = _RANGE_PATTERN.match(header.strip().replace(" ", ""))
+	if not match:
+		return None
+
+	start, end = match.groups()
+	if not start and not end:
+		return None
+
+	if not start:
+		# suffix range, the last n bytes, an empty object has none
+		length = int(end)
+		if length == 0 or size == 0:
+			raise RangeNotSatisfiable(size)
+		return max(size - length, 0), size - 1
+
+	start = int(start)
+	end = int(end) if end else size - 1
+	if start >= size or end < start:
+		raise RangeNotSatisfiable(size)
+	return start, min(end, size - 1)
+
+
+def _httpDate(value) -> Optional[datetime.datetime]:
+	if isinstance(value, datetime.datetime):
+		return value.replace(microsecond=0)
+	try:
+		return parsedate_to_datetime(value).replace(microsecond=0)
+	except (TypeError, ValueError):
+		return None
+
+
+def ifRangeMatches(ifRange: Optional[str], etag: Optional[str], lastModified=None) -> bool:
+	""" Whether a Range should be honoured given the If-Range validator
+
+	An entity tag must match strongly; a date must equal Last-Modified exactly.
+	"""
+	if not ifRange:
+		return True
+
+	ifRange = ifRange.strip()
+	if ifRange.startswith('"') or ifRange.startswith("W/"):
+		return bool(etag) and not ifRange.startswith("W/") and ifRange == etag
+
+	requested = _httpDate(ifRange)
+	modified = _httpDate(lastModified) if lastModified is not None else None
+	return requested is not None and modified is not None and requested == modified
+
+
+def objectHeaders(objectMetadata: dict) -> dict:
+	""" Validator and ranging headers for an S3 head/get_object response
+	"""
+	headers = {"Accept-Ranges": "bytes"}
+	if objectMetadata.get("ETag"):
+		headers["ETag"] = objectMetadata["ETag"]
+	lastModified = objectMetadata.get("LastModified")
+	if isinstance(lastModified, datetime.datetime):
+		if lastModified.tzinfo is None:
+			lastModified = lastModified.replace(tzinfo=datetime.timezone.utc)
+		headers["Last-Modified"] = format_datetime(
+			lastModified.astimezone(datetime.timezone.utc),
+			usegmt=True
+		)
+	return headers
+
+
+def contentRange(start: int, end: int, size: int) -> str:
+	return f"bytes {start}-{end}/{size}"
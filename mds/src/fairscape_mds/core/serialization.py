@@ -0,0 +1,36 @@
+""" Fast JSON encoding for stored documents returned without validation
+
+Documents read straight from Mongo are encoded with orjson. Statistics are
+stored with the "NaN" / "INF" / "NINF" sentinels written by
+``generateNumericalStatistics`` and pass through unchanged; any remaining
+non finite float is emitted as null instead of the invalid JSON tokens the
+stdlib encoder would produce.
+"""
+from fastapi.responses import Response
+from typing import Any
+import datetime
+import uuid
+
+import orjson
+
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _jsonDefault(value):
+	# BSON and other types orjson does not encode natively
+	if isinstance(value, (datetime.date, uuid.UUID)):
+		return str(value)
+	if isinstance(value, (set, frozenset, tuple)):
+		return list(value)
+	return str(value)
+
+
+def dumpJSON(content: Any) -> bytes:
+	return orjson.dumps(content, default=_jsonDefault, option=_JSON_OPTIONS)
+
+
+class RawJSONResponse(Response):
+	media_type = "application/json"
+
+	def render(self, content: Any) -> bytes:
+		return dumpJSON(content)
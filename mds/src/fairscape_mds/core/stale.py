@@ -0,0 +1,48 @@
+""" Queues of identifiers waiting for an index sync
+
+Writers mark the identifiers they changed, the next sync of an index takes
+the marks and reads those identifiers again. Each mark is its own small
+document ``{"_id": "stale:<guid>"}`` in the index's collection, so marking
+is one upsert per identifier whatever the size of the backlog, and the
+queue is read as a range of the _id index.
+
+Taking deletes the marks it read. A mark made again between the read and
+the delete is lost, which is safe: the write behind it landed before it was
+marked, and the caller reads the identifiers only after taking them.
+"""
+from typing import Iterable, List
+
+from pymongo import UpdateOne
+
+STALE_PREFIX = "stale:"
+# marks read and deleted per round trip
+STALE_BATCH_SIZE = 1000
+
+_STALE_RANGE = {"$gte": STALE_PREFIX, "$lt": STALE_PREFIX + "\uffff"}
+
+
+def markStale(collection, guids: Iterable[str]):
+	""" Queue identifiers for the next sync of the index kept in collection
+	"""
+	guids = list(dict.fromkeys(guid for guid in guids if guid))
+	if guids:
+		collection.bulk_write(
+			[UpdateOne({"_id": STALE_PREFIX + guid}, {"$set": {"guid": guid}}, upsert=True) for guid in guids],
+			ordered=False
+		)
+
+
+def takeStale(collection) -> List[str]:
+	""" Identifiers marked since the last call, in _id order
+	"""
+	guids = []
+	while True:
+		marks = list(collection.find({"_id": _STALE_RANGE}).sort("_id", 1).limit(STALE_BATCH_SIZE))
+		if not marks:
+			break
+		collection.delete_many({"_id": {"$in": [mark["_id"] for mark in marks]}})
+		guids.extend(mark["_id"][len(STALE_PREFIX):] for mark in marks)
+		if len(marks) < STALE_BATCH_SIZE:
+			break
+
+	return list(dict.fromkeys(guids))
@@ -0,0 +1,168 @@
+""" Pipelined streaming of S3 object bodies into HTTP responses
+
+Object bodies are read in fixed size chunks by a producer task that runs
+ahead of the client by at most ``readAhead`` chunks. The bounded queue
+between them is the backpressure: a slow client stops the S3 reads instead
+of buffering the object in memory, and a slow S3 read overlaps with the
+write of the previous chunk to the client.
+
+Each transfer records a ``TransferMetrics``; finished transfers are logged
+on the ``download`` logger and folded into the process wide ``downloadStats``,
+which administrators can read from ``GET /metrics/downloads``.
+"""
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+import asyncio
+import contextlib
+import logging
+import time
+
+downloadLogger = logging.getLogger("download")
+
+# defaults, overridden by FAIRSCAPE_DOWNLOAD_CHUNK_SIZE / FAIRSCAPE_DOWNLOAD_READ_AHEAD
+DEFAULT_CHUNK_SIZE = 1048576
+DEFAULT_READ_AHEAD = 2
+
+_END = object()
+
+
+@dataclass
+class TransferMetrics:
+	label: str = ""
+	bytes: int = 0
+	chunks: int = 0
+	started: float = field(default_factory=time.perf_counter)
+	firstByte: Optional[float] = None
+	finished: Optional[float] = None
+	# time the producer spent waiting on S3, and blocked on a full queue
+	sourceWait: float = 0.0
+	sinkWait: float = 0.0
+	completed: bool = False
+
+	@property
+	def seconds(self) -> float:
+		end = self.finished if self.finished is not None else time.perf_counter()
+		return end - self.started
+
+	@property
+	def throughput(self) -> float:
+		""" bytes per second over the whole transfer
+		"""
+		seconds = self.seconds
+		return self.bytes / seconds if seconds > 0 else 0.0
+
+	def summary(self) -> dict:
+		return {
+			"label": self.label,
+			"bytes": self.bytes,
+			"chunks": self.chunks,
+			"seconds": round(self.seconds, 4),
+			"timeToFirstByte": round(self.firstByte - self.started, 4) if self.firstByte else None,
+			"throughputMiBps": round(self.throughput / 1048576, 2),
+			"sourceWait": round(self.sourceWait, 4),
+			"sinkWait": round(self.sinkWait, 4),
+			"completed": self.completed,
+		}
+
+
+class DownloadStats():
+	""" Running totals of the transfers finished by this process
+	"""
+	def __init__(self):
+		self.transfers = 0
+		self.aborted = 0
+		self.bytes = 0
+		self.seconds = 0.0
+
+	def record(self, metrics: TransferMetrics):
+		self.transfers += 1
+		self.bytes += metrics.bytes
+		self.seconds += metrics.seconds
+		if not metrics.completed:
+			self.aborted += 1
+
+	def snapshot(self) -> dict:
+		return {
+			"transfers": self.transfers,
+			"aborted": self.aborted,
+			"bytes": self.bytes,
+			"meanThroughputMiBps": round(self.bytes / self.seconds / 1048576, 2) if self.seconds else 0.0,
+		}
+
+
+downloadStats = DownloadStats()
+
+
+async def _readChunk(body, chunkSize: int) -> bytes:
+	""" Read exactly chunkSize bytes unless the body ends first
+
+	aiohttp hands back whatever is buffered on a read, which for a fast
+	network is often a few KiB, so reads are coalesced into one chunk.
+	"""
+	buffer = bytearray()
+	while len(buffer) < chunkSize:
+		data = await body.read(chunkSize - len(buffer))
+		if not data:
+			break
+		buffer += data
+	return bytes(buffer)
+
+
+async def pipelineBody(
+	body,
+	chunkSize: int = DEFAULT_CHUNK_SIZE,
+	readAhead: int = DEFAULT_READ_AHEAD,
+	metrics: Optional[TransferMetrics] = None
+) -> AsyncIterator[bytes]:
+	""" Stream an async body in fixed size chunks, reading ahead of the consumer
+
+	body needs an async ``read(n)`` and a ``close()``, as aiobotocore's
+	StreamingBody has. The body is closed and the metrics recorded however
+	the consumer stops, including client disconnects.
+	"""
+	if metrics is None:
+		metrics = TransferMetrics()
+	queue: asyncio.Queue = asyncio.Queue(maxsize=max(readAhead, 1))
+
+	async def produce():
+		try:
+			while True:
+				readStart = time.perf_counter()
+				chunk = await _readChunk(body, chunkSize)
+				metrics.sourceWait += time.perf_counter() - readStart
+				if not chunk:
+					break
+
+				putStart = time.perf_counter()
+				await queue.put(chunk)
+				metrics.sinkWait += time.perf_counter() - putStart
+			await queue.put(_END)
+		except asyncio.CancelledError:
+			raise
+		except Exception as e:
+			await queue.put(e)
+
+	producer = asyncio.create_task(produce())
+	try:
+		while True:
+			item = await queue.get()
+			if item is _END:
+				metrics.completed = True
+				break
+			if isinstance(item, Exception):
+				raise item
+
+			if metrics.firstByte is None:
+				metrics.firstByte = time.perf_counter()
+			metrics.bytes += len(item)
+			metrics.chunks += 1
+			yield item
+	finally:
+		producer.cancel()
+		with contextlib.suppress(asyncio.CancelledError, Exception):
+			await producer
+		body.close()
+
+		metrics.finished = time.perf_counter()
+		downloadStats.record(metrics)
+		downloadLogger.info(f"download {metrics.summary()}")
@@ -0,0 +1,187 @@
+""" Streaming S3 objects to external publishing platforms
+
+Platform uploads read the stored archive from S3 in bounded chunks and hand
+requests a file-like body with a known length, so memory use stays flat
+however large the archive is and requests sends a Content-Length instead of
+falling back to chunked transfer encoding.
+"""
+from typing import Callable, Iterator, Optional
+import time
+import uuid
+
+# bytes read from S3 per request, and between progress reports
+UPLOAD_CHUNK_SIZE = 8388608
+UPLOAD_PROGRESS_INTERVAL = 67108864
+
+
+class S3UploadSource():
+	""" An S3 object that can be read from the start or a byte range,
+	uses the sync boto3 client since uploads run in the worker
+	"""
+	def __init__(self, client, bucket: str, key: str, size: Optional[int] = None):
+		self.client = client
+		self.bucket = bucket
+		self.key = key
+		self._size = size
+
+	@property
+	def size(self) -> int:
+		if self._size is None:
+			self._size = self.client.head_object(Bucket=self.bucket, Key=self.key)["ContentLength"]
+		return self._size
+
+	def open(self, start: int = 0, end: Optional[int] = None):
+		""" StreamingBody over the object, end is inclusive
+		"""
+		request = {"Bucket": self.bucket, "Key": self.key}
+		if start or end is not None:
+			request["Range"] = f"bytes={start}-{'' if end is None else end}"
+		return self.client.get_object(**request)["Body"]
+
+	def iterChunks(self, chunkSize: int = UPLOAD_CHUNK_SIZE, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+		body = self.open(start, end)
+		try:
+			while True:
+				chunk = body.read(chunkSize)
+				if not chunk:
+					break
+				yield chunk
+		finally:
+			body.close()
+
+
+class UploadProgress():
+	""" Counts uploaded bytes and reports them every ``interval`` bytes
+
+	``state`` carries platform specific resume information (e.g. a Figshare
+	file id) and is passed to the report callback with the byte count.
+	"""
+	def __init__(
+		self,
+		total: int,
+		report: Optional[Callable[[int, dict], None]] = None,
+		interval: int = UPLOAD_PROGRESS_INTERVAL,
+		uploaded: int = 0,
+		state: Optional[dict] = None
+	):
+		self.total = total
+		self.report = report
+		self.interval = interval
+		self.uploaded = uploaded
+		self.state = state if state is not None else {}
+		self._reported = uploaded
+		self.started = time.perf_counter()
+
+	def advance(self, amount: int):
+		self.uploaded += amount
+		if self.uploaded - self._reported >= self.interval:
+			self.flush()
+
+	def reset(self, uploaded: int = 0):
+		""" Restart the count, for a platform that rejected a partial upload
+		"""
+		self.uploaded = uploaded
+		self.flush()
+
+	def flush(self):
+		self._reported = self.uploaded
+		if self.report is not None:
+			self.report(self.uploaded, self.state)
+
+
+class ProgressReader():
+	""" File-like view of a body that reports each read to an UploadProgress
+
+	requests streams any iterable with a ``read`` method, ``__len__`` gives it
+	the Content-Length.
+	"""
+	def __init__(self, body, length: int, progress: Optional[UploadProgress] = None, chunkSize: int = UPLOAD_CHUNK_SIZE):
+		self.body = body
+		self.length = length
+		self.progress = progress
+		self.chunkSize = chunkSize
+
+	def __len__(self) -> int:
+		return self.length
+
+	def read(self, amount: int = -1) -> bytes:
+		if amount is None or amount < 0:
+			amount = self.chunkSize
+		data = self.body.read(amount)
+		if data and self.progress is not None:
+			self.progress.advance(len(data))
+		return data
+
+	def __iter__(self) -> Iterator[bytes]:
+		while True:
+			chunk = self.read(self.chunkSize)
+			if not chunk:
+				break
+			yield chunk
+
+	def close(self):
+		self.body.close()
+
+
+class MultipartFileStream():
+	""" multipart/form-data body with a single file field, the file part is
+	read from the underlying body as requests sends it
+	"""
+	def __init__(
+		self,
+		fieldName: str,
+		filename: str,
+		body,
+		length: int,
+		contentType: str = "application/octet-stream",
+		boundary: Optional[str] = None
+	):
+		self.boundary = boundary or uuid.uuid4().hex
+		self.file = body
+		self._parts = [
+			(
+				f"--{self.boundary}\r\n"
+				f'Content-Disposition: form-data; name="{fieldName}"; filename="{filename}"\r\n'
+				f"Content-Type: {contentType}\r\n\r\n"
+			).encode("utf-8"),
+			body,
+			f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+		]
+		self.length = len(self._parts[0]) + length + len(self._parts[2])
+		self._index = 0
+		self._offset = 0
+
+	@property
+	def contentType(self) -> str:
+		return f"multipart/form-data; boundary={self.boundary}"
+
+	def __len__(self) -> int:
+		return self.length
+
+	def read(self, amount: int = -1) -> bytes:
+		if amount is None or amount < 0:
+			amount = UPLOAD_CHUNK_SIZE
+
+		while self._index < len(self._parts):
+			part = self._parts[self._index]
+			if isinstance(part, bytes):
+				data = part[self._offset:self._offset + amount]
+				self._offset += len(data)
+			else:
+				data = part.read(amount)
+
+			if data:
+				return data
+			self._index += 1
+			self._offset = 0
+		return b""
+
+	def __iter__(self) -> Iterator[bytes]:
+		while True:
+			chunk = self.read(UPLOAD_CHUNK_SIZE)
+			if not chunk:
+				break
+			yield chunk
+
+	def close(self):
+		self.file.close()
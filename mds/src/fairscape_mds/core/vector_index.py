@@ -0,0 +1,534 @@
+""" Local vector index for semantic search
+
+Identifiers are embedded into fixed length float32 vectors stored as one row
+major matrix in a file that every process memory maps, so the index survives
+restarts without being rebuilt and lives in the page cache rather than the
+heap. A query is one matrix vector product over the mapped rows and an
+argpartition for the top k.
+
+Past a size threshold an inverted file index is trained: k-means centroids
+over the rows, with each row assigned to its nearest centroid. A query then
+only scores the rows of the ``nprobe`` centroids closest to it. Rows written
+after training are assigned as they are written, so updates never wait for a
+retrain.
+
+Files in the index directory:
+
+  - ``state.json``: dimensions, model, row count and the sync watermark,
+    replaced atomically after every write
+  - ``ids.txt``: the identifier of each row, one per line
+  - ``vectors.f32``: the row vectors
+  - ``assignments.i32``: per row 0 unassigned, -1 removed or centroid + 1
+  - ``centroids.npy``: the inverted file centroids, once trained
+
+Readers never lock, rows become visible once ``state.json`` counts them.
+Writers take an exclusive lock on ``write.lock``, so the directory must be on
+a volume shared by every process that serves search, e.g. all API workers of
+a host. Identifiers written since they were embedded are queued in a Mongo
+collection instead, see core/stale.py, so marks made by the Celery worker or
+another host reach the index as well.
+
+The embedding function is pluggable. The default ``HashingEmbedder`` needs
+no model: words and word pairs are hashed into signed buckets, so texts that
+share terms are close under the cosine.
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import contextlib
+import fcntl
+import functools
+import hashlib
+import importlib
+import json
+import logging
+import math
+import os
+import pathlib
+import re
+import threading
+import time
+
+import numpy
+
+from fairscape_mds.core.stale import markStale, takeStale
+
+searchLogger = logging.getLogger("search")
+
+VECTOR_DTYPE = numpy.float32
+DEFAULT_DIMENSIONS = 1024
+INITIAL_CAPACITY = 1024
+# rows sampled to train the centroids, and k-means rounds over them
+IVF_TRAIN_SAMPLE = 65536
+IVF_ITERATIONS = 10
+IVF_DEFAULT_NPROBE = 8
+# rows scored per block when assigning every row to a centroid
+ASSIGN_BLOCK = 65536
+
+UNASSIGNED = 0
+REMOVED = -1
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset((
+	"an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is",
+	"it", "of", "on", "or", "that", "the", "this", "to", "was", "were", "with"
+))
+
+
+@functools.lru_cache(maxsize=65536)
+def _featureHash(feature: str) -> int:
+	return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def normalizeRows(matrix):
+	norms = numpy.linalg.norm(matrix, axis=1, keepdims=True)
+	numpy.divide(matrix, norms, out=matrix, where=norms > 0)
+	return matrix
+
+
+class HashingEmbedder():
+	""" Embeds text by feature hashing its words and adjacent word pairs
+
+	Each feature adds a sublinear term frequency to one of ``dimensions``
+	buckets with a sign taken from its hash, so collisions cancel out on
+	average instead of accumulating. Rows are L2 normalized, the dot product
+	of two embeddings is their cosine.
+	"""
+	def __init__(self, dimensions: int = DEFAULT_DIMENSIONS):
+		self.dimensions = dimensions
+		self.name = f"hashing-{dimensions}"
+
+	@staticmethod
+	def tokens(text: str) -> List[str]:
+		words = []
+		for word in _TOKEN.findall(text.lower()):
+			if len(word) < 2 or word in _STOPWORDS:
+				continue
+			# a crude plural folding, datasets and dataset share a feature
+			if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+				word = word[:-1]
+			words.append(word)
+		return words
+
+	def embed(self, texts: Sequence[str]):
+		matrix = numpy.zeros((len(texts), self.dimensions), dtype=VECTOR_DTYPE)
+		for row, text in enumerate(texts):
+			words = self.tokens(text or "")
+			features = Counter(words)
+			features.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+
+			for feature, count in features.items():
+				hashed = _featureHash(feature)
+				sign = 1.0 if hashed >> 63 else -1.0
+				matrix[row, hashed % self.dimensions] += sign * (1.0 + math.log(count))
+		return normalizeRows(matrix)
+
+
+def loadEmbedder(spec: Optional[str] = "hashing", dimensions: int = DEFAULT_DIMENSIONS):
+	""" The embedder named by a FAIRSCAPE_SEMANTIC_EMBEDDER value
+
+	"hashing" is the built in HashingEmbedder, anything else is a
+	"package.module:factory" path. The factory is called without arguments and
+	returns an object with ``name``, ``dimensions`` and ``embed(texts)``
+	returning one normalized row per text. The name is stored with the index,
+	changing it rebuilds the index.
+	"""
+	if not spec or spec == "hashing":
+		return HashingEmbedder(dimensions)
+
+	moduleName, _, attribute = spec.partition(":")
+	if not attribute:
+		raise ValueError(f"embedder must be 'hashing' or 'module:factory', got {spec!r}")
+	embedder = getattr(importlib.import_module(moduleName), attribute)()
+
+	missing = [name for name in ("name", "dimensions", "embed") if not hasattr(embedder, name)]
+	if missing:
+		raise ValueError(f"embedder {spec} has no {', '.join(missing)}")
+	return embedder
+
+
+class VectorIndex():
+	""" Memory mapped float32 vectors keyed by identifier
+
+	Rows are never reused for another identifier: an upsert of a known
+	identifier overwrites its row in place and a removal only marks it, so the
+	identifier of a row read by one process stays valid for every other.
+	"""
+	def __init__(self, path, dimensions: int, model: str):
+		self.path = pathlib.Path(path)
+		self.dimensions = dimensions
+		self.model = model
+
+		self._lock = threading.RLock()
+		self._state: Optional[dict] = None
+		self._ids: List[str] = []
+		self._rows: Dict[str, int] = {}
+		self._idsBytes = 0
+		self._capacity = 0
+		self._vectors = None
+		self._assignments = None
+		self._centroids = None
+		self._centroidsGeneration = 0
+
+	def _file(self, name: str) -> pathlib.Path:
+		return self.path / name
+
+	def _readState(self) -> Optional[dict]:
+		try:
+			with open(self._file("state.json")) as handle:
+				state = json.load(handle)
+		except (FileNotFoundError, ValueError):
+			return None
+		if state.get("dimensions") != self.dimensions or state.get("model") != self.model:
+			return None
+		return state
+
+	def _writeState(self, state: dict):
+		temporary = self._file("state.json.tmp")
+		with open(temporary, "w") as handle:
+			json.dump(state, handle)
+		os.replace(temporary, self._file("state.json"))
+
+	def _map(self, capacity: int):
+		self._vectors = numpy.memmap(
+			self._file("vectors.f32"), dtype=VECTOR_DTYPE, mode="r+", shape=(capacity, self.dimensions)
+		)
+		self._assignments = numpy.memmap(
+			self._file("assignments.i32"), dtype=numpy.int32, mode="r+", shape=(capacity,)
+		)
+		self._capacity = capacity
+
+	def _clear(self):
+		self._state = None
+		self._ids = []
+		self._rows = {}
+		self._idsBytes = 0
+		self._capacity = 0
+		self._vectors = None
+		self._assignments = None
+		self._centroids = None
+		self._centroidsGeneration = 0
+
+	def refresh(self) -> bool:
+		""" Pick up rows written by other processes, False when there is no index yet
+		"""
+		with self._lock:
+			state = self._readState()
+			if state is None:
+				self._clear()
+				return False
+
+			if self._state is None or state["epoch"] != self._state["epoch"]:
+				self._clear()
+			if state["capacity"] != self._capacity:
+				self._map(state["capacity"])
+
+			if state["idsBytes"] > self._idsBytes:
+				with open(self._file("ids.txt"), "rb") as handle:
+					handle.seek(self._idsBytes)
+					data = handle.read(state["idsBytes"] - self._idsBytes)
+				for guid in data.decode("utf-8").splitlines():
+					self._rows[guid] = len(self._ids)
+					self._ids.append(guid)
+				self._idsBytes = state["idsBytes"]
+
+			if state["centroidsGeneration"] != self._centroidsGeneration:
+				self._centroids = numpy.load(self._file("centroids.npy")) if state["centroidsGeneration"] else None
+				self._centroidsGeneration = state["centroidsGeneration"]
+
+			self._state = state
+			return True
+
+	def _reset(self) -> dict:
+		""" Start an empty index, e.g. for a new directory or after the model changed
+		"""
+		self.path.mkdir(parents=True, exist_ok=True)
+		for name in ("vectors.f32", "assignments.i32", "centroids.npy"):
+			with contextlib.suppress(FileNotFoundError):
+				self._file(name).unlink()
+		self._file("ids.txt").write_bytes(b"")
+		with open(self._file("vectors.f32"), "wb") as handle:
+			handle.truncate(INITIAL_CAPACITY * self.dimensions * numpy.dtype(VECTOR_DTYPE).itemsize)
+		with open(self._file("assignments.i32"), "wb") as handle:
+			handle.truncate(INITIAL_CAPACITY * numpy.dtype(numpy.int32).itemsize)
+
+		self._writeState({
+			"dimensions": self.dimensions,
+			"model": self.model,
+			"epoch": time.time_ns(),
+			"rows": 0,
+			"capacity": INITIAL_CAPACITY,
+			"idsBytes": 0,
+			"generation": 0,
+			"centroidsGeneration": 0,
+			"trainedRows": 0,
+			"watermark": None,
+			"built": False
+		})
+		searchLogger.info(f"created vector index {self.path} for {self.model}")
+		self.refresh()
+		return self._state
+
+	@contextlib.contextmanager
+	def _writing(self):
+		""" Exclusive write access, yields the state to update
+		"""
+		self.path.mkdir(parents=True, exist_ok=True)
+		with self._lock, open(self._file("write.lock"), "a") as lockFile:
+			fcntl.flock(lockFile, fcntl.LOCK_EX)
+			try:
+				if not self.refresh():
+					self._reset()
+				state = dict(self._state)
+				yield state
+
+				if self._vectors is not None:
+					self._vectors.flush()
+					self._assignments.flush()
+				state["generation"] += 1
+				self._writeState(state)
+				self._state = state
+			finally:
+				fcntl.flock(lockFile, fcntl.LOCK_UN)
+
+	def _grow(self, state: dict, rows: int):
+		capacity = max(state["capacity"] * 2, rows)
+		self._vectors.flush()
+		self._assignments.flush()
+		self._vectors = None
+		self._assignments = None
+		# the extension reads as zeros, i.e. zero vectors that are unassigned
+		with open(self._file("vectors.f32"), "r+b") as handle:
+			handle.truncate(capacity * self.dimensions * numpy.dtype(VECTOR_DTYPE).itemsize)
+		with open(self._file("assignments.i32"), "r+b") as handle:
+			handle.truncate(capacity * numpy.dtype(numpy.int32).itemsize)
+		self._map(capacity)
+		state["capacity"] = capacity
+
+	@property
+	def rows(self) -> int:
+		return self._state["rows"] if self._state else 0
+
+	@property
+	def watermark(self):
+		return self._state.get("watermark") if self._state else None
+
+	@property
+	def built(self) -> bool:
+		""" Whether a sync has once embedded every identifier, an interrupted
+		first build leaves this False while its watermark already moved
+		"""
+		return bool(self._state and self._state.get("built"))
+
+	def markBuilt(self):
+		with self._writing() as state:
+			state["built"] = True
+
+	def __contains__(self, guid: str) -> bool:
+		return guid in self._rows
+
+	def _assign(self, vectors):
+		return numpy.argmax(vectors @ self._centroids.T, axis=1).astype(numpy.int32) + 1
+
+	def upsert(self, guids: Sequence[str], vectors, watermark=None) -> int:
+		""" Write the vectors of the identifiers, returns the number of new rows
+
+		watermark is stored with the rows for the caller's incremental sync.
+		"""
+		vectors = numpy.asarray(vectors, dtype=VECTOR_DTYPE).reshape(len(guids), self.dimensions)
+		with self._writing() as state:
+			added = [guid for guid in dict.fromkeys(guids) if guid not in self._rows]
+			if added:
+				rows = state["rows"] + len(added)
+				if rows > state["capacity"]:
+					self._grow(state, rows)
+
+				data = "".join(f"{guid}\n" for guid in added).encode("utf-8")
+				# written at the counted end, bytes of an interrupted write are overwritten
+				with open(self._file("ids.txt"), "r+b") as handle:
+					handle.seek(state["idsBytes"])
+					handle.write(data)
+					handle.truncate()
+				for guid in added:
+					self._rows[guid] = len(self._ids)
+					self._ids.append(guid)
+				self._idsBytes = state["idsBytes"] = state["idsBytes"] + len(data)
+				state["rows"] = rows
+
+			if len(guids):
+				rows = numpy.array([self._rows[guid] for guid in guids])
+				self._vectors[rows] = vectors
+				self._assignments[rows] = self._assign(vectors) if self._centroids is not None else UNASSIGNED
+			if watermark is not None:
+				state["watermark"] = watermark
+		return len(added)
+
+	def remove(self, guids: Sequence[str]) -> int:
+		rows = [self._rows[guid] for guid in guids if guid in self._rows]
+		if not rows:
+			return 0
+		with self._writing():
+			self._vectors[rows] = 0
+			self._assignments[rows] = REMOVED
+		return len(rows)
+
+	def train(self, lists: Optional[int] = None, iterations: int = IVF_ITERATIONS, seed: int = 0) -> int:
+		""" Train the inverted file centroids and assign every row, returns the number of lists
+		"""
+		with self._writing() as state:
+			rows = state["rows"]
+			alive = numpy.flatnonzero(numpy.asarray(self._assignments[:rows]) != REMOVED)
+			if len(alive) == 0:
+				return 0
+			lists = min(lists or max(1, int(math.sqrt(len(alive)))), len(alive))
+
+			generator = numpy.random.default_rng(seed)
+			sample = numpy.sort(generator.choice(alive, size=min(len(alive), IVF_TRAIN_SAMPLE), replace=False))
+			data = numpy.asarray(self._vectors[sample])
+			centroids = data[generator.choice(len(data), size=lists, replace=False)].copy()
+
+			for _ in range(iterations):
+				labels = numpy.argmax(data @ centroids.T, axis=1)
+				sums = numpy.zeros_like(centroids)
+				numpy.add.at(sums, labels, data)
+				counts = numpy.bincount(labels, minlength=lists)
+				# an empty list keeps its centroid
+				centroids[counts > 0] = sums[counts > 0]
+				normalizeRows(centroids)
+
+			self._centroids = centroids
+			for start in range(0, rows, ASSIGN_BLOCK):
+				end = min(start + ASSIGN_BLOCK, rows)
+				current = numpy.asarray(self._assignments[start:end])
+				self._assignments[start:end] = numpy.where(
+					current == REMOVED, REMOVED, self._assign(numpy.asarray(self._vectors[start:end]))
+				)
+
+			temporary = self._file("centroids.npy.tmp")
+			with open(temporary, "wb") as handle:
+				numpy.save(handle, centroids)
+			os.replace(temporary, self._file("centroids.npy"))
+			state["centroidsGeneration"] += 1
+			state["trainedRows"] = len(alive)
+			self._centroidsGeneration = state["centroidsGeneration"]
+
+		searchLogger.info(f"trained {lists} lists over {len(alive)} rows of {self.path}")
+		return lists
+
+	def maybeTrain(self, threshold: int) -> bool:
+		""" Train once the index reaches threshold rows and again each time it doubles,
+		a threshold of 0 keeps exact search
+		"""
+		if not threshold or self.rows < threshold:
+			return False
+		trained = self._state.get("trainedRows", 0)
+		if trained and self.rows < 2 * trained:
+			return False
+		self.train()
+		return True
+
+	def search(self, vector, k: int, nprobe: int = IVF_DEFAULT_NPROBE) -> Tuple[List[Tuple[str, float]], int]:
+		""" The k rows most similar to vector as (identifier, score), best first,
+		with the number of rows scoring above zero
+		"""
+		with self._lock:
+			self.refresh()
+			rows = self.rows
+			if rows == 0 or k <= 0:
+				return [], 0
+			vectors = self._vectors[:rows]
+			assignments = self._assignments[:rows]
+			centroids = self._centroids
+			ids = self._ids
+
+		query = numpy.asarray(vector, dtype=VECTOR_DTYPE).reshape(self.dimensions)
+		candidates = None
+		if centroids is not None and nprobe < len(centroids):
+			probes = numpy.argpartition(-(centroids @ query), nprobe - 1)[:nprobe] + 1
+			candidates = numpy.flatnonzero(numpy.isin(assignments, probes) | (assignments == UNASSIGNED))
+			scores = vectors[candidates] @ query
+		else:
+			scores = vectors @ query
+
+		# removed rows are zero vectors and score exactly zero
+		matched = numpy.flatnonzero(scores > 0)
+		total = len(matched)
+		if k < total:
+			matched = matched[numpy.argpartition(-scores[matched], k - 1)[:k]]
+		matched = matched[numpy.argsort(-scores[matched], kind="stable")]
+
+		positions = candidates[matched] if candidates is not None else matched
+		return [(ids[row], float(scores[index])) for row, index in zip(positions, matched)], total
+
+
+class SemanticIndex():
+	""" The vector index of the identifier collection and its embedder,
+	both opened on first use so importing the config stays cheap
+
+	staleCollection holds the identifiers queued for the next sync, shared
+	by every process that writes identifiers.
+	"""
+	def __init__(
+		self,
+		path,
+		staleCollection,
+		embedder: str = "hashing",
+		dimensions: int = DEFAULT_DIMENSIONS,
+		annThreshold: int = 0,
+		nprobe: int = IVF_DEFAULT_NPROBE,
+		syncInterval: float = 30
+	):
+		self.path = pathlib.Path(path)
+		self.staleCollection = staleCollection
+		self.embedderSpec = embedder
+		self.dimensions = dimensions
+		self.annThreshold = annThreshold
+		self.nprobe = nprobe
+		self.syncInterval = syncInterval
+
+		self.syncLock = threading.Lock()
+		self.lastSync: Optional[float] = None
+		self._built = False
+		self._embedder = None
+		self._index: Optional[VectorIndex] = None
+		self._openLock = threading.Lock()
+
+	@property
+	def embedder(self):
+		with self._openLock:
+			if self._embedder is None:
+				self._embedder = loadEmbedder(self.embedderSpec, self.dimensions)
+			return self._embedder
+
+	@property
+	def index(self) -> VectorIndex:
+		embedder = self.embedder
+		with self._openLock:
+			if self._index is None:
+				self._index = VectorIndex(self.path, embedder.dimensions, embedder.name)
+			return self._index
+
+	def embed(self, texts: Sequence[str]):
+		return self.embedder.embed(list(texts))
+
+	def markStale(self, guids: Sequence[str]):
+		""" Queue identifiers to be embedded again by the next sync
+		"""
+		markStale(self.staleCollection, guids)
+
+	def takeStale(self) -> List[str]:
+		return takeStale(self.staleCollection)
+
+	def ready(self) -> bool:
+		""" Whether the first build finished, in this or another process
+		"""
+		if not self._built:
+			index = self.index
+			index.refresh()
+			self._built = index.built
+		return self._built
+
+	def syncDue(self) -> bool:
+		return self.lastSync is None or time.monotonic() - self.lastSync >= self.syncInterval
+
+	def search(self, text: str, k: int) -> Tuple[List[Tuple[str, float]], int]:
+		return self.index.search(self.embed([text])[0], k, self.nprobe)
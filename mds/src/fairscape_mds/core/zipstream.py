@@ -0,0 +1,208 @@
+""" Streaming ZIP64 writer
+
+Builds a ZIP archive on the fly from async byte streams without a temp file
+or seeking. Every member is written with a data descriptor, since its size
+and CRC are only known after it has been streamed, and with ZIP64 fields
+throughout so members and archives over 4 GiB need no special casing.
+Members are stored uncompressed: the data is usually compressed already
+and deflating on the event loop would stall other requests.
+
+While one member is written the next one is opened concurrently, so the
+first byte latency of each S3 object overlaps with the previous transfer.
+"""
+from dataclasses import dataclass, field
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Union
+import asyncio
+import contextlib
+import datetime
+import logging
+import struct
+import zlib
+
+zipLogger = logging.getLogger("download")
+
+_LOCAL_HEADER = 0x04034b50
+_DATA_DESCRIPTOR = 0x08074b50
+_CENTRAL_HEADER = 0x02014b50
+_ZIP64_END = 0x06064b50
+_ZIP64_LOCATOR = 0x07064b50
+_END = 0x06054b50
+
+_ZIP64_VERSION = 45
+# data descriptor follows the data, names are utf-8
+_FLAGS = 0x0008 | 0x0800
+_STORED = 0
+_MAX_32 = 0xFFFFFFFF
+_MAX_16 = 0xFFFF
+
+MemberSource = Union[bytes, Callable[[], Awaitable[AsyncIterator[bytes]]]]
+
+
+@dataclass
+class ZipMember:
+	""" An archive entry, source is either the bytes or a coroutine function
+	returning an async iterator over them
+	"""
+	name: str
+	source: MemberSource
+	modified: datetime.datetime = field(default_factory=datetime.datetime.now)
+
+
+@dataclass
+class _Written:
+	name: bytes
+	offset: int
+	crc: int
+	size: int
+	dosTime: int
+	dosDate: int
+
+
+def _dosDateTime(value: datetime.datetime):
+	value = max(value, datetime.datetime(1980, 1, 1))
+	dosTime = (value.hour << 11) | (value.minute << 5) | (value.second // 2)
+	dosDate = ((value.year - 1980) << 9) | (value.month << 5) | value.day
+	return dosTime, dosDate
+
+
+def _localHeader(name: bytes, dosTime: int, dosDate: int) -> bytes:
+	# sizes are unknown up front, the ZIP64 extra reserves them as zero
+	extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+	return struct.pack(
+		"<IHHHHHIIIHH",
+		_LOCAL_HEADER, _ZIP64_VERSION, _FLAGS, _STORED, dosTime, dosDate,
+		0, _MAX_32, _MAX_32, len(name), len(extra)
+	) + name + extra
+
+
+def _dataDescriptor(crc: int, size: int) -> bytes:
+	return struct.pack("<IIQQ", _DATA_DESCRIPTOR, crc, size, size)
+
+
+def _centralHeader(entry: _Written) -> bytes:
+	extra = struct.pack("<HHQQQ", 0x0001, 24, entry.size, entry.size, entry.offset)
+	return struct.pack(
+		"<IHHHHHHIIIHHHHHII",
+		_CENTRAL_HEADER, _ZIP64_VERSION, _ZIP64_VERSION, _FLAGS, _STORED,
+		entry.dosTime, entry.dosDate, entry.crc, _MAX_32, _MAX_32,
+		len(entry.name), len(extra), 0, 0, 0, 0, _MAX_32
+	) + entry.name + extra
+
+
+def _endRecords(entries: int, directorySize: int, directoryOffset: int) -> bytes:
+	zip64EndOffset = directoryOffset + directorySize
+	zip64End = struct.pack(
+		"<IQHHIIQQQQ",
+		_ZIP64_END, 44, _ZIP64_VERSION, _ZIP64_VERSION, 0, 0,
+		entries, entries, directorySize, directoryOffset
+	)
+	locator = struct.pack("<IIQI", _ZIP64_LOCATOR, 0, zip64EndOffset, 1)
+	end = struct.pack(
+		"<IHHHHIIH",
+		_END, 0, 0, min(entries, _MAX_16), min(entries, _MAX_16),
+		min(directorySize, _MAX_32), _MAX_32, 0
+	)
+	return zip64End + locator + end
+
+
+async def _openSource(member: ZipMember) -> Optional[AsyncIterator[bytes]]:
+	if isinstance(member.source, (bytes, bytearray)):
+		async def single():
+			yield bytes(member.source)
+		return single()
+
+	try:
+		return await member.source()
+	except Exception as e:
+		# nothing of the member has been written yet, so it can be left out
+		zipLogger.warning(f"skipping {member.name} in zip stream: {e}")
+		return None
+
+
+async def _closeSource(stream: Optional[AsyncIterator[bytes]]):
+	if stream is not None and hasattr(stream, "aclose"):
+		with contextlib.suppress(Exception):
+			await stream.aclose()
+
+
+async def _asyncMembers(members: Iterable[ZipMember]) -> AsyncIterator[ZipMember]:
+	for member in members:
+		yield member
+
+
+async def streamZip(
+	members: Union[Iterable[ZipMember], AsyncIterable[ZipMember]],
+	prefetch: bool = True
+) -> AsyncIterator[bytes]:
+	""" Yield a ZIP64 archive of the members in order
+
+	members may be an async iterable, e.g. over a database cursor, and is
+	consumed one member ahead of the one being written. Members whose source
+	fails to open are left out, a repeated name keeps the first member.
+	"""
+	written = []
+	offset = 0
+	seen = set()
+
+	if not hasattr(members, "__aiter__"):
+		members = _asyncMembers(members)
+	members = aiter(members)
+	current = await anext(members, None)
+	opening = asyncio.ensure_future(_openSource(current)) if current is not None else None
+	stream = None
+
+	try:
+		while current is not None:
+			stream = await opening
+			opening = None
+
+			following = await anext(members, None)
+			if following is not None and prefetch:
+				opening = asyncio.ensure_future(_openSource(following))
+
+			if stream is not None and current.name not in seen:
+				seen.add(current.name)
+				name = current.name.encode("utf-8")
+				dosTime, dosDate = _dosDateTime(current.modified)
+
+				header = _localHeader(name, dosTime, dosDate)
+				entryOffset = offset
+				yield header
+				offset += len(header)
+
+				crc = 0
+				size = 0
+				async for chunk in stream:
+					crc = zlib.crc32(chunk, crc)
+					size += len(chunk)
+					yield chunk
+				offset += size
+
+				descriptor = _dataDescriptor(crc, size)
+				yield descriptor
+				offset += len(descriptor)
+
+				written.append(_Written(name, entryOffset, crc, size, dosTime, dosDate))
+
+			await _closeSource(stream)
+			stream = None
+
+			current = following
+			if current is not None and opening is None:
+				opening = asyncio.ensure_future(_openSource(current))
+
+		directory = b"".join(_centralHeader(entry) for entry in written)
+		yield directory
+		yield _endRecords(len(written), len(directory), offset)
+
+	finally:
+		# a client disconnect leaves the current and prefetched members unread
+		await _closeSource(stream)
+		if opening is not None:
+			if not opening.done():
+				opening.cancel()
+			with contextlib.suppress(asyncio.CancelledError, Exception):
+				await _closeSource(await opening)
+		if hasattr(members, "aclose"):
+			with contextlib.suppress(Exception):
+				await members.aclose()
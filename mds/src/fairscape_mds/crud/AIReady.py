@@ -3,11 +3,52 @@ import datetime
 
 from fairscape_models.conversion.models.AIReady import AIReadyScore
 
+from fairscape_mds.core.graph import collectGraph
 from fairscape_mds.crud.fairscape_request import FairscapeRequest
 from fairscape_mds.crud.fairscape_response import FairscapeResponse
 from fairscape_mds.models.identifier import StoredIdentifier, PublicationStatusEnum, MetadataTypeEnum
 from fairscape_mds.models.user import Permissions
 
+# member fields read by the _score_* functions of fairscape_models, plus the
+# references followed, everything else is only read from the crate root
+AI_READY_MEMBER_FIELDS = (
+    "@id", "@type", "metadataType", "hasPart", "outputs",
+    "hasSummaryStatistics", "contentSize", "format",
+    "md5", "MD5", "sha256", "SHA256", "hash"
+)
+AI_READY_MEMBER_PROJECTION = {
+    "_id": 0, "@id": 1, "@type": 1,
+    **{f"metadata.{field}": 1 for field in AI_READY_MEMBER_FIELDS}
+}
+
+
+def _flatten_entity(entity: Dict[str, Any]) -> Dict[str, Any]:
+    if "metadata" not in entity:
+        return entity
+    flattened = {k: v for k, v in entity.items() if k != "metadata"}
+    if isinstance(entity["metadata"], dict):
+        flattened.update(entity["metadata"])
+    return flattened
+
+
+def _reference_ids(value) -> List[str]:
+    if not isinstance(value, list):
+        value = [value]
+    return [item["@id"] for item in value if isinstance(item, dict) and item.get("@id")]
+
+
+def _ai_ready_references(entity: Dict[str, Any]) -> List[str]:
+    """hasPart of every entity, outputs only of nested RO-Crates"""
+    references = _reference_ids(entity.get("hasPart") or [])
+
+    entity_type = entity.get("@type", [])
+    if isinstance(entity_type, str):
+        entity_type = [entity_type]
+    if any("ROCrate" in t for t in entity_type):
+        references += _reference_ids(entity.get("outputs") or [])
+    return references
+
+
 class FairscapeAIReadyScoreRequest(FairscapeRequest):
     
     def create_ai_ready_score(
@@ -61,8 +102,9 @@ class FairscapeAIReadyScoreRequest(FairscapeRequest):
 
             self.config.identifierCollection.update_one(
                 {"@id": rocrate_id},
-                {"$set": {"metadata.hasAIReadyScore": {"@id": score_id}}}
+                {"$set": {"metadata.hasAIReadyScore": {"@id": score_id}, "dateModified": now.isoformat()}}
             )
+            self.invalidateMetadata(rocrate_id, score_id)
 
             return FairscapeResponse(
                 success=True,
@@ -80,55 +122,21 @@ class FairscapeAIReadyScoreRequest(FairscapeRequest):
         self,
         rocrate_id: str
     ) -> List[Dict[str, Any]]:
-        metadata_graph = []
-        processed_ids = set()
-        
-        def fetch_entity(entity_id: str):
-            if entity_id in processed_ids:
-                return
-            
-            processed_ids.add(entity_id)
-            entity = self.config.identifierCollection.find_one({"@id": entity_id}, {"_id": 0})
-            
-            if not entity:
-                return
-            
-            if "metadata" in entity:
-                flattened = {k: v for k, v in entity.items() if k != "metadata"}
-                if isinstance(entity["metadata"], dict):
-                    flattened.update(entity["metadata"])
-                entity = flattened
-            
-            metadata_graph.append(entity)
-            
-            entity_type = entity.get("@type", [])
-            if isinstance(entity_type, str):
-                entity_type = [entity_type]
-            
-            is_rocrate = any("ROCrate" in t for t in entity_type)
-            
-            if entity.get("hasPart"):
-                parts = entity["hasPart"]
-                if not isinstance(parts, list):
-                    parts = [parts]
-                
-                for part in parts:
-                    if isinstance(part, dict) and part.get("@id"):
-                        part_id = part["@id"]
-                        fetch_entity(part_id)
-            
-            if is_rocrate and entity.get("outputs"):
-                outputs = entity["outputs"]
-                if not isinstance(outputs, list):
-                    outputs = [outputs]
-                
-                for output in outputs:
-                    if isinstance(output, dict) and output.get("@id"):
-                        fetch_entity(output["@id"])
-        
-        fetch_entity(rocrate_id)
-        return metadata_graph
-    
+        """Flattened entities of the crate and its hasPart members, and the outputs of nested crates
+
+        The graph is collected a level at a time with batched $in queries, the
+        root in full and members with only the fields scoring reads.
+        """
+        collected = collectGraph(
+            self.config.identifierCollection,
+            [rocrate_id],
+            _ai_ready_references,
+            projection=AI_READY_MEMBER_PROJECTION,
+            rootProjection={"_id": 0},
+            transform=_flatten_entity
+        )
+        return list(collected.values())
+
     def delete_ai_ready_score(
         self,
         rocrate_id: str
@@ -147,8 +155,12 @@ class FairscapeAIReadyScoreRequest(FairscapeRequest):
             
             self.config.identifierCollection.update_one(
                 {"@id": rocrate_id},
-                {"$unset": {"metadata.hasAIReadyScore": ""}}
+                {
+                    "$unset": {"metadata.hasAIReadyScore": ""},
+                    "$set": {"dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}
+                }
             )
+            self.invalidateMetadata(rocrate_id, score_id)
             
             return FairscapeResponse(
                 success=True,
@@ -19,9 +19,12 @@ class FairscapeComputationRequest(FairscapeRequest):
 	def reasonEntailments(self, computationInstance: Computation):
 		""" Function to look into mongo and reason EVI Properties
 		"""
+		modified = {"dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}
+
 		if computationInstance.usedSoftware:
 			# query for usedSoftware
 			softwareUpdate = {
+				"$set": modified,
 				"$push": {
 					"usedByComputation": {
 						"@id": computationInstance.guid
@@ -36,6 +39,7 @@ class FairscapeComputationRequest(FairscapeRequest):
 		# query for usedDataset
 		if computationInstance.usedDataset:
 			updateUsedBy = {
+				"$set": modified,
 				"$push": {
 					"usedByComputation": {
 						"@id": computationInstance.guid
@@ -51,6 +55,7 @@ class FairscapeComputationRequest(FairscapeRequest):
 		# query for generated elements to update
 		if computationInstance.generated:
 			generatedByUpdate = {
+				"$set": modified,
 				"$push": {
 					"generatedBy": {
 						"@id": computationInstance.guid
@@ -72,6 +77,12 @@ class FairscapeComputationRequest(FairscapeRequest):
 		except BulkWriteError as bwe:
 			pass
 
+		updatedIdentifiers = [
+			element.guid for element in
+			(computationInstance.usedSoftware or []) + (computationInstance.usedDataset or []) + (computationInstance.generated or [])
+		]
+		self.invalidateMetadata(computationInstance.guid, *updatedIdentifiers)
+
 		return True
 
 
@@ -122,6 +133,8 @@ class FairscapeComputationRequest(FairscapeRequest):
 				error={"error": "error writing identifier"}
 			)
 
+		self.invalidateMetadata(computationInstance.guid)
+
 		return FairscapeResponse(
 			success=True,
 			statusCode=201,
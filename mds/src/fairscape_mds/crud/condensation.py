@@ -13,11 +13,15 @@ identifierCollection, and the FairscapeCondensationRequest class.
 """
 
 import datetime
-from collections import deque
-from typing import Any
+import logging
+from typing import Any, Optional, Sequence
 
+from pymongo.errors import OperationFailure
+
+from fairscape_mds.core.graph import collectGraph, lookupGraph
 from fairscape_mds.crud.fairscape_request import FairscapeRequest
 from fairscape_mds.crud.fairscape_response import FairscapeResponse
+from fairscape_mds.crud.search import IDENTIFIER_SYNC_BATCH, identifiers_since, sync_in_background
 from fairscape_mds.models.identifier import (
 	MetadataTypeEnum,
 	StoredIdentifier,
@@ -54,6 +58,8 @@ from fairscape_graph_tools.pipeline.graph_utils import (
 # Batch size for MongoDB $in queries
 _BATCH_SIZE = 500
 
+logger = logging.getLogger(__name__)
+
 
 def _flatten_metadata(doc: dict) -> dict:
 	"""Flatten a StoredIdentifier document's metadata sub-dict to top level,
@@ -74,28 +80,102 @@ def _flatten_metadata(doc: dict) -> dict:
 	return flattened
 
 
-def _extract_all_ark_refs(entity: dict) -> list[str]:
+def _field_ark_refs(val) -> list[str]:
+	"""ARK identifiers referenced by one field value."""
+	refs = []
+	if isinstance(val, dict):
+		aid = val.get("@id")
+		if aid and isinstance(aid, str) and "ark:" in aid:
+			refs.append(aid)
+	elif isinstance(val, list):
+		for item in val:
+			if isinstance(item, dict):
+				aid = item.get("@id")
+				if aid and isinstance(aid, str) and "ark:" in aid:
+					refs.append(aid)
+			elif isinstance(item, str) and "ark:" in item:
+				refs.append(item)
+	return refs
+
+
+def _extract_all_ark_refs(entity: dict, fields: Sequence[str] = ARK_REF_FIELDS) -> list[str]:
 	"""Extract all ARK identifier references from an entity's provenance fields."""
 	refs = []
-	for field in ARK_REF_FIELDS:
+	for field in fields:
 		val = entity.get(field)
 		if val is None:
 			continue
-		if isinstance(val, dict):
-			aid = val.get("@id")
-			if aid and isinstance(aid, str) and "ark:" in aid:
-				refs.append(aid)
-		elif isinstance(val, list):
-			for item in val:
-				if isinstance(item, dict):
-					aid = item.get("@id")
-					if aid and isinstance(aid, str) and "ark:" in aid:
-						refs.append(aid)
-				elif isinstance(item, str) and "ark:" in item:
-					refs.append(item)
+		refs.extend(_field_ark_refs(val))
 	return refs
 
 
+# ---------------------------------------------------------------------------
+# Normalized edges for the $graphLookup traversal
+# ---------------------------------------------------------------------------
+
+# the edge index holds references of these fields, traversals over any
+# other field fall back to the batched BFS
+EDGE_FIELDS = tuple(ARK_REF_FIELDS)
+EDGE_PROJECTION = {"_id": True, "@id": True, **{f"metadata.{field}": True for field in EDGE_FIELDS}}
+
+
+def _edges_by_field(doc: dict) -> dict[str, list[str]]:
+	flat = _flatten_metadata(doc)
+	return {field: _field_ark_refs(flat.get(field)) for field in EDGE_FIELDS if flat.get(field) is not None}
+
+
+def sync_provenance_edges(config, blocking: bool = True) -> Optional[dict]:
+	"""Bring the edge index up to date with the identifier collection.
+
+	Identifiers inserted since the watermark and those queued by
+	invalidateCachedMetadata get their edges replaced, deleted identifiers
+	lose theirs. Edge writes are idempotent, so no lease is taken across
+	processes, within one process syncs are serialized and without blocking
+	None is returned while another thread syncs. The first pass to reach the
+	newest identifier marks the index built.
+	"""
+	edges = config.provenanceEdges
+	if not edges.syncLock.acquire(blocking=blocking):
+		return None
+	try:
+		return _sync_provenance_edges(config, edges)
+	finally:
+		edges.syncLock.release()
+
+
+def _sync_provenance_edges(config, edges) -> dict:
+	stats = {"indexed": 0, "removed": 0}
+
+	watermark = edges.watermark
+	batch = {}
+	for doc, watermark in identifiers_since(config, watermark, EDGE_PROJECTION):
+		batch[doc["@id"]] = _edges_by_field(doc)
+		if len(batch) >= IDENTIFIER_SYNC_BATCH:
+			edges.index(batch)
+			stats["indexed"] += len(batch)
+			batch = {}
+	if batch:
+		edges.index(batch)
+		stats["indexed"] += len(batch)
+	edges.setWatermark(watermark)
+	if not edges.ready():
+		edges.markBuilt()
+
+	stale = edges.takeStale()
+	for start in range(0, len(stale), IDENTIFIER_SYNC_BATCH):
+		guids = stale[start:start + IDENTIFIER_SYNC_BATCH]
+		found = {
+			doc["@id"]: _edges_by_field(doc)
+			for doc in config.identifierCollection.find({"@id": {"$in": guids}}, projection=EDGE_PROJECTION)
+		}
+		removed = [guid for guid in guids if guid not in found]
+		edges.index(found, removed=removed)
+		stats["indexed"] += len(found)
+		stats["removed"] += len(removed)
+
+	return stats
+
+
 # ---------------------------------------------------------------------------
 # Main CRUD class
 # ---------------------------------------------------------------------------
@@ -103,58 +183,60 @@ def _extract_all_ark_refs(entity: dict) -> list[str]:
 class FairscapeCondensationRequest(FairscapeRequest):
 	"""Handles condensed ROCrate creation, retrieval, and deletion."""
 
-	def build_full_graph_for_rocrate(self, rocrate_id: str) -> list[dict]:
+	def build_full_graph_for_rocrate(
+		self,
+		rocrate_id: str,
+		fields: Optional[Sequence[str]] = None,
+		max_depth: Optional[int] = None
+	) -> list[dict]:
 		"""Collect the full provenance graph for an ROCrate from MongoDB.
 
 		Does BFS expansion: starts from the ROCrate's hasPart/outputs and
 		recursively resolves all ARK references, even those pointing to
-		entities in other crates.
+		entities in other crates. fields limits the references followed,
+		by default every ARK_REF_FIELDS field, and max_depth the levels
+		below the crate.
+
+		With an edge index configured the expansion is a single $graphLookup
+		aggregation, otherwise, for fields the index does not hold, while
+		the index is first built in the background, or when the aggregation
+		fails, it is a level at a time with batched $in queries.
 
 		Returns a flat list[dict] suitable for condense_graph().
 		"""
-		collected: dict[str, dict | None] = {}
-		queue: deque[str] = deque()
-
-		# Seed with the ROCrate root itself
-		queue.append(rocrate_id)
-
-		while queue:
-			# Drain up to _BATCH_SIZE IDs that we haven't seen yet
-			batch: list[str] = []
-			while queue and len(batch) < _BATCH_SIZE:
-				eid = queue.popleft()
-				if eid not in collected:
-					batch.append(eid)
-
-			if not batch:
-				break
-
-			# Batch fetch from MongoDB
-			cursor = self.config.identifierCollection.find(
-				{"@id": {"$in": batch}},
-				{"_id": 0}
-			)
-
-			found_ids: set[str] = set()
-			for doc in cursor:
-				flat = _flatten_metadata(doc)
-				entity_id = flat.get("@id")
-				if not entity_id:
-					continue
-				found_ids.add(entity_id)
-				collected[entity_id] = flat
-
-				# Enqueue all referenced ARKs for expansion
-				for ref_id in _extract_all_ark_refs(flat):
-					if ref_id not in collected:
-						queue.append(ref_id)
-
-			# Mark not-found IDs so we don't re-query them
-			for eid in batch:
-				if eid not in found_ids and eid not in collected:
-					collected[eid] = None
-
-		return [v for v in collected.values() if v is not None]
+		fields = tuple(fields) if fields else EDGE_FIELDS
+
+		edges = self.config.provenanceEdges
+		if edges is not None and not edges.ready():
+			sync_in_background(sync_provenance_edges, self.config, edges.syncLock)
+		elif edges is not None and set(fields) <= set(EDGE_FIELDS):
+			try:
+				sync_provenance_edges(self.config)
+				collected = lookupGraph(
+					self.config.identifierCollection,
+					self.config.provenanceEdges,
+					[rocrate_id],
+					fields,
+					projection={"_id": 0},
+					transform=_flatten_metadata,
+					batchSize=_BATCH_SIZE,
+					maxDepth=max_depth
+				)
+				return list(collected.values())
+			except OperationFailure as e:
+				# e.g. $graphLookup exceeding its memory limit on a huge graph
+				logger.warning(f"$graphLookup traversal of {rocrate_id} failed, using batched BFS: {e}")
+
+		collected = collectGraph(
+			self.config.identifierCollection,
+			[rocrate_id],
+			lambda entity: _extract_all_ark_refs(entity, fields),
+			projection={"_id": 0},
+			transform=_flatten_metadata,
+			batchSize=_BATCH_SIZE,
+			maxDepth=max_depth
+		)
+		return list(collected.values())
 
 	def condense_rocrate(
 		self,
@@ -235,8 +317,12 @@ class FairscapeCondensationRequest(FairscapeRequest):
 
 			self.config.identifierCollection.update_one(
 				{"@id": rocrate_id},
-				{"$unset": {"metadata.hasCondensedROCrate": ""}}
+				{
+					"$unset": {"metadata.hasCondensedROCrate": ""},
+					"$set": {"dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}
+				}
 			)
+			self.invalidateMetadata(rocrate_id, condensed_id)
 
 			return FairscapeResponse(
 				success=True,
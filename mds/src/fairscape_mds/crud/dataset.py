@@ -9,6 +9,7 @@ from fairscape_mds.models.dataset import (
 	DatasetDistribution, 
 	DistributionTypeEnum,
 	DatasetUpdateModel,
+	DatasetQueryRequest,
 )
 from fairscape_mds.models.errors import (
 	IdentifierNotFound,
@@ -19,9 +20,19 @@ from fairscape_mds.models.identifier import (
 	MetadataTypeEnum, 
 	StoredIdentifier
 )
+from fairscape_mds.core.preview import (
+	InvalidPreview,
+	previewFormat,
+	previewDelimited,
+	previewParquet
+)
+from fairscape_mds.core.parquet import ParquetObject
+from fairscape_mds.core.parquet_query import InvalidQuery, ParquetQuery
 from fairscape_models.dataset import Dataset
-from typing import Optional
+from typing import Optional, List
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+import botocore
 import datetime
 import pathlib
 from pymongo import ReturnDocument
@@ -75,63 +86,254 @@ class FairscapeDatasetRequest(FairscapeRequest):
 
 
 
-	def getDatasetContent(
-		self, 
-		userInstance: UserWriteModel, 
-		datasetGUID: str,
-	)->FairscapeResponse:
-		datasetMetadata = self.config.identifierCollection.find_one(
-			{"@id": datasetGUID},
-			projection={"_id": False}
-		)
-
+	def _authorizeDatasetContent(
+		self,
+		datasetMetadata: Optional[dict],
+		exists: bool
+	) -> FairscapeResponse:
+		""" Check a dataset found with findAccessible is stored for download, the
+		validated StoredIdentifier is returned as the model on success
+		"""
 		if not datasetMetadata:
+			if exists:
 				return FairscapeResponse(
 					success=False,
-					statusCode=404,
-					jsonResponse={"error": "Dataset not found"}
+					statusCode=401,
+					jsonResponse={"error": "user unauthorized"}
 				)
+			return FairscapeResponse(
+				success=False,
+				statusCode=404,
+				jsonResponse={"error": "Dataset not found"}
+			)
 
-		storedDataset = StoredIdentifier.model_validate(
-			datasetMetadata
-		)
+		storedDataset = StoredIdentifier.model_validate(datasetMetadata)
 
-		if not checkPermissions(storedDataset.permissions, userInstance):
+		if not storedDataset.distribution or storedDataset.distribution.distributionType != DistributionTypeEnum.MINIO:
 			return FairscapeResponse(
 				success=False,
-				statusCode=401,
-				jsonResponse={"error": "user unauthorized"}
+				statusCode=400,
+				jsonResponse={"error": "Dataset Not Stored Locally"}
 			)
 
-		if storedDataset.distribution:
-			if storedDataset.distribution.distributionType == DistributionTypeEnum.MINIO:
-				objectKey = storedDataset.distribution.location.path
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=storedDataset
+		)
 
-				response = self.config.minioClient.get_object(
-					Bucket=self.config.minioBucket,
-					Key=objectKey
-				)
+	def getDatasetContent(
+		self,
+		userInstance: UserWriteModel,
+		datasetGUID: str,
+	) -> FairscapeResponse:
+		datasetMetadata, exists = self.findAccessible(datasetGUID, userInstance)
 
-				return FairscapeResponse(
-					success=True,
-					statusCode=200,
-					fileResponse=response,
-					model=storedDataset
+		authorized = self._authorizeDatasetContent(datasetMetadata, exists)
+		if not authorized.success:
+			return authorized
+
+		response = self.config.minioClient.get_object(
+			Bucket=self.config.minioBucket,
+			Key=authorized.model.distribution.location.path
+		)
+
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			fileResponse=response,
+			model=authorized.model
+		)
+
+	async def getDatasetContentAsync(
+		self,
+		userInstance: UserWriteModel,
+		datasetGUID: str,
+		byteRange: Optional[str] = None,
+		ifRange: Optional[str] = None
+	) -> FairscapeResponse:
+		""" getDatasetContent using the async Mongo and S3 clients, fileResponse['Body']
+		is an aiobotocore StreamingBody, byteRange and ifRange are the request's
+		Range and If-Range headers
+		"""
+		datasetMetadata, exists = await self.findAccessibleAsync(datasetGUID, userInstance)
+
+		authorized = self._authorizeDatasetContent(datasetMetadata, exists)
+		if not authorized.success:
+			return authorized
+
+		response = await self.downloadObjectAsync(
+			"dataset",
+			authorized.model.distribution.location.path,
+			byteRange=byteRange,
+			ifRange=ifRange
+		)
+		response.model = authorized.model
+		return response
+
+	async def previewDatasetAsync(
+		self,
+		userInstance: UserWriteModel,
+		datasetGUID: str,
+		rows: int,
+		columns: Optional[List[str]] = None
+	) -> FairscapeResponse:
+		""" First rows and selected columns of a stored CSV, TSV or Parquet dataset
+
+		Only a leading range (delimited text) or the footer and leading row
+		groups (Parquet) are read from S3. Previews are cached per object ETag,
+		so a replaced object is never served a stale preview.
+		"""
+		datasetMetadata, exists = await self.findAccessibleAsync(datasetGUID, userInstance)
+
+		authorized = self._authorizeDatasetContent(datasetMetadata, exists)
+		if not authorized.success:
+			return authorized
+
+		objectKey = authorized.model.distribution.location.path
+		try:
+			contentFormat = previewFormat(objectKey)
+		except InvalidPreview as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=415,
+				error={"error": str(e)}
+			)
+
+		s3 = self.config.aioMinioClient
+		try:
+			objectMetadata = await s3.head_object(Bucket=self.config.minioBucket, Key=objectKey)
+		except botocore.exceptions.ClientError:
+			return FairscapeResponse(
+				success=False,
+				statusCode=404,
+				error={"error": "dataset content not found"}
+			)
+
+		etag = objectMetadata.get("ETag")
+		cacheNamespace = f"preview:{rows}:{','.join(columns or [])}"
+		cached = await self.config.metadataCache.getVersionAsync(cacheNamespace, datasetGUID, etag)
+		if cached is not None:
+			return FairscapeResponse(success=True, statusCode=200, jsonResponse=cached)
+
+		try:
+			if contentFormat == "parquet":
+				preview = await previewParquet(
+					s3, self.config.minioBucket, objectKey, objectMetadata,
+					rows, columns, threadpool=run_in_threadpool
 				)
 			else:
-				return FairscapeResponse(
-					success=False,
-					statusCode=400,
-					jsonResponse={"error": "Dataset Not Stored Locally"}
+				preview = await previewDelimited(
+					s3, self.config.minioBucket, objectKey,
+					objectMetadata["ContentLength"], etag, rows, columns
 				)
+		except InvalidPreview as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=400,
+				error={"error": str(e)}
+			)
+		except ImportError as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=501,
+				error={"error": str(e)}
+			)
+		except ValueError as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=422,
+				error={"error": f"unable to read dataset content: {e}"}
+			)
 
-		else:
+		preview = {"@id": datasetGUID, "format": contentFormat, **preview}
+		await self.config.metadataCache.setVersionAsync(cacheNamespace, datasetGUID, etag, preview)
+
+		return FairscapeResponse(success=True, statusCode=200, jsonResponse=preview)
+
+	async def queryDatasetAsync(
+		self,
+		userInstance: UserWriteModel,
+		datasetGUID: str,
+		query: DatasetQueryRequest
+	) -> FairscapeResponse:
+		""" Column selection and row filtering of a stored Parquet dataset
+
+		Row groups are skipped using footer statistics and only the needed
+		column chunks are read from S3. fileResponse is an async iterator over
+		the Arrow IPC stream or CSV result, jsonResponse holds the response
+		headers.
+		"""
+		datasetMetadata, exists = await self.findAccessibleAsync(datasetGUID, userInstance)
+
+		authorized = self._authorizeDatasetContent(datasetMetadata, exists)
+		if not authorized.success:
+			return authorized
+
+		objectKey = authorized.model.distribution.location.path
+		try:
+			contentFormat = previewFormat(objectKey)
+		except InvalidPreview:
+			contentFormat = None
+		if contentFormat != "parquet":
+			return FairscapeResponse(
+				success=False,
+				statusCode=415,
+				error={"error": "queries are only supported on parquet datasets"}
+			)
+
+		try:
+			parquetObject = await ParquetObject.open(
+				self.config.aioMinioClient,
+				self.config.minioBucket,
+				objectKey
+			)
+			parquetQuery = ParquetQuery(
+				parquetObject,
+				columns=query.columns,
+				filters=[(item.column, item.op, item.value) for item in query.filters],
+				outputFormat=query.format.value,
+				limit=query.limit
+			)
+		except botocore.exceptions.ClientError:
+			return FairscapeResponse(
+				success=False,
+				statusCode=404,
+				error={"error": "dataset content not found"}
+			)
+		except InvalidQuery as e:
 			return FairscapeResponse(
 				success=False,
 				statusCode=400,
-				jsonResponse={"error": "Dataset Not Stored Locally"}
+				error={"error": str(e)}
+			)
+		except ImportError as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=501,
+				error={"error": str(e)}
+			)
+		except ValueError as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=422,
+				error={"error": f"unable to read dataset content: {e}"}
 			)
 
+		filename = pathlib.Path(objectKey).stem
+		extension = "arrows" if query.format.value == "arrow" else "csv"
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=authorized.model,
+			fileResponse=parquetQuery.stream(threadpool=run_in_threadpool),
+			jsonResponse={
+				"Content-Type": parquetQuery.mediaType,
+				"Content-Disposition": f'attachment; filename="{filename}.{extension}"',
+				"X-Parquet-Row-Groups": f"{len(parquetQuery.rowGroups)}/{parquetObject.metadata.num_row_groups}"
+			}
+		)
+
  
 	def createDataset(
 		self, 
@@ -274,6 +476,8 @@ class FairscapeDatasetRequest(FairscapeRequest):
 
 					if not success:
 						failed_updates.append(parent.guid)
+					else:
+						self.invalidateMetadata(parent.guid)
 
 			# Rollback if any RO-Crate update failed
 			if failed_updates:
@@ -366,7 +570,7 @@ class FairscapeDatasetRequest(FairscapeRequest):
 		pushUpdatePrepped = { f"metadata.{key}": value for key, value in pushUpdateValues.items() }
 
 		# set update
-		setUpdatePrepped['dateModified'] = datetime.datetime.now()
+		setUpdatePrepped['dateModified'] = datetime.datetime.now(tz=datetime.timezone.utc)
 
 		updateResponse = self.config.identifierCollection.find_one_and_update(
 			{"@id": updateInstance.guid},
@@ -378,6 +582,8 @@ class FairscapeDatasetRequest(FairscapeRequest):
 			return_document=ReturnDocument.AFTER
 		)
 
+		self.invalidateMetadata(updateInstance.guid)
+
 		newModel = StoredIdentifier.model_validate(updateResponse)
 
 		return FairscapeResponse(
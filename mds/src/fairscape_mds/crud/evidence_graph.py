@@ -86,10 +86,19 @@ class FairscapeEvidenceGraphRequest(FairscapeRequest):
         try:
             result = self.config.identifierCollection.delete_one({"@id": evidence_id})
             if result.deleted_count == 1:
+                referencing = [
+                    doc["@id"] for doc in self.config.identifierCollection.find(
+                        {"metadata.hasEvidenceGraph.@id": evidence_id}, projection={"_id": False, "@id": True}
+                    )
+                ]
                 self.config.identifierCollection.update_many(
                     {"metadata.hasEvidenceGraph.@id": evidence_id},
-                    {"$unset": {"metadata.hasEvidenceGraph": ""}}
+                    {
+                        "$unset": {"metadata.hasEvidenceGraph": ""},
+                        "$set": {"dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}
+                    }
                 )
+                self.invalidateMetadata(evidence_id, *referencing)
                 return FairscapeResponse(success=True, statusCode=200, model={"deleted": {"@id": evidence_id}})
             else:
                 return FairscapeResponse(success=False, statusCode=404, error={"message": "EvidenceGraph not found during delete, or already deleted."})
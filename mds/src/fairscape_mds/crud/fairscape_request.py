@@ -1,7 +1,96 @@
 from fairscape_mds.core.config import FairscapeConfig
+from fairscape_mds.core.conditional import VERSION_PROJECTION
+from fairscape_mds.core.pagination import encodeCursor, decodeCursor, InvalidCursor, DEFAULT_PAGE_SIZE
+from fairscape_mds.core.permissions import permissionFilter, restrictQuery
+from fairscape_mds.core.projection import InvalidProjection, parseFields, fieldsProjection
+from fairscape_mds.core.ranges import (
+	RangeNotSatisfiable,
+	parseRange,
+	ifRangeMatches,
+	objectHeaders,
+	contentRange
+)
+from fairscape_mds.core.downloads import REDIRECT_NEVER, REDIRECT_THRESHOLD, insideArchive
+from fairscape_mds.crud.fairscape_response import FairscapeResponse
+from fairscape_mds.models.user import UserWriteModel
 from fairscape_graph_tools.pipeline.graph_utils import flexible_ark_query
+from bson import ObjectId
+from typing import Optional
+import botocore.exceptions
+import datetime
+import pathlib
 
-__all__ = ["FairscapeRequest", "flexible_ark_query"]
+__all__ = ["FairscapeRequest", "flexible_ark_query", "invalidateCachedMetadata", "relatedGUIDs", "InvalidCursor"]
+
+
+def _preconditionFailed(error: botocore.exceptions.ClientError) -> bool:
+	response = getattr(error, "response", None) or {}
+	code = response.get("Error", {}).get("Code")
+	status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+	return code in ("PreconditionFailed", "412") or status == 412
+
+
+def relatedGUIDs(config: FairscapeConfig, guids, includeMembers: bool = False) -> list:
+	""" The identifiers, the parents listed in their isPartOf and with
+	includeMembers the identifiers contained in them
+
+	A delete collects these before its write, since the documents naming
+	them are gone afterwards.
+	"""
+	guids = [guid for guid in guids if guid]
+	related = dict.fromkeys(guids)
+
+	for doc in config.identifierCollection.find(
+		{"@id": {"$in": guids}},
+		projection={"_id": False, "metadata.isPartOf": 1, "isPartOf": 1}
+	):
+		parents = (doc.get("metadata") or {}).get("isPartOf") or []
+		parents = parents + (doc.get("isPartOf") or [])
+		related.update(
+			dict.fromkeys(parent.get("@id") for parent in parents if isinstance(parent, dict) and parent.get("@id"))
+		)
+
+	if includeMembers:
+		for doc in config.identifierCollection.find(
+			{"metadata.isPartOf.@id": {"$in": guids}},
+			projection={"_id": False, "@id": 1}
+		):
+			if doc.get("@id"):
+				related[doc["@id"]] = None
+
+	return list(related)
+
+
+def invalidateCachedMetadata(config: FairscapeConfig, guids, includeMembers: bool = False):
+	""" Drop cached entries for identifiers after a write.
+
+	Cached crate metadata embeds its members, so writes to a member also
+	invalidate the parents listed in its isPartOf. With includeMembers the
+	identifiers contained in a crate are invalidated as well. Call it once
+	the write has landed, a reader in between would cache the old document.
+
+	The crates among them get a new memberVersion, which the validators of
+	their JSON-LD are derived from in place of every member's dateModified.
+	"""
+	guids = [guid for guid in guids if guid]
+	if config.semanticIndex is not None:
+		config.semanticIndex.markStale(guids)
+	if config.autocompleteIndex is not None:
+		config.autocompleteIndex.markStale(guids)
+	if config.provenanceEdges is not None:
+		config.provenanceEdges.markStale(guids)
+
+	staleGUIDs = relatedGUIDs(config, guids, includeMembers)
+	config.identifierCollection.update_many(
+		{"@id": {"$in": staleGUIDs}, "metadata.hasPart": {"$exists": True}},
+		{"$set": {"memberVersion": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}}
+	)
+
+	cache = config.metadataCache
+	if not cache.enabled:
+		return
+
+	cache.invalidate(*staleGUIDs)
 
 
 class FairscapeRequest():
@@ -11,17 +100,26 @@ class FairscapeRequest():
 	):
 		self.config = backendConfig
 
+	def invalidateMetadata(self, *guids: str, includeMembers: bool = False):
+		invalidateCachedMetadata(self.config, guids, includeMembers=includeMembers)
+
 	def getMetadata(self, guid: str):
 		return self.config.identifierCollection.find_one({"@id": guid}, projection={"_id": False})
 
-	def flexibleFind(self, guid: str, projection=None):
+	def getVersionInfo(self, guid: str):
+		""" Projection-only lookup of the fields conditional requests are validated against
+		"""
+		return self.flexibleFind(guid, projection=VERSION_PROJECTION)
+
+	def flexibleFind(self, guid: str, projection=None, condition=None):
 		"""Look up an identifier by exact match first, then fall back to
-		a dash-insensitive and ark:/ark: tolerant regex search."""
+		a dash-insensitive and ark:/ark: tolerant regex search. With condition
+		only identifiers also matching it are found."""
 		if projection is None:
 			projection = {"_id": False}
 		# Exact match
 		result = self.config.identifierCollection.find_one(
-			{"@id": guid}, projection=projection
+			restrictQuery({"@id": guid}, condition), projection=projection
 		)
 		if result:
 			return result
@@ -29,7 +127,308 @@ class FairscapeRequest():
 		query = flexible_ark_query(guid)
 		if query:
 			result = self.config.identifierCollection.find_one(
-				query, projection=projection
+				restrictQuery(query, condition), projection=projection
 			)
 		return result
 
+	async def flexibleFindAsync(self, guid: str, projection=None, condition=None):
+		""" flexibleFind against the async identifier collection
+		"""
+		if projection is None:
+			projection = {"_id": False}
+		collection = self.config.aioIdentifierCollection
+
+		result = await collection.find_one(restrictQuery({"@id": guid}, condition), projection=projection)
+		if result:
+			return result
+
+		query = flexible_ark_query(guid)
+		if query:
+			result = await collection.find_one(restrictQuery(query, condition), projection=projection)
+		return result
+
+	def accessFilter(self, user: UserWriteModel) -> Optional[dict]:
+		""" Query condition for the documents the user may modify or download,
+		exactly those checkPermissions allows
+
+		Membership of the admin group grants nothing here, unlike the
+		metadata listings and search, so downloads, archives and upload
+		status stay limited to owners and their groups.
+		"""
+		return permissionFilter(user, published=False)
+
+	def findAccessible(self, guid: str, user: UserWriteModel, projection=None, flexible: bool = False):
+		""" Look up an identifier the user may access, returns (document, exists)
+
+		The permission condition is part of the query, so a document the user
+		may not access is never read. On a miss exists tells such an identifier
+		from a missing one with an _id only lookup.
+		"""
+		condition = self.accessFilter(user)
+		if flexible:
+			document = self.flexibleFind(guid, projection, condition)
+		else:
+			document = self.config.identifierCollection.find_one(
+				restrictQuery({"@id": guid}, condition), projection=projection or {"_id": False}
+			)
+		if document or condition is None:
+			return document, bool(document)
+
+		if flexible:
+			exists = self.flexibleFind(guid, {"_id": True})
+		else:
+			exists = self.config.identifierCollection.find_one({"@id": guid}, projection={"_id": True})
+		return None, exists is not None
+
+	async def findAccessibleAsync(self, guid: str, user: UserWriteModel, projection=None, flexible: bool = False):
+		""" findAccessible against the async identifier collection
+		"""
+		condition = self.accessFilter(user)
+		if flexible:
+			document = await self.flexibleFindAsync(guid, projection, condition)
+		else:
+			document = await self.config.aioIdentifierCollection.find_one(
+				restrictQuery({"@id": guid}, condition), projection=projection or {"_id": False}
+			)
+		if document or condition is None:
+			return document, bool(document)
+
+		if flexible:
+			exists = await self.flexibleFindAsync(guid, {"_id": True})
+		else:
+			exists = await self.config.aioIdentifierCollection.find_one({"@id": guid}, projection={"_id": True})
+		return None, exists is not None
+
+	async def getVersionInfoAsync(self, guid: str):
+		return await self.flexibleFindAsync(guid, projection=VERSION_PROJECTION)
+
+	def _fieldsProjection(self, fields, root=None):
+		""" Parse a fields parameter into (projection, errorResponse)
+
+		With root the fields are relative to that subdocument, e.g. fields of
+		the metadata returned by the type specific GETs.
+		"""
+		try:
+			parsed = parseFields(fields)
+		except InvalidProjection as e:
+			return None, FairscapeResponse(
+				success=False,
+				statusCode=400,
+				error={"message": str(e)}
+			)
+
+		if root and parsed:
+			parsed = [f"{root}.{field}" for field in parsed]
+		required = (f"{root}.@id",) if root else ("@id",)
+		return fieldsProjection(parsed, required=required), None
+
+	def _projectedResponse(self, document, root=None):
+		if not document:
+			return FairscapeResponse(
+				success=False,
+				statusCode=404,
+				error={"message": "identifier not found"}
+			)
+
+		if root:
+			document = document.get(root) or {}
+
+		# projected documents are partial so they are returned without validation
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			jsonResponse=document
+		)
+
+	def findFields(self, guid: str, fields, root=None):
+		""" Return only the requested fields of an identifier as plain json
+
+		Returns None when no fields were requested so callers fall back to the
+		full validated document.
+		"""
+		projection, errorResponse = self._fieldsProjection(fields, root)
+		if errorResponse:
+			return errorResponse
+		if projection is None:
+			return None
+		return self._projectedResponse(self.flexibleFind(guid, projection=projection), root)
+
+	async def findFieldsAsync(self, guid: str, fields, root=None):
+		projection, errorResponse = self._fieldsProjection(fields, root)
+		if errorResponse:
+			return errorResponse
+		if projection is None:
+			return None
+		return self._projectedResponse(await self.flexibleFindAsync(guid, projection=projection), root)
+
+	async def getObjectAsync(
+			self,
+			objectKey: str,
+			byteRange: Optional[str] = None,
+			ifRange: Optional[str] = None
+		):
+		""" Fetch an object from S3 honouring Range / If-Range
+
+		Returns a 200 or 206 FairscapeResponse whose fileResponse is the S3
+		get_object response and whose jsonResponse holds the Content-Length,
+		Content-Range and validator headers. An unsatisfiable range is a 416,
+		and an object replaced between the head and the ranged get is served
+		whole with a 200.
+		"""
+		s3 = self.config.aioMinioClient
+		bucket = self.config.minioBucket
+
+		if not byteRange:
+			objectResponse = await s3.get_object(Bucket=bucket, Key=objectKey)
+			headers = objectHeaders(objectResponse)
+			headers["Content-Length"] = str(objectResponse["ContentLength"])
+			return FairscapeResponse(
+				success=True,
+				statusCode=200,
+				fileResponse=objectResponse,
+				jsonResponse=headers
+			)
+
+		# object size and validators are needed to resolve the range
+		objectMetadata = await s3.head_object(Bucket=bucket, Key=objectKey)
+		size = objectMetadata["ContentLength"]
+		headers = objectHeaders(objectMetadata)
+
+		try:
+			requested = parseRange(byteRange, size)
+		except RangeNotSatisfiable:
+			return FairscapeResponse(
+				success=False,
+				statusCode=416,
+				error={"message": "requested range not satisfiable"},
+				jsonResponse={**headers, "Content-Range": f"bytes */{size}"}
+			)
+
+		if requested is None or not ifRangeMatches(ifRange, headers.get("ETag"), objectMetadata.get("LastModified")):
+			objectResponse = await s3.get_object(Bucket=bucket, Key=objectKey)
+			headers["Content-Length"] = str(objectResponse["ContentLength"])
+			return FairscapeResponse(
+				success=True,
+				statusCode=200,
+				fileResponse=objectResponse,
+				jsonResponse=headers
+			)
+
+		start, end = requested
+		getKwargs = {"Bucket": bucket, "Key": objectKey, "Range": f"bytes={start}-{end}"}
+		# guard against the object changing between the head and the get
+		if headers.get("ETag"):
+			getKwargs["IfMatch"] = headers["ETag"]
+		try:
+			objectResponse = await s3.get_object(**getKwargs)
+		except botocore.exceptions.ClientError as e:
+			if not _preconditionFailed(e):
+				raise
+			# overwritten since the head, the range no longer applies so
+			# answer with the whole current object as If-Range would
+			objectResponse = await s3.get_object(Bucket=bucket, Key=objectKey)
+			headers = objectHeaders(objectResponse)
+			headers["Content-Length"] = str(objectResponse["ContentLength"])
+			return FairscapeResponse(
+				success=True,
+				statusCode=200,
+				fileResponse=objectResponse,
+				jsonResponse=headers
+			)
+
+		headers["Content-Length"] = str(end - start + 1)
+		headers["Content-Range"] = contentRange(start, end, size)
+		return FairscapeResponse(
+			success=True,
+			statusCode=206,
+			fileResponse=objectResponse,
+			jsonResponse=headers
+		)
+
+	async def downloadObjectAsync(
+			self,
+			route: str,
+			objectKey: str,
+			byteRange: Optional[str] = None,
+			ifRange: Optional[str] = None,
+			inline: bool = False
+		):
+		""" Serve an authorized download, by presigned redirect when the route's policy allows
+
+		A redirect is a 307 FairscapeResponse with the URL under
+		jsonResponse["Location"], otherwise the result of getObjectAsync.
+		"""
+		redirect = self.config.downloadRedirect
+		policy = redirect.policy(route)
+
+		if policy != REDIRECT_NEVER and not insideArchive(objectKey):
+			size = None
+			if policy == REDIRECT_THRESHOLD:
+				objectMetadata = await self.config.aioMinioClient.head_object(
+					Bucket=self.config.minioBucket,
+					Key=objectKey
+				)
+				size = objectMetadata["ContentLength"]
+
+			if redirect.shouldRedirect(route, size, objectKey):
+				return FairscapeResponse(
+					success=True,
+					statusCode=307,
+					jsonResponse={
+						"Location": redirect.presignedURL(
+							self.config.minioBucket,
+							objectKey,
+							pathlib.Path(objectKey).name,
+							inline=inline
+						)
+					}
+				)
+
+		return await self.getObjectAsync(objectKey, byteRange=byteRange, ifRange=ifRange)
+
+	def findPage(
+			self,
+			query: dict,
+			projection=None,
+			limit: Optional[int] = None,
+			cursor=None,
+			collection=None
+		):
+		""" Keyset paginate a query on _id, returns (documents, nextCursor)
+
+		Each page resumes with an _id range condition rather than a skip, so a
+		page costs the same at any depth. Without limit or cursor every match is
+		returned as one page, with only a cursor pages hold DEFAULT_PAGE_SIZE
+		documents. Raises InvalidCursor for tokens that were not issued by this
+		method.
+		"""
+		if collection is None:
+			collection = self.config.identifierCollection
+		if limit is None and cursor:
+			limit = DEFAULT_PAGE_SIZE
+
+		if cursor:
+			after = decodeCursor(cursor).get("after")
+			if not isinstance(after, str) or not ObjectId.is_valid(after):
+				raise InvalidCursor(f"invalid cursor: {cursor}")
+			after = ObjectId(after)
+			query = {"$and": [query, {"_id": {"$gt": after}}]}
+
+		# _id is the sort key so it is always fetched, then stripped
+		if projection is not None:
+			projection = {key: value for key, value in projection.items() if key != "_id"} or None
+
+		documents = collection.find(query, projection=projection).sort("_id", 1)
+		if limit is not None:
+			documents = documents.limit(limit + 1)
+		documents = list(documents)
+
+		nextCursor = None
+		if limit is not None and len(documents) > limit:
+			documents = documents[:limit]
+			nextCursor = encodeCursor({"after": str(documents[-1]["_id"])})
+
+		for document in documents:
+			document.pop("_id", None)
+
+		return documents, nextCursor
@@ -1,4 +1,6 @@
-from fairscape_mds.crud.fairscape_request import FairscapeRequest
+from fairscape_mds.crud.fairscape_request import FairscapeRequest, invalidateCachedMetadata, relatedGUIDs
+from fairscape_mds.core.pagination import InvalidCursor
+from fairscape_mds.core.permissions import permissionFilter, restrictQuery
 from fairscape_mds.crud.fairscape_response import FairscapeResponse
 from fairscape_mds.models.user import UserWriteModel, checkPermissions
 from fairscape_mds.models.dataset import DatasetDistribution
@@ -164,7 +166,10 @@ class IdentifierRequest(FairscapeRequest):
 			splitStats = generateSplitStatistics(dataframe, splitDicts, totalBinEdges=totalBinEdges)
 
 		# update identifier
-		updateFields = {"descriptiveStatistics": summaryStatistics}
+		updateFields = {
+			"descriptiveStatistics": summaryStatistics,
+			"dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+		}
 		if splitStats:
 			updateFields["splitStatistics"] = splitStats
 
@@ -175,16 +180,15 @@ class IdentifierRequest(FairscapeRequest):
 			}
 		)
 
+		self.invalidateMetadata(guid)
+
 		return summaryStatistics
 
 
-	def getContent(self, guid: str)->FairscapeResponse:
-		""" API Operation to Download Published Only Content, returns a FairscapeResponse with the Content from minio
+	def _authorizeContent(self, metadata: Optional[dict]) -> FairscapeResponse:
+		""" Check an identifier's content may be served publicly, returns the
+		validated StoredIdentifier as the model on success
 		"""
-
-		# get the metadata
-		metadata = self.flexibleFind(guid)
-
 		if not metadata:
 			return FairscapeResponse(
 				success=False,
@@ -215,23 +219,61 @@ class IdentifierRequest(FairscapeRequest):
 				statusCode=404,
 				error={"error": "identifier content not stored locally"}
 			)
+
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=identifier
+		)
+
+
+	def getContent(self, guid: str)->FairscapeResponse:
+		""" API Operation to Download Published Only Content, returns a FairscapeResponse with the Content from minio
+		"""
+		authorized = self._authorizeContent(self.flexibleFind(guid))
+		if not authorized.success:
+			return authorized
 		
 		# get distribution content
-		objectKey = identifier.distribution.location.path
-
 		response = self.config.minioClient.get_object(
 			Bucket=self.config.minioBucket,
-			Key=objectKey
+			Key=authorized.model.distribution.location.path
 		)
 
 		return FairscapeResponse(
 			success=True,
 			statusCode=200,
 			fileResponse=response,
-			model=identifier
+			model=authorized.model
 		)
 
 
+	async def getContentAsync(
+		self,
+		guid: str,
+		byteRange: Optional[str] = None,
+		ifRange: Optional[str] = None,
+		inline: bool = False
+		)->FairscapeResponse:
+		""" getContent using the async Mongo and S3 clients, honouring Range / If-Range
+
+		inline marks redirects for display in the browser rather than download
+		"""
+		authorized = self._authorizeContent(await self.flexibleFindAsync(guid))
+		if not authorized.success:
+			return authorized
+
+		response = await self.downloadObjectAsync(
+			"content",
+			authorized.model.distribution.location.path,
+			byteRange=byteRange,
+			ifRange=ifRange,
+			inline=inline
+		)
+		response.model = authorized.model
+		return response
+
+
 	def updatePublicationStatus(
 		self, 
 		publicationChange: UpdatePublishRequest,
@@ -277,7 +319,7 @@ class IdentifierRequest(FairscapeRequest):
 			# update all members
 			updateMembersResult = self.config.identifierCollection.update_many(
 				{"metadata.isPartOf.@id": guid},
-				{"$set": {"publicationStatus": repr(newStatus)}}
+				{"$set": {"publicationStatus": repr(newStatus), "dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}}
 			)
 
 			# TODO check the update result
@@ -286,9 +328,14 @@ class IdentifierRequest(FairscapeRequest):
 		# update the permissions on
 		updateResult = self.config.identifierCollection.update_one(
 			{"@id": guid},
-			{"$set": {"publicationStatus": repr(newStatus)}}
+			{"$set": {"publicationStatus": repr(newStatus), "dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}}
 			)
 
+		self.invalidateMetadata(
+			guid,
+			includeMembers=foundIdentifier.metadataType == MetadataTypeEnum.ROCRATE
+		)
+
 		# TODO check the update result
 
 
@@ -305,53 +352,61 @@ class IdentifierRequest(FairscapeRequest):
 	def listType(
 		self, 
 		requestType: MetadataTypeEnum, 
-		user: Optional[UserWriteModel]
+		user: Optional[UserWriteModel],
+		limit: Optional[int] = None,
+		cursor: Optional[str] = None,
+		projection: Optional[dict] = None
 		)->FairscapeResponse:
-		""" List all metadata instances of a specific type
-		"""
-	
-		# public identifiers
-		publishedIdentifiers = self.config.identifierCollection.find(
-			{
-				"@type": requestType, 
-				"publicationStatus": PublicationStatusEnum.PUBLISHED 
-			},
-			projection={"_id": False}
-		)
-
-		if user:
-			# users identifiers
-			usersIdentifiers = self.config.identifierCollection.find(
-				{
-					"@type": requestType, 
-					"permissions.owner": user.email
-				},
-				projection={"_id": False}
-			)
-
-			identifiers = list(usersIdentifiers) +  list(publishedIdentifiers)
-		
-		else:
-			identifiers = list(publishedIdentifiers)
+		""" List metadata instances of a specific type, one page at a time
 
-		return FairscapeResponse(
-			success=True,
-			statusCode=200,
-			model=identifiers
+		Returns published identifiers and those the user may access from a
+		single query, the model is a dict with the page of identifiers and the
+		continuation token for the next page. Without limit or cursor every
+		identifier is returned.
+		"""
+		query = restrictQuery(
+			{"@type": requestType.value},
+			permissionFilter(user, self.config.adminGroup)
 		)
+		return self._listPage(query, limit, cursor, projection)
 
 
 	def listPublished(
-		self
+		self,
+		limit: Optional[int] = None,
+		cursor: Optional[str] = None,
+		projection: Optional[dict] = None
 		)->FairscapeResponse:
-		""" List all published content, return to user
+		""" List published content one page at a time
 		"""
-		identifiers = self.config.identifierCollection.find(
-			{"publicationStatus": PublicationStatusEnum.PUBLISHED}, 
-			projection={"_id": False}
+		return self._listPage(
+			permissionFilter(None),
+			limit,
+			cursor,
+			projection
 		)
 
-		return FairscapeResponse(success=True, statusCode=200, model=list(identifiers))
+
+	def _listPage(self, query: dict, limit: Optional[int], cursor: Optional[str], projection: Optional[dict]):
+		try:
+			identifiers, nextCursor = self.findPage(
+				query,
+				projection=projection or {"_id": False},
+				limit=limit,
+				cursor=cursor
+			)
+		except InvalidCursor as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=400,
+				error={"error": str(e)}
+			)
+
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model={"identifiers": identifiers, "nextCursor": nextCursor}
+		)
 
 
 	def updateMetadata(
@@ -408,13 +463,15 @@ class IdentifierRequest(FairscapeRequest):
 			{
 				"$set": {
 					"metadata": newMetadata.model_dump(by_alias=True, mode="json"),
-					"dateModified": datetime.datetime.now().isoformat()
+					"dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
 				}
 			},
 			projection = {"_id": False},
 			return_document=ReturnDocument.AFTER
 		)
 
+		self.invalidateMetadata(guid)
+
 		updatedIdentifier = StoredIdentifier.model_validate(updateResult)
 
 		return FairscapeResponse(
@@ -625,6 +682,9 @@ class DeleteIdentifier():
 			objectKey = None
 			
 
+		# the members are gone after a forced delete, collect them first
+		staleGUIDs = relatedGUIDs(self.config, [identifier.guid], includeMembers=True)
+
 		if self.force:	
 			if distributionType  == DistributionTypeEnum.MINIO:
 				# remove the archive 
@@ -642,7 +702,7 @@ class DeleteIdentifier():
 			self.config.identifierCollection.delete_many({
 				"metadata.isPartOf.@id": identifier.guid
 			})
-
+			invalidateCachedMetadata(self.config, staleGUIDs)
 
 			return FairscapeResponse(
 				success=True,
@@ -653,13 +713,14 @@ class DeleteIdentifier():
 		else:
 			self.config.identifierCollection.update_one(
 				{"@id": identifier.guid},
-				{"$set": {"publicationStatus": PublicationStatusEnum.ARCHIVED}}
+				{"$set": {"publicationStatus": PublicationStatusEnum.ARCHIVED, "dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}}
 			)
 
 			self.config.identifierCollection.update_many(
 				{"metadata.isPartOf.@id": identifier.guid},
-				{"$set": {"publicationStatus": PublicationStatusEnum.ARCHIVED}}
+				{"$set": {"publicationStatus": PublicationStatusEnum.ARCHIVED, "dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}}
 			)
+			invalidateCachedMetadata(self.config, staleGUIDs)
 
 			return FairscapeResponse(
 				success=True,
@@ -686,6 +747,8 @@ class DeleteIdentifier():
 			distributionType = None
 			objectKey = None
 		
+		staleGUIDs = relatedGUIDs(self.config, [self.guid])
+
 		if distributionType == DistributionTypeEnum.MINIO and self.force:
 			# delete object from minio
 			self.config.minioClient.delete_object(
@@ -712,6 +775,8 @@ class DeleteIdentifier():
 							parent.guid,
 							self.guid
 						)
+						# the parent's hasPart changed as well
+						staleGUIDs.append(parent.guid)
 				except Exception as e:
 					# Log warning but continue - parent might have been deleted already
 					print(f"Warning: Could not remove {self.guid} from parent {parent.guid}: {e}")
@@ -722,8 +787,9 @@ class DeleteIdentifier():
 		else:
 			self.config.identifierCollection.update_one(
 				{"@id": self.guid},
-				{"$set": {"publicationStatus": PublicationStatusEnum.ARCHIVED}}
+				{"$set": {"publicationStatus": PublicationStatusEnum.ARCHIVED, "dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}}
 			)
+		invalidateCachedMetadata(self.config, staleGUIDs)
 
 		return FairscapeResponse(
 			success = True,
@@ -759,8 +825,9 @@ class DeleteIdentifier():
 			# set publication status to archived
 			self.config.identifierCollection.update_one(
 				{ "@id": identifier.guid},
-				{ "publicationStatus": PublicationStatusEnum.ARCHIVED }
+				{"$set": {"publicationStatus": PublicationStatusEnum.ARCHIVED, "dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}}
 			)
+		invalidateCachedMetadata(self.config, [identifier.guid])
 
 		return FairscapeResponse(
 			success=True,
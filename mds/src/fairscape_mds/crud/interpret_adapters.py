@@ -31,7 +31,7 @@ import httpx
 
 from fairscape_mds.core.config import FairscapeConfig
 from fairscape_mds.crud.condensation import FairscapeCondensationRequest
-from fairscape_mds.crud.fairscape_request import FairscapeRequest
+from fairscape_mds.crud.fairscape_request import FairscapeRequest, invalidateCachedMetadata
 from fairscape_mds.models.identifier import (
     MetadataTypeEnum,
     PublicationStatusEnum,
@@ -77,6 +77,12 @@ def _extract_annotates_id(ann: AnnotatedComputation) -> str:
     return str(annotates)
 
 
+def _modified() -> str:
+    """dateModified for a back-pointer write, so conditional GETs of the
+    updated identifier see the change."""
+    return datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+
+
 class MongoGraphSource(FairscapeRequest):
     """GraphSource adapter backed by `identifierCollection`."""
 
@@ -171,8 +177,9 @@ class MongoResultSink:
         self.config.identifierCollection.insert_one(stored_doc)
         self.config.identifierCollection.update_one(
             {"@id": source_rocrate_id},
-            {"$set": {"metadata.hasCondensedROCrate": {"@id": condensed_id}}},
+            {"$set": {"metadata.hasCondensedROCrate": {"@id": condensed_id}, "dateModified": _modified()}},
         )
+        invalidateCachedMetadata(self.config, [source_rocrate_id, condensed_id])
         return condensed_id
 
     def persist_evidence_graph(
@@ -200,8 +207,9 @@ class MongoResultSink:
         )
         self.config.identifierCollection.update_one(
             {"@id": source_node_id},
-            {"$set": {"metadata.hasEvidenceGraph": {"@id": evidence_graph.guid}}},
+            {"$set": {"metadata.hasEvidenceGraph": {"@id": evidence_graph.guid}, "dateModified": _modified()}},
         )
+        invalidateCachedMetadata(self.config, [source_node_id, evidence_graph.guid])
         logger.info(f"Stored EvidenceGraph {evidence_graph.guid}")
         return evidence_graph.guid
 
@@ -230,15 +238,20 @@ class MongoResultSink:
         )
         self.config.identifierCollection.update_one(
             {"@id": rocrate_id},
-            {"$set": {"metadata.hasAnnotatedEvidenceGraph": {"@id": aeg_id}}},
+            {"$set": {"metadata.hasAnnotatedEvidenceGraph": {"@id": aeg_id}, "dateModified": _modified()}},
         )
+        invalidateCachedMetadata(self.config, [rocrate_id, aeg_id])
         for ann in step_annotations:
             comp_id = _extract_annotates_id(ann)
             if comp_id:
                 self.config.identifierCollection.update_one(
                     {"@id": comp_id},
-                    {"$addToSet": {"metadata.evi:annotatedBy": {"@id": ann.guid}}},
+                    {
+                        "$addToSet": {"metadata.evi:annotatedBy": {"@id": ann.guid}},
+                        "$set": {"dateModified": _modified()},
+                    },
                 )
+                invalidateCachedMetadata(self.config, [comp_id])
         logger.info(f"Stored AnnotatedEvidenceGraph {aeg_id}")
         return aeg_id
 
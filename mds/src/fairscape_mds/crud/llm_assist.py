@@ -332,8 +332,12 @@ class FairscapeLLMAssistRequest(FairscapeRequest):
         
         self.config.identifierCollection.update_one(
             {"@id": computation_ark},
-            {"$push": {"metadata.generated": {"@id": dataset_ark}}}
+            {
+                "$push": {"metadata.generated": {"@id": dataset_ark}},
+                "$set": {"dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}
+            }
         )
+        self.invalidateMetadata(computation_ark)
         
         return dataset_ark
 
@@ -729,8 +733,12 @@ class FairscapeLLMAssistRequest(FairscapeRequest):
         # Update computation's generated field
         self.config.identifierCollection.update_one(
             {"@id": computation_ark},
-            {"$push": {"metadata.generated": {"@id": dataset_ark}}}
+            {
+                "$push": {"metadata.generated": {"@id": dataset_ark}},
+                "$set": {"dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat()}
+            }
         )
+        self.invalidateMetadata(computation_ark)
 
         return dataset_ark
 
@@ -1,5 +1,8 @@
 from typing import Dict, Any, Optional
 from pathlib import Path
+import datetime
+import traceback
+import uuid
 
 from pymongo.collection import Collection
 
@@ -7,18 +10,20 @@ from fairscape_mds.crud.fairscape_request import FairscapeRequest
 from fairscape_mds.crud.fairscape_response import FairscapeResponse
 from fairscape_mds.models.user import UserWriteModel, Permissions, checkPermissions
 
-from mds.src.fairscape_mds.crud.credentials import (
+from fairscape_mds.crud.credentials import (
     FairscapeCredentialsRequest,
     UserToken 
 )
 
-from mds.src.fairscape_mds.models.publish import (
+from fairscape_mds.models.publish import (
     PublishingService,
     DataversePublisher,
     ZenodoPublisher,
     FigsharePublisher,
+    PublishUploadTask,
     DEFAULT_DATAVERSE_DB
 )
+from fairscape_mds.core.upload_stream import S3UploadSource, UploadProgress
 
 
 class FairscapePublishRequest(FairscapeRequest):
@@ -211,14 +216,11 @@ class FairscapePublishRequest(FairscapeRequest):
         if not file_path_in_minio:
             return FairscapeResponse(success=False, statusCode=400, error={"message": "No file path found in ROCrate distribution."})
 
-
         try:
-            minio_object = self.config.minioClient.get_object(
+            object_head = self.config.minioClient.head_object(
                 Bucket=self.config.minioBucket, 
                 Key=file_path_in_minio
                 )
-            file_data = minio_object['Body'].read()
-            file_name_for_upload = Path(file_path_in_minio).name
         except Exception as e:
             return FairscapeResponse(
                 success=False, 
@@ -226,27 +228,137 @@ class FairscapePublishRequest(FairscapeRequest):
                 error={"message": f"Minio download error: {str(e)}"}
             )
 
+        # the archive is streamed to the platform by the worker, see run_platform_upload
+        upload_task = PublishUploadTask(
+            guid=str(uuid.uuid4()),
+            owner_email=current_user.email,
+            rocrate_guid=rocrate_guid,
+            platform_url=platform_url,
+            platform_dataset_id=str(platform_dataset_id),
+            object_key=file_path_in_minio,
+            filename=Path(file_path_in_minio).name,
+            bytes_total=object_head["ContentLength"]
+        )
+        self.config.asyncCollection.insert_one(upload_task.model_dump(by_alias=True))
+
+        return FairscapeResponse(
+            success=True, 
+            statusCode=202, 
+            model=upload_task
+        )
+
+    def _update_upload_task(self, task_guid: str, update: dict):
+        self.config.asyncCollection.update_one({"guid": task_guid}, {"$set": update})
+
+    def get_upload_task(self, current_user: UserWriteModel, task_guid: str) -> FairscapeResponse:
+        task_doc = self.config.asyncCollection.find_one(
+            {"guid": task_guid, "task_type": "PublishUpload"},
+            {"_id": 0}
+        )
+        if task_doc is None:
+            return FairscapeResponse(success=False, statusCode=404, error={"message": "Upload task not found."})
+
+        upload_task = PublishUploadTask.model_validate(task_doc)
+        if upload_task.owner_email != current_user.email:
+            return FairscapeResponse(success=False, statusCode=401, error={"message": "User not authorized"})
+
+        return FairscapeResponse(success=True, statusCode=200, model=upload_task)
+
+    def run_platform_upload(self, task_guid: str) -> FairscapeResponse:
+        """ Stream the archive of an upload task from S3 to the platform
+
+        Runs in the worker. Memory use is bounded by the chunk size whatever
+        the archive size, progress is written to the task document as
+        bytes_uploaded.
+        """
+        task_doc = self.config.asyncCollection.find_one({"guid": task_guid}, {"_id": 0})
+        if task_doc is None:
+            return FairscapeResponse(success=False, statusCode=404, error={"message": "Upload task not found."})
+        upload_task = PublishUploadTask.model_validate(task_doc)
+
+        self._update_upload_task(task_guid, {
+            "status": "PROCESSING",
+            "time_started": datetime.datetime.utcnow()
+        })
+
+        def failed(status_code: int, error: dict) -> FairscapeResponse:
+            self._update_upload_task(task_guid, {
+                "status": "FAILURE",
+                "error": error,
+                "time_finished": datetime.datetime.utcnow()
+            })
+            return FairscapeResponse(success=False, statusCode=status_code, error=error)
+
+        user_data = self.config.userCollection.find_one({"email": upload_task.owner_email})
+        if user_data is None:
+            return failed(401, {"message": f"User not found: {upload_task.owner_email}"})
+        current_user = UserWriteModel.model_validate(user_data)
+
+        token_response = self.credentials_request_handler.get_user_api_tokens(user_instance=current_user)
+        if not token_response.success:
+            return failed(token_response.statusCode, token_response.error)
+
+        api_token_value = next(
+            (token.tokenValue for token in token_response.model if token.endpointURL == upload_task.platform_url),
+            None
+        )
+        if not api_token_value:
+            return failed(401, {"message": f"No API token for platform: {upload_task.platform_url}"})
+
+        platform_url = upload_task.platform_url
+        if "dataverse" in platform_url.lower():
+            publisher = DataversePublisher(platform_url, DEFAULT_DATAVERSE_DB)
+        elif "zenodo" in platform_url.lower():
+            publisher = ZenodoPublisher(platform_url)
+        else:
+            publisher = FigsharePublisher(platform_url)
+
+        source = S3UploadSource(
+            self.config.minioClient,
+            self.config.minioBucket,
+            upload_task.object_key,
+            size=upload_task.bytes_total
+        )
+        progress = UploadProgress(
+            upload_task.bytes_total,
+            report=lambda uploaded, state: self._update_upload_task(task_guid, {
+                "bytes_uploaded": uploaded,
+                "upload_state": state
+            }),
+            state=dict(upload_task.upload_state)
+        )
+
         try:
-            upload_info = await publisher.upload_files(
-                platform_dataset_id, file_data, file_name_for_upload, api_token_value
+            upload_info = publisher.upload_files(
+                upload_task.platform_dataset_id,
+                source,
+                upload_task.filename,
+                api_token_value,
+                progress
             )
         except Exception as e:
+            traceback.print_exc()
+            progress.flush()
             detail = getattr(e, 'detail', str(e))
             status = getattr(e, 'status_code', 500)
-            return FairscapeResponse(
-                success=False, 
-                statusCode=status, 
-                error={"message": f"Platform upload error: {detail}"}
-            )
+            return failed(status, {"message": f"Platform upload error: {detail}"})
         
         upload_info_response = {
             **upload_info, 
-            "rocrate_guid": rocrate_guid, 
-            "platform_dataset_id": platform_dataset_id
+            "rocrate_guid": upload_task.rocrate_guid, 
+            "platform_dataset_id": upload_task.platform_dataset_id
         }
 
+        self._update_upload_task(task_guid, {
+            "status": "SUCCESS",
+            "bytes_uploaded": upload_task.bytes_total,
+            "upload_state": progress.state,
+            "result": upload_info_response,
+            "time_finished": datetime.datetime.utcnow()
+        })
+
         return FairscapeResponse(
             success=True, 
             statusCode=200, 
             model=upload_info_response
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,194 @@
+from fairscape_mds.core.cache import cacheVersion
+from fairscape_mds.crud.fairscape_request import FairscapeRequest
+from fairscape_mds.crud.fairscape_response import FairscapeResponse
+
+from typing import Iterable, Iterator, Optional
+from rdflib import Graph
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT = {
+	"@vocab": "https://schema.org/",
+	"EVI": "https://w3id.org/EVI#"
+}
+
+# negotiated format -> (rdflib serializer, media type)
+RDF_FORMATS = {
+	"turtle": ("turtle", "text/turtle"),
+	"xml": ("xml", "application/rdf+xml"),
+	"nt": ("nt", "application/n-triples"),
+	"nquads": ("nt", "application/n-quads"),
+}
+
+# formats rendered ahead of time when an identifier is published
+PRERENDER_FORMATS = ("turtle", "xml")
+
+
+def negotiateRDFFormat(accept: Optional[str]) -> Optional[str]:
+	""" Map an Accept header onto a key of RDF_FORMATS, None for JSON
+	"""
+	if not accept:
+		return None
+
+	accept = accept.lower()
+	if "n-quads" in accept:
+		return "nquads"
+	elif "n-triples" in accept:
+		return "nt"
+	elif "turtle" in accept:
+		return "turtle"
+	elif "rdf" in accept:
+		return "xml"
+	return None
+
+
+def _withContext(node: dict, context: dict) -> dict:
+	if node.get("@context"):
+		return node
+	return {**node, "@context": context}
+
+
+def _toNQuads(ntriples: str, graphName: str) -> str:
+	# every N-Triples statement ends in " ." so the graph label goes in front of it
+	return "".join(
+		f"{line[:-2]} <{graphName}> .\n"
+		for line in ntriples.splitlines()
+		if line.endswith(" .")
+	)
+
+
+def serializeJSONLD(jsonld: dict, rdfFormat: str, graphName: Optional[str] = None) -> str:
+	""" Serialize a JSON-LD document into one of RDF_FORMATS
+	"""
+	serializer, _ = RDF_FORMATS[rdfFormat]
+	graph = Graph()
+	graph.parse(data=jsonld, format='json-ld')
+	rendered = graph.serialize(format=serializer)
+
+	if rdfFormat == "nquads":
+		return _toNQuads(rendered, graphName or jsonld.get("@id", ""))
+	return rendered
+
+
+def iterNTriples(
+	nodes: Iterable[dict],
+	context: dict,
+	rdfFormat: str = "nt",
+	graphName: Optional[str] = None
+) -> Iterator[str]:
+	""" Serialize a stream of graph nodes one at a time as N-Triples or N-Quads
+
+	Line based formats need no document level state, so only a single node is
+	held in an rdflib Graph at once regardless of the size of the crate.
+	"""
+	for node in nodes:
+		try:
+			yield serializeJSONLD(_withContext(node, context), rdfFormat, graphName)
+		except Exception as e:
+			logger.warning(f"skipping node {node.get('@id')} in RDF stream: {e}")
+
+
+def _rdfVersion(version, generation: Optional[bytes]) -> Optional[str]:
+	if version is None:
+		return None
+	if generation is None:
+		return cacheVersion(version)
+	return f"{cacheVersion(version)}:{generation.decode()}"
+
+
+class FairscapeRDFRequest(FairscapeRequest):
+
+	def getRDF(self, guid: str, rdfFormat: str, versionInfo: Optional[dict] = None):
+		""" Return the RDF serialization of an identifier's metadata
+
+		Serializations are cached under (guid, dateModified, format) and the
+		cache generation of the identifier. Writes that change the metadata
+		without bumping dateModified still go through invalidateCachedMetadata,
+		which moves the generation, so the old rendering is no longer found.
+		"""
+		if rdfFormat not in RDF_FORMATS:
+			return FairscapeResponse(
+				success=False,
+				statusCode=406,
+				error={"message": f"unsupported RDF format: {rdfFormat}"}
+			)
+
+		if versionInfo is None:
+			versionInfo = self.getVersionInfo(guid)
+
+		if not versionInfo:
+			return FairscapeResponse(
+				success=False,
+				statusCode=404,
+				error={"message": "identifier not found"}
+			)
+
+		guid = versionInfo.get("@id", guid)
+		version = versionInfo.get("dateModified")
+		namespace = f"rdf:{rdfFormat}"
+		generation = self.config.metadataCache.generation(guid)
+
+		cached = self.config.metadataCache.getVersion(namespace, guid, _rdfVersion(version, generation))
+		if cached is not None:
+			return FairscapeResponse(
+				success=True,
+				statusCode=200,
+				model=cached
+			)
+
+		foundDoc = self.config.identifierCollection.find_one(
+			{"@id": guid},
+			projection={"_id": False, "@id": 1, "metadata": 1, "dateModified": 1}
+		)
+		if not foundDoc:
+			return FairscapeResponse(
+				success=False,
+				statusCode=404,
+				error={"message": "identifier not found"}
+			)
+
+		metadata = _withContext(foundDoc.get("metadata") or {}, DEFAULT_CONTEXT)
+
+		try:
+			rendered = serializeJSONLD(metadata, rdfFormat, graphName=guid)
+		except Exception as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=500,
+				error={"message": f"error serializing metadata as {rdfFormat}: {str(e)}"}
+			)
+
+		# key on the version of the document actually rendered, a write after the
+		# generation was taken leaves this entry under a generation no longer read
+		self.config.metadataCache.setVersion(
+			namespace,
+			guid,
+			_rdfVersion(foundDoc.get("dateModified", version), generation),
+			rendered
+		)
+
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=rendered
+		)
+
+
+	def prerenderRDF(self, *guids: str, formats: Iterable[str] = PRERENDER_FORMATS) -> int:
+		""" Fill the RDF cache for the identifiers, returns the number rendered
+		"""
+		rendered = 0
+		for guid in guids:
+			versionInfo = self.getVersionInfo(guid)
+			if not versionInfo:
+				continue
+
+			for rdfFormat in formats:
+				response = self.getRDF(guid, rdfFormat, versionInfo)
+				if response.success:
+					rendered += 1
+				else:
+					logger.warning(f"failed to prerender {rdfFormat} for {guid}: {response.error}")
+
+		return rendered
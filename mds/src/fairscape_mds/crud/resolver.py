@@ -1,15 +1,128 @@
 import logging
+from typing import AsyncIterator, Iterable, Optional
 from fairscape_mds.crud.fairscape_request import FairscapeRequest
 from fairscape_mds.crud.fairscape_response import FairscapeResponse
-from fairscape_mds.models.identifier import StoredIdentifier
+from fairscape_mds.core.permissions import permissionFilter, restrictQuery
+from fairscape_mds.core.projection import InvalidProjection, parseFields, fieldsProjection
+from fairscape_mds.core.serialization import dumpJSON
+from fairscape_mds.models.identifier import (
+	StoredIdentifier,
+	STORED_IDENTIFIER_PROJECTION
+)
+from fairscape_mds.models.user import UserWriteModel
 from fairscape_models.rocrate import GenericMetadataElem
 
 logger = logging.getLogger(__name__)
 
+# identifiers accepted by a single batch resolve request
+MAX_BATCH_SIZE = 1000
+
+
+async def iterBatchJSON(results: AsyncIterator) -> AsyncIterator[bytes]:
+	""" Encode (guid, document) pairs as a JSON object keyed by guid
+	"""
+	yield b"{"
+	first = True
+	async for guid, document in results:
+		if not first:
+			yield b","
+		yield dumpJSON(guid) + b":" + dumpJSON(document)
+		first = False
+	yield b"}"
+
+
+async def iterBatchNDJSON(results: AsyncIterator) -> AsyncIterator[bytes]:
+	""" Encode the found documents of (guid, document) pairs one per line
+	"""
+	async for _, document in results:
+		if document is not None:
+			yield dumpJSON(document) + b"\n"
+
+
 class FairscapeResolverRequest(FairscapeRequest):
 
+	def _cacheIdentifier(self, guid: str, foundMetadata, generation=None):
+		# only cache exact matches so invalidation by @id reaches the entry
+		if foundMetadata and foundMetadata.get("@id") == guid:
+			self.config.metadataCache.set(
+				"identifier",
+				guid,
+				foundMetadata,
+				version=foundMetadata.get("dateModified"),
+				generation=generation
+			)
+
+
+	async def _cacheIdentifierAsync(self, guid: str, foundMetadata, generation=None):
+		if foundMetadata and foundMetadata.get("@id") == guid:
+			await self.config.metadataCache.setAsync(
+				"identifier",
+				guid,
+				foundMetadata,
+				version=foundMetadata.get("dateModified"),
+				generation=generation
+			)
+
+
+	def _findIdentifier(self, guid: str):
+		foundMetadata = self.config.metadataCache.get("identifier", guid)
+		if foundMetadata is not None:
+			return foundMetadata
+
+		generation = self.config.metadataCache.generation(guid)
+		foundMetadata = self.flexibleFind(guid, projection=STORED_IDENTIFIER_PROJECTION)
+		self._cacheIdentifier(guid, foundMetadata, generation)
+		return foundMetadata
+
+
+	async def _findIdentifierAsync(self, guid: str):
+		foundMetadata = await self.config.metadataCache.getAsync("identifier", guid)
+		if foundMetadata is not None:
+			return foundMetadata
+
+		generation = await self.config.metadataCache.generationAsync(guid)
+		foundMetadata = await self.flexibleFindAsync(guid, projection=STORED_IDENTIFIER_PROJECTION)
+		await self._cacheIdentifierAsync(guid, foundMetadata, generation)
+		return foundMetadata
+
+
+	def _rawResponse(self, foundMetadata):
+		if not foundMetadata:
+			return FairscapeResponse(
+				success=False,
+				statusCode=404,
+				error= {"message": "identifier not found"}
+			)
+
+		# documents not shaped like a StoredIdentifier are normalized by validation
+		if not isinstance(foundMetadata.get("metadata"), dict):
+			response = self._validatedResponse(foundMetadata)
+			response.jsonResponse = response.model.model_dump(mode='json', by_alias=True)
+			return response
+
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			jsonResponse=foundMetadata
+		)
+
+
+	def resolveIdentifierRaw(self, guid: str):
+		""" Return the stored document as plain json without pydantic validation
+
+		Stored documents were validated when written, so read only endpoints can
+		encode them directly. Documents that are not shaped like a
+		StoredIdentifier are validated as in resolveIdentifier.
+		"""
+		return self._rawResponse(self._findIdentifier(guid))
+
+
+	async def resolveIdentifierRawAsync(self, guid: str):
+		return self._rawResponse(await self._findIdentifierAsync(guid))
+
+
 	def resolveIdentifier(self, guid: str):
-		foundMetadata = self.flexibleFind(guid)
+		foundMetadata = self._findIdentifier(guid)
 
 		if not foundMetadata:
 			return FairscapeResponse(
@@ -18,6 +131,10 @@ class FairscapeResolverRequest(FairscapeRequest):
 				error= {"message": "identifier not found"}
 			)
 
+		return self._validatedResponse(foundMetadata)
+
+
+	def _validatedResponse(self, foundMetadata):
 		# identifierCases = {
 		# 	"https://w3id.org/EVI#Dataset": Dataset,
 		# 	"https://w3id.org/EVI#Computation": Computation,
@@ -41,3 +158,69 @@ class FairscapeResolverRequest(FairscapeRequest):
 			statusCode=200,
 			model=foundMetadata
 		)
+
+
+	def batchQuery(self, guids: Iterable[str], user: Optional[UserWriteModel] = None) -> dict:
+		""" A single $in query for the identifiers, restricted to those the user may read
+		"""
+		return restrictQuery(
+			{"@id": {"$in": list(guids)}},
+			permissionFilter(user, self.config.adminGroup)
+		)
+
+
+	async def resolveBatchAsync(
+		self,
+		guids: list,
+		user: Optional[UserWriteModel] = None,
+		fields: Optional[list] = None
+	):
+		""" Resolve many identifiers with one indexed query
+
+		The model is an async iterator of (guid, document) pairs in the order the
+		documents are read, followed by (guid, None) for every requested
+		identifier that does not exist or is not readable by the user, so the
+		two cases cannot be told apart.
+		"""
+		# preserve request order while dropping repeats
+		guids = list(dict.fromkeys(guid for guid in guids if guid))
+
+		if not guids:
+			return FairscapeResponse(
+				success=False,
+				statusCode=400,
+				error={"message": "no identifiers requested"}
+			)
+
+		if len(guids) > MAX_BATCH_SIZE:
+			return FairscapeResponse(
+				success=False,
+				statusCode=400,
+				error={"message": f"at most {MAX_BATCH_SIZE} identifiers may be resolved per request"}
+			)
+
+		try:
+			projection = fieldsProjection(parseFields(fields)) or STORED_IDENTIFIER_PROJECTION
+		except InvalidProjection as e:
+			return FairscapeResponse(
+				success=False,
+				statusCode=400,
+				error={"message": str(e)}
+			)
+
+		query = self.batchQuery(guids, user)
+
+		async def results():
+			missing = dict.fromkeys(guids)
+			async for document in self.config.aioIdentifierCollection.find(query, projection=projection):
+				missing.pop(document.get("@id"), None)
+				yield document.get("@id"), document
+
+			for guid in missing:
+				yield guid, None
+
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=results()
+		)
@@ -3,6 +3,11 @@ from fairscape_mds.models.user import Permissions, UserWriteModel, checkPermissi
 from fairscape_mds.models.dataset import DatasetWriteModel, DatasetDistribution, DistributionTypeEnum
 from fairscape_mds.crud.fairscape_request import FairscapeRequest
 from fairscape_mds.crud.fairscape_response import FairscapeResponse
+from fairscape_mds.core.conditional import VERSION_PROJECTION, withMemberVersion
+from fairscape_mds.core.serialization import dumpJSON
+from fairscape_mds.core.zipstream import ZipMember, streamZip
+from fairscape_mds.core.pagination import encodeCursor, decodeCursor, InvalidCursor
+from fairscape_mds.core.permissions import permissionFilter, restrictQuery
 from fairscape_mds.models.rocrate import (
 	ROCrateUploadRequest,
 	ROCrateMetadataElemWrite,
@@ -35,8 +40,40 @@ import mimetypes
 import io
 import zipfile
 
+ROCRATE_CONTEXT = {
+	"@vocab": "https://schema.org/",
+	"EVI": "https://w3id.org/EVI#",
+	"rai":"http://mlcommons.org/croissant/RAI/"
+}
+
+# number of hasPart identifiers resolved per $in query when streaming a crate
+PART_BATCH_SIZE = 500
+
+# bytes buffered before a chunk of streamed JSON-LD is written
+STREAM_CHUNK_SIZE = 65536
+
+SUMMARY_CATEGORIES = [
+	"datasets",
+	"software",
+	"computations",
+	"schemas",
+	"samples",
+	"mlModels",
+	"rocrates",
+	"other"
+]
+
 # ROCrate Helper Functions
 
+def _rocrateDescriptor(rootGUID: str) -> dict:
+	return {
+		"@id": "ro-crate-metadata.json",
+		"@type": "CreativeWork",
+		"conformsTo": {"@id": "https://w3id.org/ro/crate/1.2"},
+		"about": {"@id": rootGUID}
+	}
+
+
 
 class _S3SeekableFile(io.RawIOBase):
     """Seekable file-like object backed by S3 range requests.
@@ -244,6 +281,66 @@ class ROCrateUploadCrateNotFound(ROCrateUploadException):
 
 
 
+def _rocrateJSONPrefix() -> bytearray:
+	buffer = bytearray(b'{"@context":')
+	buffer += dumpJSON(ROCRATE_CONTEXT)
+	buffer += b',"@graph":['
+	return buffer
+
+
+def iterROCrateJSON(graph, chunkSize: int = STREAM_CHUNK_SIZE):
+	""" Encode an RO-Crate @graph iterator as JSON-LD bytes, chunk by chunk
+	"""
+	buffer = _rocrateJSONPrefix()
+
+	first = True
+	for node in graph:
+		if not first:
+			buffer += b","
+		buffer += dumpJSON(node)
+		first = False
+
+		if len(buffer) >= chunkSize:
+			yield bytes(buffer)
+			buffer.clear()
+
+	buffer += b"]}"
+	yield bytes(buffer)
+
+
+def _uniqueMemberName(name: str, names: set) -> str:
+	""" Suffix repeated archive member names, data.csv -> data-1.csv
+	"""
+	candidate = name
+	path = pathlib.PurePosixPath(name)
+	counter = 1
+	while candidate in names:
+		candidate = f"{path.stem}-{counter}{path.suffix}"
+		counter += 1
+	names.add(candidate)
+	return candidate
+
+
+async def aiterROCrateJSON(graph, chunkSize: int = STREAM_CHUNK_SIZE):
+	""" iterROCrateJSON over an async @graph iterator
+	"""
+	buffer = _rocrateJSONPrefix()
+
+	first = True
+	async for node in graph:
+		if not first:
+			buffer += b","
+		buffer += dumpJSON(node)
+		first = False
+
+		if len(buffer) >= chunkSize:
+			yield bytes(buffer)
+			buffer.clear()
+
+	buffer += b"]}"
+	yield bytes(buffer)
+
+
 def findRootCrate(infolist: list[zipfile.ZipInfo]) -> tuple[str | None, list[str]]:
 	""" Given an Infolist from a Zip Archive, find all `ro-crate-metadata.json` files and return a tuple with the first member as the path for the root crate and the second as the list of all subcrates 
 	"""
@@ -880,8 +977,12 @@ class FairscapeROCrateRequest(FairscapeRequest):
 					# todo check success
 					metadataCollection.update_one(
 						{"@id": metadataModel.guid}, 
-						{"$push": {"metadata.isPartOf": partOfROCrate.model_dump(by_alias=True, mode='json')}}
+						{
+							"$push": {"metadata.isPartOf": partOfROCrate.model_dump(by_alias=True, mode='json')},
+							"$set": {"dateModified": datetime.datetime.now(tz=datetime.timezone.utc)}
+						}
 						)
+					self.invalidateMetadata(metadataModel.guid)
 				
 				metadataModel.isPartOf = [
 					partOfROCrate
@@ -1295,12 +1396,18 @@ class FairscapeROCrateRequest(FairscapeRequest):
 
 
 	def getUploadMetadata(self, requestingUser: UserWriteModel, transactionGUID: str):
-		# get upload metadata
-		uploadMetadata = self.config.asyncCollection.find_one({
-				"guid": transactionGUID
-		})
+		# get upload metadata the user has permission to view
+		uploadMetadata = self.config.asyncCollection.find_one(
+			restrictQuery({"guid": transactionGUID}, self.accessFilter(requestingUser))
+		)
 
 		if uploadMetadata is None:
+			if self.config.asyncCollection.find_one({"guid": transactionGUID}, projection={"_id": True}):
+				return FairscapeResponse(
+						success=False,
+						statusCode=401,
+						error={"message": "user unauthorized to view upload status"}
+				)
 			return FairscapeResponse(
 					success=False,
 					statusCode=404,
@@ -1308,46 +1415,133 @@ class FairscapeROCrateRequest(FairscapeRequest):
 					)
 		
 		uploadInstance = ROCrateUploadRequest.model_validate(uploadMetadata)
+		return FairscapeResponse(
+				model=uploadInstance,
+				success=True,
+				statusCode=200
+		)
 
-		# check that user has permission to view upload request
-		if checkPermissions(uploadInstance.permissions, requestingUser):
-			return FairscapeResponse(
-					model=uploadInstance,
-					success=True,
-					statusCode=200
+	def _partGUIDs(self, root_metadata: dict) -> list:
+		return [
+			part.get("@id") for part in root_metadata.get("hasPart", [])
+			if isinstance(part, dict) and part.get("@id")
+		]
+
+	async def getCrateVersionInfoAsync(self, rocrateGUID: str):
+		""" Version of the crate JSON-LD, which embeds every hasPart member
+
+		The root version is folded with the memberVersion that writes to the
+		members stamp on the crate, so it is one projected lookup however
+		many members the crate has.
+		"""
+		versionInfo = await self.flexibleFindAsync(
+			rocrateGUID,
+			projection={**VERSION_PROJECTION, "memberVersion": 1}
+		)
+		if not versionInfo:
+			return None
+
+		return withMemberVersion(versionInfo)
+
+	def _iterROCrateGraph(self, root_guid: str, root_metadata: dict, batchSize: int):
+		yield _rocrateDescriptor(root_guid)
+		yield root_metadata
+
+		part_guids = self._partGUIDs(root_metadata)
+
+		for start in range(0, len(part_guids), batchSize):
+			parts_cursor = self.config.identifierCollection.find(
+				{"@id": {"$in": part_guids[start:start + batchSize]}},
+				projection={"_id": False, "metadata": 1}
 			)
-		else:
+			for part_doc in parts_cursor:
+				part_metadata = part_doc.get("metadata", {})
+				if part_metadata:
+					yield part_metadata
+
+	async def _iterROCrateGraphAsync(self, root_guid: str, root_metadata: dict, batchSize: int):
+		yield _rocrateDescriptor(root_guid)
+		yield root_metadata
+
+		part_guids = self._partGUIDs(root_metadata)
+
+		for start in range(0, len(part_guids), batchSize):
+			parts_cursor = self.config.aioIdentifierCollection.find(
+				{"@id": {"$in": part_guids[start:start + batchSize]}},
+				projection={"_id": False, "metadata": 1}
+			)
+			async for part_doc in parts_cursor:
+				part_metadata = part_doc.get("metadata", {})
+				if part_metadata:
+					yield part_metadata
+
+	def streamROCrateGraph(self, rocrateGUID: str, batchSize: int = PART_BATCH_SIZE):
+		""" Resolve the crate root and return a generator over its @graph nodes
+
+		Parts are fetched in batches so the full graph is never held in memory,
+		the root is looked up eagerly so a missing crate is still a 404.
+		"""
+		root_doc = self.flexibleFind(
+			rocrateGUID,
+			projection={"_id": False, "@id": 1, "metadata": 1}
+		)
+
+		if not root_doc:
 			return FairscapeResponse(
-					success=False,
-					statusCode=401,
-					error={"message": "user unauthorized to view upload status"}
+				success=False,
+				statusCode=404,
+				error={"message": "rocrate not found"}
 			)
 
-	def _build_rocrate_structure(self, root_guid: str, root_metadata: dict, parts: list) -> dict:
-		context = {
-			"@vocab": "https://schema.org/",
-			"EVI": "https://w3id.org/EVI#",
-			"rai":"http://mlcommons.org/croissant/RAI/"
-		}
-		
-		graph = [
-			{
-				"@id": "ro-crate-metadata.json",
-				"@type": "CreativeWork",
-				"conformsTo": {"@id": "https://w3id.org/ro/crate/1.2"},
-				"about": {"@id": root_guid}
-			},
-			root_metadata
-		]
-		
-		graph.extend(parts)
-		
-		return {
-			"@context": context,
-			"@graph": graph
-		}
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=self._iterROCrateGraph(
+				root_doc.get("@id", rocrateGUID),
+				root_doc.get("metadata", {}),
+				batchSize
+			)
+		)
+
+	def _cacheROCrateEntry(self, namespace: str, rocrateGUID: str, rootDoc: dict, value, generation=None) -> None:
+		# only cache exact matches so invalidation by @id reaches the entry
+		if rootDoc.get("@id") != rocrateGUID:
+			return
+		self.config.metadataCache.set(
+			namespace,
+			rocrateGUID,
+			value,
+			version=rootDoc.get("dateModified"),
+			generation=generation
+		)
+
+	async def _cacheROCrateEntryAsync(self, namespace: str, rocrateGUID: str, rootDoc: dict, value, generation=None) -> None:
+		if rootDoc.get("@id") != rocrateGUID:
+			return
+		await self.config.metadataCache.setAsync(
+			namespace,
+			rocrateGUID,
+			value,
+			version=rootDoc.get("dateModified"),
+			generation=generation
+		)
+
+	def getROCrateMetadata(self, rocrateGUID: str, streamThreshold: Optional[int] = None):
+		""" Assemble the RO-Crate JSON-LD for a stored crate
 
-	def getROCrateMetadata(self, rocrateGUID: str):
+		Crates with more than streamThreshold parts are not built in memory, the
+		response carries a byte iterator in fileResponse that writes the
+		@context and root first and then the @graph in batches.
+		"""
+		cached_doc = self.config.metadataCache.get("rocrate", rocrateGUID)
+		if cached_doc is not None:
+			return FairscapeResponse(
+				success=True,
+				statusCode=200,
+				model=cached_doc
+			)
+
+		generation = self.config.metadataCache.generation(rocrateGUID)
 		root_doc = self.flexibleFind(rocrateGUID)
 		
 		if not root_doc:
@@ -1358,32 +1552,65 @@ class FairscapeROCrateRequest(FairscapeRequest):
 			)
 		
 		root_metadata = root_doc.get("metadata", {})
-		
-		has_part = root_metadata.get("hasPart", [])
-		
-		if not has_part:
-			rocrate_doc = self._build_rocrate_structure(rocrateGUID, root_metadata, [])
+		graph = self._iterROCrateGraph(rocrateGUID, root_metadata, PART_BATCH_SIZE)
+
+		if streamThreshold is not None and len(root_metadata.get("hasPart", [])) > streamThreshold:
 			return FairscapeResponse(
 				success=True,
 				statusCode=200,
-				model=rocrate_doc
+				fileResponse=iterROCrateJSON(graph)
 			)
+
+		rocrate_doc = {
+			"@context": ROCRATE_CONTEXT,
+			"@graph": list(graph)
+		}
+		self._cacheROCrateEntry("rocrate", rocrateGUID, root_doc, rocrate_doc, generation)
 		
-		part_guids = [part.get("@id") for part in has_part if part.get("@id")]
-		
-		parts_cursor = self.config.identifierCollection.find(
-			{"@id": {"$in": part_guids}},
-			projection={"_id": False}
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=rocrate_doc
 		)
-		
-		parts_metadata = []
-		for part_doc in parts_cursor:
-			part_metadata = part_doc.get("metadata", {})
-			if part_metadata:
-				parts_metadata.append(part_metadata)
-		
-		rocrate_doc = self._build_rocrate_structure(rocrateGUID, root_metadata, parts_metadata)
-		
+
+
+	async def getROCrateMetadataAsync(self, rocrateGUID: str, streamThreshold: Optional[int] = None):
+		""" getROCrateMetadata against the async identifier collection
+		"""
+		cached_doc = await self.config.metadataCache.getAsync("rocrate", rocrateGUID)
+		if cached_doc is not None:
+			return FairscapeResponse(
+				success=True,
+				statusCode=200,
+				model=cached_doc
+			)
+
+		generation = await self.config.metadataCache.generationAsync(rocrateGUID)
+		root_doc = await self.flexibleFindAsync(rocrateGUID)
+
+		if not root_doc:
+			return FairscapeResponse(
+				success=False,
+				statusCode=404,
+				error={"message": "rocrate not found"}
+			)
+
+		root_metadata = root_doc.get("metadata", {})
+		graph = self._iterROCrateGraphAsync(rocrateGUID, root_metadata, PART_BATCH_SIZE)
+
+		if streamThreshold is not None and len(root_metadata.get("hasPart", [])) > streamThreshold:
+			return FairscapeResponse(
+				success=True,
+				statusCode=200,
+				fileResponse=aiterROCrateJSON(graph)
+			)
+
+		rocrate_doc = {
+			"@context": ROCRATE_CONTEXT,
+			"@graph": [node async for node in graph]
+		}
+		await self._cacheROCrateEntryAsync("rocrate", rocrateGUID, root_doc, rocrate_doc, generation)
+
 		return FairscapeResponse(
 			success=True,
 			statusCode=200,
@@ -1410,11 +1637,107 @@ class FairscapeROCrateRequest(FairscapeRequest):
 			)
 
 
+	def _summaryPageProjection(self, categories: list, limit: int, offset: int) -> dict:
+		# $slice keeps the arrays in mongo, only the requested page is returned
+		projection = {
+			"_id": False,
+			"@id": 1,
+			"@type": 1,
+			"dateModified": 1,
+			"contentSummary.counts": 1,
+			"contentSummary.generatedAt": 1,
+		}
+		for category in categories:
+			projection[f"contentSummary.{category}"] = {"$slice": [offset, limit]}
+		return projection
+
+	def _summaryFilterPipeline(self, rocrateGUID: str, categories: list, limit: int, offset: int, name: str) -> list:
+		nameFilter = re.escape(name)
+		matches = {
+			category: {
+				"$filter": {
+					"input": {"$ifNull": [f"$contentSummary.{category}", []]},
+					"as": "item",
+					"cond": {"$regexMatch": {
+						"input": {"$toString": "$$item.name"},
+						"regex": nameFilter,
+						"options": "i"
+					}}
+				}
+			}
+			for category in categories
+		}
+
+		return [
+			{"$match": {"@id": rocrateGUID}},
+			{"$project": {
+				"_id": 0,
+				"@id": 1,
+				"@type": 1,
+				"dateModified": 1,
+				"contentSummary.counts": "$contentSummary.counts",
+				"contentSummary.generatedAt": "$contentSummary.generatedAt",
+				"hasSummary": {"$gt": ["$contentSummary", None]},
+				**{f"matches.{category}": expression for category, expression in matches.items()}
+			}},
+			{"$set": {
+				**{
+					f"contentSummary.{category}": {"$slice": [f"$matches.{category}", offset, limit]}
+					for category in categories
+				},
+				**{
+					f"matchCounts.{category}": {"$size": f"$matches.{category}"}
+					for category in categories
+				}
+			}},
+			{"$unset": "matches"}
+		]
+
+	def _filteredSummaryDoc(self, rocrate_doc):
+		if rocrate_doc is not None and not rocrate_doc.pop("hasSummary", False):
+			rocrate_doc.pop("contentSummary", None)
+		return rocrate_doc
+
+	def _parseSummaryRequest(self, rocrateGUID: str, category, name, offset: int, cursor):
+		""" Resolve cursor / category arguments, returns (category, name, offset, errorResponse)
+		"""
+		if cursor:
+			try:
+				cursorState = decodeCursor(cursor)
+				category = cursorState.get("category")
+				name = cursorState.get("name")
+				offset = int(cursorState.get("offset", 0))
+			except (InvalidCursor, TypeError, ValueError) as e:
+				return category, name, offset, FairscapeResponse(
+					success=False,
+					statusCode=400,
+					error={"message": str(e)}
+				)
+
+			if cursorState.get("rocrate") != rocrateGUID or offset < 0:
+				return category, name, offset, FairscapeResponse(
+					success=False,
+					statusCode=400,
+					error={"message": "cursor does not belong to this RO-Crate"}
+				)
+
+		if category is not None and category not in SUMMARY_CATEGORIES:
+			return category, name, offset, FairscapeResponse(
+				success=False,
+				statusCode=400,
+				error={"message": f"unknown content summary category: {category}"}
+			)
+
+		return category, name, offset, None
+
 	def getROCrateContentSummary(
 		self,
 		rocrateGUID: str,
 		limit: int = 10,
-		offset: int = 0
+		offset: int = 0,
+		category: Optional[str] = None,
+		name: Optional[str] = None,
+		cursor: Optional[str] = None
 	) -> FairscapeResponse:
 		"""
 		Get the pre-computed content summary for an RO-Crate.
@@ -1423,21 +1746,102 @@ class FairscapeROCrateRequest(FairscapeRequest):
 			rocrateGUID: The ARK identifier of the RO-Crate
 			limit: Maximum number of items per category (default 10)
 			offset: Starting index for pagination (default 0)
+			category: Only return this category of the summary
+			name: Case insensitive substring filter on item names
+			cursor: Continuation token from a previous page, overrides
+				category, name and offset
 
 		Returns:
 			FairscapeResponse with sliced summary data
 		"""
+		category, name, offset, errorResponse = self._parseSummaryRequest(
+			rocrateGUID, category, name, offset, cursor
+		)
+		if errorResponse:
+			return errorResponse
 
-		# Only fetch the contentSummary field
-		rocrate_doc = self.flexibleFind(
-			rocrateGUID,
-			projection={
-				"_id": False,
-				"contentSummary": 1,
-				"@type": 1
-			}
+		categories = [category] if category else SUMMARY_CATEGORIES
+
+		if name:
+			rocrate_doc = None
+			versionInfo = self.getVersionInfo(rocrateGUID)
+			if versionInfo:
+				pipeline = self._summaryFilterPipeline(
+					versionInfo.get("@id"), categories, limit, offset, name
+				)
+				rocrate_doc = self._filteredSummaryDoc(
+					next(self.config.identifierCollection.aggregate(pipeline), None)
+				)
+		else:
+			cacheNamespace = f"summary:{category or 'all'}:{offset}:{limit}"
+			rocrate_doc = self.config.metadataCache.get(cacheNamespace, rocrateGUID)
+
+			if rocrate_doc is None:
+				generation = self.config.metadataCache.generation(rocrateGUID)
+				rocrate_doc = self.flexibleFind(
+					rocrateGUID,
+					projection=self._summaryPageProjection(categories, limit, offset)
+				)
+				if rocrate_doc:
+					self._cacheROCrateEntry(cacheNamespace, rocrateGUID, rocrate_doc, rocrate_doc, generation)
+
+		return self._buildSummaryResponse(rocrateGUID, rocrate_doc, categories, category, name, limit, offset)
+
+	async def getROCrateContentSummaryAsync(
+		self,
+		rocrateGUID: str,
+		limit: int = 10,
+		offset: int = 0,
+		category: Optional[str] = None,
+		name: Optional[str] = None,
+		cursor: Optional[str] = None
+	) -> FairscapeResponse:
+		""" getROCrateContentSummary against the async identifier collection
+		"""
+		category, name, offset, errorResponse = self._parseSummaryRequest(
+			rocrateGUID, category, name, offset, cursor
 		)
+		if errorResponse:
+			return errorResponse
+
+		categories = [category] if category else SUMMARY_CATEGORIES
+
+		if name:
+			rocrate_doc = None
+			versionInfo = await self.getVersionInfoAsync(rocrateGUID)
+			if versionInfo:
+				pipeline = self._summaryFilterPipeline(
+					versionInfo.get("@id"), categories, limit, offset, name
+				)
+				aggregateCursor = await self.config.aioIdentifierCollection.aggregate(pipeline)
+				async for summary_doc in aggregateCursor:
+					rocrate_doc = self._filteredSummaryDoc(summary_doc)
+					break
+		else:
+			cacheNamespace = f"summary:{category or 'all'}:{offset}:{limit}"
+			rocrate_doc = await self.config.metadataCache.getAsync(cacheNamespace, rocrateGUID)
+
+			if rocrate_doc is None:
+				generation = await self.config.metadataCache.generationAsync(rocrateGUID)
+				rocrate_doc = await self.flexibleFindAsync(
+					rocrateGUID,
+					projection=self._summaryPageProjection(categories, limit, offset)
+				)
+				if rocrate_doc:
+					await self._cacheROCrateEntryAsync(cacheNamespace, rocrateGUID, rocrate_doc, rocrate_doc, generation)
+
+		return self._buildSummaryResponse(rocrateGUID, rocrate_doc, categories, category, name, limit, offset)
 
+	def _buildSummaryResponse(
+		self,
+		rocrateGUID: str,
+		rocrate_doc,
+		categories: list,
+		category: Optional[str],
+		name: Optional[str],
+		limit: int,
+		offset: int
+	) -> FairscapeResponse:
 		if not rocrate_doc:
 			return FairscapeResponse(
 				success=False,
@@ -1491,26 +1895,39 @@ class FairscapeROCrateRequest(FairscapeRequest):
 				}
 			)
 
-		# Apply pagination (offset and limit) to each category
-		end_idx = offset + limit
-
-		paginated_summary = {
-			"datasets": content_summary.get("datasets", [])[offset:end_idx],
-			"software": content_summary.get("software", [])[offset:end_idx],
-			"computations": content_summary.get("computations", [])[offset:end_idx],
-			"schemas": content_summary.get("schemas", [])[offset:end_idx],
-			"samples": content_summary.get("samples", [])[offset:end_idx],
-			"mlModels": content_summary.get("mlModels", [])[offset:end_idx],
-			"rocrates": content_summary.get("rocrates", [])[offset:end_idx],
-			"other": content_summary.get("other", [])[offset:end_idx],
-			"counts": content_summary.get("counts", {}),
+		counts = content_summary.get("counts", {})
+		totals = rocrate_doc.get("matchCounts") if name else counts
+
+		paginated_summary = {}
+		nextCursors = {}
+		for summaryCategory in categories:
+			items = content_summary.get(summaryCategory, [])
+			paginated_summary[summaryCategory] = items
+
+			total = (totals or {}).get(summaryCategory)
+			hasMore = offset + len(items) < total if total is not None else len(items) == limit
+			nextCursors[summaryCategory] = encodeCursor({
+				"rocrate": rocrateGUID,
+				"category": summaryCategory,
+				"name": name,
+				"offset": offset + limit
+			}) if hasMore and items else None
+
+		paginated_summary.update({
+			"counts": counts,
 			"generatedAt": content_summary.get("generatedAt"),
 			"summaryAvailable": True,
 			"pagination": {
 				"offset": offset,
-				"limit": limit
+				"limit": limit,
+				"nextCursors": nextCursors
 			}
-		}
+		})
+
+		if category:
+			paginated_summary["pagination"]["nextCursor"] = nextCursors[category]
+		if name:
+			paginated_summary["matchCounts"] = totals
 
 		return FairscapeResponse(
 			success=True,
@@ -1519,13 +1936,16 @@ class FairscapeROCrateRequest(FairscapeRequest):
 		)
 
 
-	def downloadROCrateArchive(
-		self, 
-		requestingUser: UserWriteModel, 
-		rocrateGUID: str
-	):
-
-		rocrateIdentifier = self.flexibleFind(rocrateGUID)
+	def _authorizeROCrateArchive(self, rocrateIdentifier, exists: bool):
+		""" Validate a crate found with findAccessible, returns the
+		StoredIdentifier as the model on success
+		"""
+		if not rocrateIdentifier and exists:
+			return FairscapeResponse(
+				success=False,
+				statusCode=401,
+				error={"message": "user unauthorized to download rocrate archive"}
+			)
 
 		# if no metadata is found return 404
 		if not rocrateIdentifier:
@@ -1538,39 +1958,158 @@ class FairscapeROCrateRequest(FairscapeRequest):
 		# TODO handle validation errors
 		storedROCrate = StoredIdentifier.model_validate(rocrateIdentifier)
 
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=storedROCrate
+		)
+
+	def _hasStoredArchive(self, storedROCrate: StoredIdentifier) -> bool:
+		distribution = storedROCrate.distribution
+		return bool(
+			distribution and distribution.location and
+			distribution.distributionType==DistributionTypeEnum.MINIO
+		)
 
+	def downloadROCrateArchive(
+		self, 
+		requestingUser: UserWriteModel, 
+		rocrateGUID: str
+	):
+		authorized = self._authorizeROCrateArchive(
+			*self.findAccessible(rocrateGUID, requestingUser, flexible=True)
+		)
+		if not authorized.success:
+			return authorized
 
-		if not checkPermissions(storedROCrate.permissions, requestingUser):
+		if not self._hasStoredArchive(authorized.model):
 			return FairscapeResponse(
 				success=False,
-				statusCode=401,
-				error={"message": "user unauthorized to download rocrate archive"}
+				statusCode=400,
+				jsonResponse={"error": "Dataset Not Stored Locally"}
 			)
 
-		if storedROCrate.distribution:
-			if storedROCrate.distribution.location:
-				if storedROCrate.distribution.distributionType==DistributionTypeEnum.MINIO:
-					# get the object from s3
-					# TODO handle key missing error
-					objectResponse = self.config.minioClient.get_object(
-							Bucket=self.config.minioBucket,
-							Key=storedROCrate.distribution.location.path
-					)
+		# get the object from s3
+		# TODO handle key missing error
+		objectResponse = self.config.minioClient.get_object(
+				Bucket=self.config.minioBucket,
+				Key=authorized.model.distribution.location.path
+		)
 
-					# create a FairscapeResponse with a fileResponse item
-					return FairscapeResponse(
-							success=True,
-							statusCode=200,
-							fileResponse=objectResponse.get('Body'),
-							model=storedROCrate
-					)
+		# create a FairscapeResponse with a fileResponse item
+		return FairscapeResponse(
+				success=True,
+				statusCode=200,
+				fileResponse=objectResponse.get('Body'),
+				model=authorized.model
+		)
+
+	async def downloadROCrateArchiveAsync(
+		self,
+		requestingUser: UserWriteModel,
+		rocrateGUID: str,
+		byteRange: Optional[str] = None,
+		ifRange: Optional[str] = None,
+		streamThreshold: Optional[int] = None
+	):
+		""" downloadROCrateArchive with the async clients, fileResponse is the
+		S3 get_object response for the (possibly ranged) archive
+
+		Crates registered without a stored archive are zipped on the fly from
+		their metadata and dataset objects, fileResponse is then the async
+		iterator over the archive bytes
+		"""
+		rocrateIdentifier, exists = await self.findAccessibleAsync(rocrateGUID, requestingUser, flexible=True)
+		authorized = self._authorizeROCrateArchive(rocrateIdentifier, exists)
+		if not authorized.success:
+			return authorized
+
+		if not self._hasStoredArchive(authorized.model):
+			return await self._assembleROCrateArchiveAsync(
+				requestingUser,
+				rocrateGUID,
+				rocrateIdentifier.get("metadata", {}),
+				authorized.model,
+				streamThreshold
+			)
+
+		response = await self.downloadObjectAsync(
+			"rocrate",
+			authorized.model.distribution.location.path,
+			byteRange=byteRange,
+			ifRange=ifRange
+		)
+		response.model = authorized.model
+		return response
+
+	async def _assembleROCrateArchiveAsync(
+		self,
+		requestingUser: UserWriteModel,
+		rocrateGUID: str,
+		root_metadata: dict,
+		storedROCrate: StoredIdentifier,
+		streamThreshold: Optional[int] = None
+	):
+		metadataResponse = await self.getROCrateMetadataAsync(rocrateGUID, streamThreshold=streamThreshold)
+		if not metadataResponse.success:
+			return metadataResponse
+
+		if metadataResponse.fileResponse is not None:
+			metadataStream = metadataResponse.fileResponse
+
+			async def openMetadata():
+				return metadataStream
+			metadataSource = openMetadata
+		else:
+			metadataSource = dumpJSON(metadataResponse.model)
 
 		return FairscapeResponse(
-			success=False,
-			statusCode=400,
-			jsonResponse={"error": "Dataset Not Stored Locally"}
+			success=True,
+			statusCode=200,
+			model=storedROCrate,
+			fileResponse=streamZip(self._archiveMembers(requestingUser, root_metadata, metadataSource)),
+			jsonResponse={}
 		)
 
+	async def _archiveMembers(self, requestingUser: UserWriteModel, root_metadata: dict, metadataSource):
+		""" Members of an assembled crate archive, read from the cursor as the zip is written
+
+		Only parts the user may download are included.
+		"""
+		yield ZipMember("ro-crate-metadata.json", metadataSource)
+		names = {"ro-crate-metadata.json"}
+
+		accessCondition = self.accessFilter(requestingUser)
+		part_guids = self._partGUIDs(root_metadata)
+		for start in range(0, len(part_guids), PART_BATCH_SIZE):
+			parts_cursor = self.config.aioIdentifierCollection.find(
+				restrictQuery(
+					{
+						"@id": {"$in": part_guids[start:start + PART_BATCH_SIZE]},
+						"distribution.distributionType": DistributionTypeEnum.MINIO.value
+					},
+					accessCondition
+				),
+				projection={"_id": False, "@id": 1, "distribution.location.path": 1}
+			)
+			async for part_doc in parts_cursor:
+				object_key = part_doc.get("distribution", {}).get("location", {}).get("path")
+				if not object_key:
+					continue
+				yield ZipMember(
+					_uniqueMemberName(pathlib.Path(object_key).name, names),
+					self._objectSource(object_key)
+				)
+
+	def _objectSource(self, objectKey: str):
+		async def openObject():
+			objectResponse = await self.config.aioMinioClient.get_object(
+				Bucket=self.config.minioBucket,
+				Key=objectKey
+			)
+			return self.config.aioMinioClient.iterBody(objectResponse['Body'], label=objectKey)
+		return openObject
+
 
 	def _validateMetadataOnlyCrate(self, crateModel: ROCrateV1_2) -> Optional[dict]:
 		errors = {}
@@ -1823,40 +2362,34 @@ class FairscapeROCrateRequest(FairscapeRequest):
 
 	def list_crates(
 			self,
-			requestingUser: UserWriteModel
+			requestingUser: UserWriteModel,
+			limit: Optional[int] = None,
+			cursor: Optional[str] = None
 		) -> FairscapeResponse:
 			"""
-			Lists RO-Crates based on user permissions.
-			Admins see all crates. Regular users see crates they own or that belong to their primary group.
+			Lists RO-Crates based on user permissions, one page at a time when limit or cursor is given.
+			Admins see all crates. Regular users see crates they own or that belong to one of their groups.
 			"""
-			query: Dict[str, Any] = {
-				"@type": "https://w3id.org/EVI#ROCrate"
-			}
-			
-			is_admin = self.config.adminGroup in requestingUser.groups
+			query: Dict[str, Any] = restrictQuery(
+				{"@type": "https://w3id.org/EVI#ROCrate"},
+				permissionFilter(requestingUser, self.config.adminGroup, published=False)
+			)
 
-			if not is_admin:
-				user_primary_group = requestingUser.groups[0] if requestingUser.groups else None
-				
-				or_conditions = [{"permissions.owner": requestingUser.email}]
-				if user_primary_group:
-					or_conditions.append({"permissions.group": user_primary_group})
-				
-				query["$or"] = or_conditions
-			
 			try:
-				cursor = self.config.identifierCollection.find(
+				crate_docs, next_cursor = self.findPage(
 					query,
 					projection={
-						"_id": 0,
 						"@id": 1,
-						"metadata": 1,
+						"metadata.name": 1,
+						"metadata.description": 1,
 						"contentSummary.counts": 1,
-					}
+					},
+					limit=limit,
+					cursor=cursor
 				)
 
 				crates_list = []
-				for crate_doc in cursor:
+				for crate_doc in crate_docs:
 					metadata = crate_doc.get("metadata", {})
 					content_summary = crate_doc.get("contentSummary", {})
 					counts = content_summary.get("counts", None)
@@ -1876,9 +2409,15 @@ class FairscapeROCrateRequest(FairscapeRequest):
 				return FairscapeResponse(
 					success=True,
 					statusCode=200,
-					model={"rocrates": crates_list}
+					model={"rocrates": crates_list, "nextCursor": next_cursor}
 				)
 
+			except InvalidCursor as e:
+				return FairscapeResponse(
+					success=False,
+					statusCode=400,
+					error={"message": str(e)})
+
 			except Exception as e:
 				return FairscapeResponse(
 					success=False,
@@ -1,90 +1,710 @@
-import re
+import asyncio
+import datetime
+import json
+import logging
+import threading
 import time
-from typing import List
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+import pymongo
+from pymongo.errors import OperationFailure
 
 from fairscape_mds.crud.fairscape_request import FairscapeRequest
 from fairscape_mds.crud.fairscape_response import FairscapeResponse
 from fairscape_mds.core.config import FairscapeConfig
-from fairscape_mds.models.search import SearchResultItem, SearchResults
+from fairscape_mds.core.autocomplete import AUTOCOMPLETE_KINDS
+from fairscape_mds.core.permissions import isPublished, permissionFilter, restrictQuery
+from fairscape_mds.models.search import AutocompleteResults, SearchResultItem, SearchResults
+from fairscape_mds.models.user import UserWriteModel
+
+
+# the identifier_text index, ensured by ensure_text_index at startup, a match in
+# the name outranks one in keywords, which outranks one in the description
+SEARCH_TEXT_INDEX = "identifier_text"
+SEARCH_TEXT_WEIGHTS = {"metadata.name": 10, "metadata.keywords": 5, "metadata.description": 1}
+# metadata may carry a schema.org language value mongo does not know
+SEARCH_TEXT_LANGUAGE_OVERRIDE = "textSearchLanguage"
+# server error code of a $text query without a text index
+INDEX_NOT_FOUND = 27
+MAX_SEARCH_LIMIT = 100
+
+# facet name -> field, the stored @type is the enum list and is faceted by its last entry
+SEARCH_FACET_FIELDS = {
+    "type": "@type",
+    "publicationStatus": "publicationStatus",
+    "group": "permissions.group",
+    "keywords": "metadata.keywords",
+}
+_TYPE_FACET_VALUE = {"$cond": [{"$isArray": "$@type"}, {"$arrayElemAt": ["$@type", -1]}, "$@type"]}
+SEARCH_FACET_SIZE = 20
+# counts of broad searches, empty queries or ones matching at least
+# SEARCH_FACET_CACHE_MIN_MATCHES identifiers, are reused for this long
+SEARCH_FACET_CACHE_SECONDS = 60
+SEARCH_FACET_CACHE_MIN_MATCHES = 1000
+SEARCH_FACET_CACHE_NAMESPACE = "search-facets"
+
+# Projection to get necessary fields
+BASIC_SEARCH_PROJECTION = {"_id": False, "@id": True, "@type": True, "metadata.name": True, "metadata.description": True, "metadata.keywords": True, "score": True}
+
+SEMANTIC_RESULT_PROJECTION = {key: value for key, value in BASIC_SEARCH_PROJECTION.items() if key != "score"}
+SEMANTIC_TEXT_PROJECTION = {"_id": True, "@id": True, "metadata.name": True, "metadata.description": True, "metadata.keywords": True}
+
+# the semantic and autocomplete indexes pick up inserted identifiers by _id,
+# ObjectIds are made by the client before the insert lands, so each sync
+# rescans identifiers created this many seconds before the newest one seen
+IDENTIFIER_SYNC_LAG = 300
+IDENTIFIER_SYNC_BATCH = 512
+
+# completions are shared by every user, so only published identifiers contribute
+AUTOCOMPLETE_PROJECTION = {"_id": True, "@id": True, "publicationStatus": True, "metadata.name": True, "metadata.keywords": True}
+MAX_AUTOCOMPLETE_LIMIT = 50
+# how often a process checks for identifiers to add to the autocomplete collection
+AUTOCOMPLETE_SYNC_INTERVAL = 5
+# vector hits read per readable result when the user may not see every identifier
+SEMANTIC_OVERFETCH = 2
+
+searchLogger = logging.getLogger("search")
+
+
+def basic_search_query(query_string: str) -> dict:
+    # $text tokenizes and stems the query, quoted phrases and -negations are supported
+    return {"$text": {"$search": query_string}}
+
+
+def ensure_text_index(collection) -> str:
+    """Create the text index basic search queries, a no-op when it already exists"""
+    return collection.create_index(
+        [(field, pymongo.TEXT) for field in SEARCH_TEXT_WEIGHTS],
+        name=SEARCH_TEXT_INDEX,
+        weights=SEARCH_TEXT_WEIGHTS,
+        default_language="english",
+        language_override=SEARCH_TEXT_LANGUAGE_OVERRIDE,
+        background=True
+    )
+
+
+def missing_text_index(error: OperationFailure) -> bool:
+    return error.code == INDEX_NOT_FOUND or "text index required" in str(error)
+
+
+def search_filter(filters: Optional[Dict[str, str]] = None) -> dict:
+    """ Equality filters on the facet fields, all of them indexed """
+    match = {}
+    for facet, value in (filters or {}).items():
+        if value is not None and value != "":
+            match[SEARCH_FACET_FIELDS[facet]] = value
+    return match
+
+
+def _count_by(value, size: int) -> list:
+    # $sortByCount with ties in value order, so facets do not reorder between pages
+    return [
+        {"$group": {"_id": value, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": size}
+    ]
+
+
+def search_facet_stages(size: int = SEARCH_FACET_SIZE) -> dict:
+    """ $facet sub-pipelines counting the matches per facet value, most common first """
+    return {
+        "type": _count_by(_TYPE_FACET_VALUE, size),
+        "publicationStatus": _count_by("$publicationStatus", size),
+        "group": [
+            {"$match": {"permissions.group": {"$nin": [None, ""]}}},
+            *_count_by("$permissions.group", size)
+        ],
+        "keywords": [
+            {"$unwind": "$metadata.keywords"},
+            {"$match": {"metadata.keywords": {"$type": "string"}}},
+            *_count_by("$metadata.keywords", size)
+        ],
+    }
+
+
+def basic_search_pipeline(
+    query_string: str,
+    limit: int,
+    offset: int = 0,
+    filters: Optional[Dict[str, str]] = None,
+    counts: bool = True,
+    access: Optional[dict] = None
+) -> list:
+    """ One aggregation returning the requested page with the total match count and facet counts
+
+    An empty query browses every identifier matching the filters, newest first.
+    Without counts only the page is returned, for searches whose counts are cached.
+    access is the permissionFilter of the user, matches and counts only
+    include identifiers it allows.
+    """
+    match = search_filter(filters)
+    scored = bool(query_string and query_string.strip())
+    if scored:
+        match.update(basic_search_query(query_string))
+    match = restrictQuery(match, access)
+
+    pipeline = [{"$match": match}]
+    if scored:
+        pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+        # _id breaks ties so pages are stable
+        sort = {"score": -1, "_id": 1}
+    else:
+        sort = {"_id": -1}
+
+    facets = {
+        "hits": [
+            {"$sort": sort},
+            {"$skip": offset},
+            {"$limit": limit},
+            {"$project": BASIC_SEARCH_PROJECTION}
+        ]
+    }
+    if counts:
+        facets["total"] = [{"$count": "count"}]
+        facets.update(search_facet_stages())
+    pipeline.append({"$facet": facets})
+    return pipeline
+
+
+def facet_cache_key(query_string: str, filters: Optional[Dict[str, str]] = None, access: Optional[dict] = None) -> str:
+    # counts differ by what the user may read, users with the same access share entries
+    normalized = " ".join((query_string or "").lower().split())
+    return json.dumps([normalized, search_filter(filters), access], sort_keys=True)
+
+
+def facet_cache_version() -> int:
+    # entries age out when the window rolls over, writes are not tracked
+    return int(time.time() // SEARCH_FACET_CACHE_SECONDS)
+
+
+def build_search_results(
+    query_string: str,
+    raw_results: List[dict],
+    start_time: float,
+    total: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    facets: Optional[Dict[str, List[dict]]] = None
+) -> SearchResults:
+    search_results_list: List[SearchResultItem] = []
+
+    for doc in raw_results:
+        metadata = doc.get("metadata", {})
+
+        # Handle keywords, ensuring it's always a list
+        keywords = metadata.get("keywords", [])
+        if keywords:
+            if not isinstance(keywords, list):
+                keywords = [keywords]
+        else:
+            keywords = []
+
+        data_for_validation = {
+            "@id": doc.get("@id", "N/A"),
+            "@type": doc.get("@type"),
+            "name": metadata.get("name"),
+            "description": metadata.get("description"),
+            "keywords": keywords,
+            "score": doc.get("score", 0.0)
+        }
+        search_item = SearchResultItem.model_validate(data_for_validation)
+        search_results_list.append(search_item)
+
+    end_time = time.time()
+    time_taken_ms = (end_time - start_time) * 1000
+
+    return SearchResults(
+        query=query_string,
+        total_results=total if total is not None else offset + len(search_results_list),
+        offset=offset,
+        limit=limit,
+        results=search_results_list,
+        facets=facets,
+        time_taken_ms=time_taken_ms
+    )
+
+
+def semantic_text(doc: dict) -> str:
+    """ The text embedded for an identifier, the name is repeated so it outweighs the description """
+    metadata = doc.get("metadata") or {}
+    keywords = metadata.get("keywords") or []
+    if not isinstance(keywords, list):
+        keywords = [keywords]
+    name = str(metadata.get("name") or "")
+    return " ".join([name, name, " ".join(str(keyword) for keyword in keywords), str(metadata.get("description") or "")])
+
+
+def identifiers_since(config: FairscapeConfig, watermark: Optional[float], projection: dict):
+    """ Identifiers inserted after the watermark in _id order, as (doc, watermark) pairs
+
+    The scan starts IDENTIFIER_SYNC_LAG seconds before the watermark and may
+    repeat identifiers. A None watermark scans the whole collection.
+    """
+    query = {}
+    if watermark is not None:
+        since = datetime.datetime.fromtimestamp(watermark - IDENTIFIER_SYNC_LAG, tz=datetime.timezone.utc)
+        query = {"_id": {"$gt": ObjectId.from_datetime(since)}}
+
+    cursor = config.identifierCollection.find(query, projection=projection).sort("_id", 1).batch_size(IDENTIFIER_SYNC_BATCH)
+    for doc in cursor:
+        if isinstance(doc.get("_id"), ObjectId):
+            watermark = max(watermark or 0, doc["_id"].generation_time.timestamp())
+        if doc.get("@id"):
+            yield doc, watermark
+
+
+def _embed_documents(semantic, docs: List[dict], watermark=None):
+    semantic.index.upsert(
+        [doc["@id"] for doc in docs],
+        semantic.embed([semantic_text(doc) for doc in docs]),
+        watermark=watermark
+    )
+
+
+def sync_semantic_index(config: FairscapeConfig) -> Optional[dict]:
+    """ Bring the vector index up to date with the identifier collection, blocking
+
+    Identifiers inserted since the watermark are embedded in _id order, so an
+    empty index is built by the same pass and an interrupted build resumes.
+    Identifiers queued by invalidateCachedMetadata are embedded again, or
+    removed when they no longer exist. The first pass to reach the newest
+    identifier marks the index built, semantic search answers 503 until then.
+    Returns None when another thread of this process is already syncing.
+    """
+    semantic = config.semanticIndex
+    if not semantic.syncLock.acquire(blocking=False):
+        return None
+
+    try:
+        semantic.lastSync = time.monotonic()
+        index = semantic.index
+        index.refresh()
+        stats = {"embedded": 0, "removed": 0}
+
+        batch = []
+        watermark = index.watermark
+        for doc, watermark in identifiers_since(config, index.watermark, SEMANTIC_TEXT_PROJECTION):
+            batch.append(doc)
+            if len(batch) >= IDENTIFIER_SYNC_BATCH:
+                _embed_documents(semantic, batch, watermark)
+                stats["embedded"] += len(batch)
+                batch = []
+        if batch:
+            _embed_documents(semantic, batch, watermark)
+            stats["embedded"] += len(batch)
+        if not index.built:
+            index.markBuilt()
+
+        stale = semantic.takeStale()
+        for start in range(0, len(stale), IDENTIFIER_SYNC_BATCH):
+            guids = stale[start:start + IDENTIFIER_SYNC_BATCH]
+            docs = list(config.identifierCollection.find({"@id": {"$in": guids}}, projection=SEMANTIC_TEXT_PROJECTION))
+            if docs:
+                _embed_documents(semantic, docs)
+            found = {doc["@id"] for doc in docs}
+            stats["embedded"] += len(docs)
+            stats["removed"] += index.remove([guid for guid in guids if guid not in found])
+
+        index.maybeTrain(semantic.annThreshold)
+        if stats["embedded"] or stats["removed"]:
+            searchLogger.info(f"semantic index sync {stats}, {index.rows} rows")
+        return stats
+    finally:
+        semantic.syncLock.release()
+
+
+def sync_in_background(sync, config: FairscapeConfig, lock) -> Optional[threading.Thread]:
+    """ Run a blocking index sync on a daemon thread, None when one already holds lock
+
+    Used for first builds, which walk the whole identifier collection, and
+    for syncs that must not run inside a request.
+    """
+    if lock.locked():
+        return None
+
+    def run():
+        try:
+            sync(config)
+        except Exception:
+            searchLogger.exception(f"background {sync.__name__} failed")
+
+    thread = threading.Thread(target=run, name=sync.__name__, daemon=True)
+    thread.start()
+    return thread
+
+
+async def sync_periodically(sync, config: FairscapeConfig, lock, interval: float):
+    """ Start sync in the background every interval seconds until cancelled,
+    a sync still running is left to finish rather than started twice
+    """
+    while True:
+        sync_in_background(sync, config, lock)
+        await asyncio.sleep(interval)
+
+
+def sync_autocomplete_index(config: FairscapeConfig) -> Optional[dict]:
+    """ Apply inserted and queued identifiers to the autocomplete collection, blocking
+
+    A lease in the collection lets one process at a time sync, since the
+    completion counters are not idempotent under concurrent updates. Returns
+    None while another thread or process holds it.
+    """
+    autocomplete = config.autocompleteIndex
+    if not autocomplete.syncLock.acquire(blocking=False):
+        return None
+    try:
+        return _sync_autocomplete_index(config, autocomplete)
+    finally:
+        autocomplete.syncLock.release()
+
+
+def _sync_autocomplete_index(config: FairscapeConfig, autocomplete) -> Optional[dict]:
+    state = autocomplete.acquire()
+    if state is None:
+        return None
+
+    watermark = state.get("watermark")
+    stats = {"indexed": 0, "removed": 0}
+    try:
+        batch = []
+        for doc, watermark in identifiers_since(config, state.get("watermark"), AUTOCOMPLETE_PROJECTION):
+            if isPublished(doc):
+                batch.append(doc)
+            if len(batch) >= IDENTIFIER_SYNC_BATCH:
+                autocomplete.index(batch)
+                stats["indexed"] += len(batch)
+                batch = []
+        if batch:
+            autocomplete.index(batch)
+            stats["indexed"] += len(batch)
+
+        # unpublished or deleted identifiers lose their completions
+        stale = autocomplete.takeStale()
+        for start in range(0, len(stale), IDENTIFIER_SYNC_BATCH):
+            guids = stale[start:start + IDENTIFIER_SYNC_BATCH]
+            docs = list(config.identifierCollection.find(
+                restrictQuery({"@id": {"$in": guids}}, permissionFilter(None)),
+                projection=AUTOCOMPLETE_PROJECTION
+            ))
+            found = {doc["@id"] for doc in docs}
+            removed = [guid for guid in guids if guid not in found]
+            autocomplete.index(docs, removed=removed)
+            stats["indexed"] += len(docs)
+            stats["removed"] += len(removed)
+    finally:
+        autocomplete.release(watermark)
+
+    if stats["indexed"] or stats["removed"]:
+        searchLogger.info(f"autocomplete sync {stats}")
+    return stats
+
+
+def _facet_page(aggregate_results: List[dict]) -> tuple:
+    """ (hits, total, facets) of a basic_search_pipeline result, total and
+    facets are None when the pipeline did not count """
+    facet = aggregate_results[0] if aggregate_results else {}
+    if "total" not in facet:
+        return facet.get("hits", []), None, None
+
+    total = facet["total"]
+    facets = {
+        name: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in facet.get(name, [])]
+        for name in SEARCH_FACET_FIELDS
+    }
+    return facet.get("hits", []), total[0]["count"] if total else 0, facets
 
 
 class FairscapeSearchRequest(FairscapeRequest):
     def __init__(self, config: FairscapeConfig):
         super().__init__(config)
 
-    def basic_search(self, query_string: str, limit: int = 10) -> FairscapeResponse:
-        start_time = time.time()
-        
-        if not query_string:
+    def _invalid_search(self, query_string: str, limit: int, offset: int, allow_empty: bool = False) -> Optional[FairscapeResponse]:
+        if not allow_empty and (not query_string or not query_string.strip()):
             return FairscapeResponse(
                 success=False,
                 statusCode=400,
                 error={"message": "Query string cannot be empty."}
             )
+        if limit < 1 or limit > MAX_SEARCH_LIMIT or offset < 0:
+            return FairscapeResponse(
+                success=False,
+                statusCode=400,
+                error={"message": f"limit must be between 1 and {MAX_SEARCH_LIMIT} and offset not negative."}
+            )
+        return None
+
+    def _text_index_unavailable(self) -> FairscapeResponse:
+        searchLogger.error(f"text index {SEARCH_TEXT_INDEX} is missing, basic search is unavailable")
+        return FairscapeResponse(
+            success=False,
+            statusCode=503,
+            error={"message": "search index is not built yet, try again later"}
+        )
+
+    def _access(self, user: Optional[UserWriteModel]) -> Optional[dict]:
+        return permissionFilter(user, self.config.adminGroup)
+
+    def _cached_counts(self, cache_key: str) -> Optional[dict]:
+        return self.config.metadataCache.getVersion(SEARCH_FACET_CACHE_NAMESPACE, cache_key, facet_cache_version())
+
+    async def _cached_counts_async(self, cache_key: str) -> Optional[dict]:
+        return await self.config.metadataCache.getVersionAsync(
+            SEARCH_FACET_CACHE_NAMESPACE, cache_key, facet_cache_version()
+        )
 
-        # Case-insensitive regex pattern
-        pattern = re.compile(f".*{re.escape(query_string)}.*", re.IGNORECASE)
+    def _counts_to_cache(self, query_string: str, total: int, facets, cached) -> Optional[dict]:
+        # only searches broad enough for counting to cost something are cached
+        if cached is None and (not query_string.strip() or total >= SEARCH_FACET_CACHE_MIN_MATCHES):
+            return {"total": total, "facets": facets}
+        return None
+
+    def _search_results(self, query_string, aggregate_results, start_time, cache_key, cached, offset, limit) -> SearchResults:
+        raw_results, total, facets = _facet_page(aggregate_results)
+        if cached is not None:
+            total, facets = cached["total"], cached["facets"]
+        counts = self._counts_to_cache(query_string, total, facets, cached)
+        if counts is not None:
+            self.config.metadataCache.setVersion(SEARCH_FACET_CACHE_NAMESPACE, cache_key, facet_cache_version(), counts)
+        return build_search_results(query_string, raw_results, start_time, total, offset, limit, facets)
+
+    async def _search_results_async(self, query_string, aggregate_results, start_time, cache_key, cached, offset, limit) -> SearchResults:
+        raw_results, total, facets = _facet_page(aggregate_results)
+        if cached is not None:
+            total, facets = cached["total"], cached["facets"]
+        counts = self._counts_to_cache(query_string, total, facets, cached)
+        if counts is not None:
+            await self.config.metadataCache.setVersionAsync(
+                SEARCH_FACET_CACHE_NAMESPACE, cache_key, facet_cache_version(), counts
+            )
+        return build_search_results(query_string, raw_results, start_time, total, offset, limit, facets)
+
+    def basic_search(
+        self,
+        query_string: str = "",
+        limit: int = 10,
+        offset: int = 0,
+        filters: Optional[Dict[str, str]] = None,
+        user: Optional[UserWriteModel] = None
+    ) -> FairscapeResponse:
+        start_time = time.time()
+        query_string = query_string or ""
+
+        invalid = self._invalid_search(query_string, limit, offset, allow_empty=True)
+        if invalid is not None:
+            return invalid
 
         try:
+            access = self._access(user)
+            cache_key = facet_cache_key(query_string, filters, access)
+            cached = self._cached_counts(cache_key)
+
             # Search in MongoDB's identifierCollection
-            # Looking into the 'metadata' subdocument for name, description, and keywords
-            results_cursor = self.config.identifierCollection.find(
-                {
-                    "$or": [
-                        {"metadata.name": pattern},
-                        {"metadata.description": pattern},
-                        {"metadata.keywords": pattern}  # Works if keywords is an array of strings or a single string
-                    ]
-                },
-                # Projection to get necessary fields
-                projection={"_id": False, "@id": True, "@type": True, "metadata.name": True, "metadata.description": True, "metadata.keywords": True}
-            ).limit(limit)
-
-            search_results_list: List[SearchResultItem] = []
-            
-            raw_results = list(results_cursor) # Consume cursor to get all results
-
-            for i, doc in enumerate(raw_results):
-                metadata = doc.get("metadata", {})
-                
-                # Handle keywords, ensuring it's always a list
-                keywords = metadata.get("keywords", [])
-                if keywords:
-                    if not isinstance(keywords, list):
-                        keywords = [keywords]
-                else:
-                    keywords = []
-
-                data_for_validation = {
-                    "@id": doc.get("@id", "N/A"), 
-                    "@type": doc.get("@type"),    
-                    "name": metadata.get("name"),
-                    "description": metadata.get("description"),
-                    "keywords": keywords,
-                    "score": 1
-                }
-                search_item = SearchResultItem.model_validate(data_for_validation)
-                search_results_list.append(search_item)
-
-            end_time = time.time()
-            time_taken_ms = (end_time - start_time) * 1000
-
-            search_response_model = SearchResults(
-                query=query_string,
-                total_results=len(search_results_list), # This is total returned, not total in DB
-                results=search_results_list,
-                time_taken_ms=time_taken_ms
+            aggregate_results = list(self.config.identifierCollection.aggregate(
+                basic_search_pipeline(query_string, limit, offset, filters, counts=cached is None, access=access)
+            ))
+
+            return FairscapeResponse(
+                success=True,
+                statusCode=200,
+                model=self._search_results(query_string, aggregate_results, start_time, cache_key, cached, offset, limit)
+            )
+
+        except OperationFailure as e:
+            if missing_text_index(e):
+                return self._text_index_unavailable()
+            return FairscapeResponse(
+                success=False,
+                statusCode=500,
+                error={"message": f"Search failed: {str(e)}"}
+            )
+        except Exception as e:
+            return FairscapeResponse(
+                success=False,
+                statusCode=500,
+                error={"message": f"Search failed: {str(e)}"}
+            )
+
+    async def basic_search_async(
+        self,
+        query_string: str = "",
+        limit: int = 10,
+        offset: int = 0,
+        filters: Optional[Dict[str, str]] = None,
+        user: Optional[UserWriteModel] = None
+    ) -> FairscapeResponse:
+        """basic_search against the async identifier collection"""
+        start_time = time.time()
+        query_string = query_string or ""
+
+        invalid = self._invalid_search(query_string, limit, offset, allow_empty=True)
+        if invalid is not None:
+            return invalid
+
+        try:
+            access = self._access(user)
+            cache_key = facet_cache_key(query_string, filters, access)
+            cached = await self._cached_counts_async(cache_key)
+
+            results_cursor = await self.config.aioIdentifierCollection.aggregate(
+                basic_search_pipeline(query_string, limit, offset, filters, counts=cached is None, access=access)
             )
+            aggregate_results = await results_cursor.to_list()
 
             return FairscapeResponse(
                 success=True,
                 statusCode=200,
-                model=search_response_model
+                model=await self._search_results_async(
+                    query_string, aggregate_results, start_time, cache_key, cached, offset, limit
+                )
             )
 
+        except OperationFailure as e:
+            if missing_text_index(e):
+                return self._text_index_unavailable()
+            return FairscapeResponse(
+                success=False,
+                statusCode=500,
+                error={"message": f"Search failed: {str(e)}"}
+            )
         except Exception as e:
             return FairscapeResponse(
                 success=False,
                 statusCode=500,
                 error={"message": f"Search failed: {str(e)}"}
-            )
\ No newline at end of file
+            )
+
+    def _readable_hits(self, semantic, query_string: str, wanted: int, access: Optional[dict]) -> tuple:
+        """ (hits, total) of the first wanted vector hits the user may read
+
+        The index holds every identifier, so when access restricts the user
+        more hits are read and checked with one indexed $in query per round
+        until enough are readable or the matches run out. total then only
+        discounts the unreadable hits seen.
+        """
+        if access is None:
+            return semantic.search(query_string, wanted)
+
+        k = wanted * SEMANTIC_OVERFETCH
+        while True:
+            hits, total = semantic.search(query_string, k)
+            readable = {
+                doc["@id"] for doc in self.config.identifierCollection.find(
+                    restrictQuery({"@id": {"$in": [guid for guid, _ in hits]}}, access),
+                    projection={"_id": False, "@id": True}
+                )
+            }
+            readable_hits = [hit for hit in hits if hit[0] in readable]
+            if len(readable_hits) >= wanted or len(hits) >= total:
+                return readable_hits[:wanted], total - (len(hits) - len(readable_hits))
+            k *= 2
+
+    def semantic_search(
+        self,
+        query_string: str,
+        limit: int = 10,
+        offset: int = 0,
+        user: Optional[UserWriteModel] = None
+    ) -> FairscapeResponse:
+        """Rank identifiers by cosine similarity to the query in the local vector index, blocking"""
+        start_time = time.time()
+
+        invalid = self._invalid_search(query_string, limit, offset)
+        if invalid is not None:
+            return invalid
+
+        semantic = self.config.semanticIndex
+        if semantic is None:
+            return FairscapeResponse(
+                success=False,
+                statusCode=503,
+                error={"message": "Semantic search is not configured."}
+            )
+
+        try:
+            if not semantic.ready():
+                # a search of a partial index would silently miss identifiers
+                sync_in_background(sync_semantic_index, self.config, semantic.syncLock)
+                return FairscapeResponse(
+                    success=False,
+                    statusCode=503,
+                    error={"message": "Semantic index is being built, try again later."}
+                )
+            if semantic.syncDue():
+                sync_semantic_index(self.config)
+
+            access = self._access(user)
+            hits, total = self._readable_hits(semantic, query_string, offset + limit, access)
+            page = hits[offset:]
+            docs = {
+                doc["@id"]: doc for doc in self.config.identifierCollection.find(
+                    restrictQuery({"@id": {"$in": [guid for guid, _ in page]}}, access),
+                    projection=SEMANTIC_RESULT_PROJECTION
+                )
+            }
+
+            # deleted without passing through invalidateCachedMetadata
+            missing = [guid for guid, _ in page if guid not in docs]
+            if missing and access is None:
+                semantic.index.remove(missing)
+
+            raw_results = [dict(docs[guid], score=score) for guid, score in page if guid in docs]
+            return FairscapeResponse(
+                success=True,
+                statusCode=200,
+                model=build_search_results(query_string, raw_results, start_time, total - len(missing), offset, limit)
+            )
+
+        except Exception as e:
+            return FairscapeResponse(
+                success=False,
+                statusCode=500,
+                error={"message": f"Semantic search failed: {str(e)}"}
+            )
+
+    def autocomplete(self, prefix: str, limit: int = 10, kinds: Optional[List[str]] = None) -> FairscapeResponse:
+        """Completions of a search box prefix from names, keywords and ARK postfixes, blocking
+
+        Identifiers written since the last background sync, at most
+        AUTOCOMPLETE_SYNC_INTERVAL seconds ago, may be missing."""
+        start_time = time.time()
+
+        if not prefix or not prefix.strip():
+            return FairscapeResponse(
+                success=False,
+                statusCode=400,
+                error={"message": "Prefix cannot be empty."}
+            )
+        if limit < 1 or limit > MAX_AUTOCOMPLETE_LIMIT:
+            return FairscapeResponse(
+                success=False,
+                statusCode=400,
+                error={"message": f"limit must be between 1 and {MAX_AUTOCOMPLETE_LIMIT}."}
+            )
+        unknown = [kind for kind in kinds or [] if kind not in AUTOCOMPLETE_KINDS]
+        if unknown:
+            return FairscapeResponse(
+                success=False,
+                statusCode=400,
+                error={"message": f"unknown completion kinds: {', '.join(unknown)}"}
+            )
+
+        try:
+            # kept current by sync_autocomplete_index in the background
+            completions = self.config.autocompleteIndex.complete(prefix, limit, kinds)
+            return FairscapeResponse(
+                success=True,
+                statusCode=200,
+                model=AutocompleteResults(
+                    prefix=prefix,
+                    completions=completions,
+                    time_taken_ms=(time.time() - start_time) * 1000
+                )
+            )
+
+        except Exception as e:
+            return FairscapeResponse(
+                success=False,
+                statusCode=500,
+                error={"message": f"Autocomplete failed: {str(e)}"}
+            )
@@ -8,6 +8,7 @@ from fairscape_mds.models.software import SoftwareWriteModel
 from fairscape_mds.models.identifier import StoredIdentifier
 from fairscape_mds.models.dataset import DistributionTypeEnum
 from fairscape_models.software import Software
+from typing import Optional
 
 class FairscapeSoftwareRequest(FairscapeRequest):
 
@@ -39,16 +40,14 @@ class FairscapeSoftwareRequest(FairscapeRequest):
 	def getSoftware(self, guid: str):
 		return getMetadata(self.config.identifierCollection, Software, guid)
 
-	def getSoftwareContent(
+	def _authorizeSoftwareContent(
 		self,
 		userInstance: UserWriteModel,
-		softwareGUID: str,
+		softwareMetadata: Optional[dict]
 	) -> FairscapeResponse:
-		softwareMetadata = self.config.identifierCollection.find_one(
-			{"@id": softwareGUID},
-			projection={"_id": False}
-		)
-
+		""" Check the requesting user may download the stored software, the
+		validated StoredIdentifier is returned as the model on success
+		"""
 		if not softwareMetadata:
 			return FairscapeResponse(
 				success=False,
@@ -65,31 +64,70 @@ class FairscapeSoftwareRequest(FairscapeRequest):
 				jsonResponse={"error": "user unauthorized"}
 			)
 
-		if storedSoftware.distribution:
-			if storedSoftware.distribution.distributionType == DistributionTypeEnum.MINIO:
-				objectKey = storedSoftware.distribution.location.path
-
-				response = self.config.minioClient.get_object(
-					Bucket=self.config.minioBucket,
-					Key=objectKey
-				)
-
-				return FairscapeResponse(
-					success=True,
-					statusCode=200,
-					fileResponse=response,
-					model=storedSoftware
-				)
-			else:
-				return FairscapeResponse(
-					success=False,
-					statusCode=400,
-					jsonResponse={"error": "Software Not Stored Locally"}
-				)
-
-		else:
+		if not storedSoftware.distribution or storedSoftware.distribution.distributionType != DistributionTypeEnum.MINIO:
 			return FairscapeResponse(
 				success=False,
 				statusCode=400,
 				jsonResponse={"error": "Software Not Stored Locally"}
 			)
+
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			model=storedSoftware
+		)
+
+	def getSoftwareContent(
+		self,
+		userInstance: UserWriteModel,
+		softwareGUID: str,
+	) -> FairscapeResponse:
+		softwareMetadata = self.config.identifierCollection.find_one(
+			{"@id": softwareGUID},
+			projection={"_id": False}
+		)
+
+		authorized = self._authorizeSoftwareContent(userInstance, softwareMetadata)
+		if not authorized.success:
+			return authorized
+
+		response = self.config.minioClient.get_object(
+			Bucket=self.config.minioBucket,
+			Key=authorized.model.distribution.location.path
+		)
+
+		return FairscapeResponse(
+			success=True,
+			statusCode=200,
+			fileResponse=response,
+			model=authorized.model
+		)
+
+	async def getSoftwareContentAsync(
+		self,
+		userInstance: UserWriteModel,
+		softwareGUID: str,
+		byteRange: Optional[str] = None,
+		ifRange: Optional[str] = None
+	) -> FairscapeResponse:
+		""" getSoftwareContent using the async Mongo and S3 clients, fileResponse['Body']
+		is an aiobotocore StreamingBody, byteRange and ifRange are the request's
+		Range and If-Range headers
+		"""
+		softwareMetadata = await self.config.aioIdentifierCollection.find_one(
+			{"@id": softwareGUID},
+			projection={"_id": False}
+		)
+
+		authorized = self._authorizeSoftwareContent(userInstance, softwareMetadata)
+		if not authorized.success:
+			return authorized
+
+		response = await self.downloadObjectAsync(
+			"software",
+			authorized.model.distribution.location.path,
+			byteRange=byteRange,
+			ifRange=ifRange
+		)
+		response.model = authorized.model
+		return response
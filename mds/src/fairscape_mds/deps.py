@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from fairscape_mds.core.config import appConfig
@@ -7,6 +7,7 @@ from fairscape_mds.crud.user import FairscapeUserRequest
 userRequest = FairscapeUserRequest(appConfig)
 
 OAuthScheme = OAuth2PasswordBearer(tokenUrl="token")
+OptionalOAuthScheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 
 def getCurrentUser(
@@ -22,4 +23,14 @@ def getCurrentUser(
 		raise HTTPException(
 			status_code=401,
 			detail=f"Authorization Error Decoding Token\terror: {str(e)}"
-		)
\ No newline at end of file
+		)
+
+
+def getOptionalUser(
+	token: Annotated[Optional[str], Depends(OptionalOAuthScheme)]
+	):
+	""" Return the current user when the request is authenticated, None for anonymous requests
+	"""
+	if token is None:
+		return None
+	return getCurrentUser(token)
@@ -14,16 +14,61 @@ from fairscape_mds.routers.llm_assist import router as llm_assist_router
 from fairscape_mds.routers.github import router as github_router
 from fairscape_mds.routers.mlmodel import mlModelRouter
 from fairscape_mds.routers.interpretation import router as interpretation_router
+from fairscape_mds.routers.metrics import metricsRouter
 
+from fairscape_mds.crud.search import (
+	AUTOCOMPLETE_SYNC_INTERVAL,
+	SEARCH_TEXT_INDEX,
+	ensure_text_index,
+	searchLogger,
+	sync_autocomplete_index,
+	sync_in_background,
+	sync_periodically,
+	sync_semantic_index
+)
+from fairscape_mds.crud.condensation import sync_provenance_edges
 from fairscape_mds.core.logging import requestLogger
-from fairscape_mds.core.config import settings
+from fairscape_mds.core.config import settings, appConfig, aioMongoClient
 
 from fastapi.middleware.cors import CORSMiddleware 
 from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+import asyncio
 
 import logfire
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	# basic search answers 503 until the text index exists
+	try:
+		await asyncio.to_thread(ensure_text_index, appConfig.identifierCollection)
+	except Exception as e:
+		searchLogger.warning(f"could not ensure text index {SEARCH_TEXT_INDEX}: {e}")
+	# first builds walk the whole identifier collection, requests are served meanwhile
+	if appConfig.semanticIndex is not None:
+		sync_in_background(sync_semantic_index, appConfig, appConfig.semanticIndex.syncLock)
+	if appConfig.provenanceEdges is not None:
+		sync_in_background(sync_provenance_edges, appConfig, appConfig.provenanceEdges.syncLock)
+	# completions are only read by requests, the collection is kept current here
+	autocompleteSync = None
+	if appConfig.autocompleteIndex is not None:
+		autocompleteSync = asyncio.create_task(sync_periodically(
+			sync_autocomplete_index,
+			appConfig,
+			appConfig.autocompleteIndex.syncLock,
+			AUTOCOMPLETE_SYNC_INTERVAL
+		))
+	yield
+	if autocompleteSync is not None:
+		autocompleteSync.cancel()
+	# release the connections held by the async clients
+	await appConfig.aioMinioClient.close()
+	await aioMongoClient.close()
+
+
 app = FastAPI(
+	lifespan=lifespan,
 	root_path="/api",
 	title="Fairscape API",
 	description="Backend Fairscape API for storing EVI Providence Graphs and rich provenance metadata"
@@ -79,6 +124,7 @@ app.include_router(mlModelRouter)
 app.include_router(llm_assist_router)
 app.include_router(github_router)
 app.include_router(interpretation_router)
+app.include_router(metricsRouter)
 
 
 @app.get("/healthz")
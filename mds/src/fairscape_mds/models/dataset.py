@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field, ConfigDict
 from fairscape_models.dataset import Dataset
 from fairscape_mds.models.user import Permissions
 from enum import Enum
-from typing import Union, Optional, List
+from typing import Union, Optional, List, Literal, Any
 import datetime
 
 
@@ -60,3 +60,21 @@ class DatasetUpdateModel(BaseModel):
 	guid: str = Field(alias="@id")
 	set: Optional[DatasetSetProperties] = Field(default=None)
 	push: Optional[DatasetPushProperties] = Field(default=None)
+
+
+class DatasetQueryFormatEnum(str, Enum):
+	ARROW = 'arrow'
+	CSV = 'csv'
+
+
+class DatasetQueryFilter(BaseModel):
+	column: str
+	op: Literal["==", "!=", "<", "<=", ">", ">=", "in", "not in"]
+	value: Any
+
+
+class DatasetQueryRequest(BaseModel):
+	columns: Optional[List[str]] = Field(default=None)
+	filters: List[DatasetQueryFilter] = Field(default_factory=list)
+	format: DatasetQueryFormatEnum = Field(default=DatasetQueryFormatEnum.ARROW)
+	limit: Optional[int] = Field(default=None, ge=1)
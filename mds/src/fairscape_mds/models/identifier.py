@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict, model_validator
+from pydantic import BaseModel, Field, ConfigDict, ValidationError, model_validator
 from typing import Optional, Union, Dict, TYPE_CHECKING, List
 from fairscape_mds.models.user import Permissions
 from fairscape_mds.models.dataset import DatasetDistribution
@@ -116,34 +116,107 @@ class StoredIdentifier(BaseModel):
 	@model_validator(mode='before')
 	@classmethod
 	def validate_metadata_type(cls, data):
-		"""Ensure metadata is validated against the correct type based on metadataType field"""
+		"""Validate metadata directly against the model for the stored @type
+
+		Dispatching on @type avoids trying each member of MetadataUnion in turn.
+		Types in STRICT_METADATA_TYPES must match their model, the remaining
+		types fall back to the union when the stored metadata does not validate.
+		"""
 		if isinstance(data, dict):
 			metadata_type = data.get('@type') or data.get('metadataType')
 			metadata_dict = data.get('metadata')
 
 			if metadata_dict and isinstance(metadata_dict, dict):
-				type_map = {
-					'evi:EvidenceGraph': EvidenceGraph,
-					MetadataTypeEnum.EVIDENCE_GRAPH: EvidenceGraph,
-					'evi:AIReadyScore': AIReadyScore,
-					MetadataTypeEnum.AI_READY_SCORE: AIReadyScore,
-					MetadataTypeEnum.ANNOTATED_EVIDENCE_GRAPH: AnnotatedEvidenceGraph,
-					tuple(MetadataTypeEnum.ANNOTATED_EVIDENCE_GRAPH.value): AnnotatedEvidenceGraph,
-				}
-
-				lookup_key = tuple(metadata_type) if isinstance(metadata_type, list) else metadata_type
-				if lookup_key in type_map:
-					model_class = type_map[lookup_key]
-					data['metadata'] = model_class.model_validate(metadata_dict)
+				type_enum = lookupMetadataType(metadata_type)
+				model_class = METADATA_TYPE_MODELS.get(type_enum)
+
+				if model_class is not None:
+					if type_enum in STRICT_METADATA_TYPES:
+						validated = model_class.model_validate(metadata_dict)
+					else:
+						try:
+							validated = model_class.model_validate(metadata_dict)
+						except ValidationError:
+							validated = None
+
+					if validated is not None:
+						data = {**data, 'metadata': validated}
 
 		return data
 
 
+# stored @type -> concrete metadata model, used by StoredIdentifier to skip
+# union matching; types without an entry are validated against MetadataUnion
+METADATA_TYPE_MODELS = {
+	MetadataTypeEnum.DATASET: Dataset,
+	MetadataTypeEnum.SOFTWARE: Software,
+	MetadataTypeEnum.COMPUTATION: Computation,
+	MetadataTypeEnum.SCHEMA: Schema,
+	MetadataTypeEnum.ROCRATE: ROCrateMetadataElem,
+	MetadataTypeEnum.SAMPLE: Sample,
+	MetadataTypeEnum.BIOCHEM_ENTITY: BioChemEntity,
+	MetadataTypeEnum.EXPERIMENT: Experiment,
+	MetadataTypeEnum.INSTRUMENT: Instrument,
+	MetadataTypeEnum.MEDICAL_CONDITION: MedicalCondition,
+	MetadataTypeEnum.ML_MODEL: ModelCard,
+	MetadataTypeEnum.ACTIVITY: Activity,
+	MetadataTypeEnum.ANNOTATION: Annotation,
+	MetadataTypeEnum.PERSON: Person,
+	MetadataTypeEnum.DEFINED_TERM: DefinedTerm,
+	MetadataTypeEnum.CONTAINER: Container,
+	MetadataTypeEnum.CLAIM: Claim,
+	MetadataTypeEnum.ARTICLE: Article,
+	MetadataTypeEnum.EVIDENCE_GRAPH: EvidenceGraph,
+	MetadataTypeEnum.ANNOTATED_EVIDENCE_GRAPH: AnnotatedEvidenceGraph,
+	MetadataTypeEnum.AI_READY_SCORE: AIReadyScore,
+}
+
+# metadata for these types is rejected rather than retried against the union
+STRICT_METADATA_TYPES = {
+	MetadataTypeEnum.EVIDENCE_GRAPH,
+	MetadataTypeEnum.ANNOTATED_EVIDENCE_GRAPH,
+	MetadataTypeEnum.AI_READY_SCORE,
+}
+
+_METADATA_TYPE_LOOKUP = {
+	tuple(member.value) if isinstance(member.value, list) else member.value: member
+	for member in MetadataTypeEnum
+}
+
+
+def lookupMetadataType(metadataType) -> Optional[MetadataTypeEnum]:
+	""" Resolve a stored @type value (enum, string or list) to a MetadataTypeEnum
+	"""
+	if isinstance(metadataType, MetadataTypeEnum):
+		return metadataType
+	if isinstance(metadataType, (list, tuple)):
+		metadataType = tuple(metadataType)
+	try:
+		return _METADATA_TYPE_LOOKUP.get(metadataType)
+	except TypeError:
+		return None
+
+
+# projection returning only the fields of a StoredIdentifier
+STORED_IDENTIFIER_PROJECTION = {
+	"_id": False,
+	**{
+		(field.alias or name): 1
+		for name, field in StoredIdentifier.model_fields.items()
+	}
+}
+
+
 class UpdatePublishRequest(BaseModel):
 	guid: str = Field(alias="@id")
 	publicationStatus: PublicationStatusEnum
 
 
+class ResolveBatchRequest(BaseModel):
+	guids: List[str] = Field(min_length=1)
+	fields: Optional[List[str]] = Field(default=None)
+
+
 def determineMetadataType(inputType)->MetadataTypeEnum:
 	# ASSUMES LAST TYPE OF LIST IS OUR CLASSISFER
 	if isinstance(inputType, list):
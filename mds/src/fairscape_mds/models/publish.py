@@ -1,10 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import HTTPException
+from pydantic import BaseModel, Field
 import requests
 from datetime import datetime
 import hashlib
 
+from fairscape_mds.core.upload_stream import (
+    S3UploadSource,
+    UploadProgress,
+    ProgressReader,
+    MultipartFileStream,
+    UPLOAD_CHUNK_SIZE
+)
+
 LICENSE_MAP = {
     "CC0 1.0": {
         "name": "CC0 1.0",
@@ -49,8 +58,8 @@ class PublishingTarget(ABC):
         pass
     
     @abstractmethod
-    async def upload_files(self, dataset_id: str, file_data: Any, filename: str, api_token: str) -> Dict:
-        """Upload files to an existing dataset"""
+    def upload_files(self, dataset_id: str, source: S3UploadSource, filename: str, api_token: str, progress: UploadProgress) -> Dict:
+        """Stream a stored object to an existing dataset, runs in the worker"""
         pass
     
     @abstractmethod
@@ -163,13 +172,26 @@ class DataversePublisher(PublishingTarget):
             "platform": "dataverse"
         }
     
-    async def upload_files(self, dataset_id: str, file_data: Any, filename: str, api_token: str) -> Dict:
+    def upload_files(self, dataset_id: str, source: S3UploadSource, filename: str, api_token: str, progress: UploadProgress) -> Dict:
         url = f"{self.base_url}/api/datasets/:persistentId/add?persistentId={dataset_id}"
-        headers = {"X-Dataverse-key": api_token}
-        
-        files = {'file': (filename, file_data, 'application/zip')}
 
-        response = requests.post(url, headers=headers, files=files)
+        # the native add file API takes a multipart form, the file part is read from S3 as it is sent
+        body = MultipartFileStream(
+            'file',
+            filename,
+            ProgressReader(source.open(), source.size, progress),
+            source.size,
+            'application/zip'
+        )
+        headers = {
+            "X-Dataverse-key": api_token,
+            "Content-Type": body.contentType
+        }
+
+        try:
+            response = requests.post(url, headers=headers, data=body)
+        finally:
+            body.close()
         
         if response.status_code != 200:
             raise HTTPException(status_code=response.status_code, detail=response.text)
@@ -219,18 +241,31 @@ class ZenodoPublisher(PublishingTarget):
             "platform": "zenodo"
         }
     
-    async def upload_files(self, dataset_id: str, file_data: Any, filename: str, api_token: str) -> Dict:
+    def upload_files(self, dataset_id: str, source: S3UploadSource, filename: str, api_token: str, progress: UploadProgress) -> Dict:
         headers = {"Authorization": f"Bearer {api_token}"}
-        url = f"{self.base_url}/deposit/depositions/{dataset_id}/files"
-        
-        files = {'file': (filename, file_data, 'application/zip')}
-        response = requests.post(url, headers=headers, files=files)
+
+        # the bucket API takes the raw file as a PUT body, unlike the form based
+        # deposition files API it has no size limit below the quota
+        deposition_response = requests.get(f"{self.base_url}/deposit/depositions/{dataset_id}", headers=headers)
+        if deposition_response.status_code != 200:
+            raise HTTPException(status_code=deposition_response.status_code, detail=deposition_response.text)
+        bucket_url = deposition_response.json()['links']['bucket']
+
+        body = ProgressReader(source.open(), source.size, progress)
+        try:
+            response = requests.put(
+                f"{bucket_url}/{filename}",
+                headers={**headers, "Content-Type": "application/octet-stream"},
+                data=body
+            )
+        finally:
+            body.close()
         
-        if response.status_code != 201:
+        if response.status_code not in (200, 201):
             raise HTTPException(status_code=response.status_code, detail=response.text)
             
         return {
-            "file_id": response.json()['id'],
+            "file_id": response.json().get('version_id', response.json().get('key')),
             "platform": "zenodo"
         }
     
@@ -300,17 +335,13 @@ class FigsharePublisher(PublishingTarget):
             "platform": "figshare"
         }
 
-    def _get_file_check_data(self, file_data: bytes) -> tuple[str, int]:
-        """Calculate MD5 and size of file data"""
+    def _get_file_check_data(self, source: S3UploadSource) -> tuple[str, int]:
+        """Calculate MD5 and size of the stored object in one streaming pass"""
         md5 = hashlib.md5()
-        size = len(file_data)
-        
-        # Process in chunks to handle large files
-        for i in range(0, size, self.chunk_size):
-            chunk = file_data[i:i + self.chunk_size]
+        for chunk in source.iterChunks(self.chunk_size):
             md5.update(chunk)
             
-        return md5.hexdigest(), size
+        return md5.hexdigest(), source.size
 
     def _get_upload_parts(self, upload_url: str) -> Dict:
         """Get the parts information for chunked upload"""
@@ -319,43 +350,66 @@ class FigsharePublisher(PublishingTarget):
             raise HTTPException(status_code=response.status_code, detail=response.text)
         return response.json()
 
-    async def upload_files(self, dataset_id: str, file_data: Any, filename: str, api_token: str) -> Dict:
-        """Upload files to Figshare dataset using chunked upload"""
+    def upload_files(self, dataset_id: str, source: S3UploadSource, filename: str, api_token: str, progress: UploadProgress) -> Dict:
+        """Upload files to Figshare dataset using chunked upload
+
+        The file id and upload location are kept in progress.state, a rerun
+        of the task resumes the same upload and skips completed parts.
+        """
         headers = {
             "Authorization": f"token {api_token}",
             "Content-Type": "application/json"
         }
 
-        # Calculate MD5 hash and size
-        md5_hash, file_size = self._get_file_check_data(file_data)
+        file_info = progress.state.get("figshare_file")
+        if not file_info:
+            # Calculate MD5 hash and size
+            md5_hash, file_size = self._get_file_check_data(source)
 
-        # Step 1: Initialize upload
-        init_url = f"{self.base_url}/account/articles/{dataset_id}/files"
-        file_metadata = {
-            "name": filename,
-            "size": file_size,
-            "md5": md5_hash
-        }
-        
-        init_response = requests.post(init_url, headers=headers, json=file_metadata)
-        if init_response.status_code != 201:
-            raise HTTPException(status_code=init_response.status_code, detail=init_response.text)
-        
-        file_info = init_response.json()
+            # Step 1: Initialize upload
+            init_url = f"{self.base_url}/account/articles/{dataset_id}/files"
+            file_metadata = {
+                "name": filename,
+                "size": file_size,
+                "md5": md5_hash
+            }
+            
+            init_response = requests.post(init_url, headers=headers, json=file_metadata)
+            if init_response.status_code != 201:
+                raise HTTPException(status_code=init_response.status_code, detail=init_response.text)
+
+            # the create response has the file location, the upload url is on the file
+            file_location = init_response.json()['location']
+            file_response = requests.get(file_location, headers=headers)
+            if file_response.status_code != 200:
+                raise HTTPException(status_code=file_response.status_code, detail=file_response.text)
+
+            file_json = file_response.json()
+            file_info = {"id": file_json['id'], "location": file_json['upload_url']}
+            progress.state["figshare_file"] = file_info
+            progress.flush()
         
         # Step 2: Get upload parts info
         parts_info = self._get_upload_parts(file_info['location'])
+        progress.reset(sum(
+            part['endOffset'] - part['startOffset'] + 1
+            for part in parts_info['parts'] if part.get('status') == 'COMPLETE'
+        ))
         
-        # Step 3: Upload parts
+        # Step 3: Upload parts, each read from S3 as a ranged get
         for part in parts_info['parts']:
-            # Extract the chunk from file_data
+            if part.get('status') == 'COMPLETE':
+                continue
+
             start = part['startOffset']
-            end = part['endOffset'] + 1
-            chunk = file_data[start:end]
-            
-            # Upload the part
+            end = part['endOffset']
+            part_body = ProgressReader(source.open(start, end), end - start + 1, progress)
+
             part_url = f"{file_info['location']}/{part['partNo']}"
-            upload_response = requests.put(part_url, data=chunk)
+            try:
+                upload_response = requests.put(part_url, data=part_body)
+            finally:
+                part_body.close()
             
             if upload_response.status_code != 200:
                 raise HTTPException(
@@ -394,3 +448,27 @@ class PublishingService:
             return self._publishers["zenodo"], "zenodo"
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported platform URL: {platform_url}")
+
+
+class PublishUploadTask(BaseModel):
+    guid: str
+    task_type: str = Field(default="PublishUpload")
+    owner_email: str
+    rocrate_guid: str
+    platform_url: str
+    platform_dataset_id: str
+    object_key: str
+    filename: str
+    status: str = Field(default="PENDING")
+    bytes_total: int = 0
+    bytes_uploaded: int = 0
+    # platform specific resume information, e.g. the figshare file id
+    upload_state: Dict[str, Any] = Field(default_factory=dict)
+    time_created: datetime = Field(default_factory=datetime.utcnow)
+    time_started: Optional[datetime] = None
+    time_finished: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+
+    class Config:
+        populate_by_name = True
@@ -1,6 +1,6 @@
 # File: mds/src/fairscape_mds/backend/search_models.py
 from pydantic import BaseModel, Field
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any
 
 class SearchResultItem(BaseModel):
     id: str = Field(alias="@id")
@@ -10,8 +10,28 @@ class SearchResultItem(BaseModel):
     keywords: List[str] = Field(default_factory=list)
     score: float
 
+class SearchFacetValue(BaseModel):
+    value: Any = None
+    count: int
+
 class SearchResults(BaseModel):
     query: str
     total_results: int
+    offset: int = 0
+    limit: Optional[int] = None
     results: List[SearchResultItem]
-    time_taken_ms: float
\ No newline at end of file
+    # counts per value of type, publicationStatus, group and keywords
+    facets: Optional[Dict[str, List[SearchFacetValue]]] = None
+    time_taken_ms: float
+
+class AutocompleteItem(BaseModel):
+    label: str
+    kind: str
+    # the identifier the completion came from, one of them for shared keywords
+    guid: Optional[str] = None
+    count: int = 1
+
+class AutocompleteResults(BaseModel):
+    prefix: str
+    completions: List[AutocompleteItem]
+    time_taken_ms: float
@@ -4,17 +4,22 @@ from fastapi import (
 	Depends, 
 	HTTPException, 
 	Form, 
-	UploadFile
+	UploadFile,
+	Query,
+	Header
 )
 from pydantic import ValidationError
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response, RedirectResponse
 from fastapi.encoders import jsonable_encoder
 from typing import Optional, Annotated
 import mimetypes
 
 from fairscape_mds.models.user import UserWriteModel
 from fairscape_mds.crud.dataset import FairscapeDatasetRequest
+from fairscape_mds.models.dataset import DatasetQueryRequest
 from fairscape_mds.core.config import appConfig
+from fairscape_mds.core.serialization import RawJSONResponse
+from fairscape_mds.core.preview import PREVIEW_DEFAULT_ROWS, PREVIEW_MAX_ROWS
 from fairscape_models.dataset import Dataset
 from fairscape_mds.deps import getCurrentUser
 
@@ -55,27 +60,53 @@ def createDataset(
 @datasetRouter.get("/dataset/ark:{naan}/{postfix}")
 def getDatasetMetadata(
 	naan: str,
-	postfix: str
+	postfix: str,
+	fields: Optional[str] = Query(default=None, description="Comma separated fields to return, e.g. @id,name")
 ):
 
 	datasetGUID = f"ark:{naan}/{postfix}"
+
+	# fields are relative to the returned dataset metadata
+	projected = datasetRequest.findFields(datasetGUID, fields, root="metadata")
+	if projected is not None:
+		if not projected.success:
+			return JSONResponse(
+				status_code=projected.statusCode,
+				content=projected.error
+			)
+		return RawJSONResponse(content=projected.jsonResponse)
+
 	return datasetRequest.getDatasetMetadata(datasetGUID)
 
 
 
 @datasetRouter.get("/dataset/download/ark:{naan}/{postfix}")
-def getDatasetContent(
+async def getDatasetContent(
 	naan: str,
 	postfix: str,
-	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)]
+	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)],
+	range: Optional[str] = Header(default=None),
+	if_range: Optional[str] = Header(default=None)
 ):
 
 	datasetGUID = f"ark:{naan}/{postfix}"
-	datasetResponse = datasetRequest.getDatasetContent(
+	datasetResponse = await datasetRequest.getDatasetContentAsync(
 		userInstance=currentUser,
-		datasetGUID=datasetGUID
+		datasetGUID=datasetGUID,
+		byteRange=range,
+		ifRange=if_range
 	)
 
+	if datasetResponse.statusCode == 307:
+		return RedirectResponse(
+			url=datasetResponse.jsonResponse["Location"],
+			status_code=307,
+			headers={"Cache-Control": "no-store"}
+		)
+
+	if datasetResponse.statusCode == 416:
+		return Response(status_code=416, headers=datasetResponse.jsonResponse)
+
 	if datasetResponse.success:
 
 		dataset_instance = datasetResponse.model
@@ -93,8 +124,9 @@ def getDatasetContent(
    		}
 
 		return StreamingResponse(
-			datasetResponse.fileResponse['Body'],
-			headers=download_headers
+			appConfig.aioMinioClient.iterBody(datasetResponse.fileResponse['Body'], label=object_key),
+			status_code=datasetResponse.statusCode,
+			headers={**download_headers, **datasetResponse.jsonResponse}
 		)
 
 	else:
@@ -104,6 +136,66 @@ def getDatasetContent(
 		)
 
 
+@datasetRouter.get("/dataset/preview/ark:{naan}/{postfix}")
+async def previewDataset(
+	naan: str,
+	postfix: str,
+	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)],
+	rows: int = Query(default=PREVIEW_DEFAULT_ROWS, ge=1, le=PREVIEW_MAX_ROWS),
+	columns: Optional[str] = Query(default=None, description="Comma separated columns to return")
+):
+	""" First rows of a stored CSV, TSV or Parquet dataset, read without
+	downloading the whole file
+	"""
+	datasetGUID = f"ark:{naan}/{postfix}"
+	selectedColumns = [column.strip() for column in columns.split(",") if column.strip()] if columns else None
+
+	previewResponse = await datasetRequest.previewDatasetAsync(
+		userInstance=currentUser,
+		datasetGUID=datasetGUID,
+		rows=rows,
+		columns=selectedColumns
+	)
+
+	if previewResponse.success:
+		return RawJSONResponse(content=previewResponse.jsonResponse)
+
+	return JSONResponse(
+		status_code=previewResponse.statusCode,
+		content=previewResponse.error or previewResponse.jsonResponse
+	)
+
+
+@datasetRouter.post("/dataset/query/ark:{naan}/{postfix}")
+async def queryDataset(
+	naan: str,
+	postfix: str,
+	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)],
+	query: DatasetQueryRequest
+):
+	""" Selected columns and filtered rows of a stored Parquet dataset, streamed
+	as an Arrow IPC stream or CSV
+	"""
+	datasetGUID = f"ark:{naan}/{postfix}"
+
+	queryResponse = await datasetRequest.queryDatasetAsync(
+		userInstance=currentUser,
+		datasetGUID=datasetGUID,
+		query=query
+	)
+
+	if queryResponse.success:
+		return StreamingResponse(
+			queryResponse.fileResponse,
+			headers=queryResponse.jsonResponse
+		)
+
+	return JSONResponse(
+		status_code=queryResponse.statusCode,
+		content=queryResponse.error or queryResponse.jsonResponse
+	)
+
+
 @datasetRouter.delete("/dataset/ark:/{NAAN}/{postfix}")
 @datasetRouter.delete("/dataset/ark:{NAAN}/{postfix}")
 def deleteDataset(
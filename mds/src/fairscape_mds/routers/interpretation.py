@@ -12,7 +12,7 @@ from fairscape_mds.models.user import UserWriteModel, Permissions
 from fairscape_mds.models.identifier import StoredIdentifier, PublicationStatusEnum
 from fairscape_mds.core.config import appConfig
 from fairscape_mds.deps import getCurrentUser, OAuthScheme
-from fairscape_mds.crud.fairscape_request import flexible_ark_query
+from fairscape_mds.crud.fairscape_request import flexible_ark_query, invalidateCachedMetadata
 
 router = APIRouter(
     prefix="/interpretation",
@@ -272,8 +272,12 @@ def upload_annotated_evidence_graph(
 
     appConfig.identifierCollection.update_one(
         {"@id": annotates_id},
-        {"$set": {"metadata.hasAnnotatedEvidenceGraph": {"@id": aeg_id}}},
+        {"$set": {
+            "metadata.hasAnnotatedEvidenceGraph": {"@id": aeg_id},
+            "dateModified": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+        }},
     )
+    invalidateCachedMetadata(appConfig, [aeg_id, annotates_id])
 
     return JSONResponse(
         status_code=200,
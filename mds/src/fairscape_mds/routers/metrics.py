@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated
+
+from fairscape_mds.models.user import UserWriteModel
+from fairscape_mds.core.config import appConfig
+from fairscape_mds.core.streaming import downloadStats
+from fairscape_mds.deps import getCurrentUser
+
+
+metricsRouter = APIRouter(prefix="/metrics", tags=['metrics'])
+
+
+@metricsRouter.get(
+	"/downloads",
+	summary="Download throughput of this API worker"
+)
+def getDownloadMetrics(
+	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)]
+):
+	""" Running totals of the object downloads streamed by this worker
+
+	Totals are per process, so a deployment running several workers answers
+	with the counters of whichever worker served the request. Only members
+	of the admin group may read them.
+	"""
+	if appConfig.adminGroup not in (currentUser.groups or []):
+		raise HTTPException(
+			status_code=403,
+			detail="download metrics are restricted to administrators"
+		)
+
+	return downloadStats.snapshot()
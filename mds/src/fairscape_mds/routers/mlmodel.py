@@ -3,13 +3,15 @@ from fastapi import (
 	Depends,
 	HTTPException,
 	UploadFile,
-	Form
+	Form,
+	Query
 )
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from typing import Annotated, Optional
 
 from fairscape_mds.core.config import appConfig
+from fairscape_mds.core.pagination import MAX_PAGE_SIZE
 
 from fairscape_mds.models.identifier import MetadataTypeEnum
 from fairscape_mds.models.user import UserWriteModel
@@ -60,16 +62,23 @@ def createMLModel(
 @mlModelRouter.get("/mlmodel")
 def listMLModel(
 	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)],
+	limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Max models per page, every model when neither limit nor cursor is given"),
+	cursor: Optional[str] = Query(default=None, description="Continuation token from the X-Next-Cursor header"),
 ):
 	response = identifierRequestFactory.listType(
 		requestType=MetadataTypeEnum.ML_MODEL,
-		user=currentUser
+		user=currentUser,
+		limit=limit,
+		cursor=cursor
 	)
 
 	if response.success:
+		# the body stays a list, the continuation token travels in a header
+		nextCursor = response.model["nextCursor"]
 		return JSONResponse(
-			content=response.model,
-			status_code=response.statusCode
+			content=response.model["identifiers"],
+			status_code=response.statusCode,
+			headers={"X-Next-Cursor": nextCursor} if nextCursor else None
 		)
 
 	else:
@@ -3,16 +3,18 @@ from fastapi import (
 	Depends, 
 	HTTPException, 
 	Form, 
+	Header
 )
-from fastapi.responses import JSONResponse, StreamingResponse
-from typing import Annotated
+from fastapi.responses import JSONResponse, StreamingResponse, Response, RedirectResponse
+from typing import Annotated, Optional
 import mimetypes
 
 from fairscape_mds.crud.identifier import IdentifierRequest
 from fairscape_mds.core.config import appConfig
 from fairscape_mds.deps import getCurrentUser
 from fairscape_mds.models.user import UserWriteModel
-from fairscape_mds.models.identifier import UpdatePublishRequest
+from fairscape_mds.models.identifier import UpdatePublishRequest, PublicationStatusEnum
+from fairscape_mds.worker import prerender_rdf_task
 
 identifierRequestFactory = IdentifierRequest(appConfig)
 publishRouter = APIRouter(prefix="")
@@ -29,6 +31,10 @@ def updatePublicationStatus(
 	)
 
 	if response.success:
+		# published metadata is resolved far more often than it changes
+		if publicationChangeRequest.publicationStatus == PublicationStatusEnum.PUBLISHED:
+			prerender_rdf_task.delay(publicationChangeRequest.guid)
+
 		return JSONResponse(
 			status_code=response.statusCode,
 			content=response.jsonResponse
@@ -42,13 +48,30 @@ def updatePublicationStatus(
 
 @publishRouter.get(path="/view/ark:/{NAAN}/{postfix}")
 @publishRouter.get(path="/view/ark:{NAAN}/{postfix}")
-def viewContent(
+async def viewContent(
 	NAAN: str,
-	postfix: str
+	postfix: str,
+	range: Optional[str] = Header(default=None),
+	if_range: Optional[str] = Header(default=None)
 ):
 
 	guid = f"ark:{NAAN}/{postfix}"
-	response = identifierRequestFactory.getContent(guid)
+	response = await identifierRequestFactory.getContentAsync(
+		guid,
+		byteRange=range,
+		ifRange=if_range,
+		inline=True
+	)
+
+	if response.statusCode == 307:
+		return RedirectResponse(
+			url=response.jsonResponse["Location"],
+			status_code=307,
+			headers={"Cache-Control": "no-store"}
+		)
+
+	if response.statusCode == 416:
+		return Response(status_code=416, headers=response.jsonResponse)
 
 	if response.success:
 
@@ -67,8 +90,9 @@ def viewContent(
    		}
 
 		return StreamingResponse(
-			response.fileResponse['Body'],
-			headers=download_headers
+			appConfig.aioMinioClient.iterBody(response.fileResponse['Body'], label=object_key),
+			status_code=response.statusCode,
+			headers={**download_headers, **response.jsonResponse}
 		)
 
 	else:
@@ -80,13 +104,29 @@ def viewContent(
 
 @publishRouter.get(path="/download/ark:/{NAAN}/{postfix}")
 @publishRouter.get(path="/download/ark:{NAAN}/{postfix}")
-def downloadContent(
+async def downloadContent(
 	NAAN: str,
-	postfix: str
+	postfix: str,
+	range: Optional[str] = Header(default=None),
+	if_range: Optional[str] = Header(default=None)
 ):
 
 	guid = f"ark:{NAAN}/{postfix}"
-	response = identifierRequestFactory.getContent(guid)
+	response = await identifierRequestFactory.getContentAsync(
+		guid,
+		byteRange=range,
+		ifRange=if_range
+	)
+
+	if response.statusCode == 307:
+		return RedirectResponse(
+			url=response.jsonResponse["Location"],
+			status_code=307,
+			headers={"Cache-Control": "no-store"}
+		)
+
+	if response.statusCode == 416:
+		return Response(status_code=416, headers=response.jsonResponse)
 
 	if response.success:
 
@@ -105,8 +145,9 @@ def downloadContent(
 		}
 
 		return StreamingResponse(
-			response.fileResponse['Body'],
-			headers=download_headers
+			appConfig.aioMinioClient.iterBody(response.fileResponse['Body'], label=object_key),
+			status_code=response.statusCode,
+			headers={**download_headers, **response.jsonResponse}
 		)
 
 	else:
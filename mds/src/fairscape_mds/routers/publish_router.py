@@ -9,6 +9,7 @@ from fairscape_mds.crud.publish import FairscapePublishRequest
 from fairscape_mds.models.publish import DEFAULT_DATAVERSE_URL 
 
 from fairscape_mds.core.config import appConfig
+from fairscape_mds.worker import upload_to_platform_task
 
 
 router = APIRouter(
@@ -84,6 +85,9 @@ async def upload_dataset_files_endpoint(
     Uploads the ROCrate's archive (zip file from Minio) to a previously created dataset
     on an external platform. Requires 'transaction_identifier' from the create step to be
     present in the ROCrate's metadata.
+
+    The upload runs as a background task streaming the archive from Minio, poll the
+    returned status endpoint for progress.
     """
     rocrate_guid = f"ark:{NAAN}/{postfix}"
 
@@ -96,4 +100,33 @@ async def upload_dataset_files_endpoint(
     if not response.success:
         raise HTTPException(status_code=response.statusCode, detail=response.error)
 
-    return JSONResponse(status_code=response.statusCode, content=response.model)
\ No newline at end of file
+    upload_to_platform_task.delay(task_guid=response.model.guid)
+
+    return JSONResponse(
+        status_code=response.statusCode,
+        content={
+            "message": "Platform upload initiated.",
+            "task_id": response.model.guid,
+            "bytes_total": response.model.bytes_total,
+            "status_endpoint": f"/publish/upload/status/{response.model.guid}"
+        }
+    )
+
+@router.get(
+    "/upload/status/{task_id}",
+    summary="Get the status and progress of a platform upload",
+    response_description="The upload task with bytes uploaded so far."
+)
+def get_upload_status_endpoint(
+    task_id: Annotated[str, FastApiPath(description="ID of the upload task.")],
+    current_user: Annotated[UserWriteModel, Depends(getCurrentUser)]
+):
+    response = publish_request_handler.get_upload_task(current_user, task_id)
+
+    if not response.success:
+        raise HTTPException(status_code=response.statusCode, detail=response.error)
+
+    return JSONResponse(
+        status_code=response.statusCode,
+        content=response.model.model_dump(mode="json")
+    )
\ No newline at end of file
@@ -1,82 +1,174 @@
 from fastapi import (
 	APIRouter, 
 	Header,
-    Depends
+    Depends,
+    Query
 )
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.encoders import jsonable_encoder
-from fairscape_mds.crud.resolver import FairscapeResolverRequest
+from starlette.concurrency import run_in_threadpool
+from fairscape_mds.crud.resolver import (
+    FairscapeResolverRequest,
+    iterBatchJSON,
+    iterBatchNDJSON
+)
+from fairscape_mds.crud.rdf import (
+    FairscapeRDFRequest,
+    RDF_FORMATS,
+    DEFAULT_CONTEXT,
+    negotiateRDFFormat
+)
 from fairscape_mds.core.config import appConfig
 from fairscape_mds.crud.identifier import IdentifierRequest
-from fairscape_mds.models.identifier import MetadataUnion
+from fairscape_mds.models.identifier import MetadataUnion, ResolveBatchRequest
 from fairscape_mds.models.user import UserWriteModel
-from fairscape_mds.deps import getCurrentUser
+from fairscape_mds.deps import getCurrentUser, getOptionalUser
+from fairscape_mds.core.conditional import validatorHeaders, isNotModified
+from fairscape_mds.core.serialization import RawJSONResponse
 from typing import Optional, Annotated
 import json
-from rdflib import Graph
 
 resolverRequest = FairscapeResolverRequest(appConfig)
+rdfRequest = FairscapeRDFRequest(appConfig)
 identifierRequest = IdentifierRequest(appConfig)
 resolverRouter = APIRouter(prefix="", tags=['evi', 'rocrate'])
 
+def _negotiateFormat(accept: str) -> str:
+    return negotiateRDFFormat(accept) or "json"
+
+
 @resolverRouter.get("/ark:{NAAN}/{postfix}")
-def resolveARK(
+async def resolveARK(
     NAAN: str,
     postfix: str,
-    accept: Optional[str] = Header(default="application/json")
+    accept: Optional[str] = Header(default="application/json"),
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+    fields: Optional[str] = Query(default=None, description="Comma separated fields to return, e.g. @id,metadata.name")
 ):
     guid = f"ark:{NAAN}/{postfix}"
-    response = resolverRequest.resolveIdentifier(guid)
+    rdfFormat = _negotiateFormat(accept)
+
+    # projections only apply to the JSON representation
+    if rdfFormat in RDF_FORMATS:
+        fields = None
+    variant = f"{rdfFormat}:{fields}" if fields else rdfFormat
+
+    # answer revalidation from a projection before loading the document
+    versionInfo = await resolverRequest.getVersionInfoAsync(guid)
+    if versionInfo:
+        cacheHeaders = validatorHeaders(versionInfo, variant=variant)
+        cacheHeaders["Vary"] = "Accept"
+        if isNotModified(cacheHeaders, if_none_match, if_modified_since):
+            return Response(status_code=304, headers=cacheHeaders)
+    else:
+        cacheHeaders = {}
+
+    if rdfFormat in RDF_FORMATS:
+        # rdflib serialization is CPU bound, keep it off the event loop
+        rdfResponse = await run_in_threadpool(rdfRequest.getRDF, guid, rdfFormat, versionInfo)
+        if not rdfResponse.success:
+            return JSONResponse(
+                status_code=rdfResponse.statusCode,
+                content=rdfResponse.error
+            )
+
+        return Response(
+            content=rdfResponse.model,
+            status_code=rdfResponse.statusCode,
+            media_type=RDF_FORMATS[rdfFormat][1],
+            headers=cacheHeaders
+        )
+
+    if fields:
+        projected = await resolverRequest.findFieldsAsync(guid, fields)
+        if projected is not None:
+            if not projected.success:
+                return JSONResponse(
+                    status_code=projected.statusCode,
+                    content=projected.error
+                )
+            return RawJSONResponse(
+                content=projected.jsonResponse,
+                status_code=projected.statusCode,
+                headers=cacheHeaders
+            )
+
+    # stored documents are validated on write, reads encode them directly
+    response = await resolverRequest.resolveIdentifierRawAsync(guid)
     
     if not response.success:
         return JSONResponse(
             status_code=response.statusCode,
             content=response.error
         )
-    metadata = response.model.model_dump(mode='json', by_alias=True)
-
-    if isinstance(metadata, dict) and not metadata.get("metadata", {}).get("@context"):
-        if metadata.get('metadata',{}) == {}:
-            metadata['metadata'] = {}
-        metadata['metadata']["@context"] = {
-            "@vocab": "https://schema.org/",
-            "EVI": "https://w3id.org/EVI#"
+    metadata = response.jsonResponse
+
+    if isinstance(metadata, dict) and not (metadata.get("metadata") or {}).get("@context"):
+        metadata["metadata"] = {
+            **(metadata.get("metadata") or {}),
+            "@context": DEFAULT_CONTEXT
         }
-    
-    if "turtle" in accept.lower() or accept.lower() == "text/turtle":
-        g = Graph()
-        g.parse(data=metadata['metadata'], format='json-ld')
-        turtle_data = g.serialize(format='turtle')
-        return Response(
-            content=turtle_data,
-            status_code=response.statusCode,
-            media_type="text/turtle"
-        )
-    elif "rdf" in accept.lower() or accept.lower() == "application/rdf+xml":
-        g = Graph()
-        g.parse(data=metadata['metadata'], format='json-ld')
-        rdf_data = g.serialize(format='xml')
-        return Response(
-            content=rdf_data,
-            status_code=response.statusCode,
-            media_type="application/rdf+xml"
-        )
-    else:
-        # dicts including nans from statistic cause issues
-        return JSONResponse(
-            content=metadata,
-            status_code=response.statusCode,
-            media_type="application/json"
-        )
+
+    # orjson writes leftover non finite floats from statistics as null
+    return RawJSONResponse(
+        content=metadata,
+        status_code=response.statusCode,
+        headers=cacheHeaders
+    )
 
 
 @resolverRouter.get("/ark:/{NAAN}/{postfix}")
-def resolveARKWithSlash(
+async def resolveARKWithSlash(
     NAAN: str,
     postfix: str,
+    accept: Optional[str] = Header(default="application/json"),
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+    fields: Optional[str] = Query(default=None, description="Comma separated fields to return, e.g. @id,metadata.name")
+):
+    return await resolveARK(NAAN, postfix, accept, if_none_match, if_modified_since, fields)
+
+
+@resolverRouter.post("/resolve/batch")
+async def resolveBatch(
+    batchRequest: ResolveBatchRequest,
+    currentUser: Annotated[Optional[UserWriteModel], Depends(getOptionalUser)],
     accept: Optional[str] = Header(default="application/json")
 ):
-    return resolveARK(NAAN, postfix, accept)
+    """
+    Resolve many ARKs in one request.
+
+    Anonymous requests only see published identifiers, authenticated users
+    also see identifiers they own or share a group with. `fields` limits
+    each returned document to the listed dotted paths.
+
+    Responds with a JSON object mapping each requested ARK to its document,
+    or null when it is missing or not readable. With `Accept:
+    application/x-ndjson` the found documents are streamed one per line.
+    """
+    response = await resolverRequest.resolveBatchAsync(
+        batchRequest.guids,
+        user=currentUser,
+        fields=batchRequest.fields
+    )
+
+    if not response.success:
+        return JSONResponse(
+            status_code=response.statusCode,
+            content=response.error
+        )
+
+    if accept and "ndjson" in accept.lower():
+        return StreamingResponse(
+            iterBatchNDJSON(response.model),
+            media_type="application/x-ndjson"
+        )
+
+    return StreamingResponse(
+        iterBatchJSON(response.model),
+        media_type="application/json"
+    )
 
 
 @resolverRouter.put("/ark:/{NAAN}/{postfix}")
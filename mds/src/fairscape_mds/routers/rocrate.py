@@ -5,23 +5,28 @@ from typing import (
 from fastapi import (
 	APIRouter,
 	Depends,
+	Header,
 	HTTPException,
 	Request,
 	UploadFile,
 	Query
 )
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response, RedirectResponse
 from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
 
 import uuid
 import datetime
 
-from fairscape_mds.crud.rocrate import FairscapeROCrateRequest
+from fairscape_mds.crud.rocrate import FairscapeROCrateRequest, ROCRATE_CONTEXT
+from fairscape_mds.crud.rdf import RDF_FORMATS, iterNTriples, negotiateRDFFormat
 from fairscape_mds.crud.fairscape_request import flexible_ark_query
 
 from fairscape_mds.models.user import UserWriteModel
 from fairscape_mds.models.identifier import StoredIdentifier
-from fairscape_mds.core.config import appConfig
+from fairscape_mds.core.config import appConfig, rocrateStreamThreshold
+from fairscape_mds.core.conditional import validatorHeaders, isNotModified
+from fairscape_mds.core.pagination import MAX_PAGE_SIZE
 from fairscape_models.rocrate import ROCrateV1_2, ROCrateMetadataElem
 from fairscape_mds.deps import getCurrentUser
 from fairscape_mds.worker import celeryUploadROCrate, score_ai_ready_task, condense_rocrate_task
@@ -48,6 +53,13 @@ def _flexible_find(guid: str, projection=None):
 	return result
 
 
+def _convertToCroissant(rocrateMetadata: dict) -> dict:
+	source_crate = ROCrateV1_2(**rocrateMetadata)
+	croissant_converter = ROCToTargetConverter(source_crate, CROISSANT_MAPPING)
+	croissant_result = croissant_converter.convert()
+	return croissant_result.model_dump(by_alias=True, exclude_none=True)
+
+
 @rocrateRouter.post("/rocrate/upload-async")
 def uploadROCrate(
 	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)],
@@ -117,8 +129,21 @@ def publishMetadataOnly(
 )
 def list_rocrates_endpoint(
 	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)],
+	limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Max crates per page, every crate when neither limit nor cursor is given"),
+	cursor: Optional[str] = Query(default=None, description="Continuation token from nextCursor"),
 ):
-	fairscape_response = rocrateRequest.list_crates(requestingUser=currentUser)
+	"""
+	List the RO-Crates the current user may access.
+
+	Without `limit` or `cursor` every crate is returned in one response. With
+	either, at most `limit` crates (100 when only `cursor` is given) are
+	returned and `nextCursor` continues the listing.
+	"""
+	fairscape_response = rocrateRequest.list_crates(
+		requestingUser=currentUser,
+		limit=limit,
+		cursor=cursor
+	)
 
 	if fairscape_response.success:
 		return JSONResponse(
@@ -155,23 +180,44 @@ def getUploadStatus(
 
 @rocrateRouter.get("/rocrate/download/ark:/{NAAN}/{postfix}")
 @rocrateRouter.get("/rocrate/download/ark:{NAAN}/{postfix}")
-def getROCrateArchive(
+async def getROCrateArchive(
 	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)],
 	NAAN: str,
-	postfix: str
+	postfix: str,
+	range: Optional[str] = Header(default=None),
+	if_range: Optional[str] = Header(default=None)
 ):
 
 	rocrateGUID = f"ark:{NAAN}/{postfix}"
 
-	response = rocrateRequest.downloadROCrateArchive(
+	response = await rocrateRequest.downloadROCrateArchiveAsync(
 		currentUser,
-		rocrateGUID
+		rocrateGUID,
+		byteRange=range,
+		ifRange=if_range,
+		streamThreshold=rocrateStreamThreshold
 	)
+
+	if response.statusCode == 307:
+		return RedirectResponse(
+			url=response.jsonResponse["Location"],
+			status_code=307,
+			headers={"Cache-Control": "no-store"}
+		)
+
+	if response.statusCode == 416:
+		return Response(status_code=416, headers=response.jsonResponse)
 	
 	if response.success:
 
-		object_key = response.model.distribution.location.path
-		filename = pathlib.Path(object_key).name
+		if isinstance(response.fileResponse, dict):
+			object_key = response.model.distribution.location.path
+			filename = pathlib.Path(object_key).name
+			body = appConfig.aioMinioClient.iterBody(response.fileResponse['Body'], label=object_key)
+		else:
+			# no stored archive, the zip is assembled as it streams
+			filename = f"{postfix}.zip"
+			body = response.fileResponse
 
 		zip_headers = {
 			"Content-Type": "application/zip",
@@ -179,8 +225,9 @@ def getROCrateArchive(
 		}
 		
 		return StreamingResponse(
-			response.fileResponse,
-			headers=zip_headers
+			body,
+			status_code=response.statusCode,
+			headers={**zip_headers, **response.jsonResponse}
 		)
 
 	else:
@@ -200,11 +247,16 @@ def getROCrateArchive(
 	summary="Get a summary of RO-Crate contents",
 	response_description="Paginated list of datasets, software, computations, etc. with counts"
 )
-def getROCrateContentSummary(
+async def getROCrateContentSummary(
 	NAAN: str,
 	postfix: str,
 	limit: int = Query(default=10, ge=1, le=100, description="Max items per category"),
-	offset: int = Query(default=0, ge=0, description="Starting index for pagination")
+	offset: int = Query(default=0, ge=0, description="Starting index for pagination"),
+	category: Optional[str] = Query(default=None, description="Only return this category"),
+	name: Optional[str] = Query(default=None, description="Filter items by name (case insensitive substring)"),
+	cursor: Optional[str] = Query(default=None, description="Continuation token from pagination.nextCursors"),
+	if_none_match: Optional[str] = Header(default=None),
+	if_modified_since: Optional[str] = Header(default=None)
 ):
 	"""
 	Retrieve a lightweight summary of RO-Crate contents.
@@ -221,20 +273,35 @@ def getROCrateContentSummary(
 
 	Also includes total counts for each category.
 
-	Use `offset` and `limit` for pagination through large collections.
+	Use `offset` and `limit` for pagination through large collections,
+	or pass a token from `pagination.nextCursors` as `cursor` to fetch the
+	next page of a single category. `name` filters items in every returned
+	category and reports the filtered totals in `matchCounts`.
 	"""
 	guid = f"ark:{NAAN}/{postfix}"
 
-	response = rocrateRequest.getROCrateContentSummary(
+	versionInfo = await rocrateRequest.getVersionInfoAsync(guid)
+	if versionInfo:
+		cacheHeaders = validatorHeaders(versionInfo, variant=f"summary:{limit}:{offset}:{category}:{name}:{cursor}")
+		if isNotModified(cacheHeaders, if_none_match, if_modified_since):
+			return Response(status_code=304, headers=cacheHeaders)
+	else:
+		cacheHeaders = {}
+
+	response = await rocrateRequest.getROCrateContentSummaryAsync(
 		rocrateGUID=guid,
 		limit=limit,
-		offset=offset
+		offset=offset,
+		category=category,
+		name=name,
+		cursor=cursor
 	)
 
 	if response.success:
 		return JSONResponse(
 			status_code=200,
-			content=response.model
+			content=response.model,
+			headers=cacheHeaders
 		)
 	else:
 		return JSONResponse(
@@ -245,7 +312,7 @@ def getROCrateContentSummary(
 
 @rocrateRouter.get("/rocrate/ark:/{NAAN}/{postfix}")
 @rocrateRouter.get("/rocrate/ark:{NAAN}/{postfix}")
-def getROCrateMetadata(
+async def getROCrateMetadata(
 	request: Request,
 	NAAN: str,
 	postfix: str,
@@ -255,9 +322,58 @@ def getROCrateMetadata(
 	Supports content negotiation:  
 	- `application/json` (default, raw RO-Crate JSON)  
 	- `application/vnd.mlcommons-croissant+json` (Croissant JSON-LD)  
+	- `application/n-triples` / `application/n-quads` (streamed RDF)  
 	"""
 	guid = f"ark:{NAAN}/{postfix}"
-	response = rocrateRequest.getROCrateMetadata(guid)
+	accept_header = request.headers.get("accept", "application/json")
+	is_croissant = "application/vnd.mlcommons-croissant+json" in accept_header.lower()
+	rdf_format = negotiateRDFFormat(accept_header)
+	if rdf_format not in ("nt", "nquads"):
+		rdf_format = None
+
+	if is_croissant:
+		variant = "croissant"
+	else:
+		variant = rdf_format or "rocrate"
+
+	versionInfo = await rocrateRequest.getCrateVersionInfoAsync(guid)
+	if versionInfo:
+		cacheHeaders = validatorHeaders(versionInfo, variant=variant)
+		cacheHeaders["Vary"] = "Accept"
+		if isNotModified(
+			cacheHeaders,
+			request.headers.get("if-none-match"),
+			request.headers.get("if-modified-since")
+		):
+			return Response(status_code=304, headers=cacheHeaders)
+	else:
+		cacheHeaders = {}
+
+	if rdf_format:
+		# the triple stream is a sync generator, starlette iterates it in the threadpool
+		graphResponse = await run_in_threadpool(rocrateRequest.streamROCrateGraph, guid)
+		if not graphResponse.success:
+			return JSONResponse(
+				status_code=graphResponse.statusCode,
+				content=graphResponse.error
+			)
+
+		return StreamingResponse(
+			iterNTriples(
+				graphResponse.model,
+				ROCRATE_CONTEXT,
+				rdfFormat=rdf_format,
+				graphName=versionInfo.get("@id", guid) if versionInfo else guid
+			),
+			media_type=RDF_FORMATS[rdf_format][1],
+			headers=cacheHeaders
+		)
+
+	# croissant conversion needs the whole crate, otherwise large crates stream
+	response = await rocrateRequest.getROCrateMetadataAsync(
+		guid,
+		streamThreshold=None if is_croissant else rocrateStreamThreshold
+	)
 
 	if not response.success:
 		return JSONResponse(
@@ -265,17 +381,22 @@ def getROCrateMetadata(
 			content=response.error
 		)
 
-	accept_header = request.headers.get("accept", "application/json")
+	if response.fileResponse is not None:
+		return StreamingResponse(
+			response.fileResponse,
+			media_type="application/json",
+			headers=cacheHeaders
+		)
 
-	if "application/vnd.mlcommons-croissant+json" in accept_header.lower():
+	if is_croissant:
 		try:
-			source_crate = ROCrateV1_2(**response.model)
-			croissant_converter = ROCToTargetConverter(source_crate, CROISSANT_MAPPING)
-			croissant_result = croissant_converter.convert()
+			# validation and conversion are CPU bound, keep them off the event loop
+			croissant_content = await run_in_threadpool(_convertToCroissant, response.model)
 
 			return JSONResponse(
 				status_code=200,
-				content=croissant_result.model_dump(by_alias=True, exclude_none=True)
+				content=croissant_content,
+				headers=cacheHeaders
 			)
 		except Exception as e:
 			raise HTTPException(
@@ -285,7 +406,8 @@ def getROCrateMetadata(
 
 	return JSONResponse(
 		status_code=200,
-		content=response.model
+		content=response.model,
+		headers=cacheHeaders
 	)
 
 @rocrateRouter.get(
@@ -1,10 +1,11 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from fastapi.responses import JSONResponse
 from fairscape_mds.crud.schema import FairscapeSchemaRequest
 from fairscape_mds.models.user import UserWriteModel
 from fairscape_mds.core.config import appConfig
+from fairscape_mds.core.serialization import RawJSONResponse
 from fairscape_mds.deps import getCurrentUser
 from fairscape_models.schema import Schema
 
@@ -37,12 +38,16 @@ def createSchema(
 @schemaRouter.get("/schema/ark:{NAAN}/{postfix}")
 def getSchema(
 	NAAN: str,
-	postfix: str
+	postfix: str,
+	fields: Optional[str] = Query(default=None, description="Comma separated fields to return, e.g. @id,name")
 ):
 	schemaGUID = f"ark:{NAAN}/{postfix}"
-	response = schemaRequest.getSchema(schemaGUID)
+	response = schemaRequest.findFields(schemaGUID, fields, root="metadata") or schemaRequest.getSchema(schemaGUID)
 
-	if response.success:
+	if response.success and response.model is None:
+		return RawJSONResponse(content=response.jsonResponse)
+
+	elif response.success:
 		return response.model
 
 	else:
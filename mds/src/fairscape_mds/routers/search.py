@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Query, HTTPException
-from typing import Annotated
-from fairscape_mds.crud.search import FairscapeSearchRequest
-from fairscape_mds.models.search import SearchResults, SearchResultItem
+from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import Annotated, List, Optional
+from fairscape_mds.crud.search import FairscapeSearchRequest, MAX_SEARCH_LIMIT, MAX_AUTOCOMPLETE_LIMIT
+from fairscape_mds.models.search import SearchResults, SearchResultItem, AutocompleteResults
+from fairscape_mds.models.user import UserWriteModel
 from fairscape_mds.core.config import appConfig
-import httpx
-import asyncio
+from fairscape_mds.deps import getOptionalUser
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter(
     prefix="/search",
@@ -14,13 +15,25 @@ router = APIRouter(
 search_request_handler = FairscapeSearchRequest(appConfig)
 
 @router.get("/basic", response_model=SearchResults, summary="Perform a basic keyword search")
-def basic_search_route(
-    query: Annotated[str, Query(description="The search query string.")]
+async def basic_search_route(
+    currentUser: Annotated[Optional[UserWriteModel], Depends(getOptionalUser)],
+    query: Annotated[str, Query(description="The search query string, empty to browse by facets.")] = "",
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_LIMIT, description="Results per page.")] = 10,
+    offset: Annotated[int, Query(ge=0, description="Results to skip.")] = 0,
+    metadataType: Annotated[Optional[str], Query(alias="type", description="Only identifiers of this @type.")] = None,
+    publicationStatus: Annotated[Optional[str], Query(description="Only identifiers with this publication status.")] = None,
+    group: Annotated[Optional[str], Query(description="Only identifiers owned by this group.")] = None,
+    keyword: Annotated[Optional[str], Query(description="Only identifiers with this keyword.")] = None
 ):
-    if not query:
-        raise HTTPException(status_code=400, detail="Query parameter cannot be empty.")
-    
-    response = search_request_handler.basic_search(query_string=query)
+    filters = {
+        "type": metadataType,
+        "publicationStatus": publicationStatus,
+        "group": group,
+        "keywords": keyword
+    }
+    response = await search_request_handler.basic_search_async(
+        query_string=query, limit=limit, offset=offset, filters=filters, user=currentUser
+    )
     if response.success:
         return response.model
     else:
@@ -28,40 +41,30 @@ def basic_search_route(
 
 @router.get("/semantic", response_model=SearchResults, summary="Perform a semantic search")
 async def semantic_search_route(
-    query: Annotated[str, Query(description="The search query string.")]
+    currentUser: Annotated[Optional[UserWriteModel], Depends(getOptionalUser)],
+    query: Annotated[str, Query(description="The search query string.")],
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_LIMIT, description="Results per page.")] = 10,
+    offset: Annotated[int, Query(ge=0, description="Results to skip.")] = 0
 ):
     if not query:
         raise HTTPException(status_code=400, detail="Query parameter cannot be empty.")
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "http://test-fairscape-search-service:5050/api/search/semantic",
-                params={"query": query},
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                "query": data["query"],
-                "total_results": data["total_results"],
-                "results": [
-                    {
-                        "@id": result["id"],
-                        "type": None,
-                        "name": result.get("name", ""),
-                        "description": result.get("description", ""),
-                        "keywords": result.get("keywords", []),
-                        "score": result.get("score", 0.0)
-                    }
-                    for result in data["results"]
-                ],
-                "time_taken_ms": data["time_taken"] * 1000
-            }
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail=f"External search service unavailable: {str(e)}")
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=e.response.status_code, detail=f"Search service error: {e.response.text}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Semantic search failed: {str(e)}")
\ No newline at end of file
+
+    # embedding, the index sync and the matrix product all block
+    response = await run_in_threadpool(search_request_handler.semantic_search, query, limit, offset, currentUser)
+    if response.success:
+        return response.model
+    else:
+        raise HTTPException(status_code=response.statusCode, detail=response.error)
+
+
+@router.get("/autocomplete", response_model=AutocompleteResults, summary="Complete a search box prefix")
+async def autocomplete_route(
+    prefix: Annotated[str, Query(description="The text typed so far.")],
+    limit: Annotated[int, Query(ge=1, le=MAX_AUTOCOMPLETE_LIMIT, description="Completions to return.")] = 10,
+    kind: Annotated[Optional[List[str]], Query(description="Only completions of these kinds: name, keyword or ark.")] = None
+):
+    response = await run_in_threadpool(search_request_handler.autocomplete, prefix, limit, kind)
+    if response.success:
+        return response.model
+    else:
+        raise HTTPException(status_code=response.statusCode, detail=response.error)
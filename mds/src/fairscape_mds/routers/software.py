@@ -2,11 +2,12 @@ from fairscape_mds.crud.software import FairscapeSoftwareRequest
 from fairscape_mds.models.user import UserWriteModel
 from fairscape_mds.deps import getCurrentUser
 from fairscape_mds.core.config import appConfig
+from fairscape_mds.core.serialization import RawJSONResponse
 from fairscape_models.software import Software
 
-from typing import Annotated
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Query, Header
+from fastapi.responses import JSONResponse, StreamingResponse, Response, RedirectResponse
 import mimetypes
 
 softwareRequest = FairscapeSoftwareRequest(appConfig)
@@ -34,17 +35,31 @@ def createSoftware(
 
 
 @softwareRouter.get("/software/download/ark:{naan}/{postfix}")
-def getSoftwareContent(
+async def getSoftwareContent(
 	naan: str,
 	postfix: str,
-	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)]
+	currentUser: Annotated[UserWriteModel, Depends(getCurrentUser)],
+	range: Optional[str] = Header(default=None),
+	if_range: Optional[str] = Header(default=None)
 ):
 	softwareGUID = f"ark:{naan}/{postfix}"
-	softwareResponse = softwareRequest.getSoftwareContent(
+	softwareResponse = await softwareRequest.getSoftwareContentAsync(
 		userInstance=currentUser,
-		softwareGUID=softwareGUID
+		softwareGUID=softwareGUID,
+		byteRange=range,
+		ifRange=if_range
 	)
 
+	if softwareResponse.statusCode == 307:
+		return RedirectResponse(
+			url=softwareResponse.jsonResponse["Location"],
+			status_code=307,
+			headers={"Cache-Control": "no-store"}
+		)
+
+	if softwareResponse.statusCode == 416:
+		return Response(status_code=416, headers=softwareResponse.jsonResponse)
+
 	if softwareResponse.success:
 		software_instance = softwareResponse.model
 		object_key = software_instance.distribution.location.path
@@ -60,8 +75,9 @@ def getSoftwareContent(
 		}
 
 		return StreamingResponse(
-			softwareResponse.fileResponse['Body'],
-			headers=download_headers
+			appConfig.aioMinioClient.iterBody(softwareResponse.fileResponse['Body'], label=object_key),
+			status_code=softwareResponse.statusCode,
+			headers={**download_headers, **softwareResponse.jsonResponse}
 		)
 
 	else:
@@ -75,12 +91,16 @@ def getSoftwareContent(
 @softwareRouter.get("/software/ark:{NAAN}/{postfix}")
 def getSoftware(
 	NAAN: str,
-	postfix: str
+	postfix: str,
+	fields: Optional[str] = Query(default=None, description="Comma separated fields to return, e.g. @id,name")
 ):
 	softwareGUID = f"ark:{NAAN}/{postfix}"
-	response = softwareRequest.getSoftware(softwareGUID)
+	response = softwareRequest.findFields(softwareGUID, fields, root="metadata") or softwareRequest.getSoftware(softwareGUID)
 
-	if response.success:
+	if response.success and response.model is None:
+		return RawJSONResponse(content=response.jsonResponse)
+
+	elif response.success:
 		return response.model
 
 	else:
@@ -0,0 +1,87 @@
+"""Tests for the prefix completion collection in ``core/autocomplete.py``."""
+
+import mongomock
+
+from fairscape_mds.core.autocomplete import AutocompleteIndex, autocompleteEntries
+from fairscape_mds.tests.crud.utils import sequentialBulkWrite
+
+
+def _doc(guid, name, keywords=()):
+    return {"@id": guid, "metadata": {"name": name, "keywords": list(keywords)}}
+
+
+def _index(*docs):
+    index = AutocompleteIndex(sequentialBulkWrite(mongomock.MongoClient()["fairscape_test"]["autocomplete"]))
+    index.index(list(docs))
+    return index
+
+
+def _labels(completions):
+    return [(entry["kind"], entry["label"]) for entry in completions]
+
+
+def test_entries_cover_name_word_starts_keywords_and_the_ark():
+    entries = autocompleteEntries(_doc("ark:59852/cm4ai-images", "Cell  Atlas", ["Imaging"]))
+
+    terms = sorted((entry["kind"], entry["term"]) for entry in entries.values())
+    assert terms == [
+        ("ark", "cm4ai-images"),
+        ("keyword", "imaging"),
+        ("name", "atlas"),
+        ("name", "cell atlas"),
+    ]
+
+
+def test_prefixes_complete_in_term_order_without_repeating_a_name():
+    index = _index(
+        _doc("ark:59852/a", "Cell atlas", ["cells"]),
+        _doc("ark:59852/b", "Cellular atlas atlas", ["cells", "atlas"]),
+        _doc("ark:59852/c", "Voice recordings"),
+    )
+
+    assert _labels(index.complete("CELL")) == [("name", "Cell atlas"), ("keyword", "cells"), ("name", "Cellular atlas atlas")]
+    assert _labels(index.complete("atl", kinds=["name"])) == [("name", "Cell atlas"), ("name", "Cellular atlas atlas")]
+    assert index.complete("cells")[0]["count"] == 2
+    assert [entry["guid"] for entry in index.complete("ark:59852/c")] == ["ark:59852/c"]
+    assert index.complete("   ") == []
+
+
+def test_updates_and_removals_only_touch_changed_completions():
+    index = _index(
+        _doc("ark:59852/a", "Cell atlas", ["cells"]),
+        _doc("ark:59852/b", "Gene matrix", ["cells"]),
+    )
+
+    index.index([_doc("ark:59852/a", "Tissue atlas", ["tissue"])])
+    assert _labels(index.complete("cell")) == [("keyword", "cells")]
+    assert index.complete("cells")[0]["count"] == 1
+    assert _labels(index.complete("tis")) == [("keyword", "tissue"), ("name", "Tissue atlas")]
+
+    index.index([], removed=["ark:59852/b"])
+    assert index.complete("cell") == []
+    assert index.complete("gene") == []
+
+
+def test_stale_queue_and_lease():
+    index = _index()
+    index.markStale(["ark:59852/a", "", "ark:59852/a", "ark:59852/b"])
+
+    state = index.acquire()
+    assert state is not None
+    assert index.acquire() is None
+    assert sorted(index.takeStale()) == ["ark:59852/a", "ark:59852/b"]
+    assert index.takeStale() == []
+
+    index.release(watermark=42.0)
+    assert index.acquire()["watermark"] == 42.0
+
+
+def test_stale_marks_are_one_document_each():
+    index = _index()
+    index.markStale([f"ark:59852/{number}" for number in range(3)])
+    index.markStale(["ark:59852/1"])
+
+    assert index.collection.count_documents({"_id": {"$regex": "^stale:"}}) == 3
+    assert index.takeStale() == ["ark:59852/0", "ark:59852/1", "ark:59852/2"]
+    assert index.collection.count_documents({"_id": {"$regex": "^stale:"}}) == 0
+    assert index.complete("ark:59852/1") == []
@@ -0,0 +1,126 @@
+"""Tests for the shared metadata cache in ``core/cache.py``.
+
+``FakeRedis``, a small in-memory stand-in for the redis client, exercises
+the versioned keys and pub/sub invalidation without a redis server.
+"""
+
+import asyncio
+import datetime
+import threading
+import time
+
+from fairscape_mds.core.cache import MetadataCache, cacheVersion
+from fairscape_mds.tests.crud.utils import FakeRedis
+
+
+def test_disabled_cache_is_a_noop():
+    cache = MetadataCache()
+    cache.set("identifier", "ark:59853/a", {"@id": "ark:59853/a"}, version="v1")
+    assert not cache.enabled
+    assert cache.get("identifier", "ark:59853/a") is None
+
+
+def test_entries_are_shared_between_workers():
+    redisClient = FakeRedis()
+    workerA = MetadataCache(redisClient)
+    workerB = MetadataCache(redisClient)
+
+    doc = {"@id": "ark:59853/a", "dateModified": datetime.datetime(2024, 1, 1)}
+    workerA.set("identifier", "ark:59853/a", doc, version=doc["dateModified"])
+
+    cached = workerB.get("identifier", "ark:59853/a")
+    assert cached == {"@id": "ark:59853/a", "dateModified": "2024-01-01T00:00:00"}
+    assert workerB.entryKey("identifier", "ark:59853/a", "2024-01-01T00:00:00") in redisClient.store
+
+
+def test_invalidation_reaches_local_tier_of_other_workers():
+    redisClient = FakeRedis()
+    workerA = MetadataCache(redisClient)
+    workerB = MetadataCache(redisClient)
+
+    workerA.set("identifier", "ark:59853/a", {"name": "old"}, version="v1")
+    assert workerB.get("identifier", "ark:59853/a") == {"name": "old"}
+
+    workerA.invalidate("ark:59853/a")
+
+    assert workerB.get("identifier", "ark:59853/a") is None
+    assert workerA.get("identifier", "ark:59853/a") is None
+
+
+def test_cache_version_normalizes_dates():
+    assert cacheVersion(None) is None
+    assert cacheVersion("2024-01-01T00:00:00") == "2024-01-01T00:00:00"
+    assert cacheVersion(datetime.datetime(2024, 1, 1)) == "2024-01-01T00:00:00"
+
+
+def test_versioned_entries_use_local_tier_without_redis():
+    cache = MetadataCache()
+    cache.setVersion("rdf:turtle", "ark:59853/a", "v1", "<a> <b> <c> .")
+
+    assert cache.getVersion("rdf:turtle", "ark:59853/a", "v1") == "<a> <b> <c> ."
+    assert cache.getVersion("rdf:turtle", "ark:59853/a", "v2") is None
+    assert cache.get("rdf:turtle", "ark:59853/a") is None
+
+
+def test_versioned_entries_are_shared_between_workers():
+    redisClient = FakeRedis()
+    MetadataCache(redisClient).setVersion("rdf:xml", "ark:59853/a", "v1", "<rdf/>")
+
+    assert MetadataCache(redisClient).getVersion("rdf:xml", "ark:59853/a", "v1") == "<rdf/>"
+
+
+def test_a_read_that_raced_a_write_is_not_cached():
+    redisClient = FakeRedis()
+    reader = MetadataCache(redisClient)
+    writer = MetadataCache(redisClient)
+
+    # the reader misses and reads the old version from Mongo, the write lands before it caches
+    generation = reader.generation("ark:59853/a")
+    writer.invalidate("ark:59853/a")
+    reader.set("identifier", "ark:59853/a", {"name": "old"}, version="v1", generation=generation)
+
+    assert writer.get("identifier", "ark:59853/a") is None
+    assert reader.get("identifier", "ark:59853/a") is None
+
+    generation = reader.generation("ark:59853/a")
+    reader.set("identifier", "ark:59853/a", {"name": "new"}, version="v2", generation=generation)
+    assert writer.get("identifier", "ark:59853/a") == {"name": "new"}
+
+
+def test_local_entries_expire_without_an_invalidation_message(monkeypatch):
+    redisClient = FakeRedis()
+    cache = MetadataCache(redisClient, localTtl=60)
+    cache.set("identifier", "ark:59853/a", {"name": "old"}, version="v1")
+
+    # the pub/sub message for this write is lost
+    redisClient.store[cache.entryKey("identifier", "ark:59853/a", "v2")] = '{"name": "new"}'
+    redisClient.store[cache.versionKey("ark:59853/a")] = "v2"
+    assert cache.get("identifier", "ark:59853/a") == {"name": "old"}
+
+    now = time.monotonic()
+    monkeypatch.setattr("fairscape_mds.core.cache.time.monotonic", lambda: now + 61)
+    assert cache.get("identifier", "ark:59853/a") == {"name": "new"}
+
+
+def test_async_variants_read_redis_off_the_event_loop():
+    redisClient = FakeRedis()
+    threads = []
+    get = redisClient.get
+    redisClient.get = lambda key: threads.append(threading.current_thread()) or get(key)
+    cache = MetadataCache(redisClient)
+
+    async def roundTrip():
+        generation = await cache.generationAsync("ark:59853/a")
+        await cache.setAsync("identifier", "ark:59853/a", {"name": "a"}, version="v1", generation=generation)
+        cache._local.clear()
+        fromRedis = await cache.getAsync("identifier", "ark:59853/a")
+        readsBefore = len(threads)
+        fromLocal = await cache.getAsync("identifier", "ark:59853/a")
+        return fromRedis, fromLocal, readsBefore
+
+    fromRedis, fromLocal, readsBefore = asyncio.run(roundTrip())
+
+    assert fromRedis == fromLocal == {"name": "a"}
+    assert threads and threading.main_thread() not in threads
+    # local hits are answered without a Redis read
+    assert len(threads) == readsBefore
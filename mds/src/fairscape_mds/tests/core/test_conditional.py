@@ -0,0 +1,59 @@
+"""Tests for the conditional GET helpers in ``core/conditional.py``."""
+
+import datetime
+
+from fairscape_mds.core.conditional import (
+    computeETag,
+    formatLastModified,
+    isNotModified,
+    validatorHeaders,
+)
+
+
+VERSION_DOC = {
+    "@id": "ark:59853/rocrate-a",
+    "dateModified": "2024-03-01T12:30:00",
+    "publicationStatus": "PUBLISHED",
+}
+
+
+def test_etag_is_strong_and_varies_by_representation():
+    etag = computeETag(VERSION_DOC, variant="json")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == computeETag(dict(VERSION_DOC), variant="json")
+    assert etag != computeETag(VERSION_DOC, variant="turtle")
+
+
+def test_etag_changes_with_document_version():
+    bumped = {**VERSION_DOC, "dateModified": "2024-03-02T00:00:00"}
+    unpublished = {**VERSION_DOC, "publicationStatus": "DRAFT"}
+    assert computeETag(VERSION_DOC) != computeETag(bumped)
+    assert computeETag(VERSION_DOC) != computeETag(unpublished)
+
+
+def test_datetime_and_iso_string_versions_agree():
+    asDatetime = {**VERSION_DOC, "dateModified": datetime.datetime(2024, 3, 1, 12, 30)}
+    assert computeETag(asDatetime) == computeETag(VERSION_DOC)
+    assert formatLastModified(asDatetime) == "Fri, 01 Mar 2024 12:30:00 GMT"
+
+
+def test_if_none_match():
+    headers = validatorHeaders(VERSION_DOC, variant="json")
+    etag = headers["ETag"]
+    assert isNotModified(headers, etag, None)
+    assert isNotModified(headers, f'"other", W/{etag}', None)
+    assert isNotModified(headers, "*", None)
+    assert not isNotModified(headers, '"other"', None)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    headers = validatorHeaders(VERSION_DOC)
+    assert not isNotModified(headers, '"other"', "Sat, 02 Mar 2024 00:00:00 GMT")
+
+
+def test_if_modified_since():
+    headers = validatorHeaders(VERSION_DOC)
+    assert isNotModified(headers, None, "Fri, 01 Mar 2024 12:30:00 GMT")
+    assert isNotModified(headers, None, "Sat, 02 Mar 2024 00:00:00 GMT")
+    assert not isNotModified(headers, None, "Thu, 29 Feb 2024 00:00:00 GMT")
+    assert not isNotModified(headers, None, "not a date")
@@ -0,0 +1,59 @@
+"""Tests for the download redirect policy in ``core/downloads.py``."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from fairscape_mds.core.downloads import DownloadRedirect, insideArchive, parseRoutePolicies
+
+
+def test_parse_route_policies():
+    assert parseRoutePolicies("dataset=threshold, rocrate=ALWAYS,") == {
+        "dataset": "threshold", "rocrate": "always"
+    }
+    assert parseRoutePolicies(None) == {}
+    with pytest.raises(ValueError):
+        parseRoutePolicies("dataset=sometimes")
+    with pytest.raises(ValueError):
+        parseRoutePolicies("unknown=always")
+
+
+def test_should_redirect_by_route_and_size():
+    redirect = DownloadRedirect(
+        presignClient=MagicMock(),
+        routePolicies={"dataset": "threshold", "rocrate": "always"},
+        threshold=1000
+    )
+
+    assert redirect.shouldRedirect("rocrate")
+    assert not redirect.shouldRedirect("software")
+    assert redirect.shouldRedirect("dataset", 1000)
+    assert not redirect.shouldRedirect("dataset", 999)
+    assert not redirect.shouldRedirect("dataset", None)
+
+
+def test_archive_members_are_never_redirected():
+    redirect = DownloadRedirect(presignClient=MagicMock(), defaultPolicy="always")
+
+    assert insideArchive("uploads/user/crate.zip/crate/data.csv")
+    assert insideArchive("uploads/user/CRATE.ZIP/data.csv")
+    assert not insideArchive("uploads/user/crate.zip")
+    assert not insideArchive("uploads/user/crate/data.csv")
+    assert not redirect.shouldRedirect("dataset", 10, "uploads/user/crate.zip/crate/data.csv")
+    assert redirect.shouldRedirect("rocrate", None, "uploads/user/crate.zip")
+
+
+def test_redirect_disabled_without_presign_client():
+    assert DownloadRedirect(defaultPolicy="always").policy("dataset") == "never"
+
+
+def test_presigned_url_sets_download_headers():
+    client = MagicMock()
+    client.generate_presigned_url.return_value = "https://minio/signed"
+    redirect = DownloadRedirect(presignClient=client, expiresIn=60)
+
+    assert redirect.presignedURL("default", "a/b/data.csv", "data.csv") == "https://minio/signed"
+    _, kwargs = client.generate_presigned_url.call_args
+    assert kwargs["ExpiresIn"] == 60
+    assert kwargs["Params"]["ResponseContentDisposition"] == 'attachment; filename="data.csv"'
+    assert kwargs["Params"]["ResponseContentType"] == "text/csv"
@@ -0,0 +1,18 @@
+"""Tests for the continuation tokens in ``core/pagination.py``."""
+
+import pytest
+
+from fairscape_mds.core.pagination import InvalidCursor, decodeCursor, encodeCursor
+
+
+def test_cursor_round_trip():
+    state = {"rocrate": "ark:59853/a", "category": "datasets", "offset": 20, "name": None}
+    token = encodeCursor(state)
+    assert "=" not in token
+    assert decodeCursor(token) == state
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor", encodeCursor({"a": 1})[:-3] + "!!!", "WzFd"])
+def test_invalid_cursors(token):
+    with pytest.raises(InvalidCursor):
+        decodeCursor(token)
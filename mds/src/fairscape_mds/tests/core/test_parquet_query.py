@@ -0,0 +1,74 @@
+"""Tests for Parquet column/row subsetting in ``core/parquet_query.py``."""
+
+import asyncio
+import io
+
+import pytest
+
+pyarrow = pytest.importorskip("pyarrow")
+import pyarrow.ipc
+import pyarrow.parquet
+
+from fairscape_mds.core.parquet import ParquetObject
+from fairscape_mds.core.parquet_query import InvalidQuery, ParquetQuery
+from fairscape_mds.tests.core.test_preview import FakeS3
+
+
+@pytest.fixture
+def s3():
+    rows = 50000
+    table = pyarrow.table({
+        "id": list(range(rows)),
+        "site": [f"site-{i % 5}" for i in range(rows)],
+        "notes": [f"note {i} " * 10 for i in range(rows)],
+    })
+    buffer = io.BytesIO()
+    pyarrow.parquet.write_table(table, buffer, row_group_size=5000)
+    return FakeS3(buffer.getvalue())
+
+
+def _query(s3, **kwargs):
+    async def run():
+        parquetObject = await ParquetObject.open(s3, "bucket", "values.parquet")
+        query = ParquetQuery(parquetObject, **kwargs)
+        return query, b"".join([chunk async for chunk in query.stream()])
+    return asyncio.run(run())
+
+
+def test_statistics_skip_row_groups_and_columns(s3):
+    query, body = _query(
+        s3,
+        columns=["id", "site"],
+        filters=[("id", ">=", 12000), ("id", "<", 14000), ("site", "in", ["site-1"])],
+    )
+    result = pyarrow.ipc.open_stream(body).read_all()
+
+    assert query.rowGroups == [2]
+    assert result.schema.names == ["id", "site"]
+    assert result.num_rows == 400
+    assert set(result.column("site").to_pylist()) == {"site-1"}
+    # after the footer read, one row group without the notes column
+    assert sum(end - start + 1 for start, end in s3.ranges[1:]) < len(s3.data) // 20
+
+
+def test_csv_output_with_limit(s3):
+    query, body = _query(s3, columns=["id"], filters=[("site", "==", "site-3")], outputFormat="csv", limit=3)
+    assert body == b'"id"\n3\n8\n13\n'
+
+
+def test_no_matching_row_groups_still_sends_header(s3):
+    query, body = _query(s3, columns=["id"], filters=[("id", ">", 10 ** 9)], outputFormat="csv")
+    assert query.rowGroups == []
+    assert body == b'"id"\n'
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"columns": ["missing"]},
+    {"filters": [("missing", "==", 1)]},
+    {"filters": [("id", "==", "not a number")]},
+    {"filters": [("id", "in", [])]},
+    {"outputFormat": "xlsx"},
+])
+def test_invalid_queries(s3, kwargs):
+    with pytest.raises(InvalidQuery):
+        _query(s3, **kwargs)
@@ -0,0 +1,66 @@
+"""Tests for the permission query conditions in ``core/permissions.py``."""
+
+import itertools
+
+import mongomock
+
+from fairscape_mds.core.permissions import NO_ACCESS_FILTER, permissionFilter, restrictQuery
+from fairscape_mds.models.user import Permissions, UserWriteModel, checkPermissions
+
+
+def _user(email="alice@example.org", groups=()):
+    return UserWriteModel.model_validate({
+        "email": email, "firstName": "A", "lastName": "A", "password": "pw", "groups": list(groups)
+    })
+
+
+def _collection():
+    collection = mongomock.MongoClient()["fairscape_test"]["identifier"]
+    owners = ["alice@example.org", "bob@example.org"]
+    groups = [None, "lab", "other"]
+    statuses = ["PUBLISHED", "DRAFT"]
+    collection.insert_many([
+        {"@id": f"ark:59852/{index}", "publicationStatus": status, "permissions": {"owner": owner, "group": group}}
+        for index, (owner, group, status) in enumerate(itertools.product(owners, groups, statuses))
+    ])
+    return collection
+
+
+def _matching(collection, condition):
+    return {doc["@id"] for doc in collection.find(restrictQuery({}, condition))}
+
+
+def test_owned_and_group_condition_agrees_with_check_permissions():
+    collection = _collection()
+
+    for user in [_user(), _user(groups=["lab"]), _user("carol@example.org", groups=["lab", "other"])]:
+        expected = {
+            doc["@id"] for doc in collection.find()
+            if checkPermissions(Permissions.model_validate(doc["permissions"]), user)
+        }
+        assert _matching(collection, permissionFilter(user, "admins", published=False)) == expected
+
+
+def test_published_identifiers_are_readable_by_everyone():
+    collection = _collection()
+    published = {doc["@id"] for doc in collection.find({"publicationStatus": "PUBLISHED"})}
+
+    assert _matching(collection, permissionFilter(None)) == published
+    assert _matching(collection, permissionFilter(_user("carol@example.org"))) == published
+    assert published < _matching(collection, permissionFilter(_user(groups=["lab"])))
+
+
+def test_admins_are_unrestricted_and_anonymous_owners_see_nothing():
+    assert permissionFilter(_user(groups=["lab", "admins"]), "admins") is None
+    assert permissionFilter(_user(groups=["admins"])) is not None
+    assert permissionFilter(None, "admins", published=False) == NO_ACCESS_FILTER
+    assert _matching(_collection(), NO_ACCESS_FILTER) == set()
+
+
+def test_restrict_query_keeps_text_at_the_top_level():
+    condition = permissionFilter(_user())
+    text = {"$text": {"$search": "cells"}}
+
+    assert restrictQuery(text, condition) == {**text, **condition}
+    assert restrictQuery(text, None) is text
+    assert restrictQuery({"$or": [{"a": 1}]}, condition) == {"$and": [{"$or": [{"a": 1}]}, condition]}
@@ -0,0 +1,127 @@
+"""Tests for ranged dataset previews in ``core/preview.py`` and ``core/parquet.py``."""
+
+import asyncio
+import io
+import os
+
+import pytest
+
+from fairscape_mds.core import parquet as parquetModule
+from fairscape_mds.core.parquet import MissingRange, SparseObject, coalesceRanges
+from fairscape_mds.core.preview import (
+    InvalidPreview,
+    parseDelimitedPreview,
+    previewDelimited,
+    previewFormat,
+    previewParquet,
+)
+
+
+class FakeBody:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def read(self):
+        return self.data
+
+    def close(self):
+        pass
+
+
+class FakeS3:
+    """Serves one object and records the ranges requested."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.ranges = []
+
+    async def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self.data), "ETag": '"v1"'}
+
+    async def get_object(self, Bucket, Key, Range, IfMatch=None):
+        start, end = (int(value) for value in Range[len("bytes="):].split("-"))
+        self.ranges.append((start, end))
+        return {"Body": FakeBody(self.data[start:end + 1])}
+
+
+def test_preview_format_by_extension():
+    assert previewFormat("user/datasets/values.CSV") == "delimited"
+    assert previewFormat("user/datasets/values.parquet") == "parquet"
+    with pytest.raises(InvalidPreview):
+        previewFormat("user/datasets/image.png")
+
+
+def test_partial_last_record_is_not_returned():
+    data = b'id,note\n1,"first"\n2,"sec'
+    assert parseDelimitedPreview(data, ",", rows=2) is None
+
+    preview = parseDelimitedPreview(data, ",", rows=1, columns=["note"])
+    assert preview == {"columns": ["note"], "rows": [["first"]], "truncated": True}
+
+    with pytest.raises(InvalidPreview):
+        parseDelimitedPreview(data, ",", rows=1, columns=["missing"])
+
+
+def test_delimited_preview_reads_only_a_leading_range():
+    lines = ["id\tvalue"] + [f"{i}\t{'x' * 50}" for i in range(20000)]
+    data = "\n".join(lines).encode()
+    s3 = FakeS3(data)
+
+    preview = asyncio.run(previewDelimited(s3, "bucket", "values.tsv", len(data), '"v1"', rows=5))
+
+    assert preview["columns"] == ["id", "value"]
+    assert [row[0] for row in preview["rows"]] == ["0", "1", "2", "3", "4"]
+    assert preview["truncated"] is True
+    assert s3.ranges == [(0, 65535)]
+
+
+def test_delimited_preview_of_small_file_is_complete():
+    data = b"a,b\n1,2\n3,4\n"
+    preview = asyncio.run(previewDelimited(FakeS3(data), "bucket", "small.csv", len(data), None, rows=10))
+    assert preview["rows"] == [["1", "2"], ["3", "4"]]
+    assert preview["truncated"] is False
+
+
+def test_sparse_object_reads_held_ranges_only():
+    sparse = SparseObject(100)
+    sparse.add(10, b"abcdefghij")
+    sparse.add(15, b"fghijklmno")
+
+    sparse.seek(12)
+    assert sparse.read(10) == b"cdefghijkl"
+    assert sparse.has(10, 24)
+    assert not sparse.has(0, 10)
+    with pytest.raises(MissingRange):
+        sparse.seek(20)
+        sparse.read(10)
+
+
+def test_coalesce_ranges():
+    assert coalesceRanges([(100, 199), (0, 49), (60, 80)], gap=10) == [(0, 80), (100, 199)]
+    assert coalesceRanges([(0, 9), (5, 20)], gap=0) == [(0, 20)]
+
+
+def test_parquet_preview_reads_footer_and_selected_chunks():
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    table = pyarrow.table({
+        "id": list(range(10000)),
+        "label": [f"row-{i}" for i in range(10000)],
+        "payload": [os.urandom(200) for _ in range(10000)],
+    })
+    buffer = io.BytesIO()
+    pyarrow.parquet.write_table(table, buffer, row_group_size=1000, compression="none")
+    s3 = FakeS3(buffer.getvalue())
+
+    async def preview():
+        metadata = await s3.head_object(Bucket="bucket", Key="values.parquet")
+        return await previewParquet(s3, "bucket", "values.parquet", metadata, rows=3, columns=["id", "label"])
+
+    result = asyncio.run(preview())
+
+    assert result["columns"] == ["id", "label"]
+    assert result["rows"] == [[0, "row-0"], [1, "row-1"], [2, "row-2"]]
+    assert result["totalRows"] == 10000
+    # the payload column and later row groups were never fetched
+    assert sum(end - start + 1 for start, end in s3.ranges) < len(s3.data) // 10
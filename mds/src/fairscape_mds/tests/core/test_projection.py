@@ -0,0 +1,26 @@
+"""Tests for the ``fields=`` projection helpers in ``core/projection.py``."""
+
+import pytest
+
+from fairscape_mds.core.projection import InvalidProjection, fieldsProjection, parseFields
+
+
+def test_parse_fields_splits_and_dedupes():
+    assert parseFields("@id, metadata.name,metadata.name") == ["@id", "metadata.name"]
+    assert parseFields(["@type", "metadata.keywords,metadata.name"]) == [
+        "@type", "metadata.keywords", "metadata.name"
+    ]
+    assert parseFields(None) is None
+    assert parseFields(" , ") is None
+
+
+@pytest.mark.parametrize("fields", ["$where", "metadata.$", "_id", "_id.x", "metadata..name", ".name"])
+def test_parse_fields_rejects_operators(fields):
+    with pytest.raises(InvalidProjection):
+        parseFields(fields)
+
+
+def test_fields_projection_drops_nested_paths():
+    projection = fieldsProjection(["metadata.name", "metadata", "@type"])
+    assert projection == {"_id": False, "@id": True, "@type": True, "metadata": True}
+    assert fieldsProjection(None) is None
@@ -0,0 +1,96 @@
+"""Tests for Range / If-Range handling in ``core/ranges.py``."""
+
+import asyncio
+import datetime
+from unittest.mock import MagicMock
+
+import botocore.exceptions
+import pytest
+
+from fairscape_mds.crud.fairscape_request import FairscapeRequest
+
+from fairscape_mds.core.ranges import (
+    RangeNotSatisfiable,
+    contentRange,
+    ifRangeMatches,
+    objectHeaders,
+    parseRange,
+)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-200", (800, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=0-1,5-9", None),
+    ("items=0-1", None),
+    (None, None),
+])
+def test_parse_range(header, expected):
+    assert parseRange(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5-2", "bytes=-0"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parseRange(header, 1000)
+
+
+@pytest.mark.parametrize("header", ["bytes=-5", "bytes=0-"])
+def test_ranges_of_an_empty_object_are_unsatisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parseRange(header, 0)
+
+
+def test_if_range_validators():
+    modified = datetime.datetime(2024, 5, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+    headers = objectHeaders({"ETag": '"abc"', "LastModified": modified})
+
+    assert headers["Last-Modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+    assert ifRangeMatches(None, '"abc"')
+    assert ifRangeMatches('"abc"', '"abc"')
+    assert not ifRangeMatches('"other"', '"abc"')
+    assert not ifRangeMatches('W/"abc"', '"abc"')
+    assert ifRangeMatches(headers["Last-Modified"], '"abc"', modified)
+    assert not ifRangeMatches("Thu, 02 May 2024 12:00:00 GMT", '"abc"', modified)
+    assert contentRange(0, 99, 1000) == "bytes 0-99/1000"
+
+
+class OverwrittenS3:
+    """Heads one version of an object, then serves another."""
+
+    def __init__(self):
+        self.gets = []
+
+    async def head_object(self, Bucket, Key):
+        return {"ContentLength": 1000, "ETag": '"old"'}
+
+    async def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        self.gets.append((Range, IfMatch))
+        if IfMatch is not None and IfMatch != '"new"':
+            raise botocore.exceptions.ClientError(
+                {
+                    "Error": {"Code": "PreconditionFailed", "Message": "At least one of the pre-conditions you specified did not hold"},
+                    "ResponseMetadata": {"HTTPStatusCode": 412},
+                },
+                "GetObject",
+            )
+        return {"ContentLength": 1200, "ETag": '"new"', "Body": b""}
+
+
+def test_range_over_an_overwritten_object_serves_the_whole_object():
+    config = MagicMock()
+    config.aioMinioClient = OverwrittenS3()
+    config.minioBucket = "bucket"
+
+    response = asyncio.run(
+        FairscapeRequest(config).getObjectAsync("key", byteRange="bytes=0-99")
+    )
+
+    assert response.statusCode == 200
+    assert response.jsonResponse["ETag"] == '"new"'
+    assert response.jsonResponse["Content-Length"] == "1200"
+    assert "Content-Range" not in response.jsonResponse
+    assert config.aioMinioClient.gets == [("bytes=0-99", '"old"'), (None, None)]
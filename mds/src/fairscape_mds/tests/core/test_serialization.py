@@ -0,0 +1,30 @@
+"""Tests for the orjson based encoder in ``core/serialization.py``."""
+
+import datetime
+import json
+
+from fairscape_mds.core.serialization import dumpJSON
+
+
+def test_statistics_sentinels_and_non_finite_floats():
+    stats = {"mean": "NaN", "max": "INF", "min": "NINF", "std": float("nan"), "count": float("inf")}
+    assert json.loads(dumpJSON(stats)) == {
+        "mean": "NaN",
+        "max": "INF",
+        "min": "NINF",
+        "std": None,
+        "count": None,
+    }
+
+
+def test_stored_document_types():
+    document = {
+        "@id": "ark:59853/a",
+        "dateModified": datetime.datetime(2024, 1, 1, 12, 30),
+        "tags": {"b"},
+    }
+    assert json.loads(dumpJSON(document)) == {
+        "@id": "ark:59853/a",
+        "dateModified": "2024-01-01T12:30:00",
+        "tags": ["b"],
+    }
@@ -0,0 +1,89 @@
+"""Tests for the pipelined body streaming in ``core/streaming.py``."""
+
+import asyncio
+
+import pytest
+
+from fairscape_mds.core.streaming import DownloadStats, TransferMetrics, pipelineBody
+
+
+class FakeBody:
+    """Async body returning at most ``readSize`` bytes per read, like aiohttp."""
+
+    def __init__(self, data: bytes, readSize: int = 1000, failAfter=None):
+        self.data = data
+        self.readSize = readSize
+        self.failAfter = failAfter
+        self.offset = 0
+        self.reads = 0
+        self.closed = False
+
+    async def read(self, amount: int) -> bytes:
+        if self.failAfter is not None and self.offset >= self.failAfter:
+            raise ConnectionError("connection reset")
+        self.reads += 1
+        await asyncio.sleep(0)
+        chunk = self.data[self.offset:self.offset + min(amount, self.readSize)]
+        self.offset += len(chunk)
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+def _collect(body, **kwargs):
+    async def collect():
+        return [chunk async for chunk in pipelineBody(body, **kwargs)]
+    return asyncio.run(collect())
+
+
+def test_chunks_are_coalesced_to_fixed_size():
+    data = bytes(range(256)) * 100
+    body = FakeBody(data, readSize=100)
+    metrics = TransferMetrics(label="test")
+
+    chunks = _collect(body, chunkSize=4096, readAhead=2, metrics=metrics)
+
+    assert b"".join(chunks) == data
+    assert [len(chunk) for chunk in chunks[:-1]] == [4096] * (len(chunks) - 1)
+    assert body.closed
+    assert metrics.completed and metrics.bytes == len(data) and metrics.chunks == len(chunks)
+
+
+def test_read_ahead_is_bounded():
+    body = FakeBody(b"x" * 100000, readSize=1000)
+
+    async def consumeOne():
+        stream = pipelineBody(body, chunkSize=1000, readAhead=2)
+        await stream.__anext__()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        readsBeforeClose = body.reads
+        await stream.aclose()
+        return readsBeforeClose
+
+    # one chunk consumed, two queued and one blocked on the full queue
+    assert asyncio.run(consumeOne()) <= 4
+    assert body.closed
+
+
+def test_source_errors_reach_the_consumer():
+    body = FakeBody(b"x" * 10000, readSize=1000, failAfter=3000)
+    with pytest.raises(ConnectionError):
+        _collect(body, chunkSize=1000)
+    assert body.closed
+
+
+def test_download_stats_aggregate():
+    stats = DownloadStats()
+    done = TransferMetrics(bytes=1048576, completed=True)
+    done.finished = done.started + 1.0
+    aborted = TransferMetrics(bytes=0)
+    aborted.finished = aborted.started + 1.0
+
+    stats.record(done)
+    stats.record(aborted)
+
+    assert stats.snapshot() == {
+        "transfers": 2, "aborted": 1, "bytes": 1048576, "meanThroughputMiBps": 0.5
+    }
@@ -0,0 +1,80 @@
+"""Tests for the platform upload streams in ``core/upload_stream.py``."""
+
+import email.parser
+import email.policy
+import io
+
+from fairscape_mds.core.upload_stream import (
+    MultipartFileStream,
+    ProgressReader,
+    S3UploadSource,
+    UploadProgress,
+)
+
+
+class FakeBody(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, amount=-1):
+        data = super().read(amount)
+        self.reads.append(len(data))
+        return data
+
+
+class FakeS3:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.requests = []
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self.data)}
+
+    def get_object(self, Bucket, Key, Range=None):
+        self.requests.append(Range)
+        data = self.data
+        if Range:
+            start, end = Range[len("bytes="):].split("-")
+            data = data[int(start):int(end) + 1 if end else None]
+        return {"Body": FakeBody(data)}
+
+
+def test_multipart_stream_is_a_valid_form_with_exact_length():
+    payload = b"PK\x03\x04" + bytes(range(256)) * 100
+    stream = MultipartFileStream("file", "crate.zip", FakeBody(payload), len(payload), "application/zip")
+
+    body = b"".join(iter(lambda: stream.read(1000), b""))
+    assert len(body) == len(stream)
+
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {stream.contentType}\r\n\r\n".encode() + body
+    )
+    (part,) = list(message.iter_parts())
+    assert part.get_filename() == "crate.zip"
+    assert part.get_param("name", header="content-disposition") == "file"
+    assert part.get_content() == payload
+
+
+def test_progress_reader_reads_bounded_chunks_and_reports():
+    reports = []
+    payload = b"x" * 10000
+    body = FakeBody(payload)
+    progress = UploadProgress(len(payload), report=lambda uploaded, state: reports.append(uploaded), interval=4000)
+    reader = ProgressReader(body, len(payload), progress, chunkSize=1500)
+
+    assert len(reader) == len(payload)
+    assert b"".join(reader) == payload
+    assert max(body.reads) <= 1500
+    assert progress.uploaded == len(payload)
+    assert reports == [4500, 9000]
+
+
+def test_s3_source_ranges():
+    client = FakeS3(b"0123456789")
+    source = S3UploadSource(client, "bucket", "key")
+
+    assert source.size == 10
+    assert source.open(2, 5).read() == b"2345"
+    assert b"".join(source.iterChunks(3)) == b"0123456789"
+    assert client.requests == ["bytes=2-5", None]
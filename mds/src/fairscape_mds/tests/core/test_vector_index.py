@@ -0,0 +1,129 @@
+"""Tests for the memory mapped vector index in ``core/vector_index.py``."""
+
+import mongomock
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from fairscape_mds.core.vector_index import INITIAL_CAPACITY, HashingEmbedder, SemanticIndex, VectorIndex, loadEmbedder
+from fairscape_mds.tests.crud.utils import sequentialBulkWrite
+
+
+TEXTS = {
+    "ark:59852/cells": "Cell line images of stained fibroblasts",
+    "ark:59852/genes": "Gene expression matrix of fibroblast cell lines",
+    "ark:59852/audio": "Voice recordings for speech pathology screening",
+    "ark:59852/ecg": "Electrocardiogram waveforms from a wearable device",
+}
+
+
+@pytest.fixture
+def embedder():
+    return HashingEmbedder()
+
+
+@pytest.fixture
+def index(tmp_path, embedder):
+    index = VectorIndex(tmp_path / "semantic", embedder.dimensions, embedder.name)
+    index.upsert(list(TEXTS), embedder.embed(list(TEXTS.values())))
+    return index
+
+
+def _search(index, embedder, text, k=10, **kwargs):
+    return index.search(embedder.embed([text])[0], k, **kwargs)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized(embedder):
+    first = embedder.embed(["Fibroblast cell lines", ""])
+    second = HashingEmbedder().embed(["fibroblast cell line"])
+
+    assert first.dtype == numpy.float32
+    assert numpy.isclose(numpy.linalg.norm(first[0]), 1.0)
+    assert not first[1].any()
+    # case and plurals fold to the same features
+    assert numpy.allclose(first[0], second[0])
+
+
+def test_search_ranks_by_similarity_and_counts_matches(index, embedder):
+    hits, total = _search(index, embedder, "stained fibroblasts", k=1)
+
+    assert total == 2
+    assert [guid for guid, _ in hits] == ["ark:59852/cells"]
+    assert 0 < hits[0][1] <= 1
+
+
+def test_upsert_overwrites_rows_and_remove_hides_them(index, embedder):
+    index.upsert(["ark:59852/audio"], embedder.embed(["fibroblast cells in speech"]))
+    assert index.rows == len(TEXTS)
+    assert "ark:59852/audio" in [guid for guid, _ in _search(index, embedder, "fibroblast")[0]]
+
+    assert index.remove(["ark:59852/audio", "ark:59852/unknown"]) == 1
+    hits, total = _search(index, embedder, "speech")
+    assert hits == [] and total == 0
+
+
+def test_other_instances_see_writes_and_growth(index, embedder, tmp_path):
+    reader = VectorIndex(tmp_path / "semantic", embedder.dimensions, embedder.name)
+    assert reader.refresh() and reader.rows == len(TEXTS)
+
+    guids = [f"ark:59852/bulk-{i}" for i in range(INITIAL_CAPACITY + 10)]
+    index.upsert(guids, embedder.embed([f"bulk record {i}" for i in range(len(guids))]), watermark=123.0)
+
+    hits, _ = _search(reader, embedder, "bulk record 1030", k=1)
+    assert hits[0][0] == "ark:59852/bulk-1030"
+    assert reader.watermark == 123.0
+
+
+def test_a_new_model_starts_an_empty_index(index, tmp_path):
+    other = VectorIndex(tmp_path / "semantic", 4, "another-model")
+
+    assert not other.refresh()
+    other.upsert(["ark:59852/new"], numpy.full((1, 4), 0.5, dtype=numpy.float32))
+    assert other.rows == 1
+    assert not index.refresh()
+
+
+def test_inverted_file_search_matches_exact_search(tmp_path, embedder):
+    index = VectorIndex(tmp_path / "ivf", embedder.dimensions, embedder.name)
+    texts = [f"topic {i % 20} sample {i}" for i in range(2000)]
+    index.upsert([f"ark:59852/{i}" for i in range(len(texts))], embedder.embed(texts))
+    exact, exactTotal = _search(index, embedder, "topic 7 sample 7", k=5)
+
+    lists = index.train(lists=16)
+    assert lists == 16
+    probed, probedTotal = _search(index, embedder, "topic 7 sample 7", k=5, nprobe=16)
+    assert probed == exact and probedTotal == exactTotal
+
+    # rows written after training are assigned to a list right away
+    index.upsert(["ark:59852/late"], embedder.embed(["a late arrival about glaciers"]))
+    hits, _ = _search(index, embedder, "a late arrival about glaciers", k=1, nprobe=1)
+    assert hits[0][0] == "ark:59852/late"
+
+
+def test_built_flag_is_shared_by_other_instances(index, embedder, tmp_path):
+    reader = VectorIndex(tmp_path / "semantic", embedder.dimensions, embedder.name)
+    reader.refresh()
+    assert not reader.built
+
+    index.markBuilt()
+    reader.refresh()
+    assert index.built and reader.built
+
+
+def test_stale_queue_is_shared_through_mongo(tmp_path):
+    collection = sequentialBulkWrite(mongomock.MongoClient()["fairscape_test"]["semantic_stale"])
+    writer = SemanticIndex(tmp_path / "worker", collection)
+    reader = SemanticIndex(tmp_path / "api", collection)
+    writer.markStale(["ark:59852/cells", "", "ark:59852/cells", "ark:59852/ecg"])
+
+    assert reader.takeStale() == ["ark:59852/cells", "ark:59852/ecg"]
+    assert reader.takeStale() == []
+    assert not (tmp_path / "worker").exists()
+
+
+def test_load_embedder_validates_factories():
+    assert isinstance(loadEmbedder("hashing", 64), HashingEmbedder)
+    with pytest.raises(ValueError):
+        loadEmbedder("not-a-factory")
+    with pytest.raises(ValueError):
+        loadEmbedder("collections:OrderedDict")
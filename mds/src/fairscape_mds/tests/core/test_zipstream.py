@@ -0,0 +1,93 @@
+"""Tests for the streaming ZIP64 writer in ``core/zipstream.py``."""
+
+import asyncio
+import datetime
+import io
+import zipfile
+
+from fairscape_mds.core.zipstream import ZipMember, streamZip
+
+
+def _source(data: bytes, chunkSize: int = 1000, log=None, name=""):
+    async def open_():
+        if log is not None:
+            log.append(f"open {name}")
+
+        async def iterate():
+            for start in range(0, len(data), chunkSize):
+                await asyncio.sleep(0)
+                yield data[start:start + chunkSize]
+        return iterate()
+    return open_
+
+
+def _archive(members, **kwargs) -> bytes:
+    async def collect():
+        return b"".join([chunk async for chunk in streamZip(members, **kwargs)])
+    return asyncio.run(collect())
+
+
+def test_archive_reads_back_with_zipfile():
+    modified = datetime.datetime(2024, 5, 1, 12, 30, 10)
+    payload = bytes(range(256)) * 400
+    archive = _archive([
+        ZipMember("ro-crate-metadata.json", b'{"@graph": []}', modified),
+        ZipMember("data/values.bin", _source(payload)),
+        ZipMember("data/empty.txt", b""),
+    ])
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zipped:
+        assert zipped.testzip() is None
+        assert zipped.namelist() == ["ro-crate-metadata.json", "data/values.bin", "data/empty.txt"]
+        assert zipped.read("data/values.bin") == payload
+        assert zipped.read("data/empty.txt") == b""
+        assert zipped.getinfo("ro-crate-metadata.json").date_time == (2024, 5, 1, 12, 30, 10)
+
+
+def test_members_can_come_from_an_async_iterable():
+    pulled = []
+
+    async def members():
+        for name in ["one.txt", "two.txt"]:
+            pulled.append(name)
+            yield ZipMember(name, name.encode())
+
+    archive = _archive(members())
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zipped:
+        assert zipped.namelist() == ["one.txt", "two.txt"]
+        assert zipped.read("two.txt") == b"two.txt"
+    assert pulled == ["one.txt", "two.txt"]
+
+
+def test_failed_and_duplicate_members_are_skipped():
+    async def broken():
+        raise FileNotFoundError("NoSuchKey")
+
+    archive = _archive([
+        ZipMember("a.txt", b"first"),
+        ZipMember("missing.txt", broken),
+        ZipMember("a.txt", b"second"),
+    ])
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zipped:
+        assert zipped.namelist() == ["a.txt"]
+        assert zipped.read("a.txt") == b"first"
+
+
+def test_next_member_opens_before_current_finishes():
+    log = []
+
+    async def collect():
+        stream = streamZip([
+            ZipMember("one", _source(b"1" * 5000, log=log, name="one")),
+            ZipMember("two", _source(b"2" * 5000, log=log, name="two")),
+        ])
+        await stream.__anext__()  # local header of one
+        await stream.__anext__()  # first chunk of one
+        await asyncio.sleep(0)
+        opened = list(log)
+        await stream.aclose()
+        return opened
+
+    assert asyncio.run(collect()) == ["open one", "open two"]
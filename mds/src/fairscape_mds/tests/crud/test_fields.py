@@ -0,0 +1,53 @@
+"""Mongomock-backed tests for ``FairscapeRequest.findFields`` projections."""
+
+from __future__ import annotations
+
+import asyncio
+
+import mongomock
+from unittest.mock import MagicMock
+
+from fairscape_mds.crud.fairscape_request import FairscapeRequest
+from fairscape_mds.tests.crud.utils import AsyncCollection
+
+
+GUID = "ark:59853/dataset-fields"
+
+
+def _request() -> FairscapeRequest:
+    cfg = MagicMock()
+    client = mongomock.MongoClient()
+    cfg.identifierCollection = client["fairscape_test"]["identifier"]
+    cfg.aioIdentifierCollection = AsyncCollection(cfg.identifierCollection)
+    cfg.identifierCollection.insert_one({
+        "@id": GUID,
+        "@type": "https://w3id.org/EVI#Dataset",
+        "descriptiveStatistics": {"column": {"mean": 1.0}},
+        "metadata": {"@id": GUID, "name": "fields", "description": "d", "keywords": ["a"]},
+    })
+    return FairscapeRequest(cfg)
+
+
+def test_find_fields_projects_stored_document():
+    response = _request().findFields(GUID, "@type,metadata.name")
+
+    assert response.jsonResponse == {
+        "@id": GUID,
+        "@type": "https://w3id.org/EVI#Dataset",
+        "metadata": {"name": "fields"},
+    }
+
+
+def test_find_fields_relative_to_root():
+    response = _request().findFields(GUID, ["name", "keywords"], root="metadata")
+    assert response.jsonResponse == {"@id": GUID, "name": "fields", "keywords": ["a"]}
+
+
+def test_find_fields_without_fields_falls_back():
+    request = _request()
+    assert request.findFields(GUID, None) is None
+    assert request.findFields(GUID, "$where").statusCode == 400
+    assert request.findFields("ark:59853/missing", "@id").statusCode == 404
+    assert asyncio.run(request.findFieldsAsync(GUID, "metadata.name")).jsonResponse == {
+        "@id": GUID, "metadata": {"name": "fields"}
+    }
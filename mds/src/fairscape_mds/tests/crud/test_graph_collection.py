@@ -0,0 +1,254 @@
+"""Mongomock-backed tests for the batched graph collection in ``core/graph.py``.
+
+Covers ``FairscapeAIReadyScoreRequest.build_metadata_graph_for_rocrate`` and
+``FairscapeCondensationRequest.build_full_graph_for_rocrate`` with both the
+batched BFS and the ``$graphLookup`` traversal over the edge index.
+"""
+
+from __future__ import annotations
+
+import time
+
+import mongomock
+from unittest.mock import MagicMock
+
+from fairscape_mds.core.graph import EdgeIndex, collectGraph
+from fairscape_mds.crud.AIReady import FairscapeAIReadyScoreRequest
+from fairscape_mds.crud.computation import FairscapeComputationRequest
+from fairscape_mds.crud import condensation
+from fairscape_mds.crud.condensation import FairscapeCondensationRequest, sync_provenance_edges
+from fairscape_mds.crud.fairscape_request import invalidateCachedMetadata
+from fairscape_mds.models.user import UserWriteModel
+from fairscape_models.computation import Computation
+from fairscape_mds.tests.crud.utils import sequentialBulkWrite
+
+ROCRATE = ["https://w3id.org/EVI#Dataset", "https://w3id.org/EVI#ROCrate"]
+DATASET = ["prov:Entity", "https://w3id.org/EVI#Dataset"]
+
+
+class CountingCollection:
+    """Counts the find and aggregate queries sent to a mongomock collection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.queries = 0
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def find(self, *args, **kwargs):
+        self.queries += 1
+        return self.collection.find(*args, **kwargs)
+
+    def aggregate(self, *args, **kwargs):
+        self.queries += 1
+        return self.collection.aggregate(*args, **kwargs)
+
+
+def _insert(collection, guid, metadataType, **metadata):
+    collection.insert_one({
+        "@id": guid,
+        "@type": metadataType,
+        "publicationStatus": "PUBLISHED",
+        "permissions": {"owner": "a@example.org", "group": None},
+        "metadata": {"@id": guid, "@type": metadataType[-1], "name": guid, **metadata},
+    })
+
+
+def _config(edges=False, built=True):
+    database = mongomock.MongoClient()["fairscape_test"]
+    collection = database["identifier"]
+    parts = [{"@id": f"ark:59852/part-{index}"} for index in range(30)]
+    _insert(
+        collection, "ark:59852/release", ROCRATE,
+        hasPart=[{"@id": "ark:59852/crate"}, {"@id": "ark:59852/missing"}],
+        **{"rai:dataBiases": "none known"}
+    )
+    _insert(collection, "ark:59852/crate", ROCRATE, hasPart=parts, outputs=[{"@id": "ark:59852/output"}])
+    for index, part in enumerate(parts):
+        _insert(
+            collection, part["@id"], DATASET,
+            contentSize="1 MB", format="csv", md5="abc" if index % 2 else None,
+            description="x" * 1000, generatedBy=[{"@id": "ark:59852/computation"}]
+        )
+    _insert(collection, "ark:59852/output", DATASET, hasPart=[{"@id": "ark:59852/release"}])
+    _insert(collection, "ark:59852/computation", ["prov:Activity", "https://w3id.org/EVI#Computation"])
+
+    config = MagicMock()
+    config.identifierCollection = CountingCollection(collection)
+    config.semanticIndex = None
+    config.autocompleteIndex = None
+    config.provenanceEdges = None
+    if edges:
+        config.provenanceEdges = EdgeIndex(CountingCollection(sequentialBulkWrite(database["provenance_edges"])))
+        if built:
+            # as the startup build does
+            sync_provenance_edges(config)
+            config.identifierCollection.queries = 0
+            config.provenanceEdges.collection.queries = 0
+    return config
+
+
+def _ids(graph):
+    return sorted(entity["@id"] for entity in graph)
+
+
+def test_ai_ready_graph_is_read_a_level_at_a_time():
+    config = _config()
+
+    graph = FairscapeAIReadyScoreRequest(config).build_metadata_graph_for_rocrate("ark:59852/release")
+
+    ids = [entity["@id"] for entity in graph]
+    assert ids[:2] == ["ark:59852/release", "ark:59852/crate"]
+    # outputs are followed from crates, cycles back to the release are not
+    assert sorted(ids[2:]) == sorted(["ark:59852/output"] + [f"ark:59852/part-{index}" for index in range(30)])
+    assert config.identifierCollection.queries == 3
+
+    root, part = graph[0], next(entity for entity in graph if entity["@id"] == "ark:59852/part-1")
+    assert root["rai:dataBiases"] == "none known" and root["publicationStatus"] == "PUBLISHED"
+    # members carry the scored fields only
+    assert "description" not in part and "generatedBy" not in part
+    assert part["contentSize"] == "1 MB" and part["format"] == "csv" and part["md5"] == "abc"
+
+
+def test_condensation_graph_follows_every_ark_reference_in_batches(monkeypatch):
+    monkeypatch.setattr("fairscape_mds.crud.condensation._BATCH_SIZE", 8)
+    config = _config()
+
+    graph = FairscapeCondensationRequest(config).build_full_graph_for_rocrate("ark:59852/release")
+
+    ids = {entity["@id"] for entity in graph}
+    assert "ark:59852/computation" in ids and "ark:59852/missing" not in ids
+    assert len(ids) == len(graph) == 34
+    assert "permissions" not in graph[0]
+    # release, crate, 4 batches of parts and output, computation
+    assert config.identifierCollection.queries == 1 + 1 + 4 + 1
+
+
+def test_depth_limit_and_unknown_roots():
+    config = _config()
+
+    collected = collectGraph(
+        config.identifierCollection.collection,
+        ["ark:59852/release", "ark:59852/unknown", ""],
+        lambda doc: [part["@id"] for part in doc.get("metadata", {}).get("hasPart", [])],
+        maxDepth=1
+    )
+
+    assert list(collected) == ["ark:59852/release", "ark:59852/crate"]
+
+
+def test_graph_lookup_matches_the_batched_bfs():
+    bfs = FairscapeCondensationRequest(_config()).build_full_graph_for_rocrate("ark:59852/release")
+    config = _config(edges=True)
+    request = FairscapeCondensationRequest(config)
+
+    graph = request.build_full_graph_for_rocrate("ark:59852/release")
+    assert _ids(graph) == _ids(bfs)
+    assert graph[0]["@id"] == "ark:59852/release"
+
+    # once the edges are in sync the expansion is one aggregation and a batch of
+    # finds, next to the sync's read of the empty stale queue
+    queries = config.identifierCollection.queries, config.provenanceEdges.collection.queries
+    request.build_full_graph_for_rocrate("ark:59852/release")
+    assert config.identifierCollection.queries - queries[0] == 1 + 1
+    assert config.provenanceEdges.collection.queries - queries[1] == 1 + 1
+
+
+def test_traversals_use_the_batched_bfs_until_the_edges_are_built(monkeypatch):
+    started = []
+    monkeypatch.setattr(condensation, "sync_in_background", lambda sync, config, lock: started.append(sync))
+    config = _config(edges=True, built=False)
+    request = FairscapeCondensationRequest(config)
+
+    bfs = FairscapeCondensationRequest(_config()).build_full_graph_for_rocrate("ark:59852/release")
+    assert _ids(request.build_full_graph_for_rocrate("ark:59852/release")) == _ids(bfs)
+    assert started == [sync_provenance_edges]
+    assert config.provenanceEdges.collection.queries == 0
+
+    sync_provenance_edges(config)
+    assert config.provenanceEdges.ready()
+    assert _ids(request.build_full_graph_for_rocrate("ark:59852/release")) == _ids(bfs)
+    assert started == [sync_provenance_edges]
+
+
+def test_graph_lookup_bounds_fields_and_depth():
+    request = FairscapeCondensationRequest(_config(edges=True))
+
+    parts = request.build_full_graph_for_rocrate("ark:59852/crate", fields=["hasPart"])
+    assert _ids(parts) == _ids(FairscapeCondensationRequest(_config()).build_full_graph_for_rocrate("ark:59852/crate", fields=["hasPart"]))
+    assert "ark:59852/computation" not in _ids(parts) and "ark:59852/output" not in _ids(parts)
+
+    assert _ids(request.build_full_graph_for_rocrate("ark:59852/release", max_depth=1)) == ["ark:59852/crate", "ark:59852/release"]
+    assert "ark:59852/computation" not in _ids(request.build_full_graph_for_rocrate("ark:59852/release", max_depth=2))
+    assert "ark:59852/computation" in _ids(request.build_full_graph_for_rocrate("ark:59852/release", max_depth=3))
+
+
+def test_unindexed_fields_use_the_batched_bfs():
+    config = _config(edges=True)
+    config.identifierCollection.collection.update_one(
+        {"@id": "ark:59852/crate"}, {"$set": {"metadata.citation": [{"@id": "ark:59852/computation"}]}}
+    )
+
+    graph = FairscapeCondensationRequest(config).build_full_graph_for_rocrate("ark:59852/crate", fields=["citation"])
+
+    assert _ids(graph) == ["ark:59852/computation", "ark:59852/crate"]
+    assert config.provenanceEdges.collection.queries == 0
+
+
+def test_invalidated_identifiers_update_their_edges():
+    config = _config(edges=True)
+    request = FairscapeCondensationRequest(config)
+    assert "ark:59852/computation" in _ids(request.build_full_graph_for_rocrate("ark:59852/crate"))
+
+    collection = config.identifierCollection.collection
+    collection.update_many({"metadata.generatedBy": {"$exists": True}}, {"$unset": {"metadata.generatedBy": ""}})
+    collection.delete_one({"@id": "ark:59852/output"})
+    invalidateCachedMetadata(config, [f"ark:59852/part-{index}" for index in range(30)] + ["ark:59852/output"])
+
+    graph = request.build_full_graph_for_rocrate("ark:59852/crate")
+    assert "ark:59852/computation" not in _ids(graph) and "ark:59852/output" not in _ids(graph)
+    assert config.provenanceEdges.collection.count_documents({"source": "ark:59852/output"}) == 0
+
+
+def test_edge_stale_marks_do_not_grow_the_state_document():
+    config = _config(edges=True)
+    collection = config.provenanceEdges.collection
+
+    invalidateCachedMetadata(config, [f"ark:59852/part-{index}" for index in range(30)])
+
+    assert "stale" not in collection.find_one({"_id": "__state__"})
+    assert collection.count_documents({"_id": {"$regex": "^stale:"}}) == 30
+    sync_provenance_edges(config)
+    assert collection.count_documents({"_id": {"$regex": "^stale:"}}) == 0
+
+
+def test_both_traversals_agree_after_a_computation_is_created():
+    config = _config(edges=True, built=False)
+    collection = config.identifierCollection.collection
+    _insert(collection, "ark:59852/input", DATASET)
+    # a part generated by a computation that is only registered later
+    collection.update_one(
+        {"@id": "ark:59852/part-0"}, {"$set": {"metadata.generatedBy": [{"@id": "ark:59852/late-computation"}]}}
+    )
+    sync_provenance_edges(config)
+    # as if the insert landed more than IDENTIFIER_SYNC_LAG behind the newest
+    # identifier, only its invalidation can bring it into the edge index
+    config.provenanceEdges.setWatermark(time.time() + 3600)
+
+    computation = Computation.model_validate({
+        "@id": "ark:59852/late-computation",
+        "name": "late computation",
+        "description": "registered after the edges were built",
+        "runBy": "a@example.org",
+        "dateCreated": "2024-01-01",
+        "usedDataset": [{"@id": "ark:59852/input"}],
+    })
+    user = UserWriteModel(email="a@example.org", firstName="a", lastName="b", password="p")
+    assert FairscapeComputationRequest(config).createComputation(user, computation).success
+
+    edges = FairscapeCondensationRequest(config).build_full_graph_for_rocrate("ark:59852/release")
+    config.provenanceEdges = None
+    bfs = FairscapeCondensationRequest(config).build_full_graph_for_rocrate("ark:59852/release")
+    assert "ark:59852/input" in _ids(bfs)
+    assert _ids(edges) == _ids(bfs)
@@ -151,12 +151,14 @@ def _mongomock_config() -> MagicMock:
     Only the attributes the adapters actually touch are provided:
     `identifierCollection`, `asyncCollection`, and the
     baseUrl/internalUrl rewrite pair used by `ServerSoftwareFetcher`.
+    Without `provenanceEdges` graphs are collected by the batched BFS.
     """
     cfg = MagicMock()
     client = mongomock.MongoClient()
     db = client["fairscape_test"]
     cfg.identifierCollection = db["identifier"]
     cfg.asyncCollection = db["async"]
+    cfg.provenanceEdges = None
     cfg.baseUrl = None
     cfg.internalUrl = None
     return cfg
@@ -0,0 +1,125 @@
+"""Mongomock-backed tests for keyset pagination of the listing requests.
+
+Covers ``FairscapeRequest.findPage`` through ``IdentifierRequest.listType``,
+``IdentifierRequest.listPublished`` and ``FairscapeROCrateRequest.list_crates``.
+"""
+
+from __future__ import annotations
+
+import mongomock
+from unittest.mock import MagicMock
+
+from fairscape_mds.crud.identifier import IdentifierRequest
+from fairscape_mds.crud.rocrate import FairscapeROCrateRequest
+from fairscape_mds.models.identifier import MetadataTypeEnum
+from fairscape_mds.models.user import UserWriteModel
+
+
+def _mongomock_config() -> MagicMock:
+    cfg = MagicMock()
+    client = mongomock.MongoClient()
+    db = client["fairscape_test"]
+    cfg.identifierCollection = db["identifier"]
+    cfg.adminGroup = "admins"
+    return cfg
+
+
+def _user(email: str = "alice@fairscape.org") -> UserWriteModel:
+    return UserWriteModel.model_validate({
+        "email": email,
+        "firstName": "Alice",
+        "lastName": "Anderson",
+        "password": "pw",
+        "@type": "Person",
+        "groups": ["team-alpha"],
+    })
+
+
+def _insert(cfg, guid, metadataType, status="DRAFT", owner="bob@fairscape.org"):
+    cfg.identifierCollection.insert_one({
+        "@id": guid,
+        "@type": metadataType,
+        "publicationStatus": status,
+        "permissions": {"owner": owner, "group": None},
+        "metadata": {"@id": guid, "name": guid, "description": "d"},
+    })
+
+
+def _walk(fetch):
+    seen, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        seen.extend(page["items"])
+        cursor = page["nextCursor"]
+        if not cursor:
+            return seen
+
+
+def test_list_type_merges_owned_and_published_without_duplicates():
+    cfg = _mongomock_config()
+    mlModel = MetadataTypeEnum.ML_MODEL.value
+    for index in range(7):
+        # owned and published documents match both branches of the $or
+        _insert(cfg, f"ark:59853/model-{index}", mlModel, status="PUBLISHED", owner="alice@fairscape.org")
+    for index in range(5):
+        _insert(cfg, f"ark:59853/other-{index}", mlModel)
+    _insert(cfg, "ark:59853/dataset", MetadataTypeEnum.DATASET.value, status="PUBLISHED")
+
+    request = IdentifierRequest(cfg)
+
+    def fetch(cursor):
+        model = request.listType(MetadataTypeEnum.ML_MODEL, _user(), limit=3, cursor=cursor).model
+        return {"items": model["identifiers"], "nextCursor": model["nextCursor"]}
+
+    seen = [doc["@id"] for doc in _walk(fetch)]
+    assert sorted(seen) == sorted(f"ark:59853/model-{index}" for index in range(7))
+
+
+def test_list_published_pages_and_rejects_bad_cursor():
+    cfg = _mongomock_config()
+    for index in range(4):
+        _insert(cfg, f"ark:59853/pub-{index}", MetadataTypeEnum.DATASET.value, status="PUBLISHED")
+
+    request = IdentifierRequest(cfg)
+    first = request.listPublished(limit=3).model
+    assert len(first["identifiers"]) == 3
+    assert "_id" not in first["identifiers"][0]
+
+    second = request.listPublished(limit=3, cursor=first["nextCursor"]).model
+    assert [doc["@id"] for doc in second["identifiers"]] == ["ark:59853/pub-3"]
+    assert second["nextCursor"] is None
+
+    assert request.listPublished(cursor="garbage").statusCode == 400
+
+
+def test_list_crates_pages():
+    cfg = _mongomock_config()
+    for index in range(5):
+        _insert(cfg, f"ark:59853/crate-{index}", "https://w3id.org/EVI#ROCrate", owner="alice@fairscape.org")
+
+    request = FairscapeROCrateRequest(cfg)
+
+    def fetch(cursor):
+        model = request.list_crates(_user(), limit=2, cursor=cursor).model
+        return {"items": model["rocrates"], "nextCursor": model["nextCursor"]}
+
+    crates = _walk(fetch)
+    assert len(crates) == 5
+    assert crates[0] == {"@id": "ark:59853/crate-0", "name": "ark:59853/crate-0", "description": "d"}
+
+
+def test_listing_without_limit_or_cursor_returns_everything(monkeypatch):
+    monkeypatch.setattr("fairscape_mds.crud.fairscape_request.DEFAULT_PAGE_SIZE", 2)
+    cfg = _mongomock_config()
+    for index in range(5):
+        _insert(cfg, f"ark:59853/crate-{index}", "https://w3id.org/EVI#ROCrate", owner="alice@fairscape.org")
+
+    request = FairscapeROCrateRequest(cfg)
+    everything = request.list_crates(_user()).model
+    assert len(everything["rocrates"]) == 5 and everything["nextCursor"] is None
+
+    # a cursor alone continues with pages of the default size
+    first = request.list_crates(_user(), limit=1).model
+    second = request.list_crates(_user(), cursor=first["nextCursor"]).model
+    assert [crate["@id"] for crate in second["rocrates"]] == ["ark:59853/crate-1", "ark:59853/crate-2"]
+    assert second["nextCursor"] is not None
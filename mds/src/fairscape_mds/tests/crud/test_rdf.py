@@ -0,0 +1,119 @@
+"""Mongomock-backed tests for ``crud/rdf.py``.
+
+Covers Accept negotiation, the per (identifier, dateModified, format)
+serialization cache and its invalidation and the line based N-Triples / N-Quads streaming used
+for large crates.
+"""
+
+from __future__ import annotations
+
+import mongomock
+from unittest.mock import MagicMock
+
+from fairscape_mds.core.cache import MetadataCache
+from fairscape_mds.crud.fairscape_request import invalidateCachedMetadata
+from fairscape_mds.crud.rdf import (
+    FairscapeRDFRequest,
+    iterNTriples,
+    negotiateRDFFormat,
+)
+from fairscape_mds.tests.crud.utils import FakeRedis
+
+
+GUID = "ark:59853/dataset-a"
+
+
+def _mongomock_config() -> MagicMock:
+    cfg = MagicMock()
+    client = mongomock.MongoClient()
+    db = client["fairscape_test"]
+    cfg.identifierCollection = db["identifier"]
+    cfg.metadataCache = MetadataCache()
+    return cfg
+
+
+def _insert(cfg, name: str = "Dataset A", dateModified: str = "2024-01-01T00:00:00"):
+    cfg.identifierCollection.insert_one({
+        "@id": GUID,
+        "@type": "https://w3id.org/EVI#Dataset",
+        "dateModified": dateModified,
+        "publicationStatus": "PUBLISHED",
+        "metadata": {"@id": GUID, "@type": "EVI:Dataset", "name": name},
+    })
+
+
+def test_negotiate_rdf_format():
+    assert negotiateRDFFormat("text/turtle") == "turtle"
+    assert negotiateRDFFormat("application/rdf+xml") == "xml"
+    assert negotiateRDFFormat("application/n-triples") == "nt"
+    assert negotiateRDFFormat("application/n-quads") == "nquads"
+    assert negotiateRDFFormat("application/json") is None
+    assert negotiateRDFFormat(None) is None
+
+
+def test_serialization_is_cached_per_version():
+    cfg = _mongomock_config()
+    _insert(cfg)
+    request = FairscapeRDFRequest(cfg)
+
+    first = request.getRDF(GUID, "turtle")
+    assert first.success
+    assert "Dataset A" in first.model
+
+    # an edit without a version bump keeps serving the cached rendering
+    cfg.identifierCollection.update_one({"@id": GUID}, {"$set": {"metadata.name": "Renamed"}})
+    assert "Dataset A" in request.getRDF(GUID, "turtle").model
+
+    cfg.identifierCollection.update_one(
+        {"@id": GUID}, {"$set": {"dateModified": "2024-01-02T00:00:00"}}
+    )
+    assert "Renamed" in request.getRDF(GUID, "turtle").model
+
+
+def test_invalidated_writes_without_a_version_bump_are_rendered_again():
+    cfg = _mongomock_config()
+    cfg.metadataCache = MetadataCache(FakeRedis())
+    cfg.semanticIndex = cfg.autocompleteIndex = cfg.provenanceEdges = None
+    _insert(cfg)
+    request = FairscapeRDFRequest(cfg)
+    assert "Dataset A" in request.getRDF(GUID, "turtle").model
+
+    cfg.identifierCollection.update_one({"@id": GUID}, {"$set": {"metadata.name": "Renamed"}})
+    invalidateCachedMetadata(cfg, [GUID])
+
+    assert "Renamed" in request.getRDF(GUID, "turtle").model
+
+
+def test_missing_identifier_and_unknown_format():
+    cfg = _mongomock_config()
+    request = FairscapeRDFRequest(cfg)
+    assert request.getRDF(GUID, "turtle").statusCode == 404
+    assert request.getRDF(GUID, "json").statusCode == 406
+
+
+def test_nquads_label_statements_with_graph():
+    cfg = _mongomock_config()
+    _insert(cfg)
+    response = FairscapeRDFRequest(cfg).getRDF(GUID, "nquads")
+
+    lines = response.model.strip().splitlines()
+    assert lines
+    assert all(line.endswith(f"<{GUID}> .") for line in lines)
+
+
+def test_prerender_fills_cache():
+    cfg = _mongomock_config()
+    _insert(cfg)
+    assert FairscapeRDFRequest(cfg).prerenderRDF(GUID) == 2
+    assert cfg.metadataCache.getVersion("rdf:xml", GUID, "2024-01-01T00:00:00")
+
+
+def test_iter_ntriples_streams_one_chunk_per_node():
+    context = {"@vocab": "https://schema.org/"}
+    nodes = [
+        {"@id": f"ark:59853/part-{index}", "name": f"part {index}"}
+        for index in range(3)
+    ]
+    chunks = list(iterNTriples(nodes, context))
+    assert len(chunks) == 3
+    assert "part 2" in chunks[2]
@@ -0,0 +1,97 @@
+"""Mongomock-backed tests for ``FairscapeResolverRequest.resolveBatchAsync``."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import mongomock
+from unittest.mock import MagicMock
+
+from fairscape_mds.crud.resolver import FairscapeResolverRequest, iterBatchJSON, iterBatchNDJSON
+from fairscape_mds.models.user import UserWriteModel
+from fairscape_mds.tests.crud.utils import AsyncCollection
+
+
+def _mongomock_config() -> MagicMock:
+    cfg = MagicMock()
+    client = mongomock.MongoClient()
+    db = client["fairscape_test"]
+    cfg.identifierCollection = db["identifier"]
+    cfg.aioIdentifierCollection = AsyncCollection(cfg.identifierCollection)
+    cfg.adminGroup = "admins"
+    return cfg
+
+
+def _user(email: str = "alice@fairscape.org", groups=("team-alpha",)) -> UserWriteModel:
+    return UserWriteModel.model_validate({
+        "email": email,
+        "firstName": "Alice",
+        "lastName": "Anderson",
+        "password": "pw",
+        "@type": "Person",
+        "groups": list(groups),
+    })
+
+
+def _insert(cfg, guid, status="PUBLISHED", owner="bob@fairscape.org", group=None):
+    cfg.identifierCollection.insert_one({
+        "@id": guid,
+        "@type": "https://w3id.org/EVI#Dataset",
+        "publicationStatus": status,
+        "permissions": {"owner": owner, "group": group},
+        "metadata": {"@id": guid, "name": guid, "description": "x" * 100},
+    })
+
+
+def _resolve(cfg, guids, user=None, fields=None, encoder=iterBatchJSON):
+    async def collect():
+        response = await FairscapeResolverRequest(cfg).resolveBatchAsync(guids, user=user, fields=fields)
+        if not response.success:
+            return response
+        return b"".join([chunk async for chunk in encoder(response.model)])
+
+    return asyncio.run(collect())
+
+
+def test_batch_filters_unreadable_identifiers():
+    cfg = _mongomock_config()
+    _insert(cfg, "ark:59853/public")
+    _insert(cfg, "ark:59853/draft", status="DRAFT")
+    _insert(cfg, "ark:59853/mine", status="DRAFT", owner="alice@fairscape.org")
+    _insert(cfg, "ark:59853/shared", status="DRAFT", group="team-alpha")
+    guids = ["ark:59853/public", "ark:59853/draft", "ark:59853/mine", "ark:59853/shared", "ark:59853/missing"]
+
+    anonymous = json.loads(_resolve(cfg, guids))
+    assert set(anonymous) == set(guids)
+    assert [guid for guid, doc in anonymous.items() if doc] == ["ark:59853/public"]
+
+    member = json.loads(_resolve(cfg, guids, user=_user()))
+    assert {guid for guid, doc in member.items() if doc} == {
+        "ark:59853/public", "ark:59853/mine", "ark:59853/shared"
+    }
+
+    admin = json.loads(_resolve(cfg, guids, user=_user("root@fairscape.org", groups=["admins"])))
+    assert admin["ark:59853/draft"] is not None and admin["ark:59853/missing"] is None
+
+
+def test_batch_projection_and_ndjson():
+    cfg = _mongomock_config()
+    _insert(cfg, "ark:59853/a")
+    _insert(cfg, "ark:59853/b")
+
+    lines = _resolve(
+        cfg, ["ark:59853/a", "ark:59853/b", "ark:59853/c"],
+        fields=["metadata.name"], encoder=iterBatchNDJSON
+    ).splitlines()
+
+    documents = [json.loads(line) for line in lines]
+    assert len(documents) == 2
+    assert all(set(doc) == {"@id", "metadata"} and set(doc["metadata"]) == {"name"} for doc in documents)
+
+
+def test_batch_rejects_invalid_requests():
+    cfg = _mongomock_config()
+    assert _resolve(cfg, []).statusCode == 400
+    assert _resolve(cfg, ["ark:59853/a"], fields=["$where"]).statusCode == 400
+    assert _resolve(cfg, [f"ark:59853/{index}" for index in range(1001)]).statusCode == 400
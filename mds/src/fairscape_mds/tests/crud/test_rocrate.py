@@ -0,0 +1,300 @@
+"""Mongomock-backed tests for RO-Crate JSON-LD assembly in ``crud/rocrate.py``.
+
+Checks that the streamed response for large crates encodes the same
+document as the in memory path and that parts are fetched in batches.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from email.utils import parsedate_to_datetime
+
+import mongomock
+from unittest.mock import MagicMock
+
+from fairscape_mds.core.cache import MetadataCache
+from fairscape_mds.core.conditional import validatorHeaders
+from fairscape_mds.crud.fairscape_request import invalidateCachedMetadata
+from fairscape_mds.crud.identifier import DeleteIdentifier
+from fairscape_mds.crud.rocrate import SUMMARY_CATEGORIES, FairscapeROCrateRequest, iterROCrateJSON
+from fairscape_mds.models.user import UserWriteModel
+from fairscape_mds.tests.crud.utils import AsyncCollection
+
+
+CRATE = "ark:59853/rocrate-stream"
+
+
+def _mongomock_config() -> MagicMock:
+    cfg = MagicMock()
+    client = mongomock.MongoClient()
+    db = client["fairscape_test"]
+    cfg.identifierCollection = db["identifier"]
+    cfg.metadataCache = MetadataCache()
+    return cfg
+
+
+def _insert_crate(cfg, parts: int) -> None:
+    part_ids = [f"ark:59853/part-{index}" for index in range(parts)]
+    cfg.identifierCollection.insert_one({
+        "@id": CRATE,
+        "metadata": {
+            "@id": CRATE,
+            "@type": ["Dataset", "https://w3id.org/EVI#ROCrate"],
+            "name": "stream test",
+            "hasPart": [{"@id": guid} for guid in part_ids],
+        },
+    })
+    cfg.identifierCollection.insert_many([
+        {"@id": guid, "metadata": {"@id": guid, "name": guid}}
+        for guid in part_ids
+    ])
+
+
+def test_streamed_crate_matches_in_memory_document():
+    cfg = _mongomock_config()
+    _insert_crate(cfg, parts=25)
+    request = FairscapeROCrateRequest(cfg)
+
+    in_memory = request.getROCrateMetadata(CRATE)
+    streamed = request.getROCrateMetadata(CRATE, streamThreshold=10)
+
+    assert in_memory.model is not None and in_memory.fileResponse is None
+    assert streamed.model is None
+    assert json.loads(b"".join(streamed.fileResponse)) == in_memory.model
+
+
+def test_async_crate_metadata_matches_sync():
+    cfg = _mongomock_config()
+    cfg.aioIdentifierCollection = AsyncCollection(cfg.identifierCollection)
+    _insert_crate(cfg, parts=25)
+    request = FairscapeROCrateRequest(cfg)
+
+    async def collect():
+        in_memory = await request.getROCrateMetadataAsync(CRATE)
+        streamed = await request.getROCrateMetadataAsync(CRATE, streamThreshold=10)
+        return in_memory, b"".join([chunk async for chunk in streamed.fileResponse])
+
+    in_memory, streamed = asyncio.run(collect())
+
+    assert in_memory.model == request.getROCrateMetadata(CRATE).model
+    assert json.loads(streamed) == in_memory.model
+
+
+def test_crate_validators_change_with_its_members():
+    cfg = _mongomock_config()
+    cfg.aioIdentifierCollection = AsyncCollection(cfg.identifierCollection)
+    for index in ("semanticIndex", "autocompleteIndex", "provenanceEdges"):
+        setattr(cfg, index, None)
+    _insert_crate(cfg, parts=3)
+    cfg.identifierCollection.update_many({}, {"$set": {"dateModified": "2024-01-01T00:00:00+00:00"}})
+    cfg.identifierCollection.update_many(
+        {"@id": {"$ne": CRATE}}, {"$set": {"metadata.isPartOf": [{"@id": CRATE}]}}
+    )
+    request = FairscapeROCrateRequest(cfg)
+
+    before = validatorHeaders(asyncio.run(request.getCrateVersionInfoAsync(CRATE)))
+    cfg.identifierCollection.update_one(
+        {"@id": "ark:59853/part-1"}, {"$set": {"dateModified": "2024-02-01T00:00:00+00:00"}}
+    )
+    invalidateCachedMetadata(cfg, ["ark:59853/part-1"])
+    updated = validatorHeaders(asyncio.run(request.getCrateVersionInfoAsync(CRATE)))
+    cfg.identifierCollection.delete_one({"@id": "ark:59853/part-2"})
+    invalidateCachedMetadata(cfg, ["ark:59853/part-2", CRATE])
+    deleted = validatorHeaders(asyncio.run(request.getCrateVersionInfoAsync(CRATE)))
+
+    assert len({before["ETag"], updated["ETag"], deleted["ETag"]}) == 3
+    assert before["Last-Modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert parsedate_to_datetime(updated["Last-Modified"]).year > 2024
+    assert asyncio.run(request.getCrateVersionInfoAsync("ark:59853/missing")) is None
+
+
+def test_crate_validators_read_only_the_root():
+    cfg = _mongomock_config()
+    cfg.aioIdentifierCollection = MagicMock()
+    cfg.aioIdentifierCollection.find_one = AsyncCollection(cfg.identifierCollection).find_one
+    _insert_crate(cfg, parts=3)
+
+    assert asyncio.run(FairscapeROCrateRequest(cfg).getCrateVersionInfoAsync(CRATE))["@id"] == CRATE
+    cfg.aioIdentifierCollection.find.assert_not_called()
+
+
+def test_assembled_archive_leaves_out_parts_the_user_may_not_download():
+    cfg = _mongomock_config()
+    cfg.adminGroup = "admin"
+    cfg.aioIdentifierCollection = AsyncCollection(cfg.identifierCollection)
+    _insert_crate(cfg, parts=3)
+    for index, owner in enumerate(["owner@example.org", "other@example.org", "owner@example.org"]):
+        cfg.identifierCollection.update_one(
+            {"@id": f"ark:59853/part-{index}"},
+            {"$set": {
+                "permissions": {"owner": owner, "group": None},
+                "distribution": {
+                    "distributionType": "minio",
+                    "location": {"path": f"default/part-{index}.csv"},
+                },
+            }},
+        )
+    user = UserWriteModel(email="owner@example.org", firstName="o", lastName="w", password="p")
+    request = FairscapeROCrateRequest(cfg)
+    root_metadata = cfg.identifierCollection.find_one({"@id": CRATE})["metadata"]
+
+    async def names():
+        return [member.name async for member in request._archiveMembers(user, root_metadata, b"{}")]
+
+    assert asyncio.run(names()) == ["ro-crate-metadata.json", "part-0.csv", "part-2.csv"]
+
+
+def test_admins_may_not_download_identifiers_they_do_not_own():
+    cfg = _mongomock_config()
+    cfg.adminGroup = "admin"
+    _insert_crate(cfg, parts=1)
+    cfg.identifierCollection.update_one(
+        {"@id": CRATE}, {"$set": {"permissions": {"owner": "owner@example.org", "group": "lab"}}}
+    )
+    admin = UserWriteModel(email="root@example.org", firstName="r", lastName="t", password="p", groups=["admin"])
+    member = UserWriteModel(email="m@example.org", firstName="m", lastName="b", password="p", groups=["lab"])
+    request = FairscapeROCrateRequest(cfg)
+
+    assert request.findAccessible(CRATE, admin) == (None, True)
+    assert request.findAccessible(CRATE, member)[0]["@id"] == CRATE
+
+
+def test_deleted_crate_is_invalidated_after_it_is_removed():
+    cfg = _mongomock_config()
+    _insert_crate(cfg, parts=2)
+    cfg.identifierCollection.update_many(
+        {"@id": {"$ne": CRATE}}, {"$set": {"metadata.isPartOf": [{"@id": CRATE}]}}
+    )
+    remaining = []
+    cfg.metadataCache = MagicMock()
+    cfg.metadataCache.invalidate.side_effect = lambda *guids: remaining.append(
+        (sorted(guids), cfg.identifierCollection.count_documents({}))
+    )
+    for index in ("semanticIndex", "autocompleteIndex", "provenanceEdges"):
+        setattr(cfg, index, None)
+
+    crate = MagicMock(guid=CRATE, distribution=None)
+    DeleteIdentifier(cfg, CRATE, requestingUser=None, force=True).deleteROCrate(crate)
+
+    assert remaining == [(sorted([CRATE, "ark:59853/part-0", "ark:59853/part-1"]), 0)]
+
+
+def test_small_crates_are_not_streamed():
+    cfg = _mongomock_config()
+    _insert_crate(cfg, parts=3)
+    response = FairscapeROCrateRequest(cfg).getROCrateMetadata(CRATE, streamThreshold=10)
+
+    assert response.fileResponse is None
+    assert len(response.model["@graph"]) == 5
+
+
+def test_iter_rocrate_json_chunks():
+    graph = ({"@id": f"ark:59853/node-{index}", "name": "x" * 50} for index in range(100))
+    chunks = list(iterROCrateJSON(graph, chunkSize=1024))
+
+    assert len(chunks) > 1
+    assert len(json.loads(b"".join(chunks))["@graph"]) == 100
+
+
+def _summary_page(items, page: slice) -> dict:
+    """The crate document mongo returns for a $slice of the datasets summary."""
+    return {
+        "@id": CRATE,
+        "@type": ["https://w3id.org/EVI#Dataset", "https://w3id.org/EVI#ROCrate"],
+        "contentSummary": {
+            "datasets": items[page],
+            "counts": {"datasets": len(items), "software": 0, "total": len(items)},
+            "generatedAt": "2024-01-01T00:00:00",
+        },
+    }
+
+
+def _answering_find_one(responses: dict):
+    """find_one returning the canned document for each expected datasets $slice.
+
+    mongomock drops $slice fields from an inclusion projection, so the
+    projections sent are recorded and checked instead of evaluated.
+    """
+    projections = []
+
+    def find_one(filter=None, projection=None, **kwargs):
+        projections.append(projection)
+        page = tuple(projection["contentSummary.datasets"]["$slice"])
+        assert page in responses, f"unexpected page {page}"
+        return responses[page]
+
+    return find_one, projections
+
+
+def _insert_summarised_crate(cfg, datasets: int) -> None:
+    items = [
+        {"@id": f"ark:59853/dataset-{index}", "name": f"dataset {index}", "@type": "EVI:Dataset"}
+        for index in range(datasets)
+    ]
+    cfg.identifierCollection.insert_one({
+        "@id": CRATE,
+        "@type": ["https://w3id.org/EVI#Dataset", "https://w3id.org/EVI#ROCrate"],
+        "contentSummary": {
+            "datasets": items,
+            "software": [],
+            "counts": {"datasets": datasets, "software": 0, "total": datasets},
+            "generatedAt": "2024-01-01T00:00:00",
+        },
+    })
+
+
+def test_content_summary_pages_with_slice():
+    cfg = _mongomock_config()
+    items = [{"@id": f"ark:59853/dataset-{index}"} for index in range(25)]
+    cfg.identifierCollection.find_one, projections = _answering_find_one({
+        (20, 10): _summary_page(items, slice(20, 30)),
+    })
+    request = FairscapeROCrateRequest(cfg)
+
+    page = request.getROCrateContentSummary(CRATE, limit=10, offset=20).model
+
+    # every category is sliced in mongo, only the counts come back whole
+    assert projections == [{
+        "_id": False, "@id": 1, "@type": 1, "dateModified": 1,
+        "contentSummary.counts": 1, "contentSummary.generatedAt": 1,
+        **{f"contentSummary.{category}": {"$slice": [20, 10]} for category in SUMMARY_CATEGORIES},
+    }]
+    assert [item["@id"] for item in page["datasets"]] == [
+        f"ark:59853/dataset-{index}" for index in range(20, 25)
+    ]
+    assert page["counts"]["datasets"] == 25
+    assert page["pagination"]["nextCursors"]["datasets"] is None
+
+
+def test_content_summary_cursor_walks_one_category():
+    cfg = _mongomock_config()
+    items = [{"@id": f"ark:59853/dataset-{index}"} for index in range(25)]
+    cfg.identifierCollection.find_one, projections = _answering_find_one({
+        (offset, 10): _summary_page(items, slice(offset, offset + 10)) for offset in (0, 10, 20)
+    })
+    request = FairscapeROCrateRequest(cfg)
+
+    first = request.getROCrateContentSummary(CRATE, limit=10, category="datasets").model
+    assert list(first.keys())[0] == "datasets" and "software" not in first
+
+    seen = [item["@id"] for item in first["datasets"]]
+    cursor = first["pagination"]["nextCursor"]
+    while cursor:
+        page = request.getROCrateContentSummary(CRATE, limit=10, cursor=cursor).model
+        seen.extend(item["@id"] for item in page["datasets"])
+        cursor = page["pagination"]["nextCursor"]
+
+    assert seen == [item["@id"] for item in items]
+    assert [
+        [path for path, value in projection.items() if isinstance(value, dict)] for projection in projections
+    ] == [["contentSummary.datasets"]] * 3
+
+
+def test_content_summary_rejects_bad_input():
+    cfg = _mongomock_config()
+    _insert_summarised_crate(cfg, datasets=1)
+    request = FairscapeROCrateRequest(cfg)
+
+    assert request.getROCrateContentSummary(CRATE, category="bogus").statusCode == 400
+    assert request.getROCrateContentSummary(CRATE, cursor="not-a-cursor").statusCode == 400
@@ -0,0 +1,314 @@
+"""Tests for ``FairscapeSearchRequest`` basic, semantic and autocomplete search."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from fairscape_mds.core.autocomplete import AutocompleteIndex
+from fairscape_mds.core.cache import MetadataCache
+from fairscape_mds.crud import search
+from fairscape_mds.crud.fairscape_request import invalidateCachedMetadata
+from fairscape_mds.crud.search import (
+    SEARCH_FACET_CACHE_MIN_MATCHES,
+    SEARCH_TEXT_INDEX,
+    SEARCH_TEXT_WEIGHTS,
+    FairscapeSearchRequest,
+    basic_search_pipeline,
+    build_search_results,
+    ensure_text_index,
+    sync_autocomplete_index,
+    sync_semantic_index,
+)
+from fairscape_mds.models.user import UserWriteModel
+from fairscape_mds.tests.crud.utils import sequentialBulkWrite
+
+
+def test_pipeline_ranks_by_text_score_and_counts_all_matches():
+    pipeline = basic_search_pipeline("cell lines", limit=5, offset=10)
+
+    assert pipeline[0] == {"$match": {"$text": {"$search": "cell lines"}}}
+    assert pipeline[1] == {"$addFields": {"score": {"$meta": "textScore"}}}
+    hits = pipeline[2]["$facet"]["hits"]
+    assert hits[0] == {"$sort": {"score": -1, "_id": 1}}
+    assert hits[1:3] == [{"$skip": 10}, {"$limit": 5}]
+    assert pipeline[2]["$facet"]["total"] == [{"$count": "count"}]
+
+
+def test_results_carry_scores_totals_and_offsets():
+    results = build_search_results(
+        "cell",
+        [{"@id": "ark:59852/a", "metadata": {"name": "Cell atlas", "keywords": "cells"}, "score": 7.5}],
+        time.time(),
+        total=42,
+        offset=20,
+        limit=1,
+    )
+
+    assert results.total_results == 42
+    assert results.offset == 20
+    assert results.results[0].score == 7.5
+    assert results.results[0].keywords == ["cells"]
+
+
+def test_basic_search_uses_one_aggregation():
+    config = MagicMock()
+    config.metadataCache = MetadataCache()
+    config.identifierCollection.aggregate.return_value = iter([{
+        "hits": [{"@id": "ark:59852/a", "metadata": {"name": "Cell atlas"}, "score": 3.0}],
+        "total": [{"count": 12}],
+    }])
+    request = FairscapeSearchRequest(config)
+
+    response = request.basic_search("cell", limit=1, offset=3)
+
+    assert response.success
+    assert response.model.total_results == 12
+    assert [item.id for item in response.model.results] == ["ark:59852/a"]
+    config.identifierCollection.find.assert_not_called()
+
+
+def test_basic_search_rejects_bad_pages():
+    request = FairscapeSearchRequest(MagicMock())
+
+    assert request.basic_search("cell", limit=0).statusCode == 400
+    assert request.basic_search("cell", offset=-1).statusCode == 400
+
+
+def test_missing_text_index_is_unavailable_not_an_error():
+    config = MagicMock()
+    config.metadataCache = MetadataCache()
+    config.identifierCollection.aggregate.side_effect = OperationFailure(
+        "text index required for $text query", code=27
+    )
+    request = FairscapeSearchRequest(config)
+
+    response = request.basic_search("cell")
+
+    assert response.statusCode == 503
+    assert not response.success
+
+
+def test_text_index_is_built_from_the_search_weights():
+    collection = MagicMock()
+
+    ensure_text_index(collection)
+
+    keys = collection.create_index.call_args.args[0]
+    options = collection.create_index.call_args.kwargs
+    assert [field for field, _ in keys] == list(SEARCH_TEXT_WEIGHTS)
+    assert options["name"] == SEARCH_TEXT_INDEX
+    assert options["weights"] == SEARCH_TEXT_WEIGHTS
+
+
+def _user(email="b@example.org", groups=()):
+    return UserWriteModel.model_validate({
+        "email": email, "firstName": "B", "lastName": "B", "password": "pw", "groups": list(groups)
+    })
+
+
+ADMIN = _user("root@example.org", groups=["admins"])
+
+
+def _facet_config():
+    config = MagicMock()
+    config.metadataCache = MetadataCache()
+    config.adminGroup = "admins"
+    config.identifierCollection = mongomock.MongoClient()["fairscape_test"]["identifier"]
+    config.identifierCollection.insert_many([
+        {
+            "@id": f"ark:59852/item-{index}",
+            "@type": ["prov:Entity", "https://w3id.org/EVI#Dataset" if index % 3 else "https://w3id.org/EVI#Software"],
+            "publicationStatus": "PUBLISHED" if index % 2 else "DRAFT",
+            "permissions": {"owner": "a@example.org", "group": "lab" if index < 4 else None},
+            "metadata": {"name": f"item {index}", "keywords": ["cells", "imaging"] if index % 2 else "cells"},
+        }
+        for index in range(6)
+    ])
+    return config
+
+
+def test_browse_returns_facet_counts_with_the_page():
+    request = FairscapeSearchRequest(_facet_config())
+
+    page = request.basic_search("", limit=2, user=ADMIN).model
+
+    assert [item.id for item in page.results] == ["ark:59852/item-5", "ark:59852/item-4"]
+    assert page.total_results == 6
+    facets = {name: {bucket.value: bucket.count for bucket in values} for name, values in page.facets.items()}
+    assert facets["type"] == {"https://w3id.org/EVI#Dataset": 4, "https://w3id.org/EVI#Software": 2}
+    assert facets["publicationStatus"] == {"PUBLISHED": 3, "DRAFT": 3}
+    assert facets["group"] == {"lab": 4}
+    assert facets["keywords"] == {"cells": 6, "imaging": 3}
+
+    filtered = request.basic_search("", filters={"publicationStatus": "DRAFT", "keywords": "cells"}, user=ADMIN).model
+    assert filtered.total_results == 3
+    assert {bucket.value for bucket in filtered.facets["publicationStatus"]} == {"DRAFT"}
+
+
+def test_matches_and_counts_only_include_readable_identifiers():
+    request = FairscapeSearchRequest(_facet_config())
+
+    anonymous = request.basic_search("").model
+    assert [item.id for item in anonymous.results] == ["ark:59852/item-5", "ark:59852/item-3", "ark:59852/item-1"]
+    assert {bucket.value: bucket.count for bucket in anonymous.facets["publicationStatus"]} == {"PUBLISHED": 3}
+
+    # drafts 0 and 2 belong to the lab group, draft 4 to no group
+    member = request.basic_search("", user=_user(groups=["lab"])).model
+    assert member.total_results == 5
+    assert "ark:59852/item-4" not in [item.id for item in member.results]
+
+    drafts = request.basic_search("", filters={"publicationStatus": "DRAFT"}).model
+    assert drafts.total_results == 0 and drafts.results == []
+
+
+def test_counts_of_broad_searches_are_reused():
+    config = _facet_config()
+    request = FairscapeSearchRequest(config)
+    first = request.basic_search("").model
+
+    config.identifierCollection = MagicMock()
+    config.identifierCollection.aggregate.return_value = iter([{"hits": []}])
+    second = request.basic_search("  ", offset=5).model
+
+    pipeline = config.identifierCollection.aggregate.call_args[0][0]
+    assert set(pipeline[-1]["$facet"]) == {"hits"}
+    assert second.total_results == first.total_results
+    assert second.facets == first.facets
+
+
+def test_counts_of_narrow_searches_are_not_cached():
+    config = MagicMock()
+    config.metadataCache = MetadataCache()
+    config.identifierCollection.aggregate.side_effect = lambda pipeline: iter([{
+        "hits": [], "total": [{"count": SEARCH_FACET_CACHE_MIN_MATCHES - 1}],
+    }])
+    request = FairscapeSearchRequest(config)
+
+    request.basic_search("rare")
+    request.basic_search("rare")
+
+    pipeline = config.identifierCollection.aggregate.call_args[0][0]
+    assert "total" in pipeline[-1]["$facet"]
+
+
+def test_autocomplete_follows_inserts_updates_and_deletes():
+    database = mongomock.MongoClient()["fairscape_test"]
+    config = MagicMock()
+    config.metadataCache = MetadataCache()
+    config.semanticIndex = None
+    config.identifierCollection = database["identifier"]
+    config.autocompleteIndex = AutocompleteIndex(sequentialBulkWrite(database["autocomplete"]))
+    config.identifierCollection.insert_many([
+        {"@id": "ark:59852/atlas", "publicationStatus": "PUBLISHED", "metadata": {"name": "Cell atlas", "keywords": ["cells"]}},
+        {"@id": "ark:59852/voice", "publicationStatus": "PUBLISHED", "metadata": {"name": "Voice recordings"}},
+        {"@id": "ark:59852/draft", "publicationStatus": "DRAFT", "metadata": {"name": "Cellular draft"}},
+    ])
+    request = FairscapeSearchRequest(config)
+
+    # requests only read, the background sync fills the collection
+    assert request.autocomplete("ce").model.completions == []
+    assert config.autocompleteIndex.collection.count_documents({}) == 0
+    sync_autocomplete_index(config)
+    response = request.autocomplete("ce")
+    assert response.success
+    assert [item.label for item in response.model.completions] == ["Cell atlas", "cells"]
+
+    config.identifierCollection.update_one({"@id": "ark:59852/atlas"}, {"$set": {"metadata.name": "Tissue atlas"}})
+    invalidateCachedMetadata(config, ["ark:59852/atlas"])
+    config.identifierCollection.delete_one({"@id": "ark:59852/voice"})
+    invalidateCachedMetadata(config, ["ark:59852/voice"])
+    sync_autocomplete_index(config)
+
+    assert [item.label for item in request.autocomplete("ce").model.completions] == ["cells"]
+    assert [item.label for item in request.autocomplete("atlas", kinds=["name"]).model.completions] == ["Tissue atlas"]
+    assert request.autocomplete("voice").model.completions == []
+
+    # completions are shared, so drafts only contribute once published
+    config.identifierCollection.update_one({"@id": "ark:59852/draft"}, {"$set": {"publicationStatus": "PUBLISHED"}})
+    invalidateCachedMetadata(config, ["ark:59852/draft"])
+    sync_autocomplete_index(config)
+    assert [item.label for item in request.autocomplete("ce").model.completions] == ["cells", "Cellular draft"]
+    assert request.autocomplete("x", kinds=["title"]).statusCode == 400
+
+
+def test_sync_periodically_skips_a_sync_still_running():
+    lock = threading.Lock()
+    finish = threading.Event()
+    calls = []
+
+    def sync(config):
+        with lock:
+            calls.append(config)
+            finish.wait(5)
+
+    async def run():
+        task = asyncio.create_task(search.sync_periodically(sync, "config", lock, 0.01))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(run())
+    finish.set()
+    assert calls == ["config"]
+
+
+def _semantic_config(tmp_path, docs):
+    pytest.importorskip("numpy")
+    from fairscape_mds.core.vector_index import SemanticIndex
+
+    def find(query, projection=None):
+        if "@id" in query:
+            wanted = set(query["@id"]["$in"])
+            return [doc for doc in docs if doc["@id"] in wanted]
+        cursor = MagicMock()
+        cursor.sort.return_value.batch_size.return_value = iter(list(docs))
+        return cursor
+
+    config = MagicMock()
+    config.adminGroup = "admins"
+    config.identifierCollection.find.side_effect = find
+    config.semanticIndex = SemanticIndex(
+        tmp_path / "semantic",
+        sequentialBulkWrite(mongomock.MongoClient()["fairscape_test"]["semantic_stale"]),
+        syncInterval=3600
+    )
+    return config
+
+
+def test_semantic_search_waits_for_the_index_and_drops_deleted_identifiers(tmp_path, monkeypatch):
+    started = []
+    monkeypatch.setattr(search, "sync_in_background", lambda sync, config, lock: started.append(sync))
+    docs = [
+        {"_id": ObjectId(), "@id": "ark:59852/cells", "metadata": {"name": "Fibroblast images", "keywords": ["cells"]}},
+        {"_id": ObjectId(), "@id": "ark:59852/voice", "metadata": {"name": "Voice recordings", "description": "speech"}},
+    ]
+    config = _semantic_config(tmp_path, docs)
+    request = FairscapeSearchRequest(config)
+
+    # the first build runs in the background, not inside the request
+    assert request.semantic_search("fibroblast cells").statusCode == 503
+    assert started == [sync_semantic_index]
+    assert config.semanticIndex.index.rows == 0
+
+    sync_semantic_index(config)
+    response = request.semantic_search("fibroblast cells")
+    assert response.success
+    assert [item.id for item in response.model.results] == ["ark:59852/cells"]
+    assert config.semanticIndex.index.rows == 2
+
+    del docs[0]
+    response = request.semantic_search("fibroblast cells")
+    assert response.model.results == []
+    assert response.model.total_results == 0
+    # only an unrestricted search can tell a deleted identifier from an unreadable one
+    assert config.semanticIndex.search("fibroblast cells", 10)[1] == 1
+    assert request.semantic_search("fibroblast cells", user=ADMIN).model.total_results == 0
+    assert config.semanticIndex.search("fibroblast cells", 10)[1] == 0
@@ -1,8 +1,131 @@
 import os
 import json
 
+from redis.exceptions import WatchError
+
 
 def load_test_data(filename):
 	filepath = os.path.join(os.path.dirname(__file__), "data", filename)
 	with open(filepath, 'r') as f:
 		return json.load(f)
+
+
+class AsyncCollection:
+	"""Awaitable facade over a mongomock collection, shaped like pymongo's async API."""
+
+	def __init__(self, collection):
+		self.collection = collection
+
+	async def find_one(self, *args, **kwargs):
+		return self.collection.find_one(*args, **kwargs)
+
+	def find(self, *args, **kwargs):
+		documents = list(self.collection.find(*args, **kwargs))
+
+		async def iterate():
+			for document in documents:
+				yield document
+
+		return iterate()
+
+
+def sequentialBulkWrite(collection):
+	"""mongomock 4.3 cannot read current pymongo UpdateOne requests, apply them one at a time."""
+
+	def bulk_write(requests, ordered=True):
+		for request in requests:
+			collection.update_one(request._filter, request._doc, upsert=request._upsert)
+
+	collection.bulk_write = bulk_write
+	return collection
+
+
+class _FakePipeline:
+	def __init__(self, client):
+		self.client = client
+		self.calls = []
+		self.watched = {}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.calls = []
+		self.watched = {}
+
+	def watch(self, *keys):
+		self.watched = {key: self.client.store.get(key) for key in keys}
+
+	def get(self, key):
+		return self.client.get(key)
+
+	def multi(self):
+		pass
+
+	def set(self, *args, **kwargs):
+		self.calls.append(("set", args, kwargs))
+
+	def delete(self, *args):
+		self.calls.append(("delete", args, {}))
+
+	def incr(self, *args):
+		self.calls.append(("incr", args, {}))
+
+	def expire(self, *args):
+		self.calls.append(("expire", args, {}))
+
+	def publish(self, *args):
+		self.calls.append(("publish", args, {}))
+
+	def execute(self):
+		if any(self.client.store.get(key) != value for key, value in self.watched.items()):
+			raise WatchError("watched key changed")
+		for name, args, kwargs in self.calls:
+			getattr(self.client, name)(*args, **kwargs)
+		self.calls = []
+
+
+class _FakePubSub:
+	def __init__(self, client):
+		self.client = client
+
+	def subscribe(self, **handlers):
+		for channel, handler in handlers.items():
+			self.client.subscribers.setdefault(channel, []).append(handler)
+
+	def run_in_thread(self, sleep_time=0, daemon=True):
+		return None
+
+
+class FakeRedis:
+	"""In-memory redis client sharing one store, delivers published messages synchronously."""
+
+	def __init__(self):
+		self.store = {}
+		self.subscribers = {}
+
+	def get(self, key):
+		value = self.store.get(key)
+		return value.encode() if isinstance(value, str) else value
+
+	def set(self, key, value, ex=None):
+		self.store[key] = value
+
+	def delete(self, key):
+		self.store.pop(key, None)
+
+	def incr(self, key):
+		self.store[key] = str(int(self.store.get(key, 0)) + 1)
+
+	def expire(self, key, seconds):
+		pass
+
+	def publish(self, channel, message):
+		for handler in self.subscribers.get(channel, []):
+			handler({"type": "message", "data": message.encode()})
+
+	def pipeline(self):
+		return _FakePipeline(self)
+
+	def pubsub(self, ignore_subscribe_messages=True):
+		return _FakePubSub(self)
@@ -0,0 +1,69 @@
+from fairscape_mds.models.identifier import (
+	StoredIdentifier,
+	MetadataTypeEnum,
+	MetadataUnion,
+	PublicationStatusEnum,
+	lookupMetadataType
+)
+from fairscape_mds.tests.crud.utils import load_test_data
+from fairscape_models.dataset import Dataset
+from pydantic import TypeAdapter, ValidationError
+import datetime
+import pytest
+
+
+def storedDocument(metadataType, metadata):
+	return {
+		"@id": metadata["@id"],
+		"@type": metadataType,
+		"metadata": metadata,
+		"permissions": {"owner": "test@example.org", "group": None},
+		"distribution": None,
+		"publicationStatus": PublicationStatusEnum.DRAFT,
+		"dateCreated": datetime.datetime.now(),
+		"dateModified": datetime.datetime.now()
+	}
+
+
+def test_lookup_metadata_type():
+	assert lookupMetadataType(MetadataTypeEnum.DATASET) == MetadataTypeEnum.DATASET
+	assert lookupMetadataType(["prov:Entity", "https://w3id.org/EVI#Dataset"]) == MetadataTypeEnum.DATASET
+	assert lookupMetadataType(("prov:Entity", "https://w3id.org/EVI#Dataset")) == MetadataTypeEnum.DATASET
+	assert lookupMetadataType("evi:EvidenceGraph") == MetadataTypeEnum.EVIDENCE_GRAPH
+	assert lookupMetadataType("https://w3id.org/EVI#Unknown") is None
+	assert lookupMetadataType(None) is None
+
+
+def test_stored_type_dispatches_to_model():
+	datasetMetadata = load_test_data('dataset_content.json')
+	document = storedDocument(MetadataTypeEnum.DATASET.value, datasetMetadata)
+
+	identifier = StoredIdentifier.model_validate(document)
+
+	assert isinstance(identifier.metadata, Dataset)
+	# the caller's document is left as plain json
+	assert isinstance(document["metadata"], dict)
+
+
+def test_invalid_metadata_falls_back_to_union():
+	document = storedDocument(
+		MetadataTypeEnum.DATASET.value,
+		{"@id": "ark:59853/not-a-dataset", "@type": "Thing", "name": "not a dataset"}
+	)
+
+	identifier = StoredIdentifier.model_validate(document)
+
+	# the stored model rejects it, so it gets the member union matching picks
+	expected = TypeAdapter(MetadataUnion).validate_python(document["metadata"])
+	assert type(identifier.metadata) is type(expected)
+	assert identifier.metadata.model_dump(by_alias=True) == expected.model_dump(by_alias=True)
+
+
+def test_invalid_metadata_of_a_strict_type_is_rejected():
+	document = storedDocument(
+		MetadataTypeEnum.EVIDENCE_GRAPH.value,
+		{"@id": "ark:59853/not-a-graph", "@type": "Thing", "name": "not a graph"}
+	)
+
+	with pytest.raises(ValidationError):
+		StoredIdentifier.model_validate(document)
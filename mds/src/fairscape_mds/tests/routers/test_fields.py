@@ -0,0 +1,38 @@
+"""Route-level tests for the ``fields`` query parameter of the metadata GETs."""
+
+from __future__ import annotations
+
+import mongomock
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
+
+from fairscape_mds.routers import dataset, schema, software
+
+
+ROUTES = [
+    (dataset, "datasetRequest", dataset.datasetRouter, "dataset", "https://w3id.org/EVI#Dataset"),
+    (software, "softwareRequest", software.softwareRouter, "software", "https://w3id.org/EVI#Software"),
+    (schema, "schemaRequest", schema.schemaRouter, "schema", "https://w3id.org/EVI#Schema"),
+]
+
+
+@pytest.mark.parametrize("module,requestName,router,path,metadataType", ROUTES)
+def test_fields_are_relative_to_the_metadata(monkeypatch, module, requestName, router, path, metadataType):
+    guid = f"ark:59853/{path}-fields"
+    cfg = MagicMock()
+    cfg.identifierCollection = mongomock.MongoClient()["fairscape_test"]["identifier"]
+    cfg.identifierCollection.insert_one({
+        "@id": guid,
+        "@type": metadataType,
+        "metadata": {"@id": guid, "name": f"{path} fields", "description": "d"},
+    })
+    monkeypatch.setattr(module, requestName, type(getattr(module, requestName))(cfg))
+
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).get(f"/{path}/{guid}", params={"fields": "name"})
+
+    assert response.status_code == 200
+    assert response.json() == {"@id": guid, "name": f"{path} fields"}
@@ -18,6 +18,8 @@ from fairscape_mds.crud.AIReady import FairscapeAIReadyScoreRequest
 from fairscape_mds.crud.llm_assist import FairscapeLLMAssistRequest
 from fairscape_mds.crud.condensation import FairscapeCondensationRequest
 from fairscape_mds.crud.interpretation import FairscapeInterpretationRequest
+from fairscape_mds.crud.rdf import FairscapeRDFRequest
+from fairscape_mds.crud.publish import FairscapePublishRequest
 
 from fairscape_models.conversion.models.AIReady import AIReadyScore
 from fairscape_models.conversion.mapping.AIReady import (
@@ -32,6 +34,8 @@ llmAssistRequests = FairscapeLLMAssistRequest(appConfig)
 identifierRequestFactory = IdentifierRequest(appConfig)
 condensationRequests = FairscapeCondensationRequest(appConfig)
 interpretationRequests = FairscapeInterpretationRequest(appConfig)
+rdfRequests = FairscapeRDFRequest(appConfig)
+publishRequests = FairscapePublishRequest(appConfig)
 
 # add support for logfire worker token
 @worker_init.connect()
@@ -92,6 +96,32 @@ def processROCrate(transactionGUID: str):
     return uploadAttempt.rocrateGUID
 
 
+@celeryApp.task(name='fairscape_mds.worker.prerender_rdf_task')
+def prerender_rdf_task(guid: str):
+    """ Render Turtle and RDF/XML for a published identifier and its crate members
+    """
+    memberCursor = appConfig.identifierCollection.find(
+        {"metadata.isPartOf.@id": guid},
+        projection={"_id": False, "@id": 1}
+    )
+    guids = [guid] + [member["@id"] for member in memberCursor if member.get("@id")]
+
+    rendered = rdfRequests.prerenderRDF(*guids)
+    print(f"Prerendered {rendered} RDF serializations for {guid}")
+    return rendered
+
+
+@celeryApp.task(name='fairscape_mds.worker.upload_to_platform_task')
+def upload_to_platform_task(task_guid: str):
+    """ Stream a crate archive from S3 to Dataverse, Zenodo or Figshare
+    """
+    print(f"Starting Platform Upload Job: Task GUID {task_guid}")
+    response = publishRequests.run_platform_upload(task_guid)
+    if response.success:
+        return {"status": "SUCCESS", "result": response.model}
+    return {"status": "FAILURE", "error": response.error}
+
+
 #Are the guids supposed to be @id?
 @celeryApp.task(name='fairscape_mds.worker.build_evidence_graph_task', bind=True)
 def build_evidence_graph_task(self, task_guid: str, user_email: str, naan: str, postfix: str):
@@ -0,0 +1,128 @@
+""" Download streaming throughput of pipelineBody over a real S3 body
+
+A local aiohttp server plays S3: it serves the object over a socket and
+sleeps briefly between segments, like a remote store. The client reads it
+through aiobotocore's StreamingBody, the object the API gets back from
+get_object, and each write to the API's client costs latency per MiB, so a
+transfer is bound by whichever side is slower. Compares:
+
+  - line iteration, what iterating the StreamingBody did before
+  - sequential fixed size chunks, read then write
+  - iterS3Body, the production path, fixed size chunks from pipelineBody
+    read ahead of the client
+
+Throughput of the production path is taken from downloadStats, the same
+counters GET /metrics/downloads reports.
+
+	python tests/benchmark_download_stream.py [object MiB] [chunk MiB]
+"""
+import asyncio
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+from aiobotocore.response import StreamingBody
+
+from fairscape_mds.core.aio import iterS3Body
+from fairscape_mds.core.streaming import downloadStats
+
+SEGMENT_SIZE = 65536
+# seconds the store waits per segment, and per client write of one MiB
+SEGMENT_LATENCY = 0.0002
+WRITE_LATENCY = 0.002
+
+
+def storeApp(size: int) -> web.Application:
+	# binary data with the occasional newline, so line iteration yields
+	# small pieces rather than one object sized line
+	segment = (b"\x00" * 8191 + b"\n") * (SEGMENT_SIZE // 8192)
+
+	async def getObject(request):
+		response = web.StreamResponse(headers={"Content-Length": str(size)})
+		await response.prepare(request)
+		remaining = size
+		while remaining > 0:
+			await asyncio.sleep(SEGMENT_LATENCY)
+			await response.write(segment[:min(SEGMENT_SIZE, remaining)])
+			remaining -= SEGMENT_SIZE
+		await response.write_eof()
+		return response
+
+	app = web.Application()
+	app.router.add_get("/object", getObject)
+	return app
+
+
+async def clientWrite(chunk: bytes):
+	await asyncio.sleep(WRITE_LATENCY * len(chunk) / 1048576 + 0.00005)
+
+
+async def lineIteration(body: StreamingBody, chunkSize: int):
+	async for line in body.iter_lines(keepends=True):
+		await clientWrite(line)
+	body.close()
+
+
+async def sequentialChunks(body: StreamingBody, chunkSize: int):
+	while True:
+		buffer = bytearray()
+		while len(buffer) < chunkSize:
+			data = await body.read(chunkSize - len(buffer))
+			if not data:
+				break
+			buffer += data
+		if not buffer:
+			break
+		await clientWrite(bytes(buffer))
+	body.close()
+
+
+async def pipelined(body: StreamingBody, chunkSize: int):
+	async for chunk in iterS3Body(body, chunkSize=chunkSize, readAhead=2, label="benchmark"):
+		await clientWrite(chunk)
+
+
+async def run(size: int, chunkSize: int):
+	runner = web.AppRunner(storeApp(size))
+	await runner.setup()
+	site = web.TCPSite(runner, "127.0.0.1", 0)
+	await site.start()
+	port = site._server.sockets[0].getsockname()[1]
+
+	results = []
+	try:
+		async with aiohttp.ClientSession() as session:
+			for name, transfer in [
+				("line iteration", lineIteration),
+				("sequential chunks", sequentialChunks),
+				("pipelined chunks", pipelined),
+			]:
+				start = time.perf_counter()
+				response = await session.get(f"http://127.0.0.1:{port}/object")
+				await transfer(StreamingBody(response, size), chunkSize)
+				results.append((name, time.perf_counter() - start))
+	finally:
+		await runner.cleanup()
+	return results
+
+
+def main(objectMiB: int, chunkMiB: float):
+	size = objectMiB * 1048576
+	chunkSize = int(chunkMiB * 1048576)
+
+	before = downloadStats.snapshot()
+	results = asyncio.run(run(size, chunkSize))
+
+	print(f"{objectMiB} MiB object, {chunkMiB} MiB chunks")
+	for name, seconds in results:
+		print(f"  {name:<20} {seconds:7.3f}s  {objectMiB / seconds:8.1f} MiB/s")
+
+	after = downloadStats.snapshot()
+	print(f"  downloadStats: {after['transfers'] - before['transfers']} transfer, mean {after['meanThroughputMiBps']} MiB/s")
+
+
+if __name__ == "__main__":
+	objectMiB = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+	chunkMiB = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+	main(objectMiB, chunkMiB)
@@ -0,0 +1,162 @@
+""" Provenance graph collection, batched BFS against $graphLookup
+
+Builds synthetic crates and collects their graphs twice: level by level
+with batched $in queries, which build_full_graph_for_rocrate does without
+an edge index, and with lookupGraph, the $graphLookup over the edge index
+it uses otherwise. The edge sync is timed on its own, on a server writes
+keep the index in sync between traversals. The graphs are:
+
+  - deep, a chain of datasets each generated by a computation using the
+    previous dataset, one new level per reference
+  - wide, a crate whose hasPart lists every dataset, all generated by a
+    handful of computations
+
+Against mongomock each query is charged a fixed round trip latency, which
+is what separates the two engines on a real server. mongomock evaluates
+$graphLookup with a collection scan per node, so there its time grows with
+the square of the graph and only the query counts compare. Pass a MongoDB
+URI to measure a server instead, the collections are dropped afterwards.
+
+	PYTHONPATH=mds/src python tests/benchmark_graph_traversal.py [depth] [width] [mongodb uri]
+"""
+import sys
+import time
+import types
+
+import mongomock
+import pymongo
+
+from fairscape_mds.core.graph import EdgeIndex, lookupGraph
+from fairscape_mds.crud.condensation import (
+	EDGE_FIELDS,
+	FairscapeCondensationRequest,
+	_BATCH_SIZE,
+	_flatten_metadata,
+	sync_provenance_edges
+)
+from fairscape_mds.tests.crud.utils import sequentialBulkWrite
+
+# seconds charged per query against mongomock
+ROUND_TRIP = 0.001
+DATASET = ["prov:Entity", "https://w3id.org/EVI#Dataset"]
+COMPUTATION = ["prov:Activity", "https://w3id.org/EVI#Computation"]
+ROCRATE = ["https://w3id.org/EVI#Dataset", "https://w3id.org/EVI#ROCrate"]
+
+
+class RoundTrips:
+	""" Counts the queries sent to a collection, charging latency for each """
+
+	def __init__(self, collection, latency: float):
+		self.collection = collection
+		self.latency = latency
+		self.queries = 0
+
+	def __getattr__(self, name):
+		return getattr(self.collection, name)
+
+	def _charge(self):
+		self.queries += 1
+		if self.latency:
+			time.sleep(self.latency)
+
+	def find(self, *args, **kwargs):
+		self._charge()
+		return self.collection.find(*args, **kwargs)
+
+	def aggregate(self, *args, **kwargs):
+		self._charge()
+		return self.collection.aggregate(*args, **kwargs)
+
+
+def storedDocument(guid, metadataType, **metadata):
+	return {
+		"@id": guid,
+		"@type": metadataType,
+		"publicationStatus": "PUBLISHED",
+		"permissions": {"owner": "bench@example.org", "group": None},
+		"metadata": {"@id": guid, "@type": metadataType[-1], "name": guid, **metadata},
+	}
+
+
+def deepGraph(depth: int):
+	root = "ark:59852/deep"
+	documents = [storedDocument(root, ROCRATE, hasPart=[{"@id": f"ark:59852/deep-dataset-{depth}"}])]
+	for level in range(1, depth + 1):
+		dataset = f"ark:59852/deep-dataset-{level}"
+		computation = f"ark:59852/deep-computation-{level}"
+		documents.append(storedDocument(dataset, DATASET, generatedBy=[{"@id": computation}]))
+		used = [{"@id": f"ark:59852/deep-dataset-{level - 1}"}] if level > 1 else []
+		documents.append(storedDocument(computation, COMPUTATION, usedDataset=used))
+	return root, documents
+
+
+def wideGraph(width: int, computations: int = 8):
+	root = "ark:59852/wide"
+	datasets = [f"ark:59852/wide-dataset-{index}" for index in range(width)]
+	documents = [storedDocument(root, ROCRATE, hasPart=[{"@id": guid} for guid in datasets])]
+	for index, guid in enumerate(datasets):
+		documents.append(storedDocument(
+			guid, DATASET,
+			generatedBy=[{"@id": f"ark:59852/wide-computation-{index % computations}"}]
+		))
+	for index in range(computations):
+		documents.append(storedDocument(f"ark:59852/wide-computation-{index}", COMPUTATION))
+	return root, documents
+
+
+def measure(database, latency: float, name: str, root: str, documents: list):
+	identifiers = RoundTrips(database[f"bench_{name}_identifier"], latency)
+	edgeCollection = database[f"bench_{name}_edges"]
+	if isinstance(edgeCollection, mongomock.Collection):
+		edgeCollection = sequentialBulkWrite(edgeCollection)
+	edges = EdgeIndex(RoundTrips(edgeCollection, latency))
+	identifiers.collection.insert_many(documents)
+	edges.collection.create_index([("source", pymongo.ASCENDING), ("field", pymongo.ASCENDING)])
+
+	config = types.SimpleNamespace(identifierCollection=identifiers, provenanceEdges=None)
+	results = {}
+	try:
+		start, queries = time.perf_counter(), identifiers.queries
+		graph = FairscapeCondensationRequest(config).build_full_graph_for_rocrate(root)
+		results["batched BFS"] = (time.perf_counter() - start, identifiers.queries - queries, len(graph))
+
+		config.provenanceEdges = edges
+		start, queries = time.perf_counter(), identifiers.queries + edges.collection.queries
+		sync_provenance_edges(config)
+		results["edge sync"] = (time.perf_counter() - start, identifiers.queries + edges.collection.queries - queries, 0)
+
+		start, queries = time.perf_counter(), identifiers.queries + edges.collection.queries
+		graph = lookupGraph(
+			identifiers, edges, [root], EDGE_FIELDS,
+			projection={"_id": 0}, transform=_flatten_metadata, batchSize=_BATCH_SIZE
+		)
+		results["$graphLookup"] = (
+			time.perf_counter() - start,
+			identifiers.queries + edges.collection.queries - queries,
+			len(graph)
+		)
+	finally:
+		identifiers.collection.drop()
+		edges.collection.drop()
+
+	for engine, (seconds, queries, nodes) in results.items():
+		print(f"{name:<8}{engine:<14}{nodes:>8}{queries:>10}{seconds * 1000:>12.1f}")
+
+
+def main(depth: int, width: int, uri: str = None):
+	if uri:
+		database, latency = pymongo.MongoClient(uri)["fairscape_benchmark"], 0
+	else:
+		database, latency = mongomock.MongoClient()["fairscape_benchmark"], ROUND_TRIP
+
+	print(f"{'graph':<8}{'engine':<14}{'nodes':>8}{'queries':>10}{'time (ms)':>12}")
+	measure(database, latency, "deep", *deepGraph(depth))
+	measure(database, latency, "wide", *wideGraph(width))
+
+
+if __name__ == "__main__":
+	main(
+		int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+		int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+		sys.argv[3] if len(sys.argv) > 3 else None
+	)
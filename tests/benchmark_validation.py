@@ -0,0 +1,80 @@
+""" Per document validation cost of StoredIdentifier
+
+Compares validating stored metadata against the full MetadataUnion (the path
+every read took before @type dispatch) with validating against the model for
+the stored @type, and reports the full StoredIdentifier cost alongside.
+
+	python tests/benchmark_validation.py [iterations]
+"""
+import datetime
+import sys
+import timeit
+
+from pydantic import TypeAdapter
+
+from fairscape_mds.models.identifier import (
+	StoredIdentifier,
+	MetadataUnion,
+	MetadataTypeEnum,
+	PublicationStatusEnum,
+	METADATA_TYPE_MODELS,
+	lookupMetadataType
+)
+from fairscape_mds.tests.crud.utils import load_test_data
+
+
+def storedDocument(metadataType, metadata):
+	return {
+		"@id": metadata["@id"],
+		"@type": metadataType,
+		"metadata": metadata,
+		"permissions": {"owner": "test@example.org", "group": None},
+		"distribution": None,
+		"publicationStatus": PublicationStatusEnum.PUBLISHED,
+		"dateCreated": datetime.datetime.now(),
+		"dateModified": datetime.datetime.now()
+	}
+
+
+DOCUMENTS = {
+	"dataset": storedDocument(
+		MetadataTypeEnum.DATASET.value,
+		load_test_data('dataset_content.json')
+	),
+	"computation": storedDocument(
+		MetadataTypeEnum.COMPUTATION.value,
+		load_test_data('single_computation.json')
+	),
+}
+
+
+def main(iterations: int):
+	unionAdapter = TypeAdapter(MetadataUnion)
+
+	def unionValidate(document):
+		return unionAdapter.validate_python(document["metadata"])
+
+	def dispatchValidate(document):
+		modelClass = METADATA_TYPE_MODELS[lookupMetadataType(document["@type"])]
+		return unionAdapter.validate_python(modelClass.model_validate(document["metadata"]))
+
+	print(f"{'document':<14}{'union (us)':>12}{'dispatch (us)':>15}{'speedup':>9}{'StoredIdentifier (us)':>23}")
+	for name, document in DOCUMENTS.items():
+		unionTime = timeit.timeit(lambda: unionValidate(document), number=iterations)
+		dispatchTime = timeit.timeit(lambda: dispatchValidate(document), number=iterations)
+		storedTime = timeit.timeit(
+			lambda: StoredIdentifier.model_validate(document),
+			number=iterations
+		)
+
+		unionPerDoc = unionTime / iterations * 1e6
+		dispatchPerDoc = dispatchTime / iterations * 1e6
+		storedPerDoc = storedTime / iterations * 1e6
+		print(
+			f"{name:<14}{unionPerDoc:>12.1f}{dispatchPerDoc:>15.1f}"
+			f"{unionPerDoc / dispatchPerDoc:>8.1f}x{storedPerDoc:>23.1f}"
+		)
+
+
+if __name__ == "__main__":
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)